@@ -0,0 +1,447 @@
+"""
+Detectarea rafalelor anormale de încercări de acces (în flux, memorie fixă)
+
+40 de încercări într-un minut pe aceeași cale pot fi normale pentru un
+folder folosit intens sau un semn de alarmă pentru unul deschis o dată pe
+săptămână. Detectorul compară, la fiecare încercare nouă, rata recentă cu
+rata obișnuită, fără să citească tabela AccessAttempt:
+
+    - pentru fiecare cale și fiecare gazdă (calculatorul monitorului), două
+      schițe count-min cu numărători cu descreștere exponențială: una pe
+      fereastra rafalei (ANOMALY_WINDOW, ~1 minut) și una pe fereastra de
+      referință (ANOMALY_BASELINE, ~o săptămână)
+    - un profil al orelor din săptămână (168 de numărători, tot cu
+      descreștere), care corectează rata de referință pentru ora curentă
+      (mai multe accesări luni la 10 decât duminică la 3 noaptea)
+
+Memoria este fixă (ANOMALY_SKETCH_WIDTH x ANOMALY_SKETCH_DEPTH numărători
+per schiță, indiferent de numărul căilor), iar o încercare costă
+O(ANOMALY_SKETCH_DEPTH) operații. Descreșterea este "înainte" (forward
+decay): fiecare eveniment adaugă exp((t - t_ref) / fereastră), iar valorile
+sunt reduse la momentul citirii; numărătorile sunt renormalizate rar, când
+exponentul devine mare.
+
+O încercare dintr-o rafală este marcată (anomaly_score, anomaly_reason)
+după commit-ul înregistrării, iar prima din fiecare rafală este trimisă
+dashboard-ului prin fluxul de anomalii (long-poll /api/anomalies, ca
+revocările). Încercările unui lot anulat nu ajung în detector. Fluxul este
+în memorie - presupune un singur proces al serverului, ca hotstore.py.
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import itertools
+import math
+import threading
+from array import array
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.utils import timezone
+
+# Exponentul peste care numărătorile sunt renormalizate (exp(40) ~ 2e17,
+# departe de depășirea unui double)
+RESCALE_EXPONENT = 40.0
+
+# Rata așteptată minimă într-o fereastră (evită împărțirea la zero pentru
+# căile noi - o cale nouă este comparată cu o încercare pe fereastră)
+MIN_EXPECTED = 1.0
+
+# Fereastra profilului orelor din săptămână și numărul minim (ponderat) de
+# încercări de la care profilul este folosit
+SEASON_WINDOW = 4 * 7 * 24 * 3600
+SEASON_MIN_EVENTS = 500.0
+
+# Corecția orei din săptămână este limitată la acest factor (în ambele sensuri)
+SEASON_MAX_FACTOR = 4.0
+
+# Numărul de anomalii păstrate pentru dashboard și numărul de chei
+# (cale/gazdă) ale căror rafale au fost deja anunțate
+FEED_SIZE = 200
+NOTIFIED_KEYS = 1024
+
+
+class DecayedCounters:
+    """
+    Numărători cu descreștere exponențială ("forward decay").
+
+    Un eveniment la momentul t adaugă exp((t - t_ref) / window) unei
+    numărători; valoarea la momentul now este suma împărțită la
+    exp((now - t_ref) / window), adică suma ponderilor exp(-(now - t) / window)
+    ale evenimentelor - aproximativ numărul evenimentelor din ultimele
+    `window` secunde.
+
+    Atribute:
+        window (float): Constanta de timp (secunde)
+        rows (list): Numărătorile (array de double, mărime fixă)
+    """
+
+    def __init__(self, window, width, depth=1):
+        """
+        Parametri:
+            window (float): Constanta de timp (secunde)
+            width (int): Numărătorile per rând
+            depth (int): Numărul de rânduri
+        """
+        self.window = float(window)
+        self.rows = [array('d', bytes(8 * width)) for _ in range(depth)]
+        self.t_ref = None
+
+    def weight(self, t):
+        """Ponderea unui eveniment la momentul t (renormalizează dacă e nevoie)."""
+        if self.t_ref is None:
+            self.t_ref = t
+        exponent = (t - self.t_ref) / self.window
+        if exponent > RESCALE_EXPONENT:
+            factor = math.exp(-exponent)
+            for row in self.rows:
+                for i, value in enumerate(row):
+                    if value:
+                        row[i] = value * factor
+            self.t_ref = t
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def scale(self, now):
+        """Factorul care aduce o numărătoare la momentul now."""
+        if self.t_ref is None:
+            return 0.0
+        return math.exp(-(now - self.t_ref) / self.window)
+
+
+class DecayedCountMin(DecayedCounters):
+    """
+    Schiță count-min cu numărători cu descreștere.
+
+    O cheie este numărată în câte o celulă din fiecare rând (funcții hash
+    diferite); estimarea este minimul celulelor - niciodată sub valoarea
+    reală, iar coliziunile o pot doar mări.
+    """
+
+    def __init__(self, window, width, depth):
+        super().__init__(window, width, depth)
+        self.width = width
+
+    def slots(self, key):
+        """Celulele unei chei (câte una per rând)."""
+        return [hash((row, key)) % self.width for row in range(len(self.rows))]
+
+    def add(self, slots, t):
+        """Adaugă un eveniment la momentul t în celulele date."""
+        weight = self.weight(t)
+        for row, slot in zip(self.rows, slots):
+            row[slot] += weight
+
+    def estimate(self, slots, now):
+        """Numărul (ponderat) de evenimente ale cheii la momentul now."""
+        return min(row[slot] for row, slot in zip(self.rows, slots)) * self.scale(now)
+
+
+class HourOfWeekProfile(DecayedCounters):
+    """
+    Distribuția încercărilor pe cele 168 de ore ale săptămânii (cu descreștere).
+
+    Ultima numărătoare este totalul, deci este renormalizată odată cu orele.
+    """
+
+    HOURS = 7 * 24
+
+    def __init__(self, window):
+        super().__init__(window, self.HOURS + 1)
+
+    @classmethod
+    def hour_of_week(cls, moment):
+        """Ora din săptămână (0 = luni 00:00) în fusul orar al serverului."""
+        local = timezone.localtime(moment)
+        return local.weekday() * 24 + local.hour
+
+    def add(self, hour, t):
+        """Adaugă un eveniment la momentul t, în ora dată."""
+        weight = self.weight(t)
+        counters = self.rows[0]
+        counters[hour] += weight
+        counters[self.HOURS] += weight
+
+    def factor(self, hour, now):
+        """
+        Cât de aglomerată este ora față de media săptămânii.
+
+        Returnează:
+            float: 1 dacă profilul are prea puține date, altfel raportul
+                   dintre ora dată și media orelor (limitat la SEASON_MAX_FACTOR)
+        """
+        counters = self.rows[0]
+        total = counters[self.HOURS]
+        if total * self.scale(now) < SEASON_MIN_EVENTS:
+            return 1.0
+        ratio = counters[hour] * self.HOURS / total
+        return min(max(ratio, 1.0 / SEASON_MAX_FACTOR), SEASON_MAX_FACTOR)
+
+
+class AnomalyFeed:
+    """
+    Ultimele anomalii, pentru dashboard (cursor + long-poll).
+
+    Publicarea este O(1): o adăugare într-o coadă de mărime fixă și
+    trezirea cererilor care așteaptă.
+
+    Atribute:
+        cursor (int): Numărul de ordine al ultimei anomalii publicate
+    """
+
+    def __init__(self, size=FEED_SIZE):
+        self.cursor = 0
+        self._events = deque(maxlen=size)
+        self._cond = threading.Condition()
+
+    def publish(self, event):
+        """Adaugă o anomalie (dict) și trezește cererile care așteaptă."""
+        with self._cond:
+            self.cursor += 1
+            self._events.append({'seq': self.cursor, **event})
+            self._cond.notify_all()
+
+    def since(self, after):
+        """Anomaliile cu numărul de ordine mai mare decât after (apelantul ține lock-ul)."""
+        if after > self.cursor:
+            after = 0  # Cursor dintr-o rulare anterioară a serverului
+        first = self.cursor - len(self._events) + 1
+        return list(itertools.islice(self._events, max(after + 1 - first, 0), None))
+
+    def wait(self, after, timeout):
+        """
+        Așteaptă anomalii noi.
+
+        Parametri:
+            after (int): Ultimul număr de ordine primit
+            timeout (float): Cât timp să aștepte (secunde)
+
+        Returnează:
+            tuple: (anomaliile noi - list, cursorul curent)
+        """
+        with self._cond:
+            if timeout > 0 and not self.since(after):
+                self._cond.wait_for(lambda: self.since(after), timeout)
+            return self.since(after), self.cursor
+
+
+class AnomalyDetector:
+    """
+    Detectorul rafalelor anormale, alimentat de fiecare încercare nouă.
+
+    Atribute:
+        window (float): Fereastra rafalei (secunde)
+        baseline (float): Fereastra ratei de referință (secunde)
+        factor (float): De câte ori peste rata așteptată este o rafală
+        min_count (int): Numărul minim de încercări dintr-o rafală
+        feed (AnomalyFeed): Anomaliile anunțate dashboard-ului
+        observed (int): Încercări analizate
+        flagged (int): Încercări marcate
+    """
+
+    # Dimensiunile urmărite (cheia fiecărei încercări pe fiecare dimensiune)
+    DIMENSIONS = ('path', 'host')
+
+    def __init__(self, window=None, baseline=None, factor=None, min_count=None,
+                 width=None, depth=None):
+        """
+        Parametri (implicit din settings, prefixul ANOMALY_):
+            window (float): Fereastra rafalei (secunde)
+            baseline (float): Fereastra ratei de referință (secunde)
+            factor (float): Pragul raportului observat / așteptat
+            min_count (int): Numărul minim de încercări dintr-o rafală
+            width, depth (int): Dimensiunile schițelor count-min
+        """
+        def option(value, name):
+            return getattr(settings, name) if value is None else value
+
+        self.window = option(window, 'ANOMALY_WINDOW')
+        self.baseline = option(baseline, 'ANOMALY_BASELINE')
+        self.factor = option(factor, 'ANOMALY_FACTOR')
+        self.min_count = option(min_count, 'ANOMALY_MIN_COUNT')
+        width = option(width, 'ANOMALY_SKETCH_WIDTH')
+        depth = option(depth, 'ANOMALY_SKETCH_DEPTH')
+        # Schițele sunt comune dimensiunilor - cheile conțin numele dimensiunii
+        self.recent = DecayedCountMin(self.window, width, depth)
+        self.usual = DecayedCountMin(self.baseline, width, depth)
+        self.season = HourOfWeekProfile(SEASON_WINDOW)
+        self.feed = AnomalyFeed()
+        self.observed = 0
+        self.flagged = 0
+        self._now = None
+        self._started = None
+        self._notified = OrderedDict()  # cheie -> momentul ultimei rafale anunțate
+        self._lock = threading.Lock()
+
+    def learn(self, path_id, moment, host=None):
+        """
+        Adaugă o încercare fără să o evalueze (încălzirea din baza de date).
+
+        Parametri:
+            path_id (int): Calea (internată)
+            moment (datetime): Momentul încercării
+            host (str, optional): Gazda monitorului
+        """
+        with self._lock:
+            self._add(self._keys(path_id, host), moment)
+
+    def observe(self, path_id, moment, host=None):
+        """
+        Adaugă o încercare și verifică dacă face parte dintr-o rafală anormală.
+
+        Parametri:
+            path_id (int): Calea (internată)
+            moment (datetime): Momentul încercării (încercările retrimise din
+                spool au momentul original și contează mai puțin)
+            host (str, optional): Gazda monitorului
+
+        Returnează:
+            dict: {'dimension', 'key', 'count', 'expected', 'score', 'window',
+                   'notify'} pentru rafala găsită (notify = prima din rafală)
+            None: Dacă încercarea nu face parte dintr-o rafală
+        """
+        with self._lock:
+            self.observed += 1
+            keys = self._keys(path_id, host)
+            t = self._add(keys, moment)
+            season = self.season.factor(HourOfWeekProfile.hour_of_week(moment), t)
+            # Până la o fereastră de referință completă, rata obișnuită se
+            # calculează pe istoricul existent (integrala ponderilor)
+            history = max(t - self._started, self.window)
+            exposure = self.baseline * -math.expm1(-history / self.baseline)
+            # Prima dimensiune anormală, în ordinea DIMENSIONS (calea este cea mai precisă)
+            for dimension, key, slots in keys:
+                count = self.recent.estimate(slots, t)
+                if count < self.min_count:
+                    continue
+                usual = self.usual.estimate(slots, t) - count  # Fără rafala însăși
+                expected = max(usual * self.window / exposure * season, MIN_EXPECTED)
+                score = count / expected
+                if score >= self.factor:
+                    self.flagged += 1
+                    return {'dimension': dimension, 'key': key, 'count': count,
+                            'expected': expected, 'score': score, 'window': self.window,
+                            'notify': self._first_of_burst((dimension, key), t)}
+            return None
+
+    def _keys(self, path_id, host):
+        keys = [('path', path_id)]
+        if host:
+            keys.append(('host', host))
+        return [(dimension, key, self.recent.slots((dimension, key))) for dimension, key in keys]
+
+    def _add(self, keys, moment):
+        """Numără încercarea (apelantul ține lock-ul); returnează momentul evaluării."""
+        t = moment.timestamp()
+        if self._started is None:
+            self._started = t
+        # O încercare veche (retrimisă) este evaluată la momentul curent
+        self._now = t if self._now is None else max(self._now, t)
+        self._started = min(self._started, t)
+        for _, _, slots in keys:
+            self.recent.add(slots, t)
+            self.usual.add(slots, t)
+        self.season.add(HourOfWeekProfile.hour_of_week(moment), t)
+        return self._now
+
+    def _first_of_burst(self, key, t):
+        """True dacă rafala cheii nu a fost anunțată în ultima fereastră."""
+        last = self._notified.pop(key, None)
+        self._notified[key] = t
+        if len(self._notified) > NOTIFIED_KEYS:
+            self._notified.popitem(last=False)
+        return last is None or t - last > self.window
+
+    def stats(self):
+        """
+        Returnează statisticile detectorului.
+
+        Returnează:
+            dict: observed, flagged, cursor (ultima anomalie anunțată)
+        """
+        return {'observed': self.observed, 'flagged': self.flagged,
+                'cursor': self.feed.cursor}
+
+
+def describe(anomaly):
+    """
+    Textul afișat în dashboard pentru o rafală.
+
+    Parametri:
+        anomaly (dict): Rezultatul AnomalyDetector.observe
+
+    Returnează:
+        str: ex. "40 attempts on this path in ~60s (usually 1.0)"
+    """
+    target = 'this path' if anomaly['dimension'] == 'path' else f"host {anomaly['key'][:60]}"
+    return (f"{anomaly['count']:.0f} attempts on {target} in ~{anomaly['window']:.0f}s "
+            f"(usually {anomaly['expected']:.1f})")
+
+
+def anomaly_fields(anomaly):
+    """
+    Câmpurile AccessAttempt pentru o încercare marcată.
+
+    Parametri:
+        anomaly (dict): Rezultatul AnomalyDetector.observe (sau None)
+
+    Returnează:
+        dict: anomaly_score, anomaly_reason (gol dacă încercarea nu este marcată)
+    """
+    if anomaly is None:
+        return {}
+    return {'anomaly_score': round(anomaly['score'], 2), 'anomaly_reason': describe(anomaly)}
+
+
+def publish(detector, attempt, anomaly, host=None):
+    """
+    Anunță dashboard-ului prima încercare a unei rafale.
+
+    Parametri:
+        detector (AnomalyDetector): Detectorul
+        attempt (AccessAttempt): Încercarea marcată (salvată)
+        anomaly (dict): Rezultatul AnomalyDetector.observe
+        host (str, optional): Gazda monitorului
+    """
+    if not anomaly['notify']:
+        return
+    detector.feed.publish({
+        'attempt_id': attempt.id,
+        'timestamp': attempt.timestamp.isoformat(),
+        'access_path': attempt.path.path,
+        'host': host or '',
+        'dimension': anomaly['dimension'],
+        'count': round(anomaly['count']),
+        'expected': round(anomaly['expected'], 2),
+        'score': attempt.anomaly_score,
+        'reason': attempt.anomaly_reason,
+    })
+
+
+# Detectorul folosit de view-uri (creat la prima utilizare)
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_detector():
+    """
+    Returnează detectorul partajat.
+
+    La creare, detectorul este încălzit cu ultimele ANOMALY_WARMUP_ROWS
+    încercări din baza de date (căile și orele; gazdele nu sunt stocate),
+    astfel încât o repornire a serverului nu marchează traficul obișnuit.
+
+    Returnează:
+        AnomalyDetector: Detectorul (creat la primul apel)
+    """
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            from .models import AccessAttempt
+            detector = AnomalyDetector()
+            recent = AccessAttempt.objects.order_by('-id').values_list('path_id', 'timestamp')
+            for path_id, moment in reversed(list(recent[:settings.ANOMALY_WARMUP_ROWS])):
+                detector.learn(path_id, moment)
+            _detector = detector
+        return _detector
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccessControlConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'access_control'
+
+    def ready(self):
+        # Semnalele care țin depozitul încercărilor în așteptare sincronizat
+        from . import hotstore  # noqa: F401
@@ -0,0 +1,590 @@
+"""
+Arhiva pe coloane a încercărilor de acces vechi
+
+Încercările decise de mai mult de ARCHIVE_AFTER_DAYS zile nu se mai
+modifică, dar rămân în tabela AccessAttempt și îngreunează indexurile și
+fiecare interogare. Comanda `python manage.py archive_attempts` (și,
+periodic, un fir al serverului - ARCHIVE_INTERVAL) le mută în segmente
+pe disc, în ARCHIVE_DIR:
+
+    archive/
+    └── segment_<primul id>_<ultimul id>/
+        ├── meta.json           # rânduri, intervalul de id-uri, dicționarele
+        ├── id.npy              # câte un fișier NumPy per coloană
+        ├── timestamp.npy       # momente: microsecunde UTC (int64)
+        ├── status.npy          # valori puține: coduri uint8 + dicționar
+        ├── photo_path.offsets.npy + photo_path.data.npy   # text: offset-uri + UTF-8
+        └── ...
+
+    - Fiecare coloană este un tablou NumPy deschis cu mmap: o statistică
+      peste status citește doar status.npy (un octet per rând), direct din
+      cache-ul de pagini al sistemului.
+    - Căile rămân internate (path_id); textul căii se citește din AccessPath.
+    - Segmentele sunt imuabile; un segment nou este scris într-un director
+      temporar și apoi redenumit.
+
+Citirile sunt transparente: get_attempt, lista din dashboard, căutarea,
+exportul și statisticile combină tabela cu arhiva (vezi views.py).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AccessAttempt, AccessPath, Revocation
+from .photo_index import get_photo_index
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+log = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = 'segment_'
+
+# Momentul 0 al coloanelor de timp și valoarea pentru "lipsă" (null)
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+NULL_TIME = -2 ** 63
+
+# Coloanele arhivei: (câmp AccessAttempt, tip)
+#   int      - int64 (+ mască pentru null, dacă este cazul)
+#   time     - int64, microsecunde de la EPOCH (NULL_TIME = null)
+#   float    - float64 (NaN = null)
+#   category - cod într-un dicționar păstrat în meta.json (uint8; uint16/uint32
+#              dacă segmentul are mai mult de 256 / 65536 de valori distincte)
+#   text     - offset-uri int64 + octeți UTF-8 (+ mască pentru null)
+COLUMNS = (
+    ('id', 'int'),
+    ('timestamp', 'time'),
+    ('path_id', 'int'),
+    ('access_type', 'category'),
+    ('photo_path', 'text'),
+    ('photo_sharpness', 'float'),
+    ('photo_exposure', 'float'),
+    ('photo_brightness', 'float'),
+    ('status', 'category'),
+    ('decided_at', 'time'),
+    ('client_ref', 'text'),
+    ('decision_source', 'category'),
+    ('matched_identity', 'text'),
+    ('match_similarity', 'float'),
+    ('photo_hash', 'int'),
+    ('duplicate_of_id', 'int'),
+    ('revoked_at', 'time'),
+    ('anomaly_score', 'float'),
+    ('anomaly_reason', 'text'),
+)
+
+FIELDS = tuple(name for name, _ in COLUMNS)
+KINDS = dict(COLUMNS)
+
+
+def to_micros(value):
+    """datetime -> microsecunde de la EPOCH (NULL_TIME pentru None)."""
+    if value is None:
+        return NULL_TIME
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value):
+    """Microsecunde de la EPOCH -> datetime UTC (None pentru NULL_TIME)."""
+    value = int(value)
+    if value == NULL_TIME:
+        return None
+    return EPOCH + timedelta(microseconds=value)
+
+
+def _isoformat(value):
+    moment = from_micros(value)
+    return moment.isoformat() if moment is not None else None
+
+
+def _code_dtype(size):
+    """Cel mai mic tip întreg fără semn pentru codurile unui dicționar cu size valori."""
+    if size <= 1 << 8:
+        return np.uint8
+    if size <= 1 << 16:
+        return np.uint16
+    return np.uint32
+
+
+def write_segment(directory, rows):
+    """
+    Scrie un segment din rânduri (tupluri în ordinea FIELDS, sortate după id).
+
+    Segmentul este scris într-un director temporar și redenumit la final,
+    deci cititorii nu văd niciodată un segment incomplet.
+
+    Parametri:
+        directory (str): Directorul arhivei
+        rows (list): Rândurile segmentului (nevide)
+
+    Returnează:
+        str: Calea segmentului
+    """
+    first_id, last_id = rows[0][0], rows[-1][0]
+    name = f'{SEGMENT_PREFIX}{first_id:012d}_{last_id:012d}'
+    final = os.path.join(directory, name)
+    temporary = os.path.join(directory, f'.{name}.tmp')
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+
+    meta = {'rows': len(rows), 'first_id': first_id, 'last_id': last_id,
+            'columns': KINDS, 'categories': {}}
+    for index, (name_, kind) in enumerate(COLUMNS):
+        values = [row[index] for row in rows]
+        path = os.path.join(temporary, name_)
+        if kind == 'int':
+            np.save(f'{path}.npy', np.array([v if v is not None else 0 for v in values],
+                                            dtype=np.int64))
+            if any(v is None for v in values):
+                np.save(f'{path}.null.npy', np.array([v is None for v in values], dtype=bool))
+        elif kind == 'time':
+            np.save(f'{path}.npy', np.array([to_micros(v) for v in values], dtype=np.int64))
+        elif kind == 'float':
+            np.save(f'{path}.npy', np.array([np.nan if v is None else v for v in values],
+                                            dtype=np.float64))
+        elif kind == 'category':
+            dictionary = sorted(set(values))
+            codes = {value: code for code, value in enumerate(dictionary)}
+            meta['categories'][name_] = dictionary
+            np.save(f'{path}.npy', np.array([codes[v] for v in values],
+                                            dtype=_code_dtype(len(dictionary))))
+        else:
+            encoded = [(v or '').encode('utf-8') for v in values]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            np.save(f'{path}.offsets.npy', offsets)
+            np.save(f'{path}.data.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+            if any(v is None for v in values):
+                np.save(f'{path}.null.npy', np.array([v is None for v in values], dtype=bool))
+
+    timestamps = [to_micros(row[1]) for row in rows]
+    meta['min_timestamp'], meta['max_timestamp'] = min(timestamps), max(timestamps)
+    with open(os.path.join(temporary, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    os.replace(temporary, final)
+    return final
+
+
+class Segment:
+    """
+    Un segment al arhivei, citit prin mmap (coloanele se deschid la cerere).
+
+    Atribute:
+        path (str): Directorul segmentului
+        rows (int): Numărul de rânduri
+        first_id, last_id (int): Intervalul id-urilor
+        categories (dict): coloană -> dicționarul valorilor
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.rows = meta['rows']
+        self.first_id = meta['first_id']
+        self.last_id = meta['last_id']
+        self.categories = meta['categories']
+        self.kinds = meta['columns']
+        self._files = set(os.listdir(path))
+        self._columns = {}
+        self._lock = threading.Lock()
+
+    def _array(self, filename):
+        array = self._columns.get(filename)
+        if array is None:
+            if filename not in self._files:
+                return None
+            path = os.path.join(self.path, filename)
+            try:
+                array = np.load(path, mmap_mode='r')
+            except ValueError:
+                array = np.load(path)  # Un tablou gol nu poate fi mapat în memorie
+            with self._lock:
+                array = self._columns.setdefault(filename, array)
+        return array
+
+    def column(self, name):
+        """Coloana unui câmp (tablou NumPy; codurile pentru categorii)."""
+        return self._array(f'{name}.npy')
+
+    def code(self, name, value):
+        """Codul unei valori într-o coloană categorie (None dacă lipsește)."""
+        try:
+            return self.categories[name].index(value)
+        except ValueError:
+            return None
+
+    def index_of(self, attempt_id):
+        """Poziția unei încercări în segment (None dacă nu este aici)."""
+        if not self.first_id <= attempt_id <= self.last_id:
+            return None
+        ids = self.column('id')
+        index = int(np.searchsorted(ids, attempt_id))
+        return index if index < self.rows and ids[index] == attempt_id else None
+
+    def value(self, name, index):
+        """Valoarea unui câmp pe o poziție (tipul Python al câmpului)."""
+        kind = KINDS[name]
+        if name not in self.kinds:
+            # Coloană adăugată după scrierea segmentului - valoarea implicită
+            return '' if kind == 'text' else None
+        nulls = self._array(f'{name}.null.npy')
+        if nulls is not None and nulls[index]:
+            return None
+        if kind == 'text':
+            offsets = self._array(f'{name}.offsets.npy')
+            data = self._array(f'{name}.data.npy')
+            return bytes(data[offsets[index]:offsets[index + 1]]).decode('utf-8')
+        value = self.column(name)[index]
+        if kind == 'category':
+            return self.categories[name][int(value)]
+        if kind == 'float':
+            return None if np.isnan(value) else float(value)
+        return int(value)
+
+    def record(self, index, paths):
+        """
+        Încercarea de pe o poziție, în formatul răspunsurilor API (serialize_attempt).
+
+        Parametri:
+            index (int): Poziția în segment
+            paths (dict): path_id -> calea (AccessPath)
+        """
+        value = self.value
+        return {
+            'id': value('id', index),
+            'timestamp': _isoformat(self.column('timestamp')[index]),
+            'access_path': paths.get(value('path_id', index), ''),
+            'access_type': value('access_type', index),
+            'photo_path': value('photo_path', index),
+            'photo_sharpness': value('photo_sharpness', index),
+            'photo_exposure': value('photo_exposure', index),
+            'photo_brightness': value('photo_brightness', index),
+            'status': value('status', index),
+            'decided_at': _isoformat(self.column('decided_at')[index]),
+            'client_ref': value('client_ref', index),
+            'decision_source': value('decision_source', index),
+            'matched_identity': value('matched_identity', index),
+            'match_similarity': value('match_similarity', index),
+            'duplicate_of': value('duplicate_of_id', index),
+            'revoked_at': _isoformat(self.column('revoked_at')[index]),
+            'anomaly_score': value('anomaly_score', index),
+            'anomaly_reason': value('anomaly_reason', index),
+        }
+
+
+def resolve_paths(pairs):
+    """path_id -> cale, pentru perechile (segment, poziție) date."""
+    ids = {int(segment.column('path_id')[index]) for segment, index in pairs}
+    return dict(AccessPath.objects.filter(id__in=ids).values_list('id', 'path'))
+
+
+class Archive:
+    """
+    Toate segmentele din ARCHIVE_DIR (reîncărcate când directorul se schimbă).
+
+    Atribute:
+        directory (str): Directorul arhivei
+        segments (list): Segmentele, în ordinea id-urilor
+    """
+
+    def __init__(self, directory=None):
+        self.directory = str(settings.ARCHIVE_DIR if directory is None else directory)
+        self.segments = []
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        """True dacă arhiva poate fi citită (NumPy instalat)."""
+        return np is not None
+
+    def refresh(self):
+        """
+        Reîncarcă lista segmentelor dacă directorul s-a schimbat
+        (ex: comanda archive_attempts, rulată în alt proces).
+
+        Returnează:
+            list: Segmentele curente
+        """
+        if np is None:
+            return []
+        try:
+            version = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            self.segments, self._version = [], None
+            return self.segments
+        with self._lock:
+            if version != self._version:
+                names = sorted(name for name in os.listdir(self.directory)
+                               if name.startswith(SEGMENT_PREFIX))
+                known = {segment.path: segment for segment in self.segments}
+                self.segments = [known.get(path) or Segment(path) for path in
+                                 (os.path.join(self.directory, name) for name in names)]
+                self._version = version
+            return self.segments
+
+    def rows(self):
+        """Numărul de încercări arhivate."""
+        return sum(segment.rows for segment in self.refresh())
+
+    def find(self, attempt_id):
+        """
+        Caută o încercare arhivată după id.
+
+        Returnează:
+            dict: Încercarea (formatul serialize_attempt)
+            None: Dacă nu este în arhivă
+        """
+        for segment in self.refresh():
+            index = segment.index_of(attempt_id)
+            if index is not None:
+                return segment.record(index, resolve_paths([(segment, index)]))
+        return None
+
+    def _records(self, pairs):
+        paths = resolve_paths(pairs)
+        return [segment.record(index, paths) for segment, index in pairs]
+
+    def latest(self, status, limit):
+        """
+        Cele mai recente încercări arhivate cu un anumit status.
+
+        Parametri:
+            status (str): 'approved' sau 'denied'
+            limit (int): Numărul maxim de rezultate
+
+        Returnează:
+            list: Încercările, cele mai recente primele
+        """
+        candidates = []
+        for segment in self.refresh():
+            code = segment.code('status', status)
+            if code is None:
+                continue
+            indexes = np.flatnonzero(segment.column('status') == code)
+            if len(indexes) > limit:
+                timestamps = segment.column('timestamp')[indexes]
+                indexes = indexes[np.argpartition(timestamps, len(indexes) - limit)[-limit:]]
+            timestamps = segment.column('timestamp')
+            candidates.extend((int(timestamps[i]), segment, int(i)) for i in indexes)
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        return self._records([(segment, index) for _, segment, index in candidates[:limit]])
+
+    def search(self, path_ids, limit):
+        """
+        Încercările arhivate pentru un set de căi (internate).
+
+        Parametri:
+            path_ids (list): ID-urile AccessPath
+            limit (int): Numărul maxim de rezultate
+
+        Returnează:
+            list: Încercările, cele mai recente (id descrescător) primele
+        """
+        wanted = np.asarray(list(path_ids), dtype=np.int64)
+        if not len(wanted):
+            return []
+        pairs = []
+        for segment in reversed(self.refresh()):
+            indexes = np.flatnonzero(np.isin(segment.column('path_id'), wanted))
+            pairs.extend((segment, int(i)) for i in indexes[::-1][:limit - len(pairs)])
+            if len(pairs) >= limit:
+                break
+        return self._records(pairs)
+
+    def iter_records(self, batch=1000):
+        """
+        Toate încercările arhivate, în ordinea id-urilor (pentru export).
+
+        Parametri:
+            batch (int): Rânduri per rezolvare a căilor
+        """
+        for segment in self.refresh():
+            for start in range(0, segment.rows, batch):
+                pairs = [(segment, index) for index in
+                         range(start, min(start + batch, segment.rows))]
+                yield from self._records(pairs)
+
+    def counts(self, field):
+        """
+        Numărul de încercări arhivate pentru fiecare valoare a unei coloane categorie.
+
+        Parametri:
+            field (str): 'status', 'decision_source' sau 'access_type'
+
+        Returnează:
+            dict: valoare -> număr
+        """
+        totals = {}
+        for segment in self.refresh():
+            counts = np.bincount(segment.column(field),
+                                 minlength=len(segment.categories[field]))
+            for code, value in enumerate(segment.categories[field]):
+                if counts[code]:
+                    totals[value] = totals.get(value, 0) + int(counts[code])
+        return totals
+
+    def remove_orphans(self):
+        """
+        Șterge segmentele ale căror rânduri sunt încă în tabelă.
+
+        Un segment este redenumit înainte de commit-ul care șterge rândurile;
+        dacă acel commit a eșuat, rândurile au rămas în tabelă (autoritare).
+        Sunt verificate toate id-urile segmentului, nu doar primul (primul
+        rând poate fi fost șters între timp din tabelă).
+
+        Returnează:
+            int: Segmentele șterse
+        """
+        removed = 0
+        for segment in list(self.refresh()):
+            live = np.fromiter(AccessAttempt.objects.filter(
+                id__range=(segment.first_id, segment.last_id)
+            ).values_list('id', flat=True).iterator(), dtype=np.int64)
+            # Rândurile din interval care nu au fost arhivate (ex: revocate) nu contează
+            if len(live) and np.isin(live, segment.column('id')).any():
+                log.warning("Archive segment %s is still live - removing it", segment.path)
+                shutil.rmtree(segment.path, ignore_errors=True)
+                removed += 1
+        if removed:
+            self.refresh()
+        return removed
+
+
+def archivable(cutoff):
+    """
+    Încercările care pot fi arhivate: decise și mai vechi decât cutoff.
+
+    Reprezentanții unor fotografii duplicate rămân în tabelă cât timp au
+    duplicate mai noi (legătura duplicate_of ar fi pierdută). Încercările
+    revocate rămân și ele în tabelă: ștergerea lor ar anula (SET_NULL)
+    legătura din jurnalul revocărilor.
+    """
+    younger_duplicates = AccessAttempt.objects.filter(
+        timestamp__gte=cutoff, duplicate_of__isnull=False
+    ).values('duplicate_of')
+    revoked = Revocation.objects.filter(attempt__isnull=False).values('attempt')
+    return AccessAttempt.objects.exclude(status='pending').filter(
+        timestamp__lt=cutoff
+    ).exclude(id__in=younger_duplicates).exclude(id__in=revoked)
+
+
+def archive_attempts(older_than_days=None, segment_rows=None, directory=None, dry_run=False):
+    """
+    Mută încercările decise și vechi în segmente ale arhivei.
+
+    Fiecare segment este scris și rândurile lui șterse într-o singură
+    tranzacție: scrierile concurente așteaptă, deci niciun rând nu este
+    modificat între citire și ștergere.
+
+    Parametri:
+        older_than_days (int, optional): Vârsta minimă (implicit ARCHIVE_AFTER_DAYS)
+        segment_rows (int, optional): Rânduri per segment (implicit ARCHIVE_SEGMENT_ROWS)
+        directory (str, optional): Directorul arhivei (implicit ARCHIVE_DIR)
+        dry_run (bool): Doar numără rândurile care ar fi arhivate
+
+    Returnează:
+        tuple: (rânduri arhivate, segmente scrise)
+
+    Ridică:
+        RuntimeError: Dacă NumPy nu este instalat
+    """
+    if np is None:
+        raise RuntimeError("Arhiva necesită NumPy (pip install numpy)")
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    size = settings.ARCHIVE_SEGMENT_ROWS if segment_rows is None else segment_rows
+    archive = Archive(directory)
+    cutoff = timezone.now() - timedelta(days=days)
+    if dry_run:
+        return archivable(cutoff).count(), 0
+
+    os.makedirs(archive.directory, exist_ok=True)
+    archive.remove_orphans()
+    archived = segments = 0
+    while True:
+        with transaction.atomic():
+            rows = list(archivable(cutoff).order_by('id').values_list(*FIELDS)[:size])
+            if not rows:
+                break
+            write_segment(archive.directory, rows)
+            ids = [row[0] for row in rows]
+            for start in range(0, len(ids), 500):
+                AccessAttempt.objects.filter(id__in=ids[start:start + 500]).delete()
+        archived += len(rows)
+        segments += 1
+        if len(rows) < size:
+            break
+    if archived:
+        # Reprezentanții arhivați ies din indexul fotografiilor duplicate
+        get_photo_index().reset()
+    return archived, segments
+
+
+class Archiver:
+    """
+    Firul serverului care arhivează periodic (la ARCHIVE_INTERVAL secunde).
+
+    Atribute:
+        interval (float): Pauza dintre arhivări (secunde)
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='attempt-archiver', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        from django.db import connection
+        try:
+            while not self._stop_event.wait(self.interval):
+                try:
+                    archived, segments = archive_attempts()
+                    if archived:
+                        log.info("Archived %d attempt(s) into %d segment(s)", archived, segments)
+                except Exception as e:
+                    log.warning("Attempt archiving FAILED: %s", e)
+        finally:
+            connection.close()
+
+
+# Arhiva folosită de view-uri (creată la prima utilizare)
+_archive = None
+_archiver = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """
+    Returnează arhiva partajată și pornește arhivarea periodică (ARCHIVE_INTERVAL).
+
+    Returnează:
+        Archive: Arhiva (creată la primul apel)
+    """
+    global _archive, _archiver
+    with _archive_lock:
+        if _archive is None:
+            _archive = Archive()
+            if settings.ARCHIVE_INTERVAL and np is not None:
+                _archiver = Archiver(settings.ARCHIVE_INTERVAL)
+                _archiver.start()
+        return _archive
@@ -0,0 +1,328 @@
+"""
+Depozitul în memorie al încercărilor în așteptare (write-behind)
+
+Încercările în așteptare sunt setul "fierbinte": monitorul interoghează
+decizia fiecăreia în fiecare secundă, iar dashboard-ul le listează la
+fiecare două secunde. Sunt aproape întotdeauna doar câteva, deci le ținem
+în memorie, gata serializate:
+
+    - GET /api/attempt/<id> pentru o încercare în așteptare (sau decisă
+      recent) este un acces la dicționar, fără ORM
+    - decizia administratorului este aplicată întâi în memorie (vizibilă
+      imediat pentru monitor și dashboard) și scrisă în AccessAttempt de
+      un fir separat, la fiecare HOTSTORE_FLUSH_INTERVAL secunde, toate
+      deciziile acumulate într-o singură tranzacție
+    - după scriere, încercarea decisă iese din memorie (citirile ulterioare
+      merg din nou la baza de date)
+
+Depozitul este autoritar pentru starea "în așteptare": la pornire (prima
+utilizare) este reconstruit din rândurile cu status 'pending', iar orice
+altă scriere prin ORM (înregistrare, fotografie, interfața Django admin)
+îl actualizează prin semnalele post_save / post_delete, după commit.
+
+O decizie aplicată în memorie, dar încă nescrisă când procesul se oprește
+brusc, se pierde: încercarea redevine 'pending' la repornire, iar monitorul
+o refuză la expirare (fail closed). La o oprire normală, deciziile sunt
+scrise înainte de ieșire (atexit).
+
+Depozitul presupune un singur proces al serverului (runserver rulează
+cererile pe fire în același proces).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AccessAttempt
+
+log = logging.getLogger(__name__)
+
+# Câmpurile schimbate de o decizie - valorile din memorie au prioritate
+# până când decizia este scrisă în baza de date
+TRANSITION_FIELDS = ('status', 'decided_at', 'decision_source', 'matched_identity',
+                     'match_similarity')
+
+
+class PendingStore:
+    """
+    Încercările în așteptare, în memorie, cu scrierea deciziilor în fundal.
+
+    Fiecare încercare este păstrată ca dicționar serializat (formatul
+    răspunsurilor API), înlocuit - nu modificat - la fiecare schimbare,
+    deci poate fi returnat direct de view-uri.
+
+    Atribute:
+        flush_interval (float): Intervalul scrierilor în baza de date (secunde)
+        hits (int): Citiri servite din memorie
+        writes (int): Decizii scrise în baza de date
+        flushes (int): Tranzacții de scriere
+        errors (int): Scrieri eșuate (reluate la următorul interval)
+    """
+
+    def __init__(self, serialize, flush_interval=None):
+        """
+        Parametri:
+            serialize (callable): AccessAttempt -> dict (serialize_attempt din views)
+            flush_interval (float, optional): Implicit settings.HOTSTORE_FLUSH_INTERVAL
+        """
+        self.serialize = serialize
+        self.flush_interval = (settings.HOTSTORE_FLUSH_INTERVAL if flush_interval is None
+                               else flush_interval)
+        self.hits = 0
+        self.writes = 0
+        self.flushes = 0
+        self.errors = 0
+        self._records = {}  # id -> dict serializat
+        self._dirty = {}    # id -> câmpurile de scris (decizii nescrise)
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._running = True
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='pending-store-writer',
+                                        daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        """Reconstruiește depozitul din încercările 'pending' din baza de date."""
+        with self._lock:
+            if self._loaded:
+                return
+            pending = AccessAttempt.objects.select_related('path').filter(status='pending')
+            self._records = {attempt.id: self.serialize(attempt) for attempt in pending}
+            self._loaded = True
+
+    def get(self, attempt_id):
+        """
+        Returnează o încercare în așteptare (sau decisă și încă nescrisă).
+
+        Parametri:
+            attempt_id (int): ID-ul încercării
+
+        Returnează:
+            dict: Încercarea serializată (nu trebuie modificată)
+            None: Dacă încercarea nu este în memorie (citiți din baza de date)
+        """
+        if not self._loaded:
+            self._load()
+        record = self._records.get(attempt_id)
+        if record is not None:
+            self.hits += 1
+        return record
+
+    def snapshot(self):
+        """
+        Returnează toate încercările din memorie.
+
+        Returnează:
+            dict: id -> încercarea serializată (în așteptare și decise nescrise)
+        """
+        if not self._loaded:
+            self._load()
+        with self._lock:
+            return dict(self._records)
+
+    def pending(self):
+        """
+        Returnează încercările în așteptare, cele mai recente primele.
+
+        Returnează:
+            list: Încercările serializate cu status 'pending'
+        """
+        records = [record for record in self.snapshot().values()
+                   if record['status'] == 'pending']
+        records.sort(key=lambda record: record['timestamp'], reverse=True)
+        return records
+
+    def decide(self, attempt_id, status, decided_at, fields, only_pending=False):
+        """
+        Aplică o decizie în memorie și o programează pentru scriere.
+
+        Parametri:
+            attempt_id (int): ID-ul încercării
+            status (str): 'approved' sau 'denied'
+            decided_at (datetime): Momentul deciziei
+            fields (dict): Câmpurile de audit (decision_source, matched_identity,
+                match_similarity)
+            only_pending (bool): Nu înlocuiește o decizie deja aplicată în
+                memorie (ex: rezultatul local retrimis de monitor)
+
+        Returnează:
+            dict: Încercarea actualizată (sau, cu only_pending, cea deja decisă)
+            None: Dacă încercarea nu este în memorie (nu era în așteptare) -
+                  decizia trebuie salvată direct în baza de date
+        """
+        if not self._loaded:
+            self._load()
+        changes = {'status': status, 'decided_at': decided_at, **fields}
+        with self._lock:
+            record = self._records.get(attempt_id)
+            if record is None:
+                return None
+            if only_pending and record['status'] != 'pending':
+                return record
+            record = {**record, **changes, 'decided_at': decided_at.isoformat()}
+            self._records[attempt_id] = record
+            self._dirty.setdefault(attempt_id, {}).update(changes)
+            self._wake.notify()
+        return record
+
+    def sync(self, attempt, update_fields=None):
+        """
+        Actualizează depozitul după o scriere prin ORM (apelat după commit).
+
+        Parametri:
+            attempt (AccessAttempt): Încercarea salvată
+            update_fields (frozenset, optional): Câmpurile salvate (None = toate)
+        """
+        with self._lock:
+            # Înainte de încărcare nu este nimic de sincronizat - încărcarea citește baza de date
+            if not self._loaded:
+                return
+            known = attempt.id in self._records
+            if not known and attempt.status != 'pending':
+                return
+        record = self.serialize(attempt)
+        with self._lock:
+            dirty = self._dirty.get(attempt.id)
+            current = self._records.get(attempt.id)
+            if dirty is not None and current is not None:
+                # Decizia din memorie nu a fost încă scrisă - are prioritate
+                record.update({name: current[name] for name in TRANSITION_FIELDS})
+            elif attempt.status != 'pending':
+                # Decisă direct în baza de date (ex: interfața Django admin)
+                self._records.pop(attempt.id, None)
+                return
+            elif current is None and update_fields is not None:
+                return  # Încercarea a ieșit între timp din memorie
+            self._records[attempt.id] = record
+
+    def discard(self, attempt_id):
+        """Elimină o încercare ștearsă din baza de date."""
+        with self._lock:
+            self._records.pop(attempt_id, None)
+            self._dirty.pop(attempt_id, None)
+
+    def flush(self):
+        """
+        Scrie deciziile acumulate, într-o singură tranzacție.
+
+        Încercările scrise ies din memorie; la o eroare, deciziile rămân
+        programate și sunt reluate la următorul interval.
+
+        Returnează:
+            int: Numărul de decizii scrise
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._dirty = self._dirty, {}
+            if not batch:
+                return 0
+            try:
+                with transaction.atomic():
+                    for attempt_id, changes in batch.items():
+                        AccessAttempt.objects.filter(id=attempt_id).update(**changes)
+            except Exception as e:
+                self.errors += 1
+                log.warning("Pending store flush FAILED (%d decision(s) kept): %s", len(batch), e)
+                with self._lock:
+                    for attempt_id, changes in batch.items():
+                        if attempt_id in self._records:
+                            self._dirty[attempt_id] = {**changes,
+                                                       **self._dirty.get(attempt_id, {})}
+                return 0
+            with self._lock:
+                for attempt_id in batch:
+                    # O decizie nouă între timp rămâne în memorie până la scrierea ei
+                    if attempt_id not in self._dirty:
+                        self._records.pop(attempt_id, None)
+            self.writes += len(batch)
+            self.flushes += 1
+            return len(batch)
+
+    def _run(self):
+        try:
+            while True:
+                with self._lock:
+                    while self._running and not self._dirty:
+                        self._wake.wait()
+                    if not self._running:
+                        return
+                # Deciziile apropiate în timp sunt scrise împreună
+                self._stop_event.wait(self.flush_interval)
+                self.flush()
+        finally:
+            connection.close()
+
+    def close(self):
+        """Oprește firul de scriere și scrie deciziile rămase."""
+        with self._lock:
+            self._running = False
+            self._wake.notify_all()
+        self._stop_event.set()
+        self._thread.join()
+        self.flush()
+
+    def stats(self):
+        """
+        Returnează statisticile depozitului.
+
+        Returnează:
+            dict: records (în memorie), dirty (decizii nescrise), hits, writes,
+                  flushes, errors
+        """
+        with self._lock:
+            return {
+                'records': len(self._records),
+                'dirty': len(self._dirty),
+                'hits': self.hits,
+                'writes': self.writes,
+                'flushes': self.flushes,
+                'errors': self.errors,
+            }
+
+
+# Depozitul folosit de view-uri (creat la prima utilizare)
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_pending_store():
+    """
+    Returnează depozitul partajat al încercărilor în așteptare.
+
+    Returnează:
+        PendingStore: Depozitul (creat la primul apel; deciziile nescrise
+                      sunt scrise la ieșirea procesului)
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            from .views import serialize_attempt
+            _store = PendingStore(serialize_attempt)
+            atexit.register(_store.close)
+        return _store
+
+
+@receiver(post_save, sender=AccessAttempt, dispatch_uid='pending_store_saved')
+def _attempt_saved(sender, instance, update_fields=None, **kwargs):
+    store = _store
+    if store is not None:
+        transaction.on_commit(lambda: store.sync(instance, update_fields))
+
+
+@receiver(post_delete, sender=AccessAttempt, dispatch_uid='pending_store_deleted')
+def _attempt_deleted(sender, instance, **kwargs):
+    store = _store
+    if store is not None:
+        attempt_id = instance.id
+        transaction.on_commit(lambda: store.discard(attempt_id))
@@ -0,0 +1,65 @@
+"""
+Comanda archive_attempts - mută încercările vechi în arhiva pe coloane
+
+Utilizare:
+    python manage.py archive_attempts                 # mai vechi de ARCHIVE_AFTER_DAYS
+    python manage.py archive_attempts --days 7 --dry-run
+    python manage.py archive_attempts --stats         # doar conținutul arhivei
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from access_control.archive import Archive, archive_attempts
+from access_control.models import AccessAttempt
+
+
+class Command(BaseCommand):
+    help = "Mută încercările decise și vechi în segmente pe coloane (vezi access_control/archive.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help="vârsta minimă a încercărilor arhivate (zile)")
+        parser.add_argument('--segment-rows', type=int, default=settings.ARCHIVE_SEGMENT_ROWS,
+                            help="rânduri per segment")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="doar numără încercările care ar fi arhivate")
+        parser.add_argument('--stats', action='store_true',
+                            help="afișează conținutul arhivei, fără să arhiveze")
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats(Archive())
+            return
+
+        try:
+            archived, segments = archive_attempts(older_than_days=options['days'],
+                                                  segment_rows=options['segment_rows'],
+                                                  dry_run=options['dry_run'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            self.stdout.write(f"{archived} attempt(s) older than {options['days']} day(s) "
+                              f"would be archived")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} attempt(s) into {segments} segment(s); "
+            f"{AccessAttempt.objects.count()} attempt(s) left in the table"))
+
+    def print_stats(self, archive):
+        if not archive.available:
+            raise CommandError("Arhiva necesită NumPy (pip install numpy)")
+        segments = archive.refresh()
+        self.stdout.write(f"Archive {archive.directory}: {len(segments)} segment(s), "
+                          f"{archive.rows()} attempt(s)")
+        for segment in segments:
+            self.stdout.write(f"  {segment.path}: {segment.rows} rows, "
+                              f"ids {segment.first_id}-{segment.last_id}")
+        for field in ('status', 'decision_source'):
+            counts = ', '.join(f"{value or '-'}={count}"
+                               for value, count in sorted(archive.counts(field).items()))
+            self.stdout.write(f"  {field}: {counts or 'none'}")
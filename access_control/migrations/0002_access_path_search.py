@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:16
+
+from django.db import migrations, models
+
+
+# Tabela virtuală FTS5 cu conținut extern: indexează access_path fără a
+# duplica textul; triggerele o țin sincronizată la inserare/ștergere/modificare.
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS access_control_accessattempt_fts
+    USING fts5(
+        access_path,
+        content='access_control_accessattempt',
+        content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accessattempt_fts_ai
+    AFTER INSERT ON access_control_accessattempt BEGIN
+        INSERT INTO access_control_accessattempt_fts(rowid, access_path)
+        VALUES (new.id, new.access_path);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accessattempt_fts_ad
+    AFTER DELETE ON access_control_accessattempt BEGIN
+        INSERT INTO access_control_accessattempt_fts(access_control_accessattempt_fts, rowid, access_path)
+        VALUES ('delete', old.id, old.access_path);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accessattempt_fts_au
+    AFTER UPDATE OF access_path ON access_control_accessattempt BEGIN
+        INSERT INTO access_control_accessattempt_fts(access_control_accessattempt_fts, rowid, access_path)
+        VALUES ('delete', old.id, old.access_path);
+        INSERT INTO access_control_accessattempt_fts(rowid, access_path)
+        VALUES (new.id, new.access_path);
+    END
+    """,
+    # Indexăm înregistrările existente
+    "INSERT INTO access_control_accessattempt_fts(access_control_accessattempt_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS access_control_accessattempt_fts_ai",
+    "DROP TRIGGER IF EXISTS access_control_accessattempt_fts_ad",
+    "DROP TRIGGER IF EXISTS access_control_accessattempt_fts_au",
+    "DROP TABLE IF EXISTS access_control_accessattempt_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    """Creează indexul FTS5 (doar pentru SQLite)."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in FTS_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    """Șterge indexul FTS5 (doar pentru SQLite)."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_FTS_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access_control', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='accessattempt',
+            name='access_path',
+            field=models.CharField(db_index=True, max_length=500),
+        ),
+        migrations.AlterField(
+            model_name='accessattempt',
+            name='status',
+            field=models.CharField(choices=[('pending', 'În așteptare'), ('approved', 'Aprobat'), ('denied', 'Respins')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,159 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Indexul FTS5 se mută de pe access_path (un rând per încercare) pe tabela
+# de căi internate (un rând per cale distinctă).
+DROP_ATTEMPT_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS access_control_accessattempt_fts_ai",
+    "DROP TRIGGER IF EXISTS access_control_accessattempt_fts_ad",
+    "DROP TRIGGER IF EXISTS access_control_accessattempt_fts_au",
+    "DROP TABLE IF EXISTS access_control_accessattempt_fts",
+]
+
+PATH_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS access_control_accesspath_fts
+    USING fts5(
+        path,
+        content='access_control_accesspath',
+        content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accesspath_fts_ai
+    AFTER INSERT ON access_control_accesspath BEGIN
+        INSERT INTO access_control_accesspath_fts(rowid, path)
+        VALUES (new.id, new.path);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accesspath_fts_ad
+    AFTER DELETE ON access_control_accesspath BEGIN
+        INSERT INTO access_control_accesspath_fts(access_control_accesspath_fts, rowid, path)
+        VALUES ('delete', old.id, old.path);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accesspath_fts_au
+    AFTER UPDATE OF path ON access_control_accesspath BEGIN
+        INSERT INTO access_control_accesspath_fts(access_control_accesspath_fts, rowid, path)
+        VALUES ('delete', old.id, old.path);
+        INSERT INTO access_control_accesspath_fts(rowid, path)
+        VALUES (new.id, new.path);
+    END
+    """,
+    "INSERT INTO access_control_accesspath_fts(access_control_accesspath_fts) VALUES ('rebuild')",
+]
+
+DROP_PATH_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS access_control_accesspath_fts_ai",
+    "DROP TRIGGER IF EXISTS access_control_accesspath_fts_ad",
+    "DROP TRIGGER IF EXISTS access_control_accesspath_fts_au",
+    "DROP TABLE IF EXISTS access_control_accesspath_fts",
+]
+
+ATTEMPT_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS access_control_accessattempt_fts
+    USING fts5(
+        access_path,
+        content='access_control_accessattempt',
+        content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accessattempt_fts_ai
+    AFTER INSERT ON access_control_accessattempt BEGIN
+        INSERT INTO access_control_accessattempt_fts(rowid, access_path)
+        VALUES (new.id, new.access_path);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accessattempt_fts_ad
+    AFTER DELETE ON access_control_accessattempt BEGIN
+        INSERT INTO access_control_accessattempt_fts(access_control_accessattempt_fts, rowid, access_path)
+        VALUES ('delete', old.id, old.access_path);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS access_control_accessattempt_fts_au
+    AFTER UPDATE OF access_path ON access_control_accessattempt BEGIN
+        INSERT INTO access_control_accessattempt_fts(access_control_accessattempt_fts, rowid, access_path)
+        VALUES ('delete', old.id, old.access_path);
+        INSERT INTO access_control_accessattempt_fts(rowid, access_path)
+        VALUES (new.id, new.access_path);
+    END
+    """,
+    "INSERT INTO access_control_accessattempt_fts(access_control_accessattempt_fts) VALUES ('rebuild')",
+]
+
+
+def _run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+def intern_paths(apps, schema_editor):
+    """Creează câte o înregistrare AccessPath pentru fiecare cale distinctă."""
+    AccessAttempt = apps.get_model('access_control', 'AccessAttempt')
+    AccessPath = apps.get_model('access_control', 'AccessPath')
+
+    distinct_paths = (AccessAttempt.objects.order_by()
+                      .values_list('access_path', flat=True).distinct())
+    for access_path in distinct_paths.iterator():
+        path = AccessPath.objects.create(path=access_path)
+        AccessAttempt.objects.filter(access_path=access_path).update(path=path)
+
+
+def restore_paths(apps, schema_editor):
+    """Copiază căile înapoi în coloana access_path."""
+    AccessAttempt = apps.get_model('access_control', 'AccessAttempt')
+    AccessPath = apps.get_model('access_control', 'AccessPath')
+
+    for path in AccessPath.objects.iterator():
+        AccessAttempt.objects.filter(path=path).update(access_path=path.path)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access_control', '0002_access_path_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccessPath',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='accessattempt',
+            name='path',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attempts', to='access_control.accesspath'),
+        ),
+        migrations.RunPython(intern_paths, restore_paths),
+        migrations.RunPython(_run_sqlite(DROP_ATTEMPT_FTS_SQL), _run_sqlite(ATTEMPT_FTS_SQL)),
+        # Valoare implicită doar pentru a putea re-adăuga coloana la revenire
+        migrations.AlterField(
+            model_name='accessattempt',
+            name='access_path',
+            field=models.CharField(db_index=True, default='', max_length=500),
+        ),
+        migrations.RemoveField(
+            model_name='accessattempt',
+            name='access_path',
+        ),
+        migrations.AlterField(
+            model_name='accessattempt',
+            name='path',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attempts', to='access_control.accesspath'),
+        ),
+        migrations.RunPython(_run_sqlite(PATH_FTS_SQL), _run_sqlite(DROP_PATH_FTS_SQL)),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:28
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access_control', '0003_intern_access_paths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessattempt',
+            name='client_ref',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='accessattempt',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access_control', '0004_attempt_client_ref'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessattempt',
+            name='photo_brightness',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='accessattempt',
+            name='photo_exposure',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='accessattempt',
+            name='photo_sharpness',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
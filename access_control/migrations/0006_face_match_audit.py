@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access_control', '0005_photo_quality_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessattempt',
+            name='decision_source',
+            field=models.CharField(blank=True, choices=[('admin', 'Administrator'), ('face_match', 'Recunoaștere facială'), ('monitor', 'Monitor')], default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='accessattempt',
+            name='match_similarity',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='accessattempt',
+            name='matched_identity',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access_control', '0006_face_match_audit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessattempt',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='access_control.accessattempt'),
+        ),
+        migrations.AddField(
+            model_name='accessattempt',
+            name='photo_hash',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
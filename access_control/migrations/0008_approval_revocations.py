@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access_control', '0007_photo_hash_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessattempt',
+            name='revoked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Revocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempt', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revocations', to='access_control.accessattempt')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
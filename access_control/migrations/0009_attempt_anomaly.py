@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('access_control', '0008_approval_revocations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accessattempt',
+            name='anomaly_reason',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='accessattempt',
+            name='anomaly_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -8,7 +8,87 @@ Autor: Bascacov Alexandra
 Versiune: 1.0
 """
 
-from django.db import models
+import threading
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class AccessPathManager(models.Manager):
+    """
+    Manager pentru căile internate.
+
+    Păstrează un cache în memorie cale -> id, astfel încât înregistrarea
+    unei încercări noi nu mai face o interogare pentru căile deja văzute
+    (în practică câteva mii de căi distincte sub folderul protejat).
+    """
+
+    # Numărul maxim de căi păstrate în cache (se golește când se umple)
+    CACHE_SIZE = 10000
+
+    _cache = {}
+    _cache_lock = threading.Lock()
+
+    def intern(self, path):
+        """
+        Obține id-ul căii, creând înregistrarea dacă nu există.
+
+        Calea intră în cache abia după commit: o cale creată într-o tranzacție
+        anulată (ex: un lot respins) nu există în tabelă, deci id-ul ei nu
+        trebuie refolosit.
+
+        Parametri:
+            path (str): Calea completă către folderul/fișierul accesat
+
+        Returnează:
+            int: ID-ul înregistrării AccessPath
+        """
+        path_id = self._cache.get(path)
+        if path_id is not None:
+            return path_id
+
+        access_path, _ = self.get_or_create(path=path)
+        transaction.on_commit(lambda: self._remember(path, access_path.id))
+        return access_path.id
+
+    def _remember(self, path, path_id):
+        with self._cache_lock:
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            self._cache[path] = path_id
+
+    def forget(self, path):
+        """
+        Elimină o cale din cache (ex: după o eroare de integritate - rândul
+        nu mai există).
+
+        Parametri:
+            path (str): Calea completă
+        """
+        with self._cache_lock:
+            self._cache.pop(path, None)
+
+
+class AccessPath(models.Model):
+    """
+    Model pentru căile accesate (tabelă de internare).
+
+    Fiecare cale distinctă este stocată o singură dată, iar încercările
+    de acces o referă printr-o cheie străină. Astfel rândurile AccessAttempt
+    și indexurile lor sunt mult mai mici, iar gruparea și filtrarea după
+    cale devin comparații de numere întregi.
+
+    Atribute:
+        path (CharField): Calea completă (unică)
+    """
+
+    # Calea completă - unique=True creează și indexul folosit la căutarea după prefix
+    path = models.CharField(max_length=500, unique=True)
+
+    objects = AccessPathManager()
+
+    def __str__(self):
+        return self.path
 
 
 class AccessAttempt(models.Model):
@@ -27,11 +107,24 @@ class AccessAttempt(models.Model):
 
     Atribute:
         timestamp (DateTimeField): Data și ora când s-a detectat accesul
-        access_path (CharField): Calea completă către folderul/fișierul accesat
+        path (ForeignKey): Calea accesată (internată în AccessPath)
         access_type (CharField): Tipul accesului ('folder_opened', 'file_created', etc.)
         photo_path (CharField): Calea către fotografia capturată (poate fi null)
+        photo_sharpness, photo_exposure, photo_brightness (FloatField):
+            Scorurile de calitate ale fotografiei (pot fi null)
         status (CharField): Starea curentă ('pending', 'approved', 'denied')
         decided_at (DateTimeField): Momentul când s-a luat decizia (poate fi null)
+        client_ref (CharField): Identificatorul unic generat de monitor (poate fi null)
+        decision_source (CharField): Cine a luat decizia ('admin', 'face_match', 'monitor')
+        matched_identity (CharField): Persoana recunoscută la aprobarea automată
+        match_similarity (FloatField): Similaritatea feței recunoscute (poate fi null)
+        photo_hash (BigIntegerField): Hash-ul perceptual al fotografiei (vezi photo_index.py)
+        duplicate_of (ForeignKey): Încercarea cu o fotografie aproape identică
+            (reprezentantul grupului; null dacă fotografia este unică)
+        revoked_at (DateTimeField): Momentul revocării aprobării (poate fi null)
+        anomaly_score (FloatField): De câte ori depășește rafala din care face
+            parte încercarea rata obișnuită (null = trafic normal; vezi anomaly.py)
+        anomaly_reason (CharField): Descrierea rafalei, afișată în dashboard
     """
 
     # Opțiunile posibile pentru statusul unei încercări de acces
@@ -41,15 +134,23 @@ class AccessAttempt(models.Model):
         ('denied', 'Respins'),          # Administratorul a respins accesul
     ]
 
+    # Opțiunile posibile pentru sursa deciziei
+    DECISION_SOURCE_CHOICES = [
+        ('admin', 'Administrator'),                 # Decizie din dashboard
+        ('face_match', 'Recunoaștere facială'),     # Aprobare automată (persoană înrolată)
+        ('monitor', 'Monitor'),                     # Refuz automat (server indisponibil)
+    ]
+
     # Câmpurile bazei de date (coloanele tabelului)
 
     # Data și ora când s-a detectat încercarea de acces
-    # auto_now_add=True înseamnă că se completează automat la creare
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Implicit momentul creării; încercările retrimise din spool-ul monitorului
+    # își păstrează momentul original
+    timestamp = models.DateTimeField(default=timezone.now)
 
-    # Calea către folderul sau fișierul accesat
-    # max_length=500 pentru a permite căi lungi
-    access_path = models.CharField(max_length=500)
+    # Calea către folderul sau fișierul accesat (internată în AccessPath)
+    # PROTECT: o cale nu poate fi ștearsă cât timp are încercări asociate
+    path = models.ForeignKey(AccessPath, on_delete=models.PROTECT, related_name='attempts')
 
     # Tipul accesului (ex: 'folder_opened', 'file_created', 'file_modified')
     access_type = models.CharField(max_length=50, default='folder')
@@ -58,6 +159,12 @@ class AccessAttempt(models.Model):
     # null=True și blank=True permit valori goale
     photo_path = models.CharField(max_length=255, null=True, blank=True)
 
+    # Scorurile de calitate ale fotografiei (modul rafală al monitorului):
+    # claritatea (varianța Laplacianului), expunerea (0-1) și luminozitatea (0-255)
+    photo_sharpness = models.FloatField(null=True, blank=True)
+    photo_exposure = models.FloatField(null=True, blank=True)
+    photo_brightness = models.FloatField(null=True, blank=True)
+
     # Starea curentă a încercării de acces
     # choices=STATUS_CHOICES limitează valorile posibile
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -66,6 +173,34 @@ class AccessAttempt(models.Model):
     # Rămâne null până când se aprobă sau se respinge
     decided_at = models.DateTimeField(null=True, blank=True)
 
+    # Identificatorul generat de monitor (UUID) - face înregistrarea idempotentă:
+    # o încercare retrimisă după o întrerupere nu este duplicată
+    client_ref = models.CharField(max_length=64, unique=True, null=True, blank=True)
+
+    # Sursa deciziei (jurnal de audit) - goală cât timp încercarea este în așteptare
+    decision_source = models.CharField(max_length=20, choices=DECISION_SOURCE_CHOICES,
+                                       blank=True, default='')
+
+    # Aprobarea automată: persoana din galeria monitorului și similaritatea (0-1)
+    matched_identity = models.CharField(max_length=100, blank=True, default='')
+    match_similarity = models.FloatField(null=True, blank=True)
+
+    # Hash-ul perceptual (dHash, 64 de biți, stocat cu semn) al fotografiei
+    photo_hash = models.BigIntegerField(null=True, blank=True, db_index=True)
+
+    # Reprezentantul grupului de fotografii aproape identice (vezi photo_index.py)
+    # SET_NULL: ștergerea reprezentantului nu șterge duplicatele
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='duplicates')
+
+    # Momentul când administratorul a revocat aprobarea (null = nerevocată)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    # Rafala anormală din care face parte încercarea (vezi anomaly.py):
+    # raportul dintre numărul observat și cel așteptat, și descrierea ei
+    anomaly_score = models.FloatField(null=True, blank=True)
+    anomaly_reason = models.CharField(max_length=200, blank=True, default='')
+
     class Meta:
         """
         Metadate pentru model.
@@ -75,6 +210,11 @@ class AccessAttempt(models.Model):
         """
         ordering = ['-timestamp']
 
+    @property
+    def access_path(self):
+        """Calea completă către folderul/fișierul accesat."""
+        return self.path.path
+
     def __str__(self):
         """
         Reprezentarea text a unei încercări de acces.
@@ -83,3 +223,33 @@ class AccessAttempt(models.Model):
         Folosit în interfața de administrare Django.
         """
         return f"{self.access_type} - {self.status} - {self.timestamp}"
+
+
+class Revocation(models.Model):
+    """
+    Model pentru revocările de aprobări (jurnal ordonat).
+
+    Monitorul citește revocările noi după ID (cursor) printr-o cerere
+    long-poll și elimină aprobările corespunzătoare din cache-ul său.
+
+    Atribute:
+        attempt (ForeignKey): Încercarea a cărei aprobare a fost revocată
+        path (CharField): Calea revocată (aprobările care o acoperă sunt eliminate)
+        created_at (DateTimeField): Momentul revocării
+    """
+
+    # SET_NULL: revocarea rămâne în jurnal și dacă încercarea este ștearsă
+    attempt = models.ForeignKey(AccessAttempt, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='revocations')
+
+    # Calea revocată
+    path = models.CharField(max_length=500)
+
+    # Momentul revocării
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"revoke {self.path} - {self.created_at}"
@@ -0,0 +1,303 @@
+"""
+Index de hash-uri perceptuale pentru fotografiile capturate
+
+Încercările repetate ale aceleiași persoane, la același birou, produc
+fotografii aproape identice. Acest fișier calculează, la primirea fiecărei
+fotografii, un hash perceptual (dHash, 64 de biți) și îl caută într-un
+index multi-hash: fotografiile aflate la o distanță Hamming de cel mult
+PHOTO_DUPLICATE_DISTANCE biți sunt considerate duplicate.
+
+    - Indexul conține doar reprezentanții grupurilor (fotografiile care nu
+      sunt duplicate ale altora); o căutare face PHOTO_DUPLICATE_DISTANCE + 1
+      căutări exacte în dicționare și compară doar candidații găsiți, deci
+      nu parcurge toate fotografiile.
+    - O încercare duplicat primește duplicate_of = reprezentantul grupului;
+      dashboard-ul afișează grupul ca un singur card.
+    - Cu PHOTO_DEDUPE_STORAGE activat, fișierul duplicat este șters, iar
+      încercarea refolosește fotografia reprezentantului.
+
+Indexul este construit din baza de date la prima utilizare și actualizat
+la fiecare fotografie nouă.
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import os
+import threading
+
+from django.conf import settings
+
+from .models import AccessAttempt
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Latura grilei dHash: (HASH_SIZE + 1) x HASH_SIZE pixeli -> HASH_SIZE² biți
+HASH_SIZE = 8
+
+
+def captures_dir():
+    """Directorul cu fotografiile capturate (comun cu monitorul)."""
+    return str(settings.CAPTURES_DIR)
+
+
+def dhash(path, size=HASH_SIZE):
+    """
+    Calculează hash-ul perceptual (diferență de gradient) al unei imagini.
+
+    Imaginea este redusă la (size + 1) x size tonuri de gri; fiecare bit
+    spune dacă un pixel este mai luminos decât vecinul din dreapta. Două
+    fotografii ale aceleiași scene diferă prin câțiva biți, chiar dacă
+    fișierele JPEG diferă complet.
+
+    Parametri:
+        path (str): Calea imaginii
+        size (int): Latura grilei (64 de biți pentru size=8)
+
+    Returnează:
+        int: Hash-ul, fără semn (0 <= hash < 2**(size*size))
+
+    Ridică:
+        OSError: Dacă imaginea nu poate fi citită
+    """
+    with Image.open(path) as image:
+        image.draft('L', (size * 8, size * 8))
+        pixels = list(image.convert('L').resize((size + 1, size), Image.BILINEAR).getdata())
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def to_signed(value):
+    """Convertește un hash de 64 de biți în intervalul BigIntegerField (cu semn)."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value):
+    """Inversul lui to_signed."""
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming(a, b):
+    """Numărul de biți prin care diferă două hash-uri."""
+    return (a ^ b).bit_count()
+
+
+class MultiIndexHash:
+    """
+    Index multi-hash pentru căutarea după distanța Hamming.
+
+    Hash-ul de 64 de biți este împărțit în radius + 1 bucăți disjuncte, iar
+    fiecare bucată are propriul dicționar bucată -> elemente. Dacă două
+    hash-uri diferă prin cel mult radius biți, după principiul cutiei cel
+    puțin o bucată este identică - deci candidații se obțin prin radius + 1
+    căutări exacte în dicționare, iar distanța completă se verifică doar
+    pentru aceștia, nu pentru toate fotografiile.
+
+    Atribute:
+        radius (int): Distanța Hamming maximă suportată la căutare
+        size (int): Numărul de elemente din index
+    """
+
+    def __init__(self, radius, bits=64):
+        """
+        Parametri:
+            radius (int): Distanța Hamming maximă (determină numărul de bucăți)
+            bits (int): Lungimea hash-urilor
+        """
+        self.radius = radius
+        self.size = 0
+        chunks = radius + 1
+        widths = [bits // chunks + (1 if i < bits % chunks else 0) for i in range(chunks)]
+        self._chunks = []
+        shift = 0
+        for width in widths:
+            self._chunks.append((shift, (1 << width) - 1))
+            shift += width
+        self._tables = [{} for _ in self._chunks]
+        self._values = {}
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value, item):
+        """
+        Adaugă un hash în index.
+
+        Un element deja indexat cu alt hash este mutat (vechile bucăți sunt
+        eliminate); cu același hash, apelul nu are efect.
+
+        Parametri:
+            value (int): Hash-ul
+            item: Datele asociate (ex: id-ul încercării)
+        """
+        previous = self._values.get(item)
+        if previous == value:
+            return
+        if previous is not None:
+            self.remove(item)
+        self.size += 1
+        self._values[item] = value
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            table.setdefault((value >> shift) & mask, []).append(item)
+
+    def remove(self, item):
+        """
+        Elimină un element din index.
+
+        Parametri:
+            item: Datele asociate hash-ului
+
+        Returnează:
+            bool: True dacă elementul era în index
+        """
+        value = self._values.pop(item, None)
+        if value is None:
+            return False
+        self.size -= 1
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            key = (value >> shift) & mask
+            bucket = table[key]
+            bucket.remove(item)
+            if not bucket:
+                del table[key]
+        return True
+
+    def search(self, value, radius=None):
+        """
+        Caută hash-urile aflate la cel mult radius biți distanță.
+
+        Parametri:
+            value (int): Hash-ul căutat
+            radius (int, optional): Distanța maximă (cel mult radius-ul indexului)
+
+        Returnează:
+            list: Perechi (distanță, item), sortate crescător după distanță
+        """
+        radius = self.radius if radius is None else min(radius, self.radius)
+        candidates = set()
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            candidates.update(table.get((value >> shift) & mask, ()))
+        found = []
+        for item in candidates:
+            distance = hamming(value, self._values[item])
+            if distance <= radius:
+                found.append((distance, item))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+
+class PhotoIndex:
+    """
+    Indexul reprezentanților (fotografii unice), partajat de firele serverului.
+
+    Atribute:
+        radius (int): Distanța Hamming maximă pentru un duplicat
+        dedupe_storage (bool): Șterge fișierele duplicate de pe disc
+    """
+
+    def __init__(self, radius=None, dedupe_storage=None):
+        self.radius = (settings.PHOTO_DUPLICATE_DISTANCE if radius is None else radius)
+        self.dedupe_storage = (settings.PHOTO_DEDUPE_STORAGE if dedupe_storage is None
+                               else dedupe_storage)
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Construiește indexul din reprezentanții deja salvați."""
+        index = MultiIndexHash(self.radius)
+        rows = AccessAttempt.objects.filter(
+            duplicate_of__isnull=True, photo_hash__isnull=False
+        ).values_list('photo_hash', 'id')
+        for photo_hash, attempt_id in rows.iterator():
+            index.add(to_unsigned(photo_hash), attempt_id)
+        return index
+
+    def reset(self):
+        """Golește indexul (va fi reconstruit la următoarea utilizare)."""
+        with self._lock:
+            self._index = None
+
+    def ingest(self, attempt):
+        """
+        Indexează fotografia unei încercări și o leagă de grupul ei.
+
+        Setează photo_hash și duplicate_of pe încercare (fără a o salva) și,
+        dacă PHOTO_DEDUPE_STORAGE este activat, înlocuiește fotografia
+        duplicat cu cea a reprezentantului. Încercarea trebuie să aibă id
+        (salvată), pentru a putea deveni reprezentant.
+
+        Parametri:
+            attempt (AccessAttempt): Încercarea, cu photo_path setat
+
+        Returnează:
+            list: Câmpurile modificate (pentru save(update_fields=...));
+                  lista este goală dacă fotografia nu a putut fi citită
+        """
+        if Image is None or not attempt.photo_path:
+            return []
+        path = os.path.join(captures_dir(), os.path.basename(attempt.photo_path))
+        try:
+            value = dhash(path)
+        except (OSError, ValueError):
+            return []
+
+        with self._lock:
+            if self._index is None:
+                self._index = self._load()
+            # O fotografie re-atașată nu este duplicatul ei însăși
+            matches = [m for m in self._index.search(value, self.radius) if m[1] != attempt.id]
+            if not matches:
+                self._index.add(value, attempt.id)
+
+        attempt.photo_hash = to_signed(value)
+        changed = ['photo_hash']
+        if not matches:
+            return changed
+
+        # Reprezentanții arhivați (vezi archive.py) nu mai sunt în tabelă
+        found = AccessAttempt.objects.filter(id__in=[item for _, item in matches]).only('photo_path')
+        existing = {candidate.id: candidate for candidate in found}
+        canonical = next((existing[item] for _, item in matches if item in existing), None)
+        if canonical is None:
+            with self._lock:
+                self._index.add(value, attempt.id)
+            return changed
+        attempt.duplicate_of_id = canonical.id
+        changed.append('duplicate_of')
+        with self._lock:
+            # Un reprezentant re-atașat care devine duplicat iese din index
+            self._index.remove(attempt.id)
+
+        if self.dedupe_storage and canonical.photo_path and canonical.photo_path != attempt.photo_path:
+            canonical_path = os.path.join(captures_dir(), os.path.basename(canonical.photo_path))
+            if os.path.exists(canonical_path):
+                os.remove(path)
+                attempt.photo_path = canonical.photo_path
+                changed.append('photo_path')
+        return changed
+
+
+# Indexul folosit de view-uri (creat la prima fotografie)
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_photo_index():
+    """
+    Returnează indexul partajat al fotografiilor.
+
+    Returnează:
+        PhotoIndex: Indexul (creat la primul apel)
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PhotoIndex()
+        return _index
@@ -0,0 +1,162 @@
+"""
+Căutare în căile de acces pentru aplicația de Control Acces
+
+Acest fișier conține logica de căutare peste căile accesate. Căutarea se
+face pe tabela de căi internate (AccessPath - câteva mii de rânduri), iar
+încercările sunt apoi filtrate după path_id. Sunt suportate două tipuri
+de interogări:
+
+    - Prefix de cale: toate încercările sub un anumit folder
+      (ex: "/Users/ana/Confidential/Contracte/")
+      Se rezolvă printr-o interogare pe interval peste indexul unic
+      al căii, fără scanare LIKE '%...%'.
+
+    - Termeni (tokeni): cuvinte care apar oriunde în cale
+      (ex: "contract 2024", "raport*" pentru prefix de termen)
+      Se rezolvă prin tabela virtuală SQLite FTS5, ținută sincronizată
+      cu AccessPath prin triggere (vezi migrarea 0003).
+
+Ambele tipuri de interogări pot fi combinate.
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .archive import get_archive
+from .models import AccessAttempt, AccessPath
+
+# Numele tabelei virtuale FTS5 (creată în migrarea 0003)
+FTS_TABLE = 'access_control_accesspath_fts'
+
+# Numărul maxim de rezultate returnate de o căutare
+MAX_SEARCH_RESULTS = 500
+
+
+def prefix_upper_bound(prefix):
+    """
+    Calculează limita superioară exclusivă pentru o căutare după prefix.
+
+    Toate șirurile care încep cu `prefix` sunt în intervalul
+    [prefix, limită). Astfel interogarea poate folosi indexul B-tree
+    în loc de LIKE, care în SQLite nu folosește indexul (este
+    case-insensitive implicit).
+
+    Parametri:
+        prefix (str): Prefixul căutat (nevid)
+
+    Returnează:
+        str: Cel mai mic șir mai mare decât orice șir cu acest prefix
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def build_fts_query(text):
+    """
+    Transformă textul introdus de utilizator într-o expresie FTS5 sigură.
+
+    Fiecare cuvânt este pus între ghilimele, astfel încât caracterele
+    speciale FTS5 din căi ('-', ':', '(' etc.) nu sunt interpretate ca
+    operatori. Un cuvânt terminat în '*' devine căutare după prefix de termen.
+    Toate cuvintele trebuie să apară (AND implicit).
+
+    Parametri:
+        text (str): Textul căutat (ex: "raport* 2024")
+
+    Returnează:
+        str: Expresia FTS5 (ex: '"raport"* "2024"')
+        None: Dacă textul nu conține niciun termen
+    """
+    terms = []
+    for word in text.split():
+        is_prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if not word:
+            continue
+        terms.append(f'"{word}"*' if is_prefix else f'"{word}"')
+    return ' '.join(terms) if terms else None
+
+
+def fts_available():
+    """
+    Verifică dacă baza de date curentă suportă căutarea FTS5.
+
+    Returnează:
+        bool: True pentru SQLite (tabela FTS este creată de migrare)
+    """
+    return connection.vendor == 'sqlite'
+
+
+def search_paths(prefix=None, query=None):
+    """
+    Caută căile internate după prefix și/sau termeni.
+
+    Parametri:
+        prefix (str, optional): Prefixul căii (ex: "/Users/ana/Confidential/")
+        query (str, optional): Termeni căutați oriunde în cale
+
+    Returnează:
+        QuerySet: Căile găsite (AccessPath)
+    """
+    paths = AccessPath.objects.all()
+
+    if prefix:
+        paths = paths.filter(path__gte=prefix, path__lt=prefix_upper_bound(prefix))
+
+    if query:
+        fts_query = build_fts_query(query)
+        if fts_query is None:
+            return AccessPath.objects.none()
+        if fts_available():
+            paths = paths.filter(id__in=RawSQL(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [fts_query],
+            ))
+        else:
+            # Alte baze de date: căutare simplă (fără index)
+            for word in query.split():
+                paths = paths.filter(path__icontains=word.rstrip('*'))
+
+    return paths
+
+
+def search_attempts(prefix=None, query=None, limit=50):
+    """
+    Caută încercări de acces după prefix de cale și/sau termeni.
+
+    Parametri:
+        prefix (str, optional): Prefixul căii (ex: "/Users/ana/Confidential/")
+        query (str, optional): Termeni căutați oriunde în cale
+        limit (int): Numărul maxim de rezultate (plafonat la MAX_SEARCH_RESULTS)
+
+    Returnează:
+        QuerySet: Încercările găsite, cele mai recente primele
+    """
+    path_ids = search_paths(prefix=prefix, query=query).values('id')
+    attempts = AccessAttempt.objects.filter(path_id__in=path_ids).select_related('path')
+
+    # Ordonăm după id (cheia primară) - aceeași ordine ca timestamp,
+    # dar fără sortare suplimentară
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    return attempts.order_by('-id')[:limit]
+
+
+def search_archived(prefix=None, query=None, limit=50):
+    """
+    Caută încercări arhivate (vezi archive.py) după prefix de cale și/sau termeni.
+
+    Parametri:
+        prefix (str, optional): Prefixul căii
+        query (str, optional): Termeni căutați oriunde în cale
+        limit (int): Numărul maxim de rezultate (plafonat la MAX_SEARCH_RESULTS)
+
+    Returnează:
+        list: Încercările găsite (serializate), cele mai recente primele
+    """
+    archive = get_archive()
+    if not archive.refresh():
+        return []
+    path_ids = search_paths(prefix=prefix, query=query).values_list('id', flat=True)
+    return archive.search(path_ids, max(1, min(limit, MAX_SEARCH_RESULTS)))
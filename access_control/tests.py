@@ -1,3 +1,457 @@
-from django.test import TestCase
+"""
+Teste pentru aplicația de Control Acces
 
-# Create your tests here.
+Rulare:
+    python manage.py test access_control
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import json
+import os
+import random
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipIf
+
+from django.db import DatabaseError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import anomaly, archive, hotstore, photo_index, views
+from .models import AccessAttempt, AccessPath, Revocation
+from .views import serialize_attempt
+
+
+def post_json(client, url, data):
+    """Trimite un POST cu corp JSON și returnează răspunsul."""
+    return client.post(url, json.dumps(data), content_type='application/json')
+
+
+class PendingStoreMixin:
+    """
+    Un depozit al încercărilor în așteptare propriu fiecărui test.
+
+    Firul de scriere nu scrie singur (interval de o oră) - testele apelează
+    flush() pe firul lor, în tranzacția testului.
+    """
+
+    def setUp(self):
+        super().setUp()
+        # Cache-ul căilor internate nu este golit odată cu baza de date a testului
+        AccessPath.objects._cache.clear()
+        self.store = hotstore.PendingStore(serialize_attempt, flush_interval=3600)
+        patcher = mock.patch.object(hotstore, '_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.close_store)
+
+    def close_store(self):
+        self.store.flush()
+        self.store.close()
+
+
+class AccessPathInternTests(TransactionTestCase):
+    """Internarea căilor (cache-ul cale -> id) și tranzacțiile anulate."""
+
+    def setUp(self):
+        AccessPath.objects._cache.clear()
+
+    def test_intern_returns_same_id(self):
+        first = AccessPath.objects.intern('/protected/a')
+        self.assertEqual(AccessPath.objects.intern('/protected/a'), first)
+        self.assertEqual(AccessPath.objects.get(id=first).path, '/protected/a')
+
+    def test_rolled_back_batch_does_not_poison_cache(self):
+        response = post_json(self.client, '/api/attempts/batch', {'attempts': [
+            {'client_ref': 'ok-1', 'folder_path': '/protected/new'},
+            {'client_ref': 'bad-1', 'folder_path': '/protected/new', 'status': 'unknown'},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(AccessPath.objects.filter(path='/protected/new').exists())
+        self.assertNotIn('/protected/new', AccessPath.objects._cache)
+
+        response = post_json(self.client, '/api/attempt', {'folder_path': '/protected/new'})
+        self.assertEqual(response.status_code, 200)
+        attempt = AccessAttempt.objects.get(id=response.json()['id'])
+        self.assertEqual(attempt.path.path, '/protected/new')
+
+    def test_stale_cache_entry_is_evicted(self):
+        AccessPath.objects._cache['/protected/stale'] = 987654
+        response = post_json(self.client, '/api/attempt', {'folder_path': '/protected/stale'})
+        self.assertEqual(response.status_code, 200)
+        attempt = AccessAttempt.objects.get(id=response.json()['id'])
+        self.assertEqual(attempt.path.path, '/protected/stale')
+        self.assertEqual(AccessPath.objects._cache['/protected/stale'], attempt.path_id)
+
+    def test_stale_cache_entry_in_batch(self):
+        # Cheia străină este verificată abia la commit-ul lotului
+        AccessPath.objects._cache['/protected/stale'] = 987654
+        response = post_json(self.client, '/api/attempts/batch', {'attempts': [
+            {'client_ref': 'ref-1', 'folder_path': '/protected/stale'},
+            {'client_ref': 'ref-2', 'folder_path': '/protected/stale'},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        paths = AccessAttempt.objects.values_list('path__path', flat=True)
+        self.assertEqual(list(paths), ['/protected/stale', '/protected/stale'])
+
+
+class AttemptBatchTests(PendingStoreMixin, TestCase):
+    """Lotul de încercări retrimise din spool-ul monitorului (idempotent după client_ref)."""
+
+    def test_resent_batch_does_not_duplicate(self):
+        batch = {'attempts': [
+            {'client_ref': 'ref-1', 'folder_path': '/protected/a', 'status': 'denied'},
+            {'client_ref': 'ref-2', 'folder_path': '/protected/b'},
+        ]}
+        first = post_json(self.client, '/api/attempts/batch', batch).json()['results']
+        second = post_json(self.client, '/api/attempts/batch', batch).json()['results']
+
+        self.assertEqual([r['created'] for r in first], [True, True])
+        self.assertEqual([r['created'] for r in second], [False, False])
+        self.assertEqual([r['id'] for r in first], [r['id'] for r in second])
+        self.assertEqual(AccessAttempt.objects.count(), 2)
+        self.assertEqual(first[0]['status'], 'denied')
+
+    def test_concurrent_resend_returns_existing_attempt(self):
+        live = post_json(self.client, '/api/attempt',
+                         {'client_ref': 'ref-1', 'folder_path': '/protected/a'}).json()
+
+        # Cererea paralelă nu a găsit încercarea înainte ca prima să fie creată
+        lookups = []
+
+        def racing(client_ref):
+            lookups.append(client_ref)
+            return None if len(lookups) == 1 else AccessAttempt.objects.get(client_ref=client_ref)
+
+        with mock.patch.object(views, 'find_by_client_ref', side_effect=racing):
+            response = post_json(self.client, '/api/attempt', {
+                'client_ref': 'ref-1', 'folder_path': '/protected/a', 'status': 'denied'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['id'], response.json()['status']),
+                         (live['id'], 'denied'))
+        self.assertEqual(AccessAttempt.objects.count(), 1)
+        self.assertEqual(lookups, ['ref-1', 'ref-1'])
+
+    def test_invalid_entry_rejects_whole_batch(self):
+        response = post_json(self.client, '/api/attempts/batch', {'attempts': [
+            {'client_ref': 'ref-1', 'folder_path': '/protected/a'},
+            {'client_ref': 'ref-2', 'folder_path': '/protected/b', 'timestamp': 'ieri'},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(AccessAttempt.objects.exists())
+
+    def test_local_result_closes_interrupted_attempt(self):
+        live = post_json(self.client, '/api/attempt',
+                         {'client_ref': 'ref-1', 'folder_path': '/protected/a'}).json()
+        self.assertEqual(live['status'], 'pending')
+
+        # Monitorul a repornit: încercarea este retrimisă cu refuzul local
+        result = post_json(self.client, '/api/attempts/batch', {'attempts': [
+            {'client_ref': 'ref-1', 'folder_path': '/protected/a', 'status': 'denied'},
+        ]}).json()['results'][0]
+        self.assertEqual((result['id'], result['status'], result['created']),
+                         (live['id'], 'denied', False))
+        self.store.flush()
+        attempt = AccessAttempt.objects.get(id=live['id'])
+        self.assertEqual((attempt.status, attempt.decision_source), ('denied', 'monitor'))
+
+    def test_local_result_does_not_override_admin_decision(self):
+        live = post_json(self.client, '/api/attempt',
+                         {'client_ref': 'ref-1', 'folder_path': '/protected/a'}).json()
+        post_json(self.client, f"/api/decide/{live['id']}", {'decision': 'approved'})
+
+        result = post_json(self.client, '/api/attempts/batch', {'attempts': [
+            {'client_ref': 'ref-1', 'folder_path': '/protected/a', 'status': 'denied'},
+        ]}).json()['results'][0]
+        self.assertEqual(result['status'], 'approved')
+        self.store.flush()
+        self.assertEqual(AccessAttempt.objects.get(id=live['id']).status, 'approved')
+
+
+class PendingStoreTests(PendingStoreMixin, TestCase):
+    """Deciziile aplicate întâi în memorie și scrise apoi în baza de date."""
+
+    def register(self, path='/protected/a'):
+        return post_json(self.client, '/api/attempt', {'folder_path': path}).json()['id']
+
+    def test_decision_is_visible_before_flush(self):
+        attempt_id = self.register()
+        response = post_json(self.client, f'/api/decide/{attempt_id}',
+                             {'decision': 'approved', 'decision_source': 'face_match',
+                              'matched_identity': 'Ana', 'match_similarity': 0.91})
+        self.assertEqual(response.json(), {'id': attempt_id, 'status': 'approved'})
+
+        record = self.client.get(f'/api/attempt/{attempt_id}').json()
+        self.assertEqual((record['status'], record['decision_source'], record['matched_identity']),
+                         ('approved', 'face_match', 'Ana'))
+        self.assertEqual(AccessAttempt.objects.get(id=attempt_id).status, 'pending')
+        self.assertEqual(self.store.stats()['dirty'], 1)
+
+    def test_flush_writes_and_evicts(self):
+        first, second = self.register('/protected/a'), self.register('/protected/b')
+        post_json(self.client, f'/api/decide/{first}', {'decision': 'approved'})
+        post_json(self.client, f'/api/decide/{second}', {'decision': 'denied'})
+
+        self.assertEqual(self.store.flush(), 2)
+        self.assertEqual(dict(AccessAttempt.objects.values_list('id', 'status')),
+                         {first: 'approved', second: 'denied'})
+        self.assertIsNone(self.store.get(first))
+        self.assertEqual(self.client.get(f'/api/attempt/{first}').json()['status'], 'approved')
+        stats = self.store.stats()
+        self.assertEqual((stats['records'], stats['dirty'], stats['writes'], stats['flushes']),
+                         (0, 0, 2, 1))
+
+    def test_failed_flush_keeps_decisions(self):
+        attempt_id = self.register()
+        post_json(self.client, f'/api/decide/{attempt_id}', {'decision': 'denied'})
+
+        with mock.patch.object(AccessAttempt.objects, 'filter', side_effect=DatabaseError), \
+                self.assertLogs(hotstore.log, 'WARNING'):
+            self.assertEqual(self.store.flush(), 0)
+        self.assertEqual((self.store.stats()['errors'], self.store.stats()['dirty']), (1, 1))
+        self.assertEqual(self.store.get(attempt_id)['status'], 'denied')
+
+        self.assertEqual(self.store.flush(), 1)
+        self.assertEqual(AccessAttempt.objects.get(id=attempt_id).status, 'denied')
+
+    def test_orm_decision_leaves_the_store(self):
+        attempt_id = self.register()
+        self.assertIsNotNone(self.store.get(attempt_id))
+
+        # Ex: decizia luată din interfața Django admin
+        with self.captureOnCommitCallbacks(execute=True):
+            attempt = AccessAttempt.objects.get(id=attempt_id)
+            attempt.status = 'approved'
+            attempt.save()
+        self.assertIsNone(self.store.get(attempt_id))
+        self.assertEqual(self.store.stats()['dirty'], 0)
+
+
+class SearchTests(PendingStoreMixin, TestCase):
+    """Căutarea după prefix de cale (interval pe index) și după termeni (FTS5)."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        patcher = mock.patch.object(archive, '_archive', archive.Archive(self.directory))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def register(self, path):
+        return post_json(self.client, '/api/attempt', {'folder_path': path}).json()['id']
+
+    def search(self, **params):
+        return [record['id'] for record in self.client.get('/api/search', params).json()]
+
+    def test_prefix_matches_only_the_subtree(self):
+        inside = self.register('/Users/ana/Confidential/Contracte/contract-2024.pdf')
+        folder = self.register('/Users/ana/Confidential/')
+        self.register('/Users/ana/Confidential2/notes.txt')
+        self.register('/Users/ana/Public/contract.pdf')
+
+        self.assertEqual(self.search(prefix='/Users/ana/Confidential/'), [folder, inside])
+
+    def test_terms_use_the_full_text_index(self):
+        contract = self.register('/Users/ana/Confidential/contract-2024.pdf')
+        report = self.register('/Users/ana/Confidential/raport_anual.xlsx')
+        self.register('/Users/ana/Public/notes.txt')
+
+        self.assertEqual(self.search(q='contract 2024'), [contract])
+        self.assertEqual(self.search(q='rap*'), [report])
+        self.assertEqual(self.search(q='confidential', prefix='/Users/ana/'), [report, contract])
+        # Caracterele speciale FTS5 nu sunt interpretate ca operatori
+        self.assertEqual(self.search(q='contract-2024'), [contract])
+        self.assertEqual(self.search(q='"*'), [])
+
+    def test_results_include_in_memory_decisions(self):
+        attempt_id = self.register('/Users/ana/Confidential/a.pdf')
+        post_json(self.client, f'/api/decide/{attempt_id}', {'decision': 'denied'})
+
+        results = self.client.get('/api/search', {'q': 'a.pdf'}).json()
+        self.assertEqual([(r['id'], r['status']) for r in results], [(attempt_id, 'denied')])
+
+    @skipIf(archive.np is None, "Arhiva necesită NumPy")
+    def test_archived_attempts_continue_the_list(self):
+        old = self.register('/Users/ana/Confidential/old.pdf')
+        post_json(self.client, f'/api/decide/{old}', {'decision': 'approved'})
+        self.store.flush()
+        AccessAttempt.objects.filter(id=old).update(timestamp=timezone.now() - timedelta(days=40))
+        archive.archive_attempts(older_than_days=28, directory=self.directory)
+        new = self.register('/Users/ana/Confidential/new.pdf')
+
+        self.assertEqual(self.search(prefix='/Users/ana/Confidential/'), [new, old])
+        self.assertEqual(self.search(prefix='/Users/ana/Confidential/', limit=1), [new])
+
+    def test_missing_or_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/search').status_code, 400)
+        self.assertEqual(self.client.get('/api/search', {'q': 'a', 'limit': 'x'}).status_code, 400)
+
+
+class AnomalyDetectionTests(PendingStoreMixin, TestCase):
+    """Detectorul de rafale, alimentat după commit-ul fiecărei încercări."""
+
+    def setUp(self):
+        super().setUp()
+        self.detector = anomaly.AnomalyDetector(window=60, baseline=7 * 24 * 3600, factor=5.0,
+                                                min_count=5, width=256, depth=4)
+        patcher = mock.patch.object(anomaly, '_detector', self.detector)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_is_flagged_and_published_once(self):
+        ids = []
+        for _ in range(8):
+            with self.captureOnCommitCallbacks(execute=True):
+                ids.append(post_json(self.client, '/api/attempt',
+                                     {'folder_path': '/protected/rare', 'host': 'mac'}).json()['id'])
+
+        # Numărătorile scad continuu, deci pragul este atins la a 5-a sau a 6-a încercare
+        flagged = AccessAttempt.objects.filter(anomaly_score__isnull=False)
+        flagged_ids = sorted(flagged.values_list('id', flat=True))
+        self.assertIn(flagged_ids, (ids[4:], ids[5:]))
+        self.assertIn('this path', flagged.first().anomaly_reason)
+
+        events = self.client.get('/api/anomalies?after=0').json()
+        self.assertEqual([e['attempt_id'] for e in events['anomalies']], [flagged_ids[0]])
+        self.assertEqual(events['cursor'], 1)
+
+    def test_rolled_back_batch_is_not_observed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = post_json(self.client, '/api/attempts/batch', {'attempts': [
+                {'client_ref': f'ref-{i}', 'folder_path': '/protected/rare'} for i in range(9)
+            ] + [{'client_ref': 'bad', 'folder_path': '/protected/rare', 'status': 'unknown'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.detector.stats(), {'observed': 0, 'flagged': 0, 'cursor': 0})
+
+
+@skipIf(archive.np is None, "Arhiva necesită NumPy")
+class ArchiveTests(PendingStoreMixin, TestCase):
+    """Încercările vechi mutate în arhivă rămân vizibile prin API."""
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        patcher = mock.patch.object(archive, '_archive', archive.Archive(self.directory))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_attempt(self, path, status, days_ago):
+        decided_at = timezone.now() - timedelta(days=days_ago)
+        return AccessAttempt.objects.create(
+            path_id=AccessPath.objects.intern(path), status=status, timestamp=decided_at,
+            decided_at=decided_at, decision_source='admin', access_type='folder_opened')
+
+    def test_archived_attempts_round_trip(self):
+        approved = self.create_attempt('/protected/a', 'approved', 40)
+        denied = self.create_attempt('/protected/b', 'denied', 35)
+        recent = self.create_attempt('/protected/a', 'approved', 1)
+        expected = serialize_attempt(AccessAttempt.objects.get(id=approved.id))
+
+        self.assertEqual(archive.archive_attempts(older_than_days=28, directory=self.directory),
+                         (2, 1))
+        self.assertEqual(list(AccessAttempt.objects.values_list('id', flat=True)), [recent.id])
+
+        self.assertEqual(self.client.get(f'/api/attempt/{approved.id}').json(), expected)
+        self.assertEqual(self.client.get(f'/api/attempt/{denied.id}').json()['status'], 'denied')
+
+        stats = self.client.get('/api/stats').json()
+        self.assertEqual((stats['total'], stats['live'], stats['archived']), (3, 1, 2))
+        self.assertEqual(stats['status'], {'approved': 2, 'denied': 1})
+
+        # Aprobarea arhivată nu mai poate fi revocată
+        response = self.client.post(f'/api/attempt/{approved.id}/revoke')
+        self.assertEqual(response.status_code, 404)
+
+    def test_revoked_attempt_stays_in_table(self):
+        revoked = self.create_attempt('/protected/a', 'approved', 40)
+        response = self.client.post(f'/api/attempt/{revoked.id}/revoke')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(archive.archive_attempts(older_than_days=28, directory=self.directory),
+                         (0, 0))
+        revocation = Revocation.objects.get(id=response.json()['revocation'])
+        self.assertEqual(revocation.attempt_id, revoked.id)
+
+    def test_many_distinct_categories_in_one_segment(self):
+        path_id = AccessPath.objects.intern('/protected/a')
+        decided_at = timezone.now() - timedelta(days=40)
+        AccessAttempt.objects.bulk_create(
+            AccessAttempt(path_id=path_id, status='denied', timestamp=decided_at,
+                          decided_at=decided_at, access_type=f'type_{i:03d}')
+            for i in range(300))
+
+        self.assertEqual(archive.archive_attempts(older_than_days=28, directory=self.directory),
+                         (300, 1))
+        counts = archive.get_archive().counts('access_type')
+        self.assertEqual(len(counts), 300)
+        self.assertEqual(counts['type_299'], 1)
+        self.assertFalse(AccessAttempt.objects.exists())
+        segment = archive.get_archive().segments[0]
+        self.assertEqual(segment.value('access_type', 299), 'type_299')
+
+    def test_segment_with_live_rows_is_removed(self):
+        first = self.create_attempt('/protected/a', 'approved', 40)
+        kept = self.create_attempt('/protected/b', 'approved', 40)
+        Revocation.objects.create(attempt=kept, path='/protected/b')
+        rest = [self.create_attempt('/protected/a', 'approved', 40) for _ in range(2)]
+        rows = [row for row in AccessAttempt.objects.order_by('id').values_list(*archive.FIELDS)
+                if row[0] != kept.id]
+
+        # Commit-ul care ștergea rândurile a eșuat; primul rând a fost șters ulterior
+        archive.write_segment(self.directory, rows)
+        first.delete()
+        self.assertEqual(archive.get_archive().remove_orphans(), 1)
+        self.assertEqual(archive.get_archive().refresh(), [])
+
+        # Singurul rând rămas în interval nu face parte din segment
+        archive.write_segment(self.directory, rows)
+        for attempt in rest:
+            attempt.delete()
+        self.assertEqual(archive.get_archive().remove_orphans(), 0)
+        self.assertEqual(len(archive.get_archive().refresh()), 1)
+
+
+@skipIf(photo_index.Image is None, "Pillow nu este instalat")
+class PhotoIndexTests(TestCase):
+    """Indexul reprezentanților rămâne corect când o fotografie este re-atașată."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings = override_settings(CAPTURES_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.index = photo_index.PhotoIndex(radius=6, dedupe_storage=False)
+
+    def save_photo(self, name, seed):
+        pixels = random.Random(seed).randbytes(81)
+        photo_index.Image.frombytes('L', (9, 9), pixels).resize((90, 90)).save(
+            os.path.join(self.directory, name))
+        return name
+
+    def create_attempt(self, photo):
+        return AccessAttempt.objects.create(path_id=AccessPath.objects.intern('/protected/a'),
+                                            photo_path=photo)
+
+    def test_reattached_photo_replaces_the_indexed_hash(self):
+        first = self.create_attempt(self.save_photo('a.png', 1))
+        self.index.ingest(first)
+        self.index.ingest(first)
+        self.assertEqual(len(self.index._index), 1)
+
+        first.photo_path = self.save_photo('b.png', 2)
+        self.index.ingest(first)
+        self.assertEqual(len(self.index._index), 1)
+
+        # Vechea fotografie nu mai este găsită printre reprezentanți
+        other = self.create_attempt('a.png')
+        self.assertNotIn('duplicate_of', self.index.ingest(other))
+        duplicate = self.create_attempt(self.save_photo('c.png', 2))
+        self.index.ingest(duplicate)
+        self.assertEqual(duplicate.duplicate_of_id, first.id)
+        self.assertEqual(len(self.index._index), 2)
@@ -7,9 +7,17 @@ aplicația de control acces. Fiecare rută mapează un URL la o funcție view.
 Rute API disponibile:
     /                       -> Dashboard-ul web de administrare
     /api/attempt           -> Înregistrare încercare nouă (POST)
+    /api/attempts/batch    -> Înregistrare lot de încercări (POST)
     /api/attempts          -> Lista tuturor încercărilor (GET)
     /api/attempt/<id>      -> Detalii încercare specifică (GET)
+    /api/attempt/<id>/photo -> Atașare fotografie (POST)
+    /api/search            -> Căutare după prefix de cale / termeni (GET)
+    /api/stats             -> Statistici, inclusiv arhiva (GET)
+    /api/export            -> Export CSV, inclusiv arhiva (GET)
     /api/decide/<id>       -> Aprobare/Respingere încercare (POST)
+    /api/attempt/<id>/revoke -> Revocarea unei aprobări (POST)
+    /api/revocations       -> Revocările noi, long-poll (GET)
+    /api/anomalies         -> Rafalele anormale noi, long-poll (GET)
     /captures/<filename>   -> Servire fotografii capturate (GET)
 
 Autor: Bascacov Alexandra
@@ -41,6 +49,14 @@ urlpatterns = [
     # Folosit de: monitor.py când detectează acces la folder
     path('api/attempt', views.new_attempt, name='new_attempt'),
 
+    # Înregistrare lot de încercări (idempotentă, după client_ref)
+    # URL: /api/attempts/batch
+    # Metodă: POST
+    # Corp: {"attempts": [{"client_ref": "...", "folder_path": "...", "timestamp": "...", ...}]}
+    # Răspuns: {"results": [{"client_ref": "...", "id": X, "status": "...", "created": true}]}
+    # Folosit de: spool-ul monitor.py după o întrerupere a conexiunii cu serverul
+    path('api/attempts/batch', views.attempts_batch, name='attempts_batch'),
+
     # Lista tuturor încercărilor de acces
     # URL: /api/attempts
     # Metodă: GET
@@ -55,14 +71,67 @@ urlpatterns = [
     # Folosit de: monitor.py pentru a verifica dacă s-a luat o decizie
     path('api/attempt/<int:attempt_id>', views.get_attempt, name='get_attempt'),
 
+    # Atașarea fotografiei unei încercări
+    # URL: /api/attempt/<id>/photo
+    # Metodă: POST
+    # Corp: {"photo_path": "capture_....jpg"}
+    # Răspuns: {"id": X, "photo_path": "...", "duplicate_of": Y sau null}
+    # Folosit de: monitor.py când captura se termină (după înregistrarea încercării)
+    path('api/attempt/<int:attempt_id>/photo', views.attach_photo, name='attach_photo'),
+
+    # Căutare încercări după calea accesată
+    # URL: /api/search?prefix=<prefix_cale>&q=<termeni>&limit=<n>
+    # Metodă: GET
+    # Răspuns: Lista JSON cu încercările găsite (cele mai recente primele)
+    # Folosit de: Administrator pentru a găsi accesările unui fișier/subfolder
+    path('api/search', views.search, name='search'),
+
+    # Statisticile încercărilor (tabelă + arhivă)
+    # URL: /api/stats
+    # Metodă: GET
+    # Răspuns: {"total": N, "live": N, "archived": N, "status": {...},
+    #           "decision_source": {...}, "access_type": {...}}
+    # Folosit de: Administrator / rapoarte
+    path('api/stats', views.stats, name='stats'),
+
+    # Exportul tuturor încercărilor (tabelă + arhivă)
+    # URL: /api/export
+    # Metodă: GET
+    # Răspuns: Fișier CSV (transmis pe măsură ce este generat)
+    # Folosit de: Administrator pentru arhivare externă / analiză
+    path('api/export', views.export, name='export'),
+
     # Aprobare sau respingere încercare
     # URL: /api/decide/<id>
     # Metodă: POST
     # Corp: {"decision": "approved"} sau {"decision": "denied"}
+    #       (opțional "decision_source", "matched_identity", "match_similarity")
     # Răspuns: {"id": X, "status": "approved/denied"}
-    # Folosit de: Dashboard când administratorul apasă Aprobă/Respinge
+    # Folosit de: Dashboard când administratorul apasă Aprobă/Respinge și
+    #             monitor.py la aprobarea automată prin recunoaștere facială
     path('api/decide/<int:attempt_id>', views.decide, name='decide'),
 
+    # Revocarea aprobării unei încercări
+    # URL: /api/attempt/<id>/revoke
+    # Metodă: POST
+    # Răspuns: {"id": X, "revocation": Y}
+    # Folosit de: Dashboard când administratorul apasă Revocă
+    path('api/attempt/<int:attempt_id>/revoke', views.revoke, name='revoke'),
+
+    # Revocările mai noi decât un cursor (long-poll)
+    # URL: /api/revocations?after=<id>&wait=<secunde>
+    # Metodă: GET
+    # Răspuns: {"revocations": [{"id": Y, "attempt_id": X, "path": "..."}], "cursor": Y}
+    # Folosit de: monitor.py pentru a elimina aprobările revocate din cache
+    path('api/revocations', views.revocations, name='revocations'),
+
+    # Rafalele anormale de încercări mai noi decât un cursor (long-poll)
+    # URL: /api/anomalies?after=<cursor>&wait=<secunde>
+    # Metodă: GET
+    # Răspuns: {"anomalies": [{"seq": N, "attempt_id": X, "reason": "...", ...}], "cursor": N}
+    # Folosit de: Dashboard pentru a alerta administratorul
+    path('api/anomalies', views.anomalies, name='anomalies'),
+
     # =========================================================================
     # SERVIRE FIȘIERE
     # =========================================================================
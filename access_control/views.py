@@ -7,26 +7,76 @@ Fiecare funcție este un endpoint API care procesează cereri și returnează r
 Endpoint-uri disponibile:
     GET  /              -> dashboard()      - Afișează pagina web principală
     POST /api/attempt   -> new_attempt()    - Înregistrează o nouă încercare de acces
+    POST /api/attempts/batch -> attempts_batch() - Înregistrează un lot (spool-ul monitorului)
     GET  /api/attempts  -> get_attempts()   - Listează toate încercările
     GET  /api/attempt/X -> get_attempt()    - Obține detalii despre o încercare
+    POST /api/attempt/X/photo -> attach_photo() - Atașează fotografia unei încercări
+    GET  /api/search    -> search()         - Caută încercări după cale
+    GET  /api/stats     -> stats()          - Statistici (tabelă + arhivă)
+    GET  /api/export    -> export()         - Toate încercările, CSV (tabelă + arhivă)
     POST /api/decide/X  -> decide()         - Aprobă sau respinge o încercare
+    POST /api/attempt/X/revoke -> revoke()  - Revocă aprobarea unei încercări
+    GET  /api/revocations -> revocations()  - Revocările noi (long-poll, pentru monitor)
+    GET  /api/anomalies -> anomalies()      - Rafalele anormale noi (long-poll, pentru dashboard)
     GET  /captures/X    -> serve_capture()  - Servește fotografiile capturate
 
 Autor: Bascacov Alexandra
 Versiune: 1.0
 """
 
+import csv
 import os
+import threading
+import time
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, FileResponse, Http404
+from django.http import JsonResponse, FileResponse, Http404, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.db import IntegrityError, transaction
 from django.conf import settings
-from django.db.models import Case, When, Value, IntegerField
+from django.db.models import Case, Count, When, Value, IntegerField
 import json
 
-from .models import AccessAttempt
+from .anomaly import anomaly_fields, get_detector, publish
+from .archive import get_archive
+from .hotstore import get_pending_store
+from .models import AccessAttempt, AccessPath, Revocation
+from .photo_index import get_photo_index
+from .search import MAX_SEARCH_RESULTS, search_archived, search_attempts
+
+
+def serialize_attempt(attempt):
+    """
+    Convertește o încercare de acces într-un dicționar JSON-serializabil.
+
+    Parametri:
+        attempt (AccessAttempt): Încercarea de acces
+
+    Returnează:
+        dict: Câmpurile încercării (datele în format ISO)
+    """
+    return {
+        'id': attempt.id,
+        'timestamp': attempt.timestamp.isoformat(),
+        'access_path': attempt.path.path,
+        'access_type': attempt.access_type,
+        'photo_path': attempt.photo_path,
+        'photo_sharpness': attempt.photo_sharpness,
+        'photo_exposure': attempt.photo_exposure,
+        'photo_brightness': attempt.photo_brightness,
+        'status': attempt.status,
+        'decided_at': attempt.decided_at.isoformat() if attempt.decided_at else None,
+        'client_ref': attempt.client_ref,
+        'decision_source': attempt.decision_source,
+        'matched_identity': attempt.matched_identity,
+        'match_similarity': attempt.match_similarity,
+        'duplicate_of': attempt.duplicate_of_id,
+        'revoked_at': attempt.revoked_at.isoformat() if attempt.revoked_at else None,
+        'anomaly_score': attempt.anomaly_score,
+        'anomaly_reason': attempt.anomaly_reason,
+    }
 
 
 def dashboard(request):
@@ -47,6 +97,238 @@ def dashboard(request):
     })
 
 
+# Numărul maxim de încercări acceptate într-un singur lot
+MAX_BATCH_SIZE = 500
+
+
+def photo_score_fields(scores):
+    """
+    Convertește scorurile de calitate trimise de monitor în câmpuri ale modelului.
+
+    Parametri:
+        scores (dict): {'sharpness', 'exposure', 'brightness'} (oricare lipsește -> ignorat)
+
+    Returnează:
+        dict: Câmpurile photo_* ale AccessAttempt
+
+    Ridică:
+        ValueError: Dacă un scor nu este numeric
+    """
+    if not scores:
+        return {}
+    if not isinstance(scores, dict):
+        raise ValueError('photo_scores invalid')
+    fields = {}
+    for name in ('sharpness', 'exposure', 'brightness'):
+        if scores.get(name) is not None:
+            try:
+                fields[f'photo_{name}'] = float(scores[name])
+            except (TypeError, ValueError):
+                raise ValueError('photo_scores invalid')
+    return fields
+
+
+def decision_fields(data, default_source):
+    """
+    Extrage câmpurile de audit ale unei decizii (sursa, persoana recunoscută).
+
+    Parametri:
+        data (dict): decision_source, matched_identity, match_similarity (toate opționale)
+        default_source (str): Sursa folosită dacă datele nu conțin una
+
+    Returnează:
+        dict: Câmpurile decision_source, matched_identity, match_similarity ale AccessAttempt
+
+    Ridică:
+        ValueError: Dacă sursa sau similaritatea sunt invalide
+    """
+    source = data.get('decision_source') or default_source
+    if source not in dict(AccessAttempt.DECISION_SOURCE_CHOICES):
+        raise ValueError('decision_source invalid')
+    fields = {
+        'decision_source': source,
+        'matched_identity': str(data.get('matched_identity') or '')[:100],
+    }
+    if data.get('match_similarity') is not None:
+        try:
+            fields['match_similarity'] = float(data['match_similarity'])
+        except (TypeError, ValueError):
+            raise ValueError('match_similarity invalid')
+    return fields
+
+
+def create_attempt(data, host=None):
+    """
+    Creează o încercare de acces din datele trimise de monitor.
+
+    Dacă datele conțin un client_ref deja înregistrat, se returnează
+    încercarea existentă - retrimiterea aceleiași încercări (după o
+    întrerupere a conexiunii) nu creează un duplicat. Dacă încercarea
+    existentă este încă în așteptare și datele conțin un rezultat local
+    (ex: refuzul unei încercări întrerupte de repornirea monitorului),
+    rezultatul este aplicat - niciun monitor nu mai așteaptă decizia.
+
+    Fiecare încercare nouă trece, după commit, prin detectorul de rafale
+    (vezi detect_anomaly).
+
+    Parametri:
+        data (dict): folder_path (obligatoriu), access_type, photo_path,
+            photo_scores, client_ref, timestamp (ISO 8601), status (rezultatul
+            local, pentru încercările retrimise din spool), host (gazda
+            monitorului) și câmpurile de audit ale rezultatului local
+            (vezi decision_fields)
+        host (str, optional): Gazda folosită dacă datele nu conțin una
+            (adresa clientului)
+
+    Returnează:
+        tuple: (AccessAttempt, creat: bool)
+
+    Ridică:
+        ValueError: Dacă datele sunt invalide (mesajul este afișat clientului)
+    """
+    folder_path = data.get('folder_path')
+    if not folder_path:
+        raise ValueError('folder_path este obligatoriu')
+
+    client_ref = data.get('client_ref') or None
+    existing = find_by_client_ref(client_ref)
+    if existing is not None:
+        apply_local_result(existing, data)
+        return existing, False
+
+    fields = {
+        'access_type': data.get('access_type', 'folder'),
+        'photo_path': data.get('photo_path'),
+        'status': 'pending',  # Toate încercările încep cu statusul "în așteptare"
+        'client_ref': client_ref,
+        **photo_score_fields(data.get('photo_scores')),
+    }
+
+    if data.get('timestamp'):
+        timestamp = parse_datetime(data['timestamp'])
+        if timestamp is None:
+            raise ValueError('timestamp invalid')
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+        fields['timestamp'] = timestamp
+
+    # Încercările retrimise au deja un rezultat local (ex: refuz automat
+    # pentru că serverul nu a fost disponibil, aprobare prin recunoaștere facială)
+    status = data.get('status')
+    if status and status != 'pending':
+        if status not in dict(AccessAttempt.STATUS_CHOICES):
+            raise ValueError('status invalid')
+        fields['status'] = status
+        fields['decided_at'] = fields.get('timestamp', timezone.now())
+        fields.update(decision_fields(data, default_source='monitor'))
+
+    # Calea este internată - id-ul se rezolvă din cache-ul în memorie.
+    # SQLite verifică cheia străină abia la commit (într-un lot, la commit-ul
+    # întregului lot), deci id-ul din cache este verificat aici: poate
+    # aparține unei căi care nu mai există
+    path_id = AccessPath.objects.intern(folder_path)
+    if not AccessPath.objects.filter(id=path_id, path=folder_path).exists():
+        AccessPath.objects.forget(folder_path)
+        path_id = AccessPath.objects.intern(folder_path)
+    try:
+        with transaction.atomic():
+            attempt = AccessAttempt.objects.create(path_id=path_id, **fields)
+    except IntegrityError:
+        # Aceeași încercare trimisă de două ori în paralel (retrimiterea
+        # clientului HTTP, spool-ul): cealaltă cerere a creat-o între timp
+        existing = find_by_client_ref(client_ref)
+        if existing is None:
+            raise
+        apply_local_result(existing, data)
+        return existing, False
+    index_photo(attempt)
+
+    # Doar încercările salvate (după commit - un lot anulat nu contează) trec prin detector
+    host = str(data.get('host') or host or '')[:100]
+    transaction.on_commit(lambda: detect_anomaly(attempt, host))
+    return attempt, True
+
+
+def find_by_client_ref(client_ref):
+    """
+    Returnează încercarea înregistrată deja cu acest client_ref.
+
+    Parametri:
+        client_ref (str): Identificatorul generat de monitor (poate lipsi)
+
+    Returnează:
+        AccessAttempt: Încercarea existentă
+        None: Dacă nu există (sau client_ref lipsește)
+    """
+    if not client_ref:
+        return None
+    return AccessAttempt.objects.filter(client_ref=client_ref).first()
+
+
+def detect_anomaly(attempt, host):
+    """
+    Trece o încercare salvată prin detectorul de rafale (vezi anomaly.py).
+
+    O încercare dintr-o rafală anormală este marcată (anomaly_score,
+    anomaly_reason), iar prima din rafală este anunțată dashboard-ului.
+
+    Parametri:
+        attempt (AccessAttempt): Încercarea nouă (după commit)
+        host (str): Gazda monitorului
+    """
+    detector = get_detector()
+    anomaly = detector.observe(attempt.path_id, attempt.timestamp, host)
+    if anomaly is None:
+        return
+    for name, value in anomaly_fields(anomaly).items():
+        setattr(attempt, name, value)
+    attempt.save(update_fields=['anomaly_score', 'anomaly_reason'])
+    publish(detector, attempt, anomaly, host)
+
+
+def index_photo(attempt):
+    """
+    Calculează hash-ul perceptual al fotografiei și marchează duplicatele.
+
+    Parametri:
+        attempt (AccessAttempt): Încercarea salvată (fără efect dacă nu are fotografie)
+    """
+    changed = get_photo_index().ingest(attempt)
+    if changed:
+        attempt.save(update_fields=changed)
+
+
+def apply_local_result(attempt, data):
+    """
+    Aplică rezultatul local trimis de monitor unei încercări încă în așteptare.
+
+    Parametri:
+        attempt (AccessAttempt): Încercarea existentă (modificată pe loc)
+        data (dict): status și câmpurile de audit (vezi decision_fields)
+
+    Ridică:
+        ValueError: Dacă statusul sau câmpurile de audit sunt invalide
+    """
+    status = data.get('status')
+    if not status or status == 'pending' or attempt.status != 'pending':
+        return
+    if status not in dict(AccessAttempt.STATUS_CHOICES):
+        raise ValueError('status invalid')
+    fields = decision_fields(data, default_source='monitor')
+    decided_at = timezone.now()
+    # O decizie a administratorului încă nescrisă (hotstore.py) are prioritate
+    record = get_pending_store().decide(attempt.id, status, decided_at, fields,
+                                         only_pending=True)
+    if record is not None:
+        attempt.status = record['status']
+        return
+    attempt.status = status
+    attempt.decided_at = decided_at
+    for name, value in fields.items():
+        setattr(attempt, name, value)
+    attempt.save()
+
+
 @csrf_exempt  # Dezactivează protecția CSRF (necesar pentru API)
 @require_http_methods(["POST"])  # Acceptă doar cereri POST
 def new_attempt(request):
@@ -61,9 +343,10 @@ def new_attempt(request):
         folder_path (str): Calea către folderul accesat (obligatoriu)
         access_type (str): Tipul accesului (opțional, default: 'folder')
         photo_path (str): Calea către fotografia capturată (opțional)
+        client_ref (str): Identificatorul unic generat de monitor (opțional)
 
     Returnează:
-        JsonResponse: {'id': <id>, 'status': 'pending'} la succes
+        JsonResponse: {'id': <id>, 'status': <status>} la succes
         JsonResponse: {'error': <mesaj>} la eroare (status 400)
     """
     # Parsăm corpul cererii ca JSON
@@ -72,24 +355,67 @@ def new_attempt(request):
     except json.JSONDecodeError:
         return JsonResponse({'error': 'JSON invalid'}, status=400)
 
-    # Extragem datele din cerere
-    folder_path = data.get('folder_path')
-    access_type = data.get('access_type', 'folder')
-    photo_path = data.get('photo_path')
+    try:
+        attempt, _ = create_attempt(data, host=request.META.get('REMOTE_ADDR'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
-    # Validăm că avem calea folderului
-    if not folder_path:
-        return JsonResponse({'error': 'folder_path este obligatoriu'}, status=400)
+    return JsonResponse({'id': attempt.id, 'status': attempt.status})
+
+
+@csrf_exempt  # Dezactivează protecția CSRF pentru API
+@require_http_methods(["POST"])  # Acceptă doar cereri POST
+def attempts_batch(request):
+    """
+    Înregistrează un lot de încercări de acces (retrimise din spool-ul monitorului).
+
+    Fiecare încercare trebuie să aibă un client_ref; încercările deja
+    înregistrate sunt returnate fără a fi duplicate, deci lotul poate fi
+    retrimis în siguranță. Tot lotul este scris într-o singură tranzacție.
+
+    Parametri cerere (JSON):
+        attempts (list): Încercările, cu aceleași câmpuri ca /api/attempt
+            plus client_ref (obligatoriu), timestamp și status
+
+    Returnează:
+        JsonResponse: {'results': [{'client_ref', 'id', 'status', 'created'}]}
+        JsonResponse: {'error': <mesaj>} la eroare (status 400)
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON invalid'}, status=400)
+
+    entries = data.get('attempts') if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return JsonResponse({'error': 'attempts trebuie să fie o listă'}, status=400)
+    if len(entries) > MAX_BATCH_SIZE:
+        return JsonResponse({'error': f'maxim {MAX_BATCH_SIZE} încercări per lot'}, status=400)
+    if not all(isinstance(entry, dict) and entry.get('client_ref') for entry in entries):
+        return JsonResponse({'error': 'fiecare încercare necesită client_ref'}, status=400)
+
+    results = []
+    try:
+        with transaction.atomic():
+            for entry in entries:
+                attempt, created = create_attempt(entry, host=request.META.get('REMOTE_ADDR'))
+                results.append({
+                    'client_ref': attempt.client_ref,
+                    'id': attempt.id,
+                    'status': attempt.status,
+                    'created': created,
+                })
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'results': results})
 
-    # Creăm înregistrarea în baza de date
-    attempt = AccessAttempt.objects.create(
-        access_path=folder_path,
-        access_type=access_type,
-        photo_path=photo_path,
-        status='pending'  # Toate încercările încep cu statusul "în așteptare"
-    )
 
-    return JsonResponse({'id': attempt.id, 'status': 'pending'})
+# Numărul de încercări afișate în dashboard
+DASHBOARD_LIMIT = 50
+
+# Ordinea încercărilor decise în dashboard (după cele în așteptare)
+STATUS_ORDER = {'denied': 1, 'approved': 2}
 
 
 def get_attempts(request):
@@ -99,39 +425,49 @@ def get_attempts(request):
     Returnează ultimele 50 de încercări, sortate cu cele în așteptare
     primele, apoi cele recente.
 
+    Încercările în așteptare (și deciziile încă nescrise) vin din memorie
+    (vezi hotstore.py); din baza de date se citesc doar cele decise, iar
+    din arhivă (vezi archive.py) cele vechi, dacă nu sunt destule recente.
+
     Parametri:
         request: Cererea HTTP de la browser
 
     Returnează:
         JsonResponse: Lista încercărilor în format JSON
     """
-    # Obținem toate încercările, sortate cu pending primele (folosind Case pentru ordine corectă)
-    # Ordinea alfabetică nu funcționează: 'approved' < 'denied' < 'pending'
-    # Folosim Case pentru a defini ordinea dorită: pending=0, denied=1, approved=2
-    attempts = AccessAttempt.objects.all().annotate(
-        status_order=Case(
-            When(status='pending', then=Value(0)),
-            When(status='denied', then=Value(1)),
-            When(status='approved', then=Value(2)),
-            default=Value(3),
-            output_field=IntegerField(),
-        )
-    ).order_by('status_order', '-timestamp')[:50]
-
-    ordered = list(attempts)
-
-    # Construim lista de rezultate în format JSON-serializabil
-    result = []
-    for a in ordered:
-        result.append({
-            'id': a.id,
-            'timestamp': a.timestamp.isoformat(),
-            'access_path': a.access_path,
-            'access_type': a.access_type,
-            'photo_path': a.photo_path,
-            'status': a.status,
-            'decided_at': a.decided_at.isoformat() if a.decided_at else None,
-        })
+    store = get_pending_store()
+    in_memory = store.snapshot()
+    result = store.pending()[:DASHBOARD_LIMIT]
+    remaining = DASHBOARD_LIMIT - len(result)
+
+    if remaining > 0:
+        # Încercările decise, sortate după status (folosind Case pentru ordine corectă)
+        # Ordinea alfabetică nu funcționează: 'approved' < 'denied' < 'pending'
+        # Folosim Case pentru a defini ordinea dorită: denied=1, approved=2
+        attempts = AccessAttempt.objects.select_related('path').exclude(
+            status='pending'
+        ).exclude(id__in=list(in_memory)).annotate(
+            status_order=Case(
+                When(status='denied', then=Value(1)),
+                When(status='approved', then=Value(2)),
+                default=Value(3),
+                output_field=IntegerField(),
+            )
+        ).order_by('status_order', '-timestamp')[:remaining]
+
+        # Construim lista de rezultate în format JSON-serializabil, împreună
+        # cu deciziile din memorie, în aceeași ordine
+        decided = [serialize_attempt(a) for a in attempts]
+        decided.extend(record for record in in_memory.values() if record['status'] != 'pending')
+        archive = get_archive()
+        for status in STATUS_ORDER:
+            # Încercările cu un status anterior umplu deja lista
+            if sum(1 for record in decided if record['status'] == status) >= remaining:
+                break
+            decided.extend(archive.latest(status, remaining))
+        decided.sort(key=lambda record: record['timestamp'], reverse=True)
+        decided.sort(key=lambda record: STATUS_ORDER.get(record['status'], 3))
+        result.extend(decided[:remaining])
 
     return JsonResponse(result, safe=False)  # safe=False permite liste
 
@@ -141,7 +477,8 @@ def get_attempt(request, attempt_id):
     Obține statusul unei încercări specifice de acces.
 
     Acest endpoint este folosit de monitor.py pentru a verifica periodic
-    dacă administratorul a luat o decizie.
+    dacă administratorul a luat o decizie. Încercările în așteptare sunt
+    servite din memorie (vezi hotstore.py), fără interogări.
 
     Parametri:
         request: Cererea HTTP
@@ -151,17 +488,184 @@ def get_attempt(request, attempt_id):
         JsonResponse: Detaliile încercării în format JSON
         Http404: Dacă încercarea nu există
     """
-    # get_object_or_404 returnează obiectul sau ridică eroare 404
+    record = get_pending_store().get(attempt_id)
+    if record is not None:
+        return JsonResponse(record)
+
+    attempt = AccessAttempt.objects.select_related('path').filter(id=attempt_id).first()
+    if attempt is None:
+        # Încercările vechi sunt în arhivă (vezi archive.py)
+        record = get_archive().find(attempt_id)
+        if record is None:
+            raise Http404("Încercarea nu există")
+        return JsonResponse(record)
+
+    return JsonResponse(serialize_attempt(attempt))
+
+
+@csrf_exempt  # Dezactivează protecția CSRF pentru API
+@require_http_methods(["POST"])  # Acceptă doar cereri POST
+def attach_photo(request, attempt_id):
+    """
+    Atașează fotografia unei încercări de acces deja înregistrate.
+
+    Monitorul înregistrează încercarea imediat (administratorul o vede
+    fără întârziere) și trimite fotografia când captura s-a terminat.
+
+    Parametri:
+        request: Cererea HTTP
+        attempt_id (int): ID-ul încercării de acces
+
+    Parametri cerere (JSON):
+        photo_path (str): Numele fișierului foto capturat
+        photo_scores (dict): Scorurile de calitate (opțional) -
+            {'sharpness', 'exposure', 'brightness'}
+
+    Fotografia este indexată după hash-ul perceptual; dacă este aproape
+    identică cu una anterioară, încercarea este legată de aceasta
+    (duplicate_of) și, opțional, fișierul duplicat este șters.
+
+    Returnează:
+        JsonResponse: {'id': <id>, 'photo_path': <fișier>, 'duplicate_of': <id sau null>} la succes
+        JsonResponse: {'error': <mesaj>} la eroare (status 400)
+        Http404: Dacă încercarea nu există
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON invalid'}, status=400)
+
+    photo_path = data.get('photo_path')
+    if not photo_path:
+        return JsonResponse({'error': 'photo_path este obligatoriu'}, status=400)
+
+    try:
+        score_fields = photo_score_fields(data.get('photo_scores'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
     attempt = get_object_or_404(AccessAttempt, id=attempt_id)
+    attempt.photo_path = photo_path
+    for name, value in score_fields.items():
+        setattr(attempt, name, value)
+    attempt.save(update_fields=['photo_path', *score_fields])
+    index_photo(attempt)
 
-    return JsonResponse({
-        'id': attempt.id,
-        'timestamp': attempt.timestamp.isoformat(),
-        'access_path': attempt.access_path,
-        'access_type': attempt.access_type,
-        'photo_path': attempt.photo_path,
-        'status': attempt.status,
-        'decided_at': attempt.decided_at.isoformat() if attempt.decided_at else None,
+    return JsonResponse({'id': attempt_id, 'photo_path': attempt.photo_path,
+                         'duplicate_of': attempt.duplicate_of_id})
+
+
+@require_http_methods(["GET"])  # Acceptă doar cereri GET
+def search(request):
+    """
+    Caută încercări de acces după calea accesată.
+
+    Căutarea după prefix folosește indexul pe access_path, iar căutarea
+    după termeni folosește indexul FTS5 - ambele rămân rapide și pentru
+    milioane de înregistrări (vezi search.py).
+
+    Parametri cerere (query string):
+        prefix (str): Prefixul căii (ex: /api/search?prefix=/Users/ana/Confidential/)
+        q (str): Termeni căutați în cale; 'raport*' caută după prefix de termen
+        limit (int): Numărul maxim de rezultate (implicit 50)
+
+    Returnează:
+        JsonResponse: Lista încercărilor găsite, cele mai recente primele
+        JsonResponse: {'error': <mesaj>} la eroare (status 400)
+    """
+    prefix = request.GET.get('prefix', '').strip()
+    query = request.GET.get('q', '').strip()
+
+    if not prefix and not query:
+        return JsonResponse({'error': 'prefix sau q este obligatoriu'}, status=400)
+
+    try:
+        limit = int(request.GET.get('limit', 50))
+    except ValueError:
+        return JsonResponse({'error': 'limit invalid'}, status=400)
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+
+    attempts = search_attempts(prefix=prefix or None, query=query or None, limit=limit)
+    # Deciziile încă nescrise sunt în memorie
+    in_memory = get_pending_store().snapshot()
+    results = [in_memory.get(a.id) or serialize_attempt(a) for a in attempts]
+    # Încercările vechi (id-uri mai mici) continuă lista din arhivă
+    if len(results) < limit:
+        results.extend(search_archived(prefix=prefix or None, query=query or None,
+                                       limit=limit - len(results)))
+    return JsonResponse(results, safe=False)
+
+
+# Câmpurile numărate de /api/stats
+STATS_FIELDS = ('status', 'decision_source', 'access_type')
+
+# Coloanele fișierului CSV exportat (cheile din serialize_attempt)
+EXPORT_FIELDS = ('id', 'timestamp', 'access_path', 'access_type', 'status', 'decided_at',
+                 'decision_source', 'matched_identity', 'match_similarity', 'photo_path',
+                 'duplicate_of', 'revoked_at', 'client_ref', 'anomaly_score', 'anomaly_reason')
+
+
+@require_http_methods(["GET"])  # Acceptă doar cereri GET
+def stats(request):
+    """
+    Numără încercările de acces după status, sursa deciziei și tipul accesului.
+
+    Încercările arhivate (vezi archive.py) sunt numărate direct din
+    coloanele arhivei, fără să fie citite rând cu rând.
+
+    Parametri:
+        request: Cererea HTTP
+
+    Returnează:
+        JsonResponse: {'total', 'live', 'archived', 'status': {...},
+                       'decision_source': {...}, 'access_type': {...}}
+    """
+    archive = get_archive()
+    result = {'live': AccessAttempt.objects.count(), 'archived': archive.rows()}
+    result['total'] = result['live'] + result['archived']
+    for field in STATS_FIELDS:
+        counts = archive.counts(field)
+        for row in AccessAttempt.objects.values(field).annotate(count=Count('id')).order_by():
+            counts[row[field]] = counts.get(row[field], 0) + row['count']
+        result[field] = counts
+    return JsonResponse(result)
+
+
+class _Echo:
+    """Obiect "fișier" pentru csv.writer: returnează linia în loc să o scrie."""
+
+    def write(self, value):
+        return value
+
+
+@require_http_methods(["GET"])  # Acceptă doar cereri GET
+def export(request):
+    """
+    Exportă toate încercările de acces ca fișier CSV.
+
+    Răspunsul este transmis pe măsură ce este generat: întâi încercările
+    arhivate, apoi cele din tabelă, în ordinea id-urilor.
+
+    Parametri:
+        request: Cererea HTTP
+
+    Returnează:
+        StreamingHttpResponse: Fișierul access_attempts.csv
+    """
+    writer = csv.writer(_Echo())
+
+    def rows():
+        yield writer.writerow(EXPORT_FIELDS)
+        for record in get_archive().iter_records():
+            yield writer.writerow([record[name] for name in EXPORT_FIELDS])
+        in_memory = get_pending_store().snapshot()
+        attempts = AccessAttempt.objects.select_related('path').order_by('id')
+        for attempt in attempts.iterator(chunk_size=2000):
+            record = in_memory.get(attempt.id) or serialize_attempt(attempt)
+            yield writer.writerow([record[name] for name in EXPORT_FIELDS])
+
+    return StreamingHttpResponse(rows(), content_type='text/csv', headers={
+        'Content-Disposition': 'attachment; filename="access_attempts.csv"',
     })
 
 
@@ -178,8 +682,14 @@ def decide(request, attempt_id):
         request: Cererea HTTP
         attempt_id (int): ID-ul încercării de acces
 
+    Monitorul folosește același endpoint pentru a înregistra aprobările
+    automate (recunoaștere facială), cu sursa și persoana recunoscută.
+
     Parametri cerere (JSON):
         decision (str): 'approved' sau 'denied'
+        decision_source (str): 'admin' (implicit) sau 'face_match'
+        matched_identity (str): Persoana recunoscută (opțional)
+        match_similarity (float): Similaritatea feței recunoscute (opțional)
 
     Returnează:
         JsonResponse: {'id': <id>, 'status': <decizie>} la succes
@@ -197,15 +707,170 @@ def decide(request, attempt_id):
     if decision not in ['approved', 'denied']:
         return JsonResponse({'error': 'Decizie invalidă'}, status=400)
 
-    # Găsim încercarea și actualizăm statusul
+    try:
+        audit_fields = decision_fields(data, default_source='admin')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # O încercare în așteptare este decisă în memorie (monitorul vede decizia
+    # imediat); scrierea în baza de date se face în fundal (vezi hotstore.py)
+    decided_at = timezone.now()  # Înregistrăm momentul deciziei
+    if get_pending_store().decide(attempt_id, decision, decided_at, audit_fields) is not None:
+        return JsonResponse({'id': attempt_id, 'status': decision})
+
+    # Încercarea nu este în așteptare (ex: o decizie schimbată) - direct în baza de date
     attempt = get_object_or_404(AccessAttempt, id=attempt_id)
     attempt.status = decision
-    attempt.decided_at = timezone.now()  # Înregistrăm momentul deciziei
+    attempt.decided_at = decided_at
+    for name, value in audit_fields.items():
+        setattr(attempt, name, value)
     attempt.save()
 
     return JsonResponse({'id': attempt.id, 'status': decision})
 
 
+# Durata maximă (secunde) a unei cereri long-poll pentru revocări
+MAX_REVOCATION_WAIT = 30
+
+# Cât de des (secunde) cererile long-poll re-verifică baza de date - o
+# revocare făcută de alt proces al serverului este văzută cel târziu atunci
+REVOCATION_RECHECK = 0.5
+
+# Trezește cererile long-poll din acest proces când apare o revocare
+_revocation_cond = threading.Condition()
+
+
+def serialize_revocation(revocation):
+    """
+    Convertește o revocare într-un dicționar JSON-serializabil.
+
+    Parametri:
+        revocation (Revocation): Revocarea
+
+    Returnează:
+        dict: id, attempt_id, path, created_at (ISO)
+    """
+    return {
+        'id': revocation.id,
+        'attempt_id': revocation.attempt_id,
+        'path': revocation.path,
+        'created_at': revocation.created_at.isoformat(),
+    }
+
+
+@csrf_exempt  # Dezactivează protecția CSRF pentru API
+@require_http_methods(["POST"])  # Acceptă doar cereri POST
+def revoke(request, attempt_id):
+    """
+    Revocă aprobarea unei încercări de acces.
+
+    Acest endpoint este apelat din dashboard când administratorul apasă
+    butonul "Revocă". Revocarea este adăugată în jurnal, iar monitoarele
+    care așteaptă în /api/revocations sunt trezite imediat.
+
+    Doar încercările din tabelă pot fi revocate: o încercare aprobată și
+    deja arhivată (mai veche de ARCHIVE_AFTER_DAYS zile) returnează 404 -
+    aprobarea ei a expirat de mult în monitor.
+
+    Parametri:
+        request: Cererea HTTP
+        attempt_id (int): ID-ul încercării aprobate
+
+    Returnează:
+        JsonResponse: {'id': <id>, 'revocation': <id_revocare>} la succes
+        JsonResponse: {'error': <mesaj>} dacă încercarea nu este aprobată (status 400)
+        Http404: Dacă încercarea nu există (sau a fost arhivată)
+    """
+    # O aprobare abia acordată poate fi încă doar în memorie
+    get_pending_store().flush()
+    attempt = get_object_or_404(AccessAttempt.objects.select_related('path'), id=attempt_id)
+    if attempt.status != 'approved':
+        return JsonResponse({'error': 'Doar o încercare aprobată poate fi revocată'}, status=400)
+
+    with transaction.atomic():
+        attempt.revoked_at = timezone.now()
+        attempt.save(update_fields=['revoked_at'])
+        revocation = Revocation.objects.create(attempt=attempt, path=attempt.path.path)
+
+    with _revocation_cond:
+        _revocation_cond.notify_all()
+
+    return JsonResponse({'id': attempt.id, 'revocation': revocation.id})
+
+
+@require_http_methods(["GET"])  # Acceptă doar cereri GET
+def revocations(request):
+    """
+    Returnează revocările mai noi decât un cursor (long-poll).
+
+    Dacă nu există revocări noi, cererea rămâne deschisă până apare una sau
+    până expiră `wait` secunde. Fără `after`, se returnează imediat doar
+    cursorul curent (monitorul îl folosește la pornire).
+
+    Parametri cerere (query string):
+        after (int): ID-ul ultimei revocări primite
+        wait (float): Cât timp să aștepte o revocare nouă (implicit 0, maxim 30)
+
+    Returnează:
+        JsonResponse: {'revocations': [...], 'cursor': <id_ultima_revocare>}
+        JsonResponse: {'error': <mesaj>} la eroare (status 400)
+    """
+    if 'after' not in request.GET:
+        latest = Revocation.objects.order_by('-id').values_list('id', flat=True).first()
+        return JsonResponse({'revocations': [], 'cursor': latest or 0})
+
+    try:
+        after = int(request.GET['after'])
+        wait = min(max(float(request.GET.get('wait', 0)), 0), MAX_REVOCATION_WAIT)
+    except ValueError:
+        return JsonResponse({'error': 'after sau wait invalid'}, status=400)
+
+    deadline = time.monotonic() + wait
+    while True:
+        found = list(Revocation.objects.filter(id__gt=after).order_by('id')[:100])
+        remaining = deadline - time.monotonic()
+        if found or remaining <= 0:
+            break
+        with _revocation_cond:
+            _revocation_cond.wait(min(remaining, REVOCATION_RECHECK))
+
+    return JsonResponse({
+        'revocations': [serialize_revocation(r) for r in found],
+        'cursor': found[-1].id if found else after,
+    })
+
+
+# Durata maximă (secunde) a unei cereri long-poll pentru anomalii
+MAX_ANOMALY_WAIT = 30
+
+
+@require_http_methods(["GET"])  # Acceptă doar cereri GET
+def anomalies(request):
+    """
+    Returnează rafalele anormale mai noi decât un cursor (long-poll).
+
+    Fiecare rafală este anunțată o singură dată (prima încercare marcată);
+    încercările următoare din rafală sunt doar marcate (anomaly_score).
+    Fără `after`, se returnează imediat ultimele rafale și cursorul curent.
+
+    Parametri cerere (query string):
+        after (int): Cursorul ultimei anomalii primite
+        wait (float): Cât timp să aștepte o anomalie nouă (implicit 0, maxim 30)
+
+    Returnează:
+        JsonResponse: {'anomalies': [...], 'cursor': <cursor>}
+        JsonResponse: {'error': <mesaj>} la eroare (status 400)
+    """
+    try:
+        after = int(request.GET.get('after', 0))
+        wait = min(max(float(request.GET.get('wait', 0)), 0), MAX_ANOMALY_WAIT)
+    except ValueError:
+        return JsonResponse({'error': 'after sau wait invalid'}, status=400)
+
+    found, cursor = get_detector().feed.wait(after, wait)
+    return JsonResponse({'anomalies': found, 'cursor': cursor})
+
+
 def serve_capture(request, filename):
     """
     Servește fotografiile capturate.
@@ -215,14 +880,14 @@ def serve_capture(request, filename):
 
     Parametri:
         request: Cererea HTTP
-        filename (str): Numele fișierului foto (ex: 'capture_20250117_143052.jpg')
+        filename (str): Numele fișierului foto (ex: 'capture_20250117_143052_3f9a1c2e.jpg')
 
     Returnează:
         FileResponse: Fișierul imagine JPEG
         Http404: Dacă fotografia nu există
     """
     # Construim calea completă către fișier
-    captures_dir = os.path.join(settings.BASE_DIR, 'captures')
+    captures_dir = settings.CAPTURES_DIR
     file_path = os.path.join(captures_dir, filename)
 
     # Verificăm dacă fișierul există
@@ -12,6 +12,7 @@ Autor: Bascacov Alexandra
 Versiune: 1.0
 """
 
+import os
 from pathlib import Path
 
 # ============================================================================
@@ -21,6 +22,10 @@ from pathlib import Path
 # BASE_DIR este directorul rădăcină al proiectului
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Folderul cu fotografiile capturate (comun cu monitorul)
+# Variabila de mediu ACCESS_CONTROL_CAPTURES îl schimbă (ex: benchmark-uri)
+CAPTURES_DIR = Path(os.environ.get('ACCESS_CONTROL_CAPTURES', BASE_DIR / 'captures'))
+
 
 # ============================================================================
 # SETĂRI DE SECURITATE
@@ -58,6 +63,45 @@ INSTALLED_APPS = [
 # Timpul (în secunde) înainte de respingere automată
 APPROVAL_TIMEOUT = 30
 
+# Fotografiile ale căror hash-uri perceptuale diferă prin cel mult atâția
+# biți (din 64) sunt considerate duplicate (vezi access_control/photo_index.py)
+PHOTO_DUPLICATE_DISTANCE = 6
+
+# True = fișierul unei fotografii duplicat este șters din captures/, iar
+# încercarea refolosește fotografia reprezentantului grupului
+PHOTO_DEDUPE_STORAGE = False
+
+# Încercările în așteptare sunt ținute în memorie (vezi access_control/hotstore.py);
+# deciziile sunt scrise în baza de date în loturi, la acest interval (secunde)
+HOTSTORE_FLUSH_INTERVAL = 0.2
+
+# Arhiva pe coloane a încercărilor vechi (vezi access_control/archive.py)
+# Încercările decise mai vechi de ARCHIVE_AFTER_DAYS zile sunt mutate din
+# tabelă în segmente de ARCHIVE_SEGMENT_ROWS rânduri, în ARCHIVE_DIR
+# (variabila de mediu ACCESS_CONTROL_ARCHIVE îl schimbă)
+ARCHIVE_DIR = Path(os.environ.get('ACCESS_CONTROL_ARCHIVE', BASE_DIR / 'archive'))
+ARCHIVE_AFTER_DAYS = 28
+ARCHIVE_SEGMENT_ROWS = 50000
+
+# Serverul arhivează singur la acest interval (secunde); None = doar manual
+# (python manage.py archive_attempts)
+ARCHIVE_INTERVAL = 6 * 3600
+
+# Detectarea rafalelor anormale (vezi access_control/anomaly.py)
+# O încercare este marcată când în ultimele ~ANOMALY_WINDOW secunde au fost
+# cel puțin ANOMALY_MIN_COUNT încercări pe aceeași cale (sau gazdă) și de
+# ANOMALY_FACTOR ori mai multe decât rata obișnuită (ANOMALY_BASELINE)
+ANOMALY_WINDOW = 60
+ANOMALY_BASELINE = 7 * 24 * 3600
+ANOMALY_FACTOR = 5.0
+ANOMALY_MIN_COUNT = 10
+
+# Dimensiunile schițelor count-min (memoria este fixă: lățime x adâncime
+# numere per schiță) și încercările citite la pornire pentru rata obișnuită
+ANOMALY_SKETCH_WIDTH = 4096
+ANOMALY_SKETCH_DEPTH = 4
+ANOMALY_WARMUP_ROWS = 20000
+
 # ============================================================================
 # MIDDLEWARE
 # ============================================================================
@@ -107,10 +151,19 @@ WSGI_APPLICATION = 'admin_dashboard.wsgi.application'
 # ============================================================================
 # Folosim SQLite pentru simplitate - baza de date este un fișier local
 # Documentație: https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# Variabila de mediu ACCESS_CONTROL_DB indică altă bază de date (ex: o copie
+# temporară pentru benchmark-uri, fără să atingă datele reale)
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',  # Motor SQLite
-        'NAME': BASE_DIR / 'db.sqlite3',         # Calea către fișierul DB
+        'NAME': os.environ.get('ACCESS_CONTROL_DB', BASE_DIR / 'db.sqlite3'),  # Calea către fișierul DB
+        'OPTIONS': {
+            # Tranzacțiile iau imediat lock-ul de scriere: cererile simultane
+            # (ex: mai multe foldere deschise deodată) așteaptă, în loc să
+            # eșueze cu "database is locked" la trecerea de la citire la scriere
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -0,0 +1,313 @@
+"""
+Cache-ul Aprobărilor - Aprobări per cale, cu durată proprie și revocare
+
+Descriere:
+    După o aprobare, accesul repetat la aceeași cale nu trebuie să mai
+    ajungă la server. Până acum exista o singură aprobare per folder
+    protejat (approved_until), deci nu putea fi limitată la un subfolder
+    și nu putea fi retrasă înainte de expirare.
+
+    ApprovalCache:
+    - o intrare per cale aprobată (folderul protejat sau un subfolder),
+      cu propriul termen de expirare și ID-ul încercării aprobate
+    - căutarea unei căi parcurge trie-ul de căi (vezi path_trie.py):
+      O(adâncime), indiferent de numărul de aprobări
+    - numărul de intrări este limitat; la depășire este eliminată intrarea
+      folosită cel mai demult (LRU)
+
+    RevocationListener:
+    - un fir de fundal care ține deschisă o cerere long-poll către
+      /api/revocations; când administratorul revocă o aprobare în
+      dashboard, serverul răspunde imediat, iar intrarea este eliminată
+      din cache (efect în mai puțin de o secundă)
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from config import APPROVAL_CACHE_DURATION, APPROVAL_CACHE_SIZE, REVOCATION_WAIT
+from path_trie import PathTrie
+
+log = logging.getLogger(__name__)
+
+
+class ApprovalEntry:
+    """
+    O aprobare din cache.
+
+    Atribute:
+        path (str): Calea aprobată (acoperă și tot ce este sub ea)
+        expires_at (float): Momentul expirării (time.time)
+        attempt_id (int): ID-ul încercării aprobate (None dacă nu este cunoscut)
+    """
+
+    __slots__ = ('path', 'expires_at', 'attempt_id')
+
+    def __init__(self, path, expires_at, attempt_id=None):
+        self.path = path
+        self.expires_at = expires_at
+        self.attempt_id = attempt_id
+
+    def __repr__(self):
+        return f"ApprovalEntry({self.path!r}, expires_at={self.expires_at:.0f})"
+
+
+class ApprovalCache:
+    """
+    Cache de aprobări indexat după prefix de cale, cu TTL per intrare și LRU.
+
+    Atribute:
+        max_entries (int): Numărul maxim de aprobări păstrate
+        default_ttl (float): Durata implicită a unei aprobări (secunde)
+        hits (int): Căutări acoperite de o aprobare validă
+        misses (int): Căutări fără aprobare validă
+        evictions (int): Intrări eliminate pentru a respecta max_entries
+        revoked (int): Intrări eliminate prin revocare
+    """
+
+    def __init__(self, max_entries=APPROVAL_CACHE_SIZE, default_ttl=APPROVAL_CACHE_DURATION,
+                 clock=time.time):
+        """
+        Parametri:
+            max_entries (int): Numărul maxim de aprobări păstrate
+            default_ttl (float): Durata implicită a unei aprobări (secunde)
+            clock (callable): Sursa de timp (secunde)
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._trie = PathTrie()
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revoked = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._lru)
+
+    def _remove(self, path):
+        self._trie.remove(path)
+        self._lru.pop(path, None)
+
+    def grant(self, path, ttl=None, attempt_id=None):
+        """
+        Adaugă (sau reînnoiește) aprobarea unei căi.
+
+        Parametri:
+            path (str): Calea aprobată
+            ttl (float, optional): Durata aprobării (implicit default_ttl)
+            attempt_id (int, optional): ID-ul încercării aprobate
+
+        Returnează:
+            ApprovalEntry: Intrarea creată
+        """
+        path = os.path.normpath(path)
+        entry = ApprovalEntry(path, self._clock() + (self.default_ttl if ttl is None else ttl),
+                              attempt_id)
+        with self._lock:
+            self._trie.insert(path, entry)
+            self._lru[path] = entry
+            self._lru.move_to_end(path)
+            while len(self._lru) > self.max_entries:
+                oldest, _ = self._lru.popitem(last=False)
+                self._trie.remove(oldest)
+                self.evictions += 1
+        return entry
+
+    def lookup(self, path):
+        """
+        Găsește aprobarea validă care acoperă o cale.
+
+        Sunt verificate doar prefixele căii (O(adâncime)); intrările expirate
+        întâlnite sunt eliminate. Intrarea găsită devine cea mai recent folosită.
+
+        Parametri:
+            path (str): Calea accesată (fișier sau folder)
+
+        Returnează:
+            ApprovalEntry: Aprobarea cea mai specifică încă validă
+            None: Dacă nicio aprobare validă nu acoperă calea
+        """
+        now = self._clock()
+        with self._lock:
+            for prefix, entry in self._trie.prefixes(path):
+                if entry.expires_at <= now:
+                    self._remove(prefix)
+                    continue
+                self._lru.move_to_end(prefix)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def remaining(self, path):
+        """
+        Returnează câte secunde mai este validă aprobarea unei căi.
+
+        Parametri:
+            path (str): Calea
+
+        Returnează:
+            float: Secundele rămase (0 dacă nu există o aprobare validă)
+        """
+        entry = self.lookup(path)
+        return max(entry.expires_at - self._clock(), 0) if entry else 0
+
+    def any_valid(self):
+        """True dacă există cel puțin o aprobare nerevocată și neexpirată."""
+        now = self._clock()
+        with self._lock:
+            return any(entry.expires_at > now for entry in self._lru.values())
+
+    def revoke(self, path):
+        """
+        Revocă aprobările care acoperă o cale sau se află sub ea.
+
+        Parametri:
+            path (str): Calea revocată
+
+        Returnează:
+            int: Numărul de intrări eliminate
+        """
+        path = os.path.normpath(path)
+        below = path.rstrip(os.sep) + os.sep
+        with self._lock:
+            targets = [prefix for prefix, _ in self._trie.prefixes(path)]
+            targets += [p for p in self._lru if p.startswith(below)]
+            for target in targets:
+                self._remove(target)
+            self.revoked += len(targets)
+            return len(targets)
+
+    def revoke_attempt(self, attempt_id):
+        """
+        Revocă aprobările acordate pentru o încercare.
+
+        Parametri:
+            attempt_id (int): ID-ul încercării aprobate
+
+        Returnează:
+            int: Numărul de intrări eliminate
+        """
+        with self._lock:
+            targets = [p for p, entry in self._lru.items() if entry.attempt_id == attempt_id]
+            for target in targets:
+                self._remove(target)
+            self.revoked += len(targets)
+            return len(targets)
+
+    def stats(self):
+        """
+        Returnează statisticile cache-ului.
+
+        Returnează:
+            dict: entries, hits, misses, evictions, revoked
+        """
+        return {
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'revoked': self.revoked,
+        }
+
+
+class RevocationListener:
+    """
+    Fir de fundal care primește revocările de la server (long-poll).
+
+    Cererea GET /api/revocations?after=<cursor>&wait=<secunde> rămâne
+    deschisă pe server până apare o revocare nouă (sau până expiră wait);
+    cursorul este ID-ul ultimei revocări primite, deci revocările făcute
+    cât timp serverul nu a putut fi contactat sunt primite la reconectare.
+
+    Atribute:
+        cache (ApprovalCache): Cache-ul din care se elimină aprobările
+        client: Clientul HTTP (ServerClient din monitor.py - get_json)
+        on_revoke (callable): Apelată după fiecare revocare aplicată (opțional)
+        wait (float): Durata maximă a unei cereri long-poll (secunde)
+        cursor (int): ID-ul ultimei revocări primite
+    """
+
+    def __init__(self, cache, client, on_revoke=None, wait=REVOCATION_WAIT, retry_interval=2.0):
+        """
+        Parametri:
+            cache (ApprovalCache): Cache-ul aprobărilor
+            client: Clientul HTTP (trebuie să aibă get_json(path, deadline, read_timeout))
+            on_revoke (callable, optional): Apelată cu fiecare revocare (dict)
+            wait (float): Durata maximă a unei cereri long-poll (secunde)
+            retry_interval (float): Pauza după o eroare de conexiune (secunde)
+        """
+        self.cache = cache
+        self.client = client
+        self.on_revoke = on_revoke
+        self.wait = wait
+        self.retry_interval = retry_interval
+        self.cursor = None
+        self.running = False
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Pornește firul de ascultare."""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='revocations', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Oprește firul (cererea în curs este abandonată)."""
+        self.running = False
+        self._stop_event.set()
+
+    def poll_once(self):
+        """
+        Execută o cerere long-poll și aplică revocările primite.
+
+        Prima cerere (fără cursor) doar obține cursorul curent al serverului -
+        revocările mai vechi nu privesc aprobările acestui monitor.
+
+        Returnează:
+            int: Numărul de revocări primite
+
+        Ridică:
+            Exception: Dacă serverul nu a putut fi contactat
+        """
+        if self.cursor is None:
+            data = self.client.get_json('/api/revocations')
+            self.cursor = data['cursor']
+            return 0
+
+        data = self.client.get_json(
+            f'/api/revocations?after={self.cursor}&wait={self.wait:g}',
+            deadline=self.wait + 5, read_timeout=self.wait + 2
+        )
+        for revocation in data['revocations']:
+            removed = 0
+            if revocation.get('attempt_id') is not None:
+                removed += self.cache.revoke_attempt(revocation['attempt_id'])
+            if revocation.get('path'):
+                removed += self.cache.revoke(revocation['path'])
+            log.debug("Approval REVOKED: %s (attempt %s, %s cache entries)",
+                      revocation.get('path'), revocation.get('attempt_id'), removed)
+            if self.on_revoke is not None:
+                self.on_revoke(revocation)
+        self.cursor = data['cursor']
+        return len(data['revocations'])
+
+    def _run(self):
+        while self.running:
+            try:
+                self.poll_once()
+            except Exception as e:
+                log.debug("Revocation poll failed: %s", e)
+                self._stop_event.wait(self.retry_interval * random.uniform(0.5, 1.5))
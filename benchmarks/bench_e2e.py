@@ -0,0 +1,556 @@
+"""
+Benchmark - Latența de la un capăt la altul: monitor + server Django
+
+Descriere:
+    Pornește serverul Django (runserver, pe o bază de date temporară) și
+    componentele lui monitor.py (FolderAccessHandler, observatorul de fișiere,
+    FinderWindowMonitor, ApprovalEngine, ServerClient) și măsoară cele două
+    durate care contează:
+    - de la deschiderea unui folder protejat până când încercarea apare în
+      dashboard (open_to_dashboard)
+    - de la click-ul administratorului până la redeschiderea folderului
+      (click_to_reopen)
+
+    Nimic nu depinde de un Mac sau de o persoană:
+    - ferestrele Finder: FakeWindowSource (fereastra dispare când monitorul o închide)
+    - camera: SyntheticCamera, prin serviciul de captură (socket Unix)
+    - acțiunile asupra sistemului: RecordingOSActions
+    - administratorul: un fir care interoghează /api/attempts ca dashboard-ul
+      (la fiecare --admin-poll secunde) și aprobă fiecare încercare nouă
+
+    Accesările vin în rafale (--burst foldere deodată, --rounds runde): pe
+    rând, o fereastră Finder deschisă și un fișier scris în folder (detectat
+    de observatorul real - inotify/fanotify sau watchdog).
+
+    Etape raportate (p50/p90/p99/max, în secunde):
+        detect            deschidere -> fereastra Finder închisă de monitor
+        register          cererea creată -> încercarea înregistrată pe server
+        dashboard         fereastra închisă -> încercarea văzută de administrator
+        decide            click -> răspunsul serverului la /api/decide
+        reopen            decizia salvată -> folderul redeschis de monitor
+        open_to_dashboard deschidere -> încercarea văzută de administrator
+        click_to_reopen   click -> folderul redeschis
+
+    Regresii: --save-baseline scrie percentilele în fișierul de referință;
+    la rulările următoare, p50 și p90 ale fiecărei etape sunt comparate cu
+    referința (toleranță relativă + absolută), iar --max ETAPA=SECUNDE
+    impune limite fixe. Orice depășire -> cod de ieșire 1.
+
+Utilizare:
+    python benchmarks/bench_e2e.py [--rounds 10] [--burst 4] [--admin-poll 2.0]
+                                   [--save-baseline] [--max click_to_reopen=2.5] [-v]
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import requests  # noqa: E402
+
+from camera import CaptureClient, CaptureService, SyntheticCamera  # noqa: E402
+from config import APPROVAL_TIMEOUT  # noqa: E402
+from monitor import (  # noqa: E402
+    FinderWindowMonitor, FolderAccessHandler, ProtectedRoot, ServerClient, create_observer
+)
+from os_actions import RecordingOSActions  # noqa: E402
+from spool import AttemptSpool  # noqa: E402
+from window_sources import FakeWindowSource  # noqa: E402
+
+# Etapele raportate, în ordinea afișării
+STAGES = ('detect', 'register', 'dashboard', 'decide', 'reopen',
+          'open_to_dashboard', 'click_to_reopen')
+
+# Percentilele comparate cu referința
+COMPARED = ('p50', 'p90')
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'bench_e2e_baseline.json')
+
+
+def free_port():
+    """Returnează un port TCP liber pe 127.0.0.1."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, q):
+    """
+    Percentila unei liste de valori (interpolare liniară între ranguri).
+
+    Parametri:
+        values (list): Valorile (nesortate)
+        q (float): Percentila (0-1)
+
+    Returnează:
+        float: Valoarea percentilei (0 pentru o listă goală)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class DjangoServer:
+    """
+    Serverul Django pornit într-un subproces, pe o bază de date temporară.
+
+    Atribute:
+        url (str): Adresa serverului (http://127.0.0.1:<port>)
+    """
+
+    def __init__(self, workdir, port):
+        self.url = f"http://127.0.0.1:{port}"
+        self.port = port
+        self.env = dict(os.environ,
+                        ACCESS_CONTROL_DB=os.path.join(workdir, 'db.sqlite3'),
+                        ACCESS_CONTROL_CAPTURES=os.path.join(workdir, 'captures'))
+        self.log_path = os.path.join(workdir, 'server.log')
+        self.process = None
+
+    def start(self, timeout=30):
+        """
+        Creează schema bazei de date și pornește serverul.
+
+        Ridică:
+            RuntimeError: Dacă serverul nu răspunde în timeout secunde
+        """
+        manage = os.path.join(BASE_DIR, 'manage.py')
+        subprocess.run([sys.executable, manage, 'migrate', '--noinput'], env=self.env,
+                       cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL)
+        with open(self.log_path, 'wb') as log_file:
+            self.process = subprocess.Popen(
+                [sys.executable, manage, 'runserver', f'127.0.0.1:{self.port}', '--noreload'],
+                env=self.env, cwd=BASE_DIR, stdout=log_file, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                requests.get(f"{self.url}/api/attempts", timeout=1)
+                return
+            except requests.RequestException:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"Serverul Django nu a pornit - vezi {self.log_path}")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class Trial:
+    """
+    O accesare sintetică și momentele ei (time.monotonic, None = neatins).
+
+    Atribute:
+        root (str): Folderul protejat accesat (fiecare încercare are folderul ei)
+        kind (str): 'window' (fereastră Finder) sau 'file' (fișier scris)
+        opened, detected, seen, clicked, decided, reopened (float): Momentele etapelor
+        timings (dict): Duratele înregistrate de ApprovalEngine (request.timings)
+    """
+
+    def __init__(self, root, kind):
+        self.root = root
+        self.kind = kind
+        self.opened = self.detected = self.seen = None
+        self.clicked = self.decided = self.reopened = None
+        self.timings = {}
+
+    def stages(self):
+        """Duratele etapelor disponibile (etapă -> secunde)."""
+        def between(start, end):
+            return end - start if start is not None and end is not None else None
+
+        stages = {
+            'detect': between(self.opened, self.detected),
+            'register': self.timings.get('admin_notified'),
+            'dashboard': between(self.detected, self.seen),
+            'decide': between(self.clicked, self.decided),
+            'reopen': between(self.decided, self.reopened),
+            'open_to_dashboard': between(self.opened, self.seen),
+            'click_to_reopen': between(self.clicked, self.reopened),
+        }
+        return {stage: value for stage, value in stages.items() if value is not None}
+
+
+class FlowLog:
+    """
+    Primește rezultatele fluxurilor de aprobare (interfața TraceRecorder).
+
+    Monitorul apelează handler.recorder.flow(request) la finalul fiecărui
+    flux; celelalte înregistrări ale urmei nu sunt necesare aici.
+    """
+
+    def __init__(self, trials):
+        self.trials = trials
+
+    def event(self, event):
+        pass
+
+    def windows(self, paths):
+        pass
+
+    def server(self, method, path, data=None, error=None):
+        pass
+
+    def flow(self, request):
+        trial = self.trials.get(request.root.path)
+        if trial is not None:
+            trial.timings = dict(request.timings)
+
+
+class ScriptedAdmin:
+    """
+    Administratorul: interoghează lista încercărilor ca dashboard-ul și
+    aprobă fiecare încercare nouă a benchmark-ului.
+
+    Atribute:
+        poll_interval (float): Intervalul interogărilor (dashboard-ul: 2 secunde)
+        think_time (float): Pauza dintre apariția încercării și click
+        errors (int): Cererile eșuate
+    """
+
+    def __init__(self, url, trials, poll_interval=2.0, think_time=0.0):
+        self.url = url
+        self.trials = trials
+        self.poll_interval = poll_interval
+        self.think_time = think_time
+        self.errors = 0
+        self.session = requests.Session()
+        self._handled = set()
+        self._stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='scripted-admin', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.thread.join()
+        self.session.close()
+
+    def _trial_for(self, access_path):
+        for root, trial in self.trials.items():
+            if access_path == root or access_path.startswith(root + os.sep):
+                return trial
+        return None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                attempts = self.session.get(f"{self.url}/api/attempts", timeout=5).json()
+            except (requests.RequestException, ValueError):
+                self.errors += 1
+                self._stop_event.wait(self.poll_interval)
+                continue
+            seen = time.monotonic()
+            new = []
+            for attempt in attempts:
+                trial = self._trial_for(attempt['access_path'])
+                if (attempt['status'] != 'pending' or attempt['id'] in self._handled
+                        or trial is None):
+                    continue
+                self._handled.add(attempt['id'])
+                trial.seen = seen
+                new.append((attempt['id'], trial))
+            if new and self.think_time:
+                time.sleep(self.think_time)
+            for attempt_id, trial in new:
+                trial.clicked = time.monotonic()
+                try:
+                    self.session.post(f"{self.url}/api/decide/{attempt_id}",
+                                      json={'decision': 'approved'}, timeout=5)
+                    trial.decided = time.monotonic()
+                except requests.RequestException:
+                    self.errors += 1
+            self._stop_event.wait(max(self.poll_interval - (time.monotonic() - seen), 0))
+
+
+class Bench:
+    """
+    Monitorul real (cu backend-uri false), serverul și administratorul scriptat.
+
+    Atribute:
+        trials (dict): Folderul protejat -> Trial
+    """
+
+    def __init__(self, workdir, count, admin_poll, think_time):
+        self.workdir = workdir
+        self.trials = {}
+        roots = []
+        for index in range(count):
+            path = os.path.join(workdir, 'protected', f'folder_{index:03d}')
+            os.makedirs(path)
+            roots.append(ProtectedRoot(path))
+            self.trials[path] = Trial(path, 'window' if index % 2 == 0 else 'file')
+        self.roots = roots
+
+        captures = os.path.join(workdir, 'captures')
+        os.makedirs(captures)
+        self.server = DjangoServer(workdir, free_port())
+        self.capture_service = CaptureService(SyntheticCamera(),
+                                              os.path.join(workdir, 'camera.sock'))
+        self.capture_client = CaptureClient(self.capture_service.socket_path)
+
+        def capture():
+            filename = f'capture_{uuid.uuid4().hex[:12]}.jpg'
+            self.capture_client.capture(os.path.join(captures, filename))
+            return filename, None
+
+        self.os_actions = RecordingOSActions()
+        self.os_actions.listeners.append(self._on_action)
+        self.handler = FolderAccessHandler(
+            roots, server=ServerClient(base_url=self.server.url),
+            spool=AttemptSpool(os.path.join(workdir, 'spool.db')), os_actions=self.os_actions)
+        self.handler.approvals.capture = capture
+        self.handler.recorder = FlowLog(self.trials)
+        self.window_source = FakeWindowSource()
+        self.finder_monitor = FinderWindowMonitor(self.handler, window_source=self.window_source)
+        self.observer = None
+        self.backend = None
+        self.admin = ScriptedAdmin(self.server.url, self.trials, admin_poll, think_time)
+        self._windows = set()
+        self._lock = threading.Lock()
+
+    def _on_action(self, name, args, _):
+        now = time.monotonic()
+        if name == 'close_finder_window':
+            trial = self.trials.get(args[0])
+            if trial is not None and trial.detected is None:
+                trial.detected = now
+            # Monitorul a închis fereastra - nu mai este în lista Finder
+            with self._lock:
+                self._windows.discard(args[0])
+                self.window_source.set_paths(sorted(self._windows))
+        elif name == 'open_folder':
+            trial = self.trials.get(args[0])
+            if trial is not None and trial.reopened is None:
+                trial.reopened = now
+
+    def start(self):
+        self.server.start()
+        self.capture_service.start()
+        self.handler.start()
+        self.observer, self.backend = create_observer(self.handler, self.roots)
+        self.observer.start()
+        self.finder_monitor.start()
+        self.admin.start()
+
+    def stop(self):
+        self.admin.stop()
+        self.finder_monitor.stop()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+        self.handler.stop()
+        self.capture_client.close()
+        self.capture_service.stop()
+        self.server.stop()
+
+    def open(self, trial):
+        """Accesează folderul unei încercări (fereastră Finder sau fișier scris)."""
+        trial.opened = time.monotonic()
+        if trial.kind == 'window':
+            with self._lock:
+                self._windows.add(trial.root)
+                self.window_source.set_paths(sorted(self._windows))
+        else:
+            with open(os.path.join(trial.root, 'report.txt'), 'w') as f:
+                f.write('synthetic access\n')
+
+    def run_round(self, trials, timeout):
+        """
+        Deschide o rafală de foldere și așteaptă redeschiderea lor.
+
+        Returnează:
+            int: Încercările care nu s-au încheiat în timeout secunde
+        """
+        for trial in trials:
+            self.open(trial)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(trial.reopened is not None for trial in trials):
+                break
+            time.sleep(0.02)
+        # Fluxul se încheie după redeschidere (curățenie) - rafala următoare pornește după
+        while self.handler.approvals.active_requests() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return sum(1 for trial in trials if trial.reopened is None)
+
+
+def summarize(trials):
+    """
+    Percentilele fiecărei etape.
+
+    Returnează:
+        dict: etapă -> {'count', 'p50', 'p90', 'p99', 'max'}
+    """
+    samples = {stage: [] for stage in STAGES}
+    for trial in trials:
+        for stage, value in trial.stages().items():
+            samples[stage].append(value)
+    return {
+        stage: {
+            'count': len(values),
+            'p50': percentile(values, 0.5),
+            'p90': percentile(values, 0.9),
+            'p99': percentile(values, 0.99),
+            'max': max(values, default=0.0),
+        }
+        for stage, values in samples.items()
+    }
+
+
+def check_regressions(results, baseline, tolerance, slack, limits):
+    """
+    Compară rezultatele cu referința și cu limitele fixe.
+
+    Parametri:
+        results (dict): Rezultatul summarize()
+        baseline (dict): Referința (același format) sau None
+        tolerance (float): Creșterea relativă permisă (0.25 = 25%)
+        slack (float): Creșterea absolută permisă în plus (secunde)
+        limits (dict): etapă -> p90 maxim (secunde)
+
+    Returnează:
+        list: Descrierea fiecărei regresii (goală dacă nu există)
+    """
+    failures = []
+    for stage, stats in results.items():
+        if not stats['count']:
+            continue
+        reference = (baseline or {}).get(stage)
+        if reference:
+            for name in COMPARED:
+                allowed = reference[name] * (1 + tolerance) + slack
+                if stats[name] > allowed:
+                    failures.append(f"{stage} {name} {stats[name]:.3f}s > {allowed:.3f}s "
+                                    f"(baseline {reference[name]:.3f}s)")
+        if stage in limits and stats['p90'] > limits[stage]:
+            failures.append(f"{stage} p90 {stats['p90']:.3f}s > limit {limits[stage]:.3f}s")
+    return failures
+
+
+def parse_limits(values):
+    limits = {}
+    for value in values:
+        stage, _, seconds = value.partition('=')
+        if stage not in STAGES or not seconds:
+            raise SystemExit(f"--max: expected STAGE=SECONDS with STAGE in {', '.join(STAGES)}")
+        limits[stage] = float(seconds)
+    return limits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latența de la deschiderea folderului "
+                                                 "la dashboard și de la click la redeschidere")
+    parser.add_argument('--rounds', type=int, default=10, help="rafale de accesări")
+    parser.add_argument('--burst', type=int, default=4, help="foldere deschise deodată")
+    parser.add_argument('--gap', type=float, default=2.0,
+                        help="pauza maximă dintre rafale (aleatoare, secunde)")
+    parser.add_argument('--admin-poll', type=float, default=2.0,
+                        help="intervalul interogărilor administratorului (dashboard-ul: 2s)")
+    parser.add_argument('--think', type=float, default=0.0,
+                        help="pauza administratorului înainte de click (secunde)")
+    parser.add_argument('--seed', type=int, default=1, help="sămânța pauzelor aleatoare")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="fișierul de referință")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="scrie rezultatele ca referință (fără comparație)")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="creșterea relativă permisă față de referință")
+    parser.add_argument('--slack', type=float, default=0.05,
+                        help="creșterea absolută permisă în plus (secunde)")
+    parser.add_argument('--max', action='append', default=[], metavar='STAGE=SECONDS',
+                        help="p90 maxim pentru o etapă (se poate repeta)")
+    parser.add_argument('--keep', action='store_true', help="nu șterge directorul de lucru")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="afișează mesajele monitorului")
+    args = parser.parse_args()
+    limits = parse_limits(args.max)
+
+    if not sys.platform.startswith('linux'):
+        print("Benchmark-ul necesită Linux (backend-uri false pentru ferestre și cameră).")
+        return 0
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="[%(levelname)s] %(message)s")
+    random.seed(args.seed)
+    workdir = tempfile.mkdtemp(prefix='e2e-bench-')
+    bench = Bench(workdir, args.rounds * args.burst, args.admin_poll, args.think)
+    trials = list(bench.trials.values())
+    unfinished = 0
+    try:
+        bench.start()
+        print(f"Server {bench.server.url}, file events: {bench.backend}, "
+              f"{args.rounds} rounds x {args.burst} accesses, admin polls every "
+              f"{args.admin_poll}s\n")
+        timeout = APPROVAL_TIMEOUT + args.admin_poll + args.think + 10
+        for index in range(args.rounds):
+            time.sleep(random.uniform(0, args.gap))
+            unfinished += bench.run_round(trials[index * args.burst:(index + 1) * args.burst],
+                                          timeout)
+    finally:
+        bench.stop()
+        if args.keep:
+            print(f"Work directory kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = summarize(trials)
+    print(f"{'stage':<18} {'n':>4} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for stage in STAGES:
+        stats = results[stage]
+        print(f"{stage:<18} {stats['count']:>4} {stats['p50']:>8.3f}s {stats['p90']:>8.3f}s "
+              f"{stats['p99']:>8.3f}s {stats['max']:>8.3f}s")
+    if unfinished or bench.admin.errors:
+        print(f"\n{unfinished} access(es) not completed, {bench.admin.errors} admin request(s) failed")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 1 if unfinished else 0
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = check_regressions(results, baseline, args.tolerance, args.slack, limits)
+    if unfinished:
+        failures.append(f"{unfinished} access(es) not completed")
+    if failures:
+        print("\nREGRESSION:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    if baseline is not None or limits:
+        print("\nNo regression" + (f" (baseline {args.baseline})" if baseline else ""))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Benchmark - Armarea urmăririlor pentru un arbore protejat foarte mare
+
+Descriere:
+    Creează un arbore sintetic de directoare (implicit 100.000, câte 10
+    subdirectoare pe nivel) și măsoară, pentru fiecare strategie a
+    WatchManager (vezi linux_access.py):
+    - timpul de armare la pornire
+    - numărul de urmăriri inotify folosite
+    - memoria Python ocupată de evidența urmăririlor (tracemalloc)
+    - creșterea memoriei slab a kernel-ului (/proc/meminfo, aproximativă)
+    - costul unei urmăriri la cerere (ensure) pentru directoare neurmărite
+
+    Strategii:
+    - eager, buget implicit: jumătate din fs.inotify.max_user_watches
+    - eager, fără buget: până la limita kernel-ului (ENOSPC)
+    - lazy: doar rădăcina; restul la cerere
+    - lazy + fanotify: ca lazy, plus marcajul pe sistemul de fișiere montat
+      (necesită CAP_SYS_ADMIN - omis altfel)
+
+Utilizare:
+    python benchmarks/bench_watch_arm.py [--dirs 100000] [--fanout 10] [--root DIR] [--keep]
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linux_access import (  # noqa: E402
+    FANOTIFY_MASK, READ_MASK, STRUCTURE_MASK, Fanotify, Inotify, WatchManager,
+    fanotify_permitted, system_watch_limit
+)
+
+
+def build_tree(root, dirs, fanout):
+    """
+    Creează un arbore de directoare, nivel cu nivel.
+
+    Parametri:
+        root (str): Directorul rădăcină (trebuie să existe)
+        dirs (int): Numărul de directoare create (fără rădăcină)
+        fanout (int): Subdirectoare per director
+
+    Returnează:
+        list: Căile directoarelor create
+    """
+    created = []
+    level = [root]
+    while len(created) < dirs:
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                if len(created) >= dirs:
+                    break
+                path = os.path.join(parent, f'd{i}')
+                os.mkdir(path)
+                created.append(path)
+                next_level.append(path)
+        level = next_level
+    return created
+
+
+def slab_kib():
+    """Memoria slab a kernel-ului (KiB), din /proc/meminfo."""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('Slab:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def arm(root, mode, budget, fanotify):
+    """Armează urmăririle o dată; returnează (durata, manager, inotify, fanotify)."""
+    started = time.perf_counter()
+    marks = None
+    if fanotify:
+        marks = Fanotify()
+        marks.mark_mount(root, FANOTIFY_MASK)
+    inotify = Inotify()
+    mask = STRUCTURE_MASK if fanotify else STRUCTURE_MASK | READ_MASK
+    manager = WatchManager(inotify, mask, mode, budget)
+    manager.start([root])
+    return time.perf_counter() - started, manager, inotify, marks
+
+
+def run_strategy(name, root, created, mode, budget, fanotify, samples):
+    # Durata și memoria kernel-ului (fără tracemalloc, care încetinește Python)
+    slab_before = slab_kib()
+    elapsed, manager, inotify, marks = arm(root, mode, budget, fanotify)
+    slab_after = slab_kib()
+    stats = manager.stats()
+
+    # Urmărirea la cerere a unor directoare aleatoare
+    targets = random.sample(created, min(samples, len(created)))
+    started = time.perf_counter()
+    for path in targets:
+        manager.ensure(path)
+    ensure_us = (time.perf_counter() - started) / len(targets) * 1e6
+    inotify.close()
+    if marks is not None:
+        marks.close()
+
+    # Memoria Python a evidenței urmăririlor
+    tracemalloc.start()
+    _, manager, inotify, marks = arm(root, mode, budget, fanotify)
+    python_kib = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    inotify.close()
+    if marks is not None:
+        marks.close()
+
+    slab = (f"{slab_after - slab_before:>9} KiB"
+            if slab_before is not None and slab_after is not None else '        n/a')
+    print(f"{name:<22} {elapsed * 1000:>9.1f} ms {stats['watches']:>8} "
+          f"{'yes' if stats['exhausted'] else 'no':>9} {python_kib:>9.0f} KiB {slab} "
+          f"{ensure_us:>9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Armarea urmăririlor pentru un arbore mare")
+    parser.add_argument('--dirs', type=int, default=100000, help="directoare în arbore")
+    parser.add_argument('--fanout', type=int, default=10, help="subdirectoare per director")
+    parser.add_argument('--root', help="director existent în care se creează arborele")
+    parser.add_argument('--samples', type=int, default=1000,
+                        help="directoare urmărite la cerere (ensure)")
+    parser.add_argument('--keep', action='store_true', help="nu șterge arborele la final")
+    args = parser.parse_args()
+
+    if not sys.platform.startswith('linux'):
+        print("Benchmark-ul necesită Linux (inotify).")
+        return
+
+    root = tempfile.mkdtemp(prefix='watch-bench-', dir=args.root)
+    try:
+        started = time.perf_counter()
+        created = build_tree(root, args.dirs, args.fanout)
+        print(f"Tree: {len(created)} directories (fanout {args.fanout}) in {root}, "
+              f"built in {time.perf_counter() - started:.1f}s")
+        limit = system_watch_limit()
+        print(f"fs.inotify.max_user_watches = {limit}\n")
+
+        print(f"{'strategy':<22} {'arm time':>12} {'watches':>8} {'exhausted':>9} "
+              f"{'python mem':>13} {'kernel slab':>13} {'ensure':>12}")
+        run_strategy('eager (default budget)', root, created, 'eager', None, False, args.samples)
+        run_strategy('eager (no budget)', root, created, 'eager', 10 ** 9, False, args.samples)
+        run_strategy('lazy', root, created, 'lazy', None, False, args.samples)
+        if fanotify_permitted():
+            run_strategy('lazy + fanotify mount', root, created, 'lazy', None, True, args.samples)
+        else:
+            print(f"{'lazy + fanotify mount':<22} skipped (fanotify needs CAP_SYS_ADMIN)")
+    finally:
+        if args.keep:
+            print(f"\nTree kept in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
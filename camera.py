@@ -0,0 +1,843 @@
+"""
+Camera - Backend-uri de captură și serviciul de captură cu sesiune caldă
+
+Descriere:
+    Până acum fiecare acces pornea binarul Swift .camera_capture, care
+    crea o sesiune AVCaptureSession nouă, aștepta pornirea camerei și
+    expunerea automată, scria fotografia și se oprea. Pornirea la rece
+    era cel mai mare cost fix înainte ca administratorul să fie alertat.
+
+    Acest modul definește interfața comună Camera și mai multe implementări:
+
+    - WarmSwiftCamera: un proces Swift persistent care ține sesiunea
+      AVCaptureSession pornită și face o captură la fiecare cerere
+      (primită prin stdin) - fără timp de pornire
+    - SubprocessCamera: varianta clasică (un proces nou per captură)
+    - FileCamera: copiază pe rând imaginile dintr-un director (teste, reluări)
+    - SyntheticCamera: scrie un cadru JPEG inclus în cod (doar teste și
+      benchmark-uri - nu este niciodată aleasă automat)
+
+    CaptureService păstrează o cameră deschisă și răspunde la cereri de
+    captură printr-un socket Unix local; CaptureClient este clientul folosit
+    de monitor. Serviciul poate rula în procesul monitorului (pornit automat
+    de ensure_capture_service) sau separat:
+
+        python camera.py [backend]
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import base64
+import itertools
+import logging
+import os
+import selectors
+import shutil
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+from config import CAMERA_BACKEND, CAMERA_SOCKET, CAMERA_FRAMES_DIR, CAMERA_TIMEOUT
+
+log = logging.getLogger(__name__)
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Path to pre-compiled camera capture binaries
+_CAMERA_BINARY = os.path.join(_BASE_DIR, '.camera_capture')
+_CAMERA_DAEMON_BINARY = os.path.join(_BASE_DIR, '.camera_daemon')
+
+# Swift source code for camera capture
+_SWIFT_CAMERA_CODE = '''
+import AVFoundation
+import CoreImage
+import Foundation
+
+class CameraCapture: NSObject, AVCapturePhotoCaptureDelegate {
+    var session: AVCaptureSession?
+    var photoOutput: AVCapturePhotoOutput?
+    var capturedData: Data?
+    var isDone = false
+
+    func capture(to path: String) -> Bool {
+        guard let device = AVCaptureDevice.default(for: .video) else {
+            fputs("No camera found\\n", stderr)
+            return false
+        }
+
+        session = AVCaptureSession()
+        session?.sessionPreset = .photo
+
+        guard let input = try? AVCaptureDeviceInput(device: device) else {
+            fputs("Cannot create input\\n", stderr)
+            return false
+        }
+
+        if session?.canAddInput(input) == true {
+            session?.addInput(input)
+        }
+
+        photoOutput = AVCapturePhotoOutput()
+        if session?.canAddOutput(photoOutput!) == true {
+            session?.addOutput(photoOutput!)
+        }
+
+        session?.startRunning()
+
+        // Wait for camera to warm up
+        RunLoop.current.run(until: Date(timeIntervalSinceNow: 0.5))
+
+        let settings = AVCapturePhotoSettings()
+        photoOutput?.capturePhoto(with: settings, delegate: self)
+
+        // Run the run loop until capture is done or timeout
+        let timeout = Date(timeIntervalSinceNow: 5)
+        while !isDone && Date() < timeout {
+            RunLoop.current.run(until: Date(timeIntervalSinceNow: 0.1))
+        }
+
+        session?.stopRunning()
+
+        if !isDone {
+            fputs("Capture timed out\\n", stderr)
+            return false
+        }
+
+        guard let data = capturedData else {
+            fputs("No data captured\\n", stderr)
+            return false
+        }
+
+        do {
+            try data.write(to: URL(fileURLWithPath: path))
+            return true
+        } catch {
+            fputs("Failed to write: \\(error)\\n", stderr)
+            return false
+        }
+    }
+
+    func photoOutput(_ output: AVCapturePhotoOutput, didFinishProcessingPhoto photo: AVCapturePhoto, error: Error?) {
+        if let error = error {
+            fputs("Photo error: \\(error)\\n", stderr)
+        } else {
+            capturedData = photo.fileDataRepresentation()
+        }
+        isDone = true
+    }
+}
+
+guard CommandLine.arguments.count > 1 else {
+    fputs("Usage: camera_capture <output_path>\\n", stderr)
+    exit(1)
+}
+
+let capture = CameraCapture()
+let success = capture.capture(to: CommandLine.arguments[1])
+exit(success ? 0 : 1)
+'''
+
+# Swift source code for the warm capture daemon: the session is started once
+# and kept running; each line read from stdin is an output path, and the
+# daemon answers with one line ("ok" or "error <message>").
+_SWIFT_DAEMON_CODE = """
+import AVFoundation
+import Foundation
+
+class WarmCamera: NSObject, AVCapturePhotoCaptureDelegate {
+    let session = AVCaptureSession()
+    let photoOutput = AVCapturePhotoOutput()
+    var capturedData: Data?
+    var captureError: String?
+    let done = DispatchSemaphore(value: 0)
+
+    func start() -> String? {
+        guard let device = AVCaptureDevice.default(for: .video) else {
+            return "No camera found"
+        }
+        guard let input = try? AVCaptureDeviceInput(device: device) else {
+            return "Cannot create input"
+        }
+        session.sessionPreset = .photo
+        if session.canAddInput(input) { session.addInput(input) }
+        if session.canAddOutput(photoOutput) { session.addOutput(photoOutput) }
+        session.startRunning()
+
+        // Let auto-exposure settle once, at startup
+        Thread.sleep(forTimeInterval: 0.5)
+        return nil
+    }
+
+    func capture(to path: String) -> String? {
+        capturedData = nil
+        captureError = nil
+        photoOutput.capturePhoto(with: AVCapturePhotoSettings(), delegate: self)
+        if done.wait(timeout: .now() + 5) == .timedOut {
+            return "Capture timed out"
+        }
+        if let error = captureError {
+            return error
+        }
+        guard let data = capturedData else {
+            return "No data captured"
+        }
+        do {
+            try data.write(to: URL(fileURLWithPath: path))
+            return nil
+        } catch {
+            return "Failed to write: \\(error)"
+        }
+    }
+
+    func photoOutput(_ output: AVCapturePhotoOutput, didFinishProcessingPhoto photo: AVCapturePhoto, error: Error?) {
+        if let error = error {
+            captureError = "Photo error: \\(error)"
+        } else {
+            capturedData = photo.fileDataRepresentation()
+        }
+        done.signal()
+    }
+}
+
+setvbuf(stdout, nil, _IOLBF, 0)
+let camera = WarmCamera()
+if let error = camera.start() {
+    print("error \\(error)")
+    exit(1)
+}
+print("ready")
+
+DispatchQueue.global().async {
+    while let line = readLine() {
+        let path = line.trimmingCharacters(in: .whitespaces)
+        if path.isEmpty { continue }
+        if let error = camera.capture(to: path) {
+            print("error \\(error)")
+        } else {
+            print("ok")
+        }
+    }
+    camera.session.stopRunning()
+    exit(0)
+}
+RunLoop.main.run()
+"""
+
+# Cadru JPEG mic (64x48) folosit de SyntheticCamera
+_SYNTHETIC_JPEG = base64.b64decode("""
+/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAoHBwgHBgoICAgLCgoLDhgQDg0NDh0VFhEYIx8lJCIf
+IiEmKzcvJik0KSEiMEExNDk7Pj4+JS5ESUM8SDc9Pjv/2wBDAQoLCw4NDhwQEBw7KCIoOzs7Ozs7
+Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozs7Ozv/wAARCAAwAEADASIA
+AhEBAxEB/8QAHwAAAQUBAQEBAQEAAAAAAAAAAAECAwQFBgcICQoL/8QAtRAAAgEDAwIEAwUFBAQA
+AAF9AQIDAAQRBRIhMUEGE1FhByJxFDKBkaEII0KxwRVS0fAkM2JyggkKFhcYGRolJicoKSo0NTY3
+ODk6Q0RFRkdISUpTVFVWV1hZWmNkZWZnaGlqc3R1dnd4eXqDhIWGh4iJipKTlJWWl5iZmqKjpKWm
+p6ipqrKztLW2t7i5usLDxMXGx8jJytLT1NXW19jZ2uHi4+Tl5ufo6erx8vP09fb3+Pn6/8QAHwEA
+AwEBAQEBAQEBAQAAAAAAAAECAwQFBgcICQoL/8QAtREAAgECBAQDBAcFBAQAAQJ3AAECAxEEBSEx
+BhJBUQdhcRMiMoEIFEKRobHBCSMzUvAVYnLRChYkNOEl8RcYGRomJygpKjU2Nzg5OkNERUZHSElK
+U1RVVldYWVpjZGVmZ2hpanN0dXZ3eHl6goOEhYaHiImKkpOUlZaXmJmaoqOkpaanqKmqsrO0tba3
+uLm6wsPExcbHyMnK0tPU1dbX2Nna4uPk5ebn6Onq8vP09fb3+Pn6/9oADAMBAAIRAxEAPwDjfJ9q
+PJ9qveTR5NdfMY8pR8n2o8n2q95NdNpnhSDyknvizsyg+SMqFz2PfPT0/GolVUVdlRpuTsji/J9q
+PJ9q7q+8JWcy7rMm3cDhSSynr68jt/hXKNbsjFWUqynBBGCDRCsp7BKk47lDyfajyfar3k0eTV8x
+PKXvJ9qPJ9qveTR5Nc3Mb8o3SLZZNVtw2QA27j1AyP5V2NcraE211HMM/K3OB27/AKV1KMrorqcq
+wyD7Vz1Xd3N6Ssha5bxDbKNULjJMiBjn16f0rqa5rUpBd3jSKSUACrkY4/8A15pUtJXHV1Rj+T7U
+eT7Ve8mjya6eY5+UveT7UeT7Ve8mjya5+Y35Sj5PtU8E89vwjZX+63IqfyaPJpc1x2Ip7q4nG0tt
+XuF4zVbyfar3k0eTQpWC1yj5PtR5PtV7yaPJp8wuU//Z
+""")
+
+
+class CameraError(Exception):
+    """Camera nu a putut face captura."""
+
+
+def _compile_swift(source_code, binary):
+    """
+    Compilează un program Swift dacă binarul nu există încă.
+
+    Parametri:
+        source_code (str): Codul sursă Swift
+        binary (str): Calea binarului rezultat
+
+    Returnează:
+        bool: True dacă binarul este disponibil
+    """
+    if os.path.exists(binary):
+        return True
+
+    log.debug("Compiling %s...", os.path.basename(binary))
+    source = f"{binary}.swift"
+
+    try:
+        # Write Swift source
+        with open(source, 'w') as f:
+            f.write(source_code)
+
+        # Compile to binary
+        result = subprocess.run(
+            ['swiftc', source, '-o', binary,
+             '-framework', 'AVFoundation', '-framework', 'CoreImage',
+             '-framework', 'Foundation'],
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+
+        if result.returncode != 0:
+            log.debug("Swift compilation failed: %s", result.stderr)
+            return False
+
+        # Clean up source file
+        os.unlink(source)
+        log.debug("Camera binary compiled successfully")
+        return True
+
+    except Exception as e:
+        log.debug("Failed to compile camera binary: %s", e)
+        return False
+
+
+class Camera:
+    """
+    Interfața comună pentru backend-urile de captură.
+
+    O cameră scrie o fotografie JPEG la calea primită. Implementările
+    trebuie să fie sigure pentru apeluri repetate; CaptureService le
+    serializează (o singură captură la un moment dat).
+    """
+
+    # Numele backend-ului (afișat în mesajele de pornire)
+    name = 'base'
+
+    def capture(self, path):
+        """
+        Capturează o fotografie.
+
+        Parametri:
+            path (str): Calea fișierului JPEG de scris
+
+        Ridică:
+            CameraError: Dacă captura a eșuat
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Eliberează camera (procese, dispozitiv)."""
+
+
+class SubprocessCamera(Camera):
+    """
+    Cameră care pornește binarul Swift .camera_capture la fiecare captură.
+
+    Este comportamentul original: fiecare captură plătește pornirea
+    sesiunii AVCaptureSession și așteptarea expunerii automate.
+    """
+
+    name = 'subprocess'
+
+    def __init__(self, timeout=CAMERA_TIMEOUT):
+        """
+        Parametri:
+            timeout (float): Timpul maxim pentru o captură (secunde)
+        """
+        self.timeout = timeout
+
+    def capture(self, path):
+        if not _compile_swift(_SWIFT_CAMERA_CODE, _CAMERA_BINARY):
+            raise CameraError('camera binary not available')
+
+        try:
+            result = subprocess.run(
+                [_CAMERA_BINARY, path],
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired as e:
+            raise CameraError('capture timed out') from e
+        except OSError as e:
+            raise CameraError(str(e)) from e
+
+        if result.returncode != 0 or not os.path.exists(path):
+            # Filter out the harmless KVO warning
+            errors = [l for l in result.stderr.strip().split('\n')
+                      if l and 'NSKVONotifying' not in l]
+            raise CameraError('; '.join(errors) or f'rc={result.returncode}')
+
+
+class WarmSwiftCamera(Camera):
+    """
+    Cameră cu un proces Swift persistent (sesiune de captură mereu pornită).
+
+    Procesul este pornit la prima captură (sau prin warm_up()); după
+    pornire, o captură costă doar declanșarea și scrierea fotografiei.
+    Dacă procesul moare sau nu răspunde, este repornit; după MAX_RESTARTS
+    eșecuri consecutive se trece pe camera de rezervă (implicit SubprocessCamera).
+
+    Atribute:
+        timeout (float): Timpul maxim pentru o captură (secunde)
+        startup_timeout (float): Timpul maxim de pornire a sesiunii (secunde)
+        fallback (Camera): Camera folosită dacă procesul nu funcționează
+        restarts (int): Numărul de reporniri ale procesului
+    """
+
+    name = 'warm-swift'
+
+    # Numărul de eșecuri consecutive după care se renunță la procesul persistent
+    MAX_RESTARTS = 3
+
+    def __init__(self, timeout=CAMERA_TIMEOUT, startup_timeout=15.0, fallback=None):
+        """
+        Parametri:
+            timeout (float): Timpul maxim pentru o captură
+            startup_timeout (float): Timpul maxim de pornire a sesiunii
+            fallback (Camera, optional): Camera de rezervă
+        """
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.fallback = fallback if fallback is not None else SubprocessCamera(timeout)
+        self.restarts = 0
+        self._failures = 0
+        self._process = None
+        self._buffer = b''
+        self._lock = threading.Lock()
+
+    def _start(self):
+        """Pornește procesul Swift și așteaptă ca sesiunea să fie pregătită."""
+        if not _compile_swift(_SWIFT_DAEMON_CODE, _CAMERA_DAEMON_BINARY):
+            raise CameraError('camera daemon binary not available')
+        try:
+            self._process = subprocess.Popen(
+                [_CAMERA_DAEMON_BINARY],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0
+            )
+        except OSError as e:
+            raise CameraError(str(e)) from e
+        self._buffer = b''
+        line = self._read_line(self.startup_timeout)
+        if line != 'ready':
+            raise CameraError(line or 'camera daemon failed to start')
+
+    def _stop(self):
+        """Oprește procesul persistent (dacă rulează)."""
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=1)
+        except Exception:
+            self._process.kill()
+        self._process = None
+
+    def _read_line(self, timeout):
+        """
+        Citește o linie din stdout-ul procesului, cu timeout.
+
+        Ridică:
+            CameraError: La timeout sau dacă procesul s-a închis
+        """
+        fd = self._process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b'\n' not in self._buffer:
+                if not selector.select(timeout):
+                    raise CameraError('timeout waiting for camera daemon')
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    raise CameraError('camera daemon exited')
+                self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return line.decode('utf-8', 'replace').strip()
+
+    def warm_up(self):
+        """Pornește sesiunea de captură în avans (fără a face o fotografie)."""
+        with self._lock:
+            if self._process is None and self._failures < self.MAX_RESTARTS:
+                try:
+                    self._start()
+                except CameraError as e:
+                    self._failures += 1
+                    self._stop()
+                    log.debug("Camera daemon failed to start: %s", e)
+
+    def _capture_warm(self, path):
+        if self._process is None or self._process.poll() is not None:
+            if self._process is not None:
+                self.restarts += 1
+            self._start()
+        try:
+            self._process.stdin.write(f"{path}\n".encode('utf-8'))
+        except OSError as e:
+            raise CameraError(str(e)) from e
+        reply = self._read_line(self.timeout)
+        if reply != 'ok':
+            # Eroare de captură - procesul este încă în viață
+            raise CameraError(reply[len('error '):] if reply.startswith('error ') else reply)
+
+    def capture(self, path):
+        with self._lock:
+            if self._failures >= self.MAX_RESTARTS:
+                return self.fallback.capture(path)
+            try:
+                self._capture_warm(path)
+                self._failures = 0
+            except CameraError:
+                self._failures += 1
+                self._stop()
+                if self._failures >= self.MAX_RESTARTS:
+                    log.warning("Camera process is not responding - using '%s'",
+                                self.fallback.name)
+                raise
+
+    def close(self):
+        with self._lock:
+            self._stop()
+        self.fallback.close()
+
+
+class FileCamera(Camera):
+    """
+    Cameră care copiază, pe rând, imaginile JPEG dintr-un director.
+
+    Folosită pentru teste și reluări pe sisteme fără cameră.
+
+    Atribute:
+        frames (list): Căile imaginilor, în ordinea în care sunt folosite
+    """
+
+    name = 'file'
+
+    def __init__(self, frames_dir=CAMERA_FRAMES_DIR):
+        """
+        Parametri:
+            frames_dir (str): Directorul cu imagini .jpg/.jpeg
+        """
+        if not frames_dir or not os.path.isdir(frames_dir):
+            raise CameraError(f'frames directory not found: {frames_dir}')
+        self.frames = sorted(
+            os.path.join(frames_dir, name) for name in os.listdir(frames_dir)
+            if name.lower().endswith(('.jpg', '.jpeg'))
+        )
+        if not self.frames:
+            raise CameraError(f'no JPEG frames in {frames_dir}')
+        self._next = itertools.cycle(self.frames)
+        self._lock = threading.Lock()
+
+    def capture(self, path):
+        with self._lock:
+            frame = next(self._next)
+        try:
+            shutil.copyfile(frame, path)
+        except OSError as e:
+            raise CameraError(str(e)) from e
+
+
+class SyntheticCamera(Camera):
+    """
+    Cameră care scrie un cadru JPEG inclus în cod.
+
+    Nu depinde de niciun dispozitiv sau bibliotecă - permite rularea
+    întregului flux pe Linux și în teste.
+
+    Atribute:
+        captures (int): Numărul de capturi făcute
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, frame=_SYNTHETIC_JPEG):
+        """
+        Parametri:
+            frame (bytes): Conținutul JPEG scris la fiecare captură
+        """
+        self.frame = frame
+        self.captures = 0
+
+    def capture(self, path):
+        try:
+            with open(path, 'wb') as f:
+                f.write(self.frame)
+        except OSError as e:
+            raise CameraError(str(e)) from e
+        self.captures += 1
+
+
+def create_camera(kind='auto'):
+    """
+    Creează camera potrivită pentru platforma curentă.
+
+    Cu 'auto', fără o cameră reală (orice sistem în afară de macOS) nu se
+    creează nicio cameră: încercările sunt înregistrate fără fotografie.
+    Cadrul sintetic ar apărea în istoric ca fotografie capturată (și toate
+    capturile ar fi grupate ca duplicate), deci este doar o alegere explicită.
+
+    Parametri:
+        kind (str): 'auto', 'warm', 'subprocess', 'file' sau 'synthetic'
+
+    Returnează:
+        Camera: Camera creată
+        None: Cu 'auto', dacă nu există o cameră reală
+    """
+    if kind == 'auto':
+        if sys.platform != 'darwin':
+            return None
+        kind = 'warm'
+
+    if kind == 'warm':
+        return WarmSwiftCamera()
+    if kind == 'subprocess':
+        return SubprocessCamera()
+    if kind == 'file':
+        return FileCamera()
+    if kind == 'synthetic':
+        return SyntheticCamera()
+    raise ValueError(f"Cameră necunoscută: {kind}")
+
+
+class _CaptureRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Protocolul serviciului, câte o linie per cerere:
+        ping            -> pong <backend>
+        capture <cale>  -> ok <milisecunde> | error <mesaj>
+    """
+
+    def handle(self):
+        service = self.server.service
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').strip()
+            if not line:
+                continue
+            command, _, argument = line.partition(' ')
+            if command == 'ping':
+                reply = f"pong {service.camera.name}"
+            elif command == 'capture' and argument:
+                reply = service.capture(argument)
+            else:
+                reply = 'error unknown command'
+            self.wfile.write(f"{reply}\n".encode('utf-8'))
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class CaptureService:
+    """
+    Serviciu de captură: o cameră deschisă, accesibilă printr-un socket Unix.
+
+    Camera este încălzită la pornire și rămâne deschisă; capturile sunt
+    serializate (o singură captură la un moment dat).
+
+    Atribute:
+        camera (Camera): Camera folosită
+        socket_path (str): Calea socket-ului Unix
+        captures (int): Numărul de capturi reușite
+        failures (int): Numărul de capturi eșuate
+    """
+
+    def __init__(self, camera, socket_path=CAMERA_SOCKET):
+        """
+        Parametri:
+            camera (Camera): Camera folosită
+            socket_path (str): Calea socket-ului Unix
+        """
+        self.camera = camera
+        self.socket_path = socket_path
+        self.captures = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def capture(self, path):
+        """
+        Face o captură și returnează linia de răspuns a protocolului.
+
+        Parametri:
+            path (str): Calea fișierului JPEG de scris
+
+        Returnează:
+            str: 'ok <milisecunde>' sau 'error <mesaj>'
+        """
+        started = time.monotonic()
+        with self._lock:
+            try:
+                self.camera.capture(path)
+            except CameraError as e:
+                self.failures += 1
+                return f"error {e}"
+        self.captures += 1
+        return f"ok {(time.monotonic() - started) * 1000:.1f}"
+
+    def start(self):
+        """Încălzește camera și pornește serverul pe un fir de fundal."""
+        if hasattr(self.camera, 'warm_up'):
+            self.camera.warm_up()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _UnixServer(self.socket_path, _CaptureRequestHandler)
+        self._server.service = self
+        thread = threading.Thread(target=self._server.serve_forever, name='capture-service',
+                                  daemon=True)
+        thread.start()
+
+    def stop(self):
+        """Oprește serverul și închide camera."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+        self.camera.close()
+
+
+class CaptureClient:
+    """
+    Client pentru CaptureService (o conexiune persistentă, refăcută la nevoie).
+
+    Atribute:
+        socket_path (str): Calea socket-ului Unix
+        timeout (float): Timpul maxim de așteptare pentru o captură (secunde)
+    """
+
+    def __init__(self, socket_path=CAMERA_SOCKET, timeout=CAMERA_TIMEOUT):
+        """
+        Parametri:
+            socket_path (str): Calea socket-ului Unix
+            timeout (float): Timpul maxim de așteptare pentru o captură
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def _call(self, line):
+        """Trimite o cerere și returnează linia de răspuns (o reîncercare la reconectare)."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(f"{line}\n".encode('utf-8'))
+                    reply = self._reader.readline()
+                    if not reply:
+                        raise ConnectionError('capture service closed the connection')
+                    return reply.decode('utf-8', 'replace').strip()
+                except OSError as e:
+                    self._disconnect()
+                    if attempt or isinstance(e, socket.timeout):
+                        raise CameraError(f'capture service unavailable: {e}') from e
+
+    def ping(self):
+        """
+        Verifică dacă serviciul răspunde.
+
+        Returnează:
+            str: Numele backend-ului serviciului
+            None: Dacă serviciul nu răspunde
+        """
+        try:
+            reply = self._call('ping')
+        except CameraError:
+            return None
+        return reply.split(' ', 1)[1] if reply.startswith('pong ') else None
+
+    def capture(self, path):
+        """
+        Cere serviciului o captură.
+
+        Parametri:
+            path (str): Calea fișierului JPEG de scris
+
+        Returnează:
+            float: Durata capturii în serviciu (milisecunde)
+
+        Ridică:
+            CameraError: Dacă serviciul nu răspunde sau captura a eșuat
+        """
+        reply = self._call(f"capture {path}")
+        status, _, detail = reply.partition(' ')
+        if status != 'ok':
+            raise CameraError(detail or reply)
+        return float(detail or 0)
+
+    def close(self):
+        """Închide conexiunea."""
+        with self._lock:
+            self._disconnect()
+
+
+def ensure_capture_service(socket_path=CAMERA_SOCKET, backend=CAMERA_BACKEND):
+    """
+    Returnează un client pentru serviciul de captură, pornindu-l dacă este nevoie.
+
+    Dacă un serviciu (ex: pornit separat cu `python camera.py`) răspunde
+    deja pe socket, este folosit; altfel se pornește un serviciu în
+    procesul curent.
+
+    Parametri:
+        socket_path (str): Calea socket-ului Unix
+        backend (str): Camera folosită dacă serviciul trebuie pornit
+
+    Returnează:
+        tuple: (CaptureClient, CaptureService sau None dacă serviciul rula deja)
+        tuple: (None, None) dacă nu rulează niciun serviciu și nu există o
+               cameră (create_camera('auto') fără cameră reală)
+    """
+    client = CaptureClient(socket_path)
+    if client.ping() is not None:
+        return client, None
+
+    camera = create_camera(backend)
+    if camera is None:
+        client.close()
+        return None, None
+    service = CaptureService(camera, socket_path)
+    service.start()
+    return client, service
+
+
+def main():
+    """Rulează serviciul de captură ca proces separat (până la Ctrl+C)."""
+    backend = sys.argv[1] if len(sys.argv) > 1 else CAMERA_BACKEND
+    camera = create_camera(backend)
+    if camera is None:
+        print(f"No camera available for backend '{backend}' on {sys.platform}")
+        sys.exit(1)
+    service = CaptureService(camera)
+    service.start()
+    print(f"Capture service ({service.camera.name}) listening on {service.socket_path}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        print(f"Capture service stopped ({service.captures} captures, {service.failures} failures)")
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,23 @@ SERVER_PORT = 5000
 # URL-ul complet al serverului (generat automat)
 SERVER_URL = f"http://{SERVER_HOST}:{SERVER_PORT}"
 
+# Clientul HTTP al monitorului (vezi ServerClient în monitor.py):
+# conexiuni keep-alive reutilizate, timeout-uri, reîncercări și circuit breaker
+SERVER_POOL_SIZE = 8             # conexiuni păstrate deschise
+SERVER_CONNECT_TIMEOUT = 2.0     # secunde
+SERVER_READ_TIMEOUT = 5.0        # secunde
+SERVER_RETRIES = 2               # reîncercări pentru erorile tranzitorii
+SERVER_RETRY_BACKOFF = 0.2       # pauza de bază (secunde), dublată la fiecare reîncercare
+SERVER_BREAKER_THRESHOLD = 5     # eșecuri consecutive care deschid circuitul
+SERVER_BREAKER_COOLDOWN = 10.0   # secunde în care cererile eșuează imediat
+
+# Spool-ul local al încercărilor (vezi spool.py): fiecare încercare este
+# scrisă aici înainte de trimitere și retrimisă în loturi după o întrerupere
+SPOOL_PATH = os.path.join(BASE_DIR, ".attempt_spool.db")
+SPOOL_BATCH_SIZE = 100           # încercări per lot retrimis
+SPOOL_REPLAY_INTERVAL = 5.0      # secunde între încercările de retrimitere
+SPOOL_RETENTION = 7 * 24 * 3600  # cât timp se păstrează încercările trimise (secunde)
+
 # ============================================================================
 # SETĂRI TIMEOUT
 # ============================================================================
@@ -37,6 +54,14 @@ SERVER_URL = f"http://{SERVER_HOST}:{SERVER_PORT}"
 # Dacă nu se primește nicio decizie în acest timp, accesul este refuzat automat
 APPROVAL_TIMEOUT = 30  # Respingere automată după 30 de secunde fără răspuns
 
+# Cererile de aprobare rulează ca mașini de stări pe un fond de fire:
+# mai multe foldere protejate pot aștepta decizia în același timp
+# (fiecare cerere folosește până la 3 fire: server, cameră, interfață)
+APPROVAL_WORKERS = 8
+
+# Intervalul (în secunde) dintre interogările serverului pentru decizie
+DECISION_POLL_INTERVAL = 1.0
+
 # ============================================================================
 # SETĂRI NGROK (ACCES DE LA DISTANȚĂ)
 # ============================================================================
@@ -55,10 +80,92 @@ USE_NGROK = True
 #    (se folosește exact această cale)
 PROTECTED_FOLDER = "Confidential"
 
+# Lista tuturor folderelor protejate (implicit doar PROTECTED_FOLDER)
+# Fiecare element poate fi un nume/o cale (ca mai sus) sau un dicționar
+# cu politica proprie a folderului:
+#   {"path": "~/Clienti/Acme", "cooldown": 10, "approval_cache": 600}
+# Exemplu: PROTECTED_FOLDERS = ["Confidential", "~/Clienti/Acme", "~/Clienti/Beta"]
+PROTECTED_FOLDERS = [PROTECTED_FOLDER]
+
 # Directorul rădăcină unde se caută folderul protejat
 # (folosit doar dacă PROTECTED_FOLDER este un nume, nu o cale completă)
 SEARCH_ROOT = os.path.expanduser("~")
 
+# Adâncimea maximă a căutării (numărul de niveluri sub SEARCH_ROOT)
+SEARCH_MAX_DEPTH = 12
+
+# Directoarele care nu se parcurg la căutare (glob-uri aplicate numelui)
+# ".*" = directoarele ascunse
+SEARCH_EXCLUDE = [".*", "Library", "node_modules", "__pycache__"]
+
+# Numărul de fire de execuție folosite la căutare
+SEARCH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Fișierul în care se păstrează locațiile găsite (repornirile nu mai caută)
+FOLDER_CACHE_PATH = os.path.join(BASE_DIR, ".folder_cache.json")
+
+# Sursa folosită pentru a lista ferestrele deschise (vezi window_sources.py)
+# "auto" = proces osascript persistent pe macOS, /proc pe Linux
+# "persistent" / "osascript" / "proc" / "fake" = alegere explicită
+WINDOW_SOURCE = "auto"
+
+# Intervalul de verificare a ferestrelor este adaptiv (vezi AdaptivePollScheduler):
+# - imediat după activitate în folderul protejat se verifică la POLL_MIN_INTERVAL
+# - cât timp nu se întâmplă nimic, intervalul crește de POLL_BACKOFF_FACTOR ori,
+#   până la POLL_MAX_INTERVAL
+# - în timpul așteptării unei decizii sau al unei aprobări valide nu se verifică deloc
+POLL_MIN_INTERVAL = 0.25   # secunde
+POLL_MAX_INTERVAL = 4.0    # secunde
+POLL_BACKOFF_FACTOR = 1.5
+
+# Acțiunile fluxului de aprobare asupra sistemului (vezi os_actions.py):
+# închiderea ferestrei, popup-ul, notificările, redeschiderea folderului,
+# blocarea ecranului
+# "auto" = AppleScript pe macOS, nicio acțiune pe celelalte sisteme
+# "macos" / "none" / "recording" = alegere explicită
+OS_ACTIONS = "auto"
+
+# ============================================================================
+# SETĂRI CAMERĂ
+# ============================================================================
+# Backend-ul camerei (vezi camera.py):
+# "auto" = proces Swift persistent pe macOS (sesiune de captură mereu pornită),
+#          nicio cameră pe celelalte sisteme (încercările fără fotografie)
+# "warm" / "subprocess" / "file" / "synthetic" = alegere explicită
+CAMERA_BACKEND = "auto"
+
+# Socket-ul Unix al serviciului de captură
+CAMERA_SOCKET = os.path.join(BASE_DIR, ".camera.sock")
+
+# Directorul cu imagini JPEG folosit de backend-ul "file"
+CAMERA_FRAMES_DIR = None
+
+# Timpul maxim (în secunde) pentru o captură
+CAMERA_TIMEOUT = 10
+
+# Modul rafală: se capturează BURST_FRAMES cadre, la BURST_INTERVAL secunde
+# unul de altul, și se păstrează cel mai clar și mai bine expus (vezi
+# frame_quality.py; necesită numpy și Pillow). 1 = un singur cadru
+BURST_FRAMES = 3
+BURST_INTERVAL = 0.05  # secunde
+
+# ============================================================================
+# SETĂRI RECUNOAȘTERE FACIALĂ
+# ============================================================================
+# Persoanele înrolate în galerie (vezi face_gallery.py) sunt aprobate automat,
+# fără a aștepta administratorul; decizia este trimisă serverului pentru audit.
+# Embedder-ul: "auto" = biblioteca face_recognition dacă este instalată
+# (altfel aprobarea rămâne doar manuală), "thumbnail" = doar pentru teste,
+# "none" = dezactivat
+FACE_EMBEDDER = "auto"
+
+# Fișierul galeriei (vectorii persoanelor înrolate)
+FACE_GALLERY_PATH = os.path.join(BASE_DIR, "face_gallery.npz")
+
+# Similaritatea cosinus minimă (0-1) pentru aprobarea automată - o valoare
+# mai mare reduce riscul de a aproba o persoană asemănătoare
+FACE_MATCH_THRESHOLD = 0.94
+
 # ============================================================================
 # SETĂRI ALERTĂ
 # ============================================================================
@@ -66,6 +173,84 @@ SEARCH_ROOT = os.path.expanduser("~")
 # Previne notificări multiple pentru același acces
 ACCESS_COOLDOWN = 5
 
+# Timpul (în secunde) cât rămâne validă o aprobare - în acest interval
+# folderul poate fi accesat din nou fără o nouă cerere de aprobare
+APPROVAL_CACHE_DURATION = 300  # 5 minute
+
+# Ce acoperă o aprobare (vezi approval_cache.py):
+# "root"   = tot folderul protejat
+# "folder" = doar folderul accesat (pentru un fișier, folderul care îl conține)
+#            și subfolderele lui
+APPROVAL_SCOPE = "root"
+
+# Numărul maxim de aprobări păstrate în cache (se elimină cea folosită cel mai demult)
+APPROVAL_CACHE_SIZE = 1024
+
+# Revocările din dashboard ajung la monitor printr-o cerere long-poll care
+# rămâne deschisă pe server cel mult REVOCATION_WAIT secunde
+REVOCATION_WAIT = 20
+
+# Sursa evenimentelor de fișiere (vezi linux_access.py):
+# "auto"     = pe Linux, direct din kernel - fanotify dacă procesul are
+#              dreptul CAP_SYS_ADMIN, altfel inotify (detectează și citirile);
+#              pe macOS, watchdog
+# "fanotify" / "inotify" / "watchdog" = alegere explicită
+ACCESS_BACKEND = "auto"
+
+# Urmărirea directoarelor pe Linux (vezi WatchManager în linux_access.py):
+# "auto"  = "lazy" cu fanotify (deschiderile și citirile vin deja de pe tot
+#           sistemul de fișiere montat), altfel "eager"
+# "eager" = toate directoarele sunt urmărite la pornire (în limita bugetului)
+# "lazy"  = la pornire doar folderele protejate; celelalte directoare sunt
+#           urmărite când apare activitate în ele
+WATCH_MODE = "auto"
+
+# Numărul maxim de urmăriri inotify folosite de monitor
+# None = jumătate din limita sistemului (fs.inotify.max_user_watches)
+WATCH_BUDGET = None
+
+# Evenimentele de fișiere trec printr-un pipeline (vezi event_pipeline.py):
+# - numele care se potrivesc EVENT_IGNORE sunt eliminate imediat
+# - evenimentele pentru aceeași cale se contopesc; o cale este procesată după
+#   EVENT_DEBOUNCE secunde de liniște (cel târziu după EVENT_MAX_DELAY)
+# - coada păstrează cel mult EVENT_QUEUE_SIZE căi; surplusul este aruncat
+EVENT_IGNORE = [".*", "Thumbs.db", "desktop.ini"]
+EVENT_DEBOUNCE = 0.3       # secunde
+EVENT_MAX_DELAY = 2.0      # secunde
+EVENT_QUEUE_SIZE = 10000
+
+# ============================================================================
+# SETĂRI JURNAL ȘI METRICI
+# ============================================================================
+# Nivelul mesajelor afișate de monitor: "DEBUG" (toate detaliile, inclusiv
+# fiecare verificare a ferestrelor), "INFO", "WARNING" sau "ERROR".
+# Mesajele sunt scrise în consolă de un fir separat, deci buclele de
+# monitorizare nu așteaptă după consolă.
+LOG_LEVEL = "INFO"
+
+# Metricile monitorului (vezi metrics.py) sunt expuse local la
+# http://METRICS_HOST:METRICS_PORT/metrics (Prometheus) și /metrics.json
+# None = dezactivat
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+
+# Fișierul de urmă (vezi event_trace.py): evenimentele de fișiere, verificările
+# ferestrelor și răspunsurile serverului, pentru reluare cu trace_replay.py
+# Exemplu: TRACE_PATH = os.path.join(BASE_DIR, "monitor_trace.jsonl.gz")
+# None = dezactivat
+TRACE_PATH = None
+
+# ============================================================================
+# SETĂRI SUPERVIZOR (MAI MULTE PROCESE)
+# ============================================================================
+# supervisor.py împarte folderele protejate între mai multe procese de lucru
+# (aprobările și cooldown-urile sunt comune - vezi shared_state.py)
+# None = câte un proces per nucleu (dar nu mai multe decât grupurile de foldere)
+SUPERVISOR_WORKERS = None
+
+# Un proces căzut este repornit după 1, 2, 4 ... secunde, cel mult atât
+SUPERVISOR_RESTART_BACKOFF = 30
+
 # ============================================================================
 # CĂILE FIȘIERELOR
 # ============================================================================
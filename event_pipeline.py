@@ -0,0 +1,337 @@
+"""
+Pipeline pentru Evenimentele de Sistem de Fișiere - Filtrare, coalescență, debounce
+
+Descriere:
+    Watchdog apelează handler-ul pe firul observatorului, câte o dată pentru
+    fiecare eveniment. O copiere în masă în folderul protejat produce mii de
+    evenimente; dacă fiecare este procesat (și afișat) pe loc, observatorul
+    rămâne în urmă, iar fluxul de aprobare îl poate bloca de tot.
+
+    Pipeline-ul separă primirea evenimentelor de procesarea lor:
+    1. Filtrare: numele ignorate (fișiere ascunse, de sistem) sunt eliminate
+       printr-o singură expresie regulată precompilată
+    2. Coadă mărginită cu coalescență: evenimentele pentru aceeași cale se
+       contopesc într-o singură intrare (cu un contor); când coada este plină,
+       evenimentele noi sunt aruncate și numărate - primirea nu blochează niciodată
+    3. Debounce: o intrare este livrată după ce calea a fost liniștită
+       EVENT_DEBOUNCE secunde (sau cel târziu după EVENT_MAX_DELAY)
+    4. Consumator: un fir separat livrează câte un AccessEvent per rafală
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import fnmatch
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from config import EVENT_IGNORE, EVENT_QUEUE_SIZE, EVENT_DEBOUNCE, EVENT_MAX_DELAY
+
+log = logging.getLogger(__name__)
+
+
+# Un acces logic: ultima stare a unei rafale de evenimente pentru o cale
+AccessEvent = namedtuple('AccessEvent', [
+    'src_path',       # Calea accesată
+    'event_type',     # Tipul ultimului eveniment din rafală ('created', 'modified', ...)
+    'is_directory',   # True dacă evenimentul privește un director
+    'count',          # Numărul de evenimente contopite
+    'first_seen',     # Momentul primului eveniment (time.monotonic)
+])
+
+
+class IgnoreMatcher:
+    """
+    Filtru precompilat pentru numele de fișiere ignorate.
+
+    Toate glob-urile sunt combinate într-o singură expresie regulată,
+    aplicată doar numelui (basename) căii - o singură potrivire per eveniment.
+    """
+
+    def __init__(self, patterns=EVENT_IGNORE):
+        """
+        Parametri:
+            patterns (list): Glob-uri pentru numele ignorate (ex: ['.*', 'Thumbs.db'])
+        """
+        self.patterns = list(patterns)
+        self._regex = (re.compile('|'.join(fnmatch.translate(p) for p in self.patterns))
+                       if self.patterns else None)
+
+    def __call__(self, path):
+        """
+        Verifică dacă o cale trebuie ignorată.
+
+        Parametri:
+            path (str): Calea evenimentului
+
+        Returnează:
+            bool: True dacă numele căii se potrivește unui glob ignorat
+        """
+        if self._regex is None or not path:
+            return False
+        return self._regex.match(os.path.basename(path)) is not None
+
+
+class _Pending:
+    """O intrare din coadă: evenimentele încă nelivrate pentru o cale."""
+
+    __slots__ = ('event_type', 'is_directory', 'count', 'first_seen', 'deadline')
+
+    def __init__(self, event_type, is_directory, now, deadline):
+        self.event_type = event_type
+        self.is_directory = is_directory
+        self.count = 1
+        self.first_seen = now
+        self.deadline = deadline
+
+
+class CoalescingQueue:
+    """
+    Coadă mărginită, cu coalescență per cale și fereastră de debounce.
+
+    Intrările sunt păstrate într-un OrderedDict indexat după cale. Un
+    eveniment nou pentru o cale existentă actualizează intrarea și o mută
+    la final (termenul ei de livrare se amână). Astfel, intrarea din capul
+    cozii este cea liniștită de cel mai mult timp. Termenul unei intrări
+    nu depășește first_seen + max_delay, deci o cale modificată continuu
+    este totuși livrată periodic.
+
+    Atribute:
+        maxsize (int): Numărul maxim de căi distincte în coadă
+        debounce (float): Secunde de liniște după care o cale este livrată
+        max_delay (float): Întârzierea maximă față de primul eveniment
+    """
+
+    def __init__(self, maxsize=EVENT_QUEUE_SIZE, debounce=EVENT_DEBOUNCE,
+                 max_delay=EVENT_MAX_DELAY, clock=time.monotonic):
+        """
+        Parametri:
+            maxsize (int): Numărul maxim de căi distincte în coadă
+            debounce (float): Fereastra de debounce (secunde)
+            max_delay (float): Întârzierea maximă a unei livrări (secunde)
+            clock (callable): Sursa de timp (monotonă)
+        """
+        self.maxsize = maxsize
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.coalesced = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def __len__(self):
+        with self._cond:
+            return len(self._entries)
+
+    def put(self, path, event_type, is_directory=False):
+        """
+        Adaugă un eveniment în coadă (fără a bloca).
+
+        Parametri:
+            path (str): Calea evenimentului
+            event_type (str): Tipul evenimentului
+            is_directory (bool): True dacă evenimentul privește un director
+
+        Returnează:
+            bool: False dacă evenimentul a fost aruncat (coadă plină)
+        """
+        now = self._clock()
+        with self._cond:
+            entry = self._entries.get(path)
+            if entry is not None:
+                entry.event_type = event_type
+                entry.is_directory = entry.is_directory or is_directory
+                entry.count += 1
+                entry.deadline = min(now + self.debounce, entry.first_seen + self.max_delay)
+                self._entries.move_to_end(path)
+                self.coalesced += 1
+                return True
+
+            if len(self._entries) >= self.maxsize:
+                self.dropped += 1
+                return False
+
+            self._entries[path] = _Pending(event_type, is_directory, now, now + self.debounce)
+            if len(self._entries) > self.high_water:
+                self.high_water = len(self._entries)
+            if len(self._entries) == 1:
+                self._cond.notify()
+            return True
+
+    def get(self):
+        """
+        Așteaptă și extrage următoarea intrare liniștită.
+
+        Returnează:
+            AccessEvent: Rafala contopită pentru o cale
+            None: Dacă coada a fost închisă
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                if not self._entries:
+                    self._cond.wait()
+                    continue
+                access, delay = self._pop_head()
+                if access is None:
+                    self._cond.wait(delay)
+                    continue
+                return access
+
+    def _pop_head(self):
+        """Extrage capul cozii dacă este liniștit; altfel (None, secunde rămase)."""
+        path, entry = next(iter(self._entries.items()))
+        delay = entry.deadline - self._clock()
+        if delay > 0:
+            return None, delay
+        del self._entries[path]
+        return AccessEvent(path, entry.event_type, entry.is_directory,
+                           entry.count, entry.first_seen), 0
+
+    def next_deadline(self):
+        """
+        Returnează termenul de livrare al capului cozii (fără a aștepta).
+
+        Returnează:
+            float: Momentul (după clock) - None dacă coada este goală
+        """
+        with self._cond:
+            if not self._entries:
+                return None
+            return next(iter(self._entries.values())).deadline
+
+    def pop_due(self):
+        """
+        Extrage capul cozii dacă termenul lui a trecut (fără a aștepta).
+
+        Returnează:
+            AccessEvent: Rafala contopită - None dacă nu există una liniștită
+        """
+        with self._cond:
+            if not self._entries:
+                return None
+            return self._pop_head()[0]
+
+    def close(self):
+        """Închide coada și trezește consumatorul."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class EventPipeline:
+    """
+    Pipeline-ul complet: filtrare -> coadă cu coalescență -> consumator.
+
+    submit() este apelată pe firul observatorului watchdog și face doar
+    filtrarea și o inserare în coadă. Firul consumator apelează callback-ul
+    pentru fiecare acces logic; callback-ul nu trebuie să blocheze mult timp
+    (fluxul de aprobare rulează separat).
+
+    Atribute:
+        callback (callable): Funcția apelată cu fiecare AccessEvent
+        ignore (IgnoreMatcher): Filtrul de nume ignorate
+        queue (CoalescingQueue): Coada de evenimente
+    """
+
+    def __init__(self, callback, ignore=None, queue=None):
+        """
+        Parametri:
+            callback (callable): Funcția apelată cu fiecare AccessEvent
+            ignore (IgnoreMatcher, optional): Filtrul (implicit din config)
+            queue (CoalescingQueue, optional): Coada (implicit din config)
+        """
+        self.callback = callback
+        self.ignore = ignore if ignore is not None else IgnoreMatcher()
+        self.queue = queue if queue is not None else CoalescingQueue()
+        self.thread = None
+
+        self.received = 0
+        self.ignored = 0
+        self.emitted = 0
+        self.errors = 0
+
+    def submit(self, event):
+        """
+        Primește un eveniment watchdog (apelată pe firul observatorului).
+
+        Parametri:
+            event: Evenimentul watchdog (src_path, event_type, is_directory)
+        """
+        self.received += 1
+        path = event.src_path
+        if self.ignore(path):
+            self.ignored += 1
+            return
+        self.queue.put(path, event.event_type, event.is_directory)
+
+    def start(self):
+        """Pornește firul consumator."""
+        self.thread = threading.Thread(target=self._consume, name='event-pipeline', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2.0):
+        """Oprește firul consumator (evenimentele rămase în coadă se pierd)."""
+        self.queue.close()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def drain_due(self):
+        """
+        Livrează pe firul apelantului accesele liniștite (fără firul consumator).
+
+        Folosită de reluările cu ceas virtual (vezi trace_replay.py).
+
+        Returnează:
+            int: Numărul de accese livrate
+        """
+        delivered = 0
+        while True:
+            access = self.queue.pop_due()
+            if access is None:
+                return delivered
+            self._deliver(access)
+            delivered += 1
+
+    def _consume(self):
+        while True:
+            access = self.queue.get()
+            if access is None:
+                return
+            self._deliver(access)
+
+    def _deliver(self, access):
+        self.emitted += 1
+        try:
+            self.callback(access)
+        except Exception as e:
+            self.errors += 1
+            log.debug("Event pipeline callback FAILED for %s: %s", access.src_path, e)
+
+    def stats(self):
+        """
+        Returnează statisticile pipeline-ului.
+
+        Returnează:
+            dict: received, ignored, coalesced, dropped, emitted, errors,
+                  queued (intrări curente), high_water (maximul atins)
+        """
+        return {
+            'received': self.received,
+            'ignored': self.ignored,
+            'coalesced': self.queue.coalesced,
+            'dropped': self.queue.dropped,
+            'emitted': self.emitted,
+            'errors': self.errors,
+            'queued': len(self.queue),
+            'high_water': self.queue.high_water,
+        }
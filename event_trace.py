@@ -0,0 +1,286 @@
+"""
+Înregistrarea Intrărilor Monitorului - Fișiere de urmă (trace) pentru reluare
+
+Descriere:
+    Comportamentul din should_trigger, cooldown-urile și FinderWindowMonitor
+    nu pot fi verificate fără un Mac, o cameră și cineva care deschide
+    foldere în Finder. Când config.TRACE_PATH este setat, monitorul scrie
+    într-un fișier de urmă tot ce intră în deciziile lui:
+    - evenimentele de fișiere (watchdog / inotify / fanotify)
+    - rezultatul fiecărei verificări a ferestrelor Finder
+    - răspunsurile serverului (înregistrarea încercării, decizia)
+    - rezultatul fiecărui flux de aprobare (pentru comparație la reluare)
+
+    Fișierul poate fi apoi reluat, oriunde și mult mai repede decât în
+    timp real, cu trace_replay.py.
+
+    Formatul: JSON lines comprimat gzip. Prima linie este antetul (folderele
+    protejate, configurarea relevantă); momentele sunt milisecunde de la
+    pornire; fiecare cale apare o singură dată (record "p") și este apoi
+    referită prin index. Scrierea pe disc se face pe un fir separat, deci
+    înregistrarea costă doar o adăugare într-o listă.
+
+Utilizare:
+    python event_trace.py urma.jsonl.gz     # rezumatul unui fișier de urmă
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import gzip
+import json
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import config
+
+TRACE_VERSION = 1
+
+# Configurarea care influențează deciziile - păstrată în antet
+TRACE_CONFIG = (
+    'ACCESS_COOLDOWN', 'APPROVAL_CACHE_DURATION', 'APPROVAL_SCOPE', 'APPROVAL_TIMEOUT',
+    'DECISION_POLL_INTERVAL', 'EVENT_DEBOUNCE', 'EVENT_MAX_DELAY', 'EVENT_IGNORE',
+)
+
+# Răspunsurile serverului care nu sunt înregistrate (long-poll fără legătură cu deciziile)
+_SKIPPED_ENDPOINTS = ('/api/revocations',)
+
+# Câmpurile păstrate din răspunsurile serverului
+_RESPONSE_FIELDS = ('id', 'status')
+
+# Un eveniment de fișier reluat (aceleași câmpuri ca evenimentele watchdog)
+TraceEvent = namedtuple('TraceEvent', ['src_path', 'event_type', 'is_directory'])
+
+
+class TraceRecorder:
+    """
+    Scrie intrările monitorului într-un fișier de urmă.
+
+    Metodele de înregistrare sunt apelate din firele monitorului și doar
+    adaugă o înregistrare în memorie; firul de scriere le comprimă pe disc
+    la fiecare flush_interval secunde.
+
+    Atribute:
+        path (str): Fișierul de urmă
+        records (int): Numărul de înregistrări scrise
+    """
+
+    def __init__(self, path, roots=(), flush_interval=1.0):
+        """
+        Parametri:
+            path (str): Fișierul de urmă (suprascris)
+            roots (list): Folderele protejate (ProtectedRoot)
+            flush_interval (float): Intervalul scrierilor pe disc (secunde)
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._started = time.monotonic()
+        self._paths = {}
+        self._last_windows = None
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        self._append({
+            'k': 'h',
+            'v': TRACE_VERSION,
+            'start': time.time(),
+            'roots': [[root.path, root.cooldown, root.approval_cache_duration] for root in roots],
+            'config': {name: getattr(config, name) for name in TRACE_CONFIG},
+        })
+        self._thread = threading.Thread(target=self._run, name='trace-writer', daemon=True)
+        self._thread.start()
+
+    def _now(self):
+        return int((time.monotonic() - self._started) * 1000)
+
+    def _append(self, record):
+        with self._lock:
+            self._buffer.append(record)
+
+    def _path(self, path):
+        """Indexul unei căi (apelantul ține lock-ul); prima apariție o scrie."""
+        index = self._paths.get(path)
+        if index is None:
+            index = self._paths[path] = len(self._paths)
+            self._buffer.append({'k': 'p', 'i': index, 'p': path})
+        return index
+
+    def event(self, event):
+        """Înregistrează un eveniment de fișier (src_path, event_type, is_directory)."""
+        t = self._now()
+        with self._lock:
+            record = {'t': t, 'k': 'e', 'p': self._path(event.src_path), 'e': event.event_type}
+            if event.is_directory:
+                record['d'] = 1
+            self._buffer.append(record)
+
+    def windows(self, paths):
+        """
+        Înregistrează rezultatul unei verificări a ferestrelor.
+
+        Parametri:
+            paths (list): Căile ferestrelor deschise (None = sursa a eșuat)
+        """
+        t = self._now()
+        with self._lock:
+            if paths is None:
+                record = {'t': t, 'k': 'w', 'x': 1}
+            elif paths == self._last_windows:
+                record = {'t': t, 'k': 'w'}  # Aceleași ferestre ca la verificarea anterioară
+            else:
+                record = {'t': t, 'k': 'w', 'p': [self._path(path) for path in paths]}
+            self._last_windows = None if paths is None else list(paths)
+            self._buffer.append(record)
+
+    def server(self, method, path, data=None, error=None):
+        """
+        Înregistrează răspunsul serverului la o cerere.
+
+        Parametri:
+            method (str): 'GET' sau 'POST'
+            path (str): Calea cererii (ex: '/api/attempt/5')
+            data (dict, optional): Răspunsul (se păstrează doar id și status)
+            error (Exception, optional): Eroarea, dacă serverul nu a răspuns
+        """
+        if path.startswith(_SKIPPED_ENDPOINTS):
+            return
+        record = {'t': self._now(), 'k': 's', 'm': method, 'u': path}
+        if error is not None:
+            record['x'] = str(error)
+        else:
+            record['b'] = {key: data[key] for key in _RESPONSE_FIELDS
+                           if isinstance(data, dict) and key in data}
+        self._append(record)
+
+    def flow(self, request):
+        """Înregistrează rezultatul unui flux de aprobare (ApprovalRequest încheiat)."""
+        t = self._now()
+        with self._lock:
+            self._buffer.append({
+                't': t, 'k': 'f', 'p': self._path(request.root.path), 'q': self._path(request.path),
+                'a': request.access_type, 'd': request.decision,
+            })
+
+    def flush(self):
+        """Scrie pe disc înregistrările din memorie."""
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+        if buffer:
+            self._file.write(''.join(json.dumps(record, separators=(',', ':')) + '\n'
+                                     for record in buffer))
+            self.records += len(buffer)
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Oprește firul de scriere, scrie restul înregistrărilor și închide fișierul."""
+        self._stop_event.set()
+        self._thread.join()
+        self.flush()
+        self._file.close()
+
+
+def load_trace(path):
+    """
+    Citește un fișier de urmă.
+
+    Căile sunt rezolvate (câmpul "path" / "paths" în loc de indexuri), iar
+    momentele sunt convertite în secunde (câmpul "t").
+
+    Parametri:
+        path (str): Fișierul de urmă
+
+    Returnează:
+        tuple: (antet - dict, înregistrări - list de dict, în ordine)
+
+    Ridică:
+        ValueError: Dacă fișierul nu este un fișier de urmă cunoscut
+    """
+    paths = {}
+    header = None
+    records = []
+    windows = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            kind = record['k']
+            if kind == 'h':
+                if record.get('v') != TRACE_VERSION:
+                    raise ValueError(f"Versiune de urmă necunoscută: {record.get('v')}")
+                header = record
+                continue
+            if kind == 'p':
+                paths[record['i']] = record['p']
+                continue
+            record['t'] = record['t'] / 1000.0
+            if kind in ('e', 'f'):
+                record['path'] = paths[record['p']]
+            if kind == 'f':
+                record['request_path'] = paths[record['q']]
+            if kind == 'w' and 'x' not in record:
+                if 'p' in record:
+                    windows = [paths[index] for index in record['p']]
+                record['paths'] = windows
+            records.append(record)
+    if header is None:
+        raise ValueError(f"{path} nu are antet - nu este un fișier de urmă")
+    return header, records
+
+
+def summarize(records):
+    """
+    Numără înregistrările unui fișier de urmă.
+
+    Parametri:
+        records (list): Înregistrările (din load_trace)
+
+    Returnează:
+        dict: events, polls, poll_errors, server, server_errors, flows,
+              decisions (decizie -> număr), duration (secunde)
+    """
+    summary = {'events': 0, 'polls': 0, 'poll_errors': 0, 'server': 0, 'server_errors': 0,
+               'flows': 0, 'decisions': {}, 'duration': records[-1]['t'] if records else 0.0}
+    for record in records:
+        kind = record['k']
+        if kind == 'e':
+            summary['events'] += 1
+        elif kind == 'w':
+            summary['polls'] += 1
+            summary['poll_errors'] += 'x' in record
+        elif kind == 's':
+            summary['server'] += 1
+            summary['server_errors'] += 'x' in record
+        elif kind == 'f':
+            summary['flows'] += 1
+            decision = record.get('d') or 'none'
+            summary['decisions'][decision] = summary['decisions'].get(decision, 0) + 1
+    return summary
+
+
+def main():
+    """Afișează rezumatul unui fișier de urmă."""
+    if len(sys.argv) != 2:
+        print("Utilizare: python event_trace.py <fișier de urmă>")
+        sys.exit(1)
+    header, records = load_trace(sys.argv[1])
+    summary = summarize(records)
+    started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(header['start']))
+    print(f"Trace {sys.argv[1]}: recorded {started}, {summary['duration']:.1f}s")
+    for path, cooldown, approval_cache in header['roots']:
+        print(f"  root {path} (cooldown {cooldown}s, approval valid {approval_cache}s)")
+    print(f"  {summary['events']} file events, {summary['polls']} window polls "
+          f"({summary['poll_errors']} failed), {summary['server']} server responses "
+          f"({summary['server_errors']} failed)")
+    print(f"  {summary['flows']} approval flows: " + ', '.join(
+        f"{count} {decision}" for decision, count in sorted(summary['decisions'].items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,395 @@
+"""
+Galeria de Fețe Cunoscute - Aprobare automată pentru utilizatorii înrolați
+
+Descriere:
+    Monitorul capturează o fotografie la fiecare acces, dar până acum nu o
+    analiza: chiar și proprietarul folderului aștepta decizia unui om.
+    Acest modul:
+    - calculează un vector de trăsături (embedding) pentru fețele din
+      fotografie, pe CPU
+    - păstrează identitățile aprobate într-o galerie: o matrice float32
+      contiguă (un rând normalizat per fotografie înrolată) și numele
+      asociate, salvate într-un fișier .npz
+    - compară toate fețele detectate cu toată galeria printr-un singur
+      produs matricial NumPy (similaritate cosinus)
+
+    Embedder-e:
+    - FaceRecognitionEmbedder: biblioteca opțională face_recognition
+      (dlib, detector HOG, vectori de 128 de valori)
+    - ThumbnailEmbedder: imaginea micșorată și normalizată - NU recunoaște
+      fețe, este folosit doar pentru teste și reluări
+
+    Înrolarea se face din linia de comandă:
+
+        python face_gallery.py enroll "Ana" poza1.jpg poza2.jpg
+        python face_gallery.py list
+        python face_gallery.py remove "Ana"
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import face_recognition
+except ImportError:
+    face_recognition = None
+
+from config import FACE_EMBEDDER, FACE_GALLERY_PATH, FACE_MATCH_THRESHOLD
+
+log = logging.getLogger(__name__)
+
+
+# Rezultatul unei potriviri
+FaceMatch = namedtuple('FaceMatch', [
+    'name',         # Identitatea din galerie
+    'similarity',   # Similaritatea cosinus (0-1)
+    'faces',        # Numărul de fețe detectate în fotografie
+])
+
+
+class Embedder:
+    """
+    Interfața comună pentru calculul vectorilor de trăsături.
+
+    Atribute:
+        name (str): Numele embedder-ului (salvat în galerie)
+        dimension (int): Lungimea vectorilor
+    """
+
+    name = 'base'
+    dimension = 0
+
+    def embed(self, path):
+        """
+        Calculează vectorii fețelor dintr-o fotografie.
+
+        Parametri:
+            path (str): Calea fotografiei (JPEG)
+
+        Returnează:
+            numpy.ndarray: Matrice (fețe, dimension) float32 - 0 rânduri
+                dacă nu a fost detectată nicio față
+        """
+        raise NotImplementedError
+
+
+class FaceRecognitionEmbedder(Embedder):
+    """
+    Embedder bazat pe biblioteca face_recognition (dlib), doar pe CPU.
+
+    Fotografia este micșorată înainte de detectare (detectorul HOG este
+    cel mai costisitor pas); fețele sunt apoi codificate la rezoluția
+    micșorată.
+    """
+
+    name = 'face_recognition'
+    dimension = 128
+
+    def __init__(self, max_side=480):
+        """
+        Parametri:
+            max_side (int): Latura maximă a imaginii folosite la detectare
+        """
+        if face_recognition is None:
+            raise RuntimeError('face_recognition nu este instalat')
+        self.max_side = max_side
+
+    def _load(self, path):
+        from PIL import Image
+        with Image.open(path) as image:
+            image.draft('RGB', (self.max_side, self.max_side))
+            image = image.convert('RGB')
+            image.thumbnail((self.max_side, self.max_side))
+            return np.asarray(image)
+
+    def embed(self, path):
+        image = self._load(path)
+        locations = face_recognition.face_locations(image, model='hog')
+        if not locations:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        encodings = face_recognition.face_encodings(image, known_face_locations=locations)
+        return np.asarray(encodings, dtype=np.float32)
+
+
+class ThumbnailEmbedder(Embedder):
+    """
+    Embedder de test: imaginea micșorată la 16x16 tonuri de gri, centrată.
+
+    Nu detectează și nu recunoaște fețe - două fotografii sunt "aceeași
+    persoană" doar dacă sunt aproape identice. Permite testarea fluxului
+    de aprobare automată fără face_recognition.
+    """
+
+    name = 'thumbnail'
+    dimension = 256
+
+    def embed(self, path):
+        from PIL import Image
+        with Image.open(path) as image:
+            image.draft('L', (64, 64))
+            vector = np.asarray(image.convert('L').resize((16, 16)), dtype=np.float32).ravel()
+        return (vector - vector.mean()).reshape(1, -1)
+
+
+def create_embedder(kind=FACE_EMBEDDER):
+    """
+    Creează embedder-ul configurat.
+
+    Parametri:
+        kind (str): 'auto', 'face_recognition', 'thumbnail' sau 'none'
+
+    Returnează:
+        Embedder: Embedder-ul creat
+        None: Dacă recunoașterea facială nu este disponibilă sau este dezactivată
+    """
+    if np is None or kind == 'none':
+        return None
+    if kind == 'auto':
+        kind = 'face_recognition' if face_recognition is not None else 'none'
+        if kind == 'none':
+            return None
+    if kind == 'face_recognition':
+        return FaceRecognitionEmbedder()
+    if kind == 'thumbnail':
+        return ThumbnailEmbedder()
+    raise ValueError(f"Embedder necunoscut: {kind}")
+
+
+def _normalize(matrix):
+    """Normalizează rândurile la lungimea 1 (similaritatea devine un produs scalar)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class FaceGallery:
+    """
+    Galeria identităților aprobate.
+
+    Vectorii sunt păstrați într-o singură matrice float32 contiguă
+    (C-order), normalizată pe rânduri; labels[i] este identitatea
+    rândului i. O identitate poate avea mai multe rânduri (fotografii
+    din unghiuri sau lumini diferite).
+
+    Atribute:
+        path (str): Calea fișierului .npz
+        embedder_name (str): Embedder-ul cu care au fost calculați vectorii
+        matrix (numpy.ndarray): Vectorii (rânduri, dimensiune), float32
+        labels (list): Identitatea fiecărui rând
+    """
+
+    def __init__(self, path=FACE_GALLERY_PATH, embedder_name=None):
+        """
+        Încarcă galeria de pe disc (dacă există).
+
+        Parametri:
+            path (str): Calea fișierului .npz
+            embedder_name (str, optional): Embedder-ul folosit - o galerie
+                creată cu alt embedder este ignorată (vectori incompatibili)
+        """
+        self.path = path
+        self.embedder_name = embedder_name
+        self.matrix = None
+        self.labels = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with np.load(self.path, allow_pickle=False) as data:
+            stored_embedder = str(data['embedder'])
+            if self.embedder_name and stored_embedder != self.embedder_name:
+                log.warning("Face gallery was built with '%s', not '%s' - ignoring it",
+                            stored_embedder, self.embedder_name)
+                return
+            self.embedder_name = stored_embedder
+            self.matrix = np.ascontiguousarray(data['matrix'], dtype=np.float32)
+            self.labels = [str(label) for label in data['labels']]
+
+    def save(self):
+        """Scrie galeria pe disc (atomic, prin fișier temporar)."""
+        with self._lock:
+            matrix = self.matrix if self.matrix is not None else np.empty((0, 0), np.float32)
+            tmp_path = f"{self.path}.tmp.npz"
+            np.savez(tmp_path, matrix=matrix, labels=np.array(self.labels, dtype=str),
+                     embedder=np.array(self.embedder_name or ''))
+            os.replace(tmp_path, self.path)
+
+    def names(self):
+        """
+        Returnează identitățile înrolate și numărul de fotografii ale fiecăreia.
+
+        Returnează:
+            dict: nume -> număr de rânduri
+        """
+        counts = {}
+        for label in self.labels:
+            counts[label] = counts.get(label, 0) + 1
+        return counts
+
+    def enroll(self, name, embeddings):
+        """
+        Adaugă vectori pentru o identitate.
+
+        Parametri:
+            name (str): Identitatea
+            embeddings (numpy.ndarray): Vectorii (rânduri, dimensiune)
+        """
+        rows = _normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            if self.matrix is None or not len(self.labels):
+                self.matrix = np.ascontiguousarray(rows)
+            else:
+                self.matrix = np.ascontiguousarray(np.vstack([self.matrix, rows]))
+            self.labels.extend([name] * len(rows))
+
+    def remove(self, name):
+        """
+        Elimină toate rândurile unei identități.
+
+        Parametri:
+            name (str): Identitatea
+
+        Returnează:
+            int: Numărul de rânduri eliminate
+        """
+        with self._lock:
+            keep = [i for i, label in enumerate(self.labels) if label != name]
+            removed = len(self.labels) - len(keep)
+            if removed:
+                self.matrix = np.ascontiguousarray(self.matrix[keep])
+                self.labels = [self.labels[i] for i in keep]
+            return removed
+
+    def match(self, embeddings, threshold=FACE_MATCH_THRESHOLD):
+        """
+        Caută cea mai apropiată identitate pentru fețele detectate.
+
+        Toate fețele sunt comparate cu toată galeria printr-un singur produs
+        matricial: (fețe, d) @ (d, rânduri) -> similarități (fețe, rânduri).
+
+        Parametri:
+            embeddings (numpy.ndarray): Vectorii fețelor (fețe, dimensiune)
+            threshold (float): Similaritatea minimă pentru o potrivire sigură
+
+        Returnează:
+            FaceMatch: Cea mai bună potrivire peste prag
+            None: Dacă nicio față nu se potrivește suficient de bine
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            matrix, labels = self.matrix, self.labels
+        if matrix is None or not labels or not len(embeddings):
+            return None
+        if embeddings.shape[1] != matrix.shape[1]:
+            return None
+
+        similarities = _normalize(embeddings) @ matrix.T
+        face, row = np.unravel_index(int(np.argmax(similarities)), similarities.shape)
+        best = float(similarities[face, row])
+        if best < threshold:
+            return None
+        return FaceMatch(labels[row], best, len(embeddings))
+
+
+class FaceMatcher:
+    """
+    Etapa de recunoaștere din monitor: embedder + galerie.
+
+    Atribute:
+        embedder (Embedder): Calculează vectorii fețelor
+        gallery (FaceGallery): Identitățile aprobate
+        threshold (float): Similaritatea minimă pentru aprobarea automată
+    """
+
+    def __init__(self, embedder, gallery, threshold=FACE_MATCH_THRESHOLD):
+        self.embedder = embedder
+        self.gallery = gallery
+        self.threshold = threshold
+
+    def match_photo(self, path):
+        """
+        Recunoaște o persoană înrolată într-o fotografie.
+
+        Parametri:
+            path (str): Calea fotografiei
+
+        Returnează:
+            FaceMatch: Potrivirea sigură
+            None: Dacă nu a fost recunoscută nicio persoană înrolată
+        """
+        return self.gallery.match(self.embedder.embed(path), self.threshold)
+
+
+def create_face_matcher():
+    """
+    Creează etapa de recunoaștere, dacă este disponibilă.
+
+    Returnează:
+        FaceMatcher: Dacă există un embedder și o galerie nevidă
+        None: Altfel (aprobarea rămâne doar manuală)
+    """
+    embedder = create_embedder()
+    if embedder is None:
+        return None
+    gallery = FaceGallery(embedder_name=embedder.name)
+    if not len(gallery):
+        return None
+    return FaceMatcher(embedder, gallery)
+
+
+def main():
+    """Gestionarea galeriei din linia de comandă (enroll / list / remove)."""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('enroll', 'list', 'remove'):
+        print("Utilizare:")
+        print("  python face_gallery.py enroll <nume> <fotografie> [<fotografie> ...]")
+        print("  python face_gallery.py list")
+        print("  python face_gallery.py remove <nume>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    embedder = create_embedder()
+    if embedder is None:
+        print("Recunoașterea facială nu este disponibilă (instalați numpy și face_recognition)")
+        sys.exit(1)
+    gallery = FaceGallery(embedder_name=embedder.name)
+
+    if command == 'list':
+        for name, count in sorted(gallery.names().items()):
+            print(f"{name}: {count} fotografie/fotografii")
+        return
+
+    if command == 'remove':
+        removed = gallery.remove(sys.argv[2])
+        gallery.save()
+        print(f"Eliminate {removed} rânduri pentru '{sys.argv[2]}'")
+        return
+
+    name, photos = sys.argv[2], sys.argv[3:]
+    for photo in photos:
+        embeddings = embedder.embed(photo)
+        if len(embeddings) != 1:
+            print(f"  {photo}: {len(embeddings)} fețe detectate - ignorată (este necesară exact una)")
+            continue
+        gallery.enroll(name, embeddings)
+        print(f"  {photo}: înrolată")
+    gallery.save()
+    print(f"Galeria are {len(gallery)} rânduri ({len(gallery.names())} identități)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""
+Descoperirea Folderelor Protejate - Căutare paralelă cu cache persistent
+
+Descriere:
+    Când un folder protejat este specificat doar prin nume ("Confidential"),
+    el trebuie găsit în SEARCH_ROOT (de obicei tot directorul utilizatorului).
+    Un os.walk pe un singur fir peste milioane de fișiere poate dura minute,
+    iar căutarea se repeta la fiecare pornire a monitorului.
+
+    Acest modul:
+    - parcurge arborele în lățime (BFS) cu os.scandir, nivel cu nivel,
+      cu mai multe fire de execuție (scandir eliberează GIL-ul în apelurile
+      de sistem, deci citirea directoarelor se face în paralel)
+    - respectă o adâncime maximă și o listă de excluderi (glob-uri)
+    - se oprește imediat ce toate folderele căutate au fost găsite
+      (BFS găsește mai întâi potrivirea cea mai puțin adâncă)
+    - păstrează căile găsite într-un cache pe disc, validat prin
+      dispozitiv + inode, astfel încât repornirile sunt instantanee
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import fnmatch
+import json
+import logging
+import os
+import re
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    SEARCH_MAX_DEPTH, SEARCH_EXCLUDE, SEARCH_WORKERS, FOLDER_CACHE_PATH
+)
+
+log = logging.getLogger(__name__)
+
+# Numărul de directoare citite de un fir într-o singură sarcină
+# (evită crearea unui Future pentru fiecare director)
+_BATCH_SIZE = 64
+
+
+def compile_excludes(patterns):
+    """
+    Compilează glob-urile de excludere într-o singură expresie regulată.
+
+    Parametri:
+        patterns (list): Glob-uri aplicate numelui directorului (ex: ['.*', 'Library'])
+
+    Returnează:
+        callable: Funcție nume -> bool (True dacă directorul este exclus)
+    """
+    if not patterns:
+        return lambda name: False
+    regex = re.compile('|'.join(fnmatch.translate(p) for p in patterns))
+    return lambda name: regex.match(name) is not None
+
+
+def _scan_batch(directories, names, is_excluded, stop_event):
+    """
+    Citește un lot de directoare.
+
+    Parametri:
+        directories (list): Directoarele de citit
+        names (set): Numele folderelor căutate
+        is_excluded (callable): Filtrul de excludere
+        stop_event (threading.Event): Setat când căutarea s-a încheiat
+
+    Returnează:
+        tuple: (subdirectoare de parcurs, lista (nume, cale) găsite)
+    """
+    subdirs = []
+    matches = []
+    for directory in directories:
+        if stop_event.is_set():
+            break
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                    except OSError:
+                        continue
+                    if entry.name in names:
+                        matches.append((entry.name, entry.path))
+                    if not is_excluded(entry.name):
+                        subdirs.append(entry.path)
+        except OSError:
+            # Fără permisiuni sau directorul a dispărut între timp
+            continue
+    return subdirs, matches
+
+
+def scan_for_folders(names, search_root, max_depth=SEARCH_MAX_DEPTH,
+                     exclude=SEARCH_EXCLUDE, workers=SEARCH_WORKERS):
+    """
+    Caută folderele după nume printr-o parcurgere paralelă în lățime.
+
+    Parametri:
+        names (iterable): Numele folderelor căutate
+        search_root (str): Directorul rădăcină unde să caute
+        max_depth (int): Adâncimea maximă (1 = doar copiii lui search_root)
+        exclude (list): Glob-uri pentru directoarele care nu se parcurg
+        workers (int): Numărul de fire de execuție
+
+    Returnează:
+        dict: nume -> cale completă, doar pentru folderele găsite
+    """
+    remaining = set(names)
+    found = {}
+    if not remaining:
+        return found
+
+    is_excluded = compile_excludes(exclude)
+    stop_event = threading.Event()
+    frontier = [search_root]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for _ in range(max_depth):
+            if not frontier:
+                break
+            batches = [frontier[i:i + _BATCH_SIZE] for i in range(0, len(frontier), _BATCH_SIZE)]
+            wanted = frozenset(remaining)
+            futures = [executor.submit(_scan_batch, batch, wanted, is_excluded, stop_event)
+                       for batch in batches]
+
+            next_frontier = []
+            for future in futures:
+                subdirs, matches = future.result()
+                next_frontier.extend(subdirs)
+                for name, path in matches:
+                    if name in remaining:
+                        found[name] = path
+                        remaining.discard(name)
+                if not remaining:
+                    # Toate folderele au fost găsite - loturile încă
+                    # nepornite se opresc imediat
+                    stop_event.set()
+
+            if not remaining:
+                break
+            frontier = next_frontier
+
+    return found
+
+
+class FolderLocationCache:
+    """
+    Cache persistent pentru locațiile folderelor protejate.
+
+    Pentru fiecare (rădăcină de căutare, nume) se păstrează calea găsită
+    și identitatea folderului (dispozitiv + inode). La pornire, intrarea
+    este validă doar dacă la aceeași cale există încă un director cu
+    aceeași identitate - un folder mutat, șters sau înlocuit forțează o
+    nouă căutare. (Data modificării folderului nu este folosită pentru
+    validare: se schimbă la fiecare fișier adăugat în folder.)
+
+    Atribute:
+        path (str): Calea fișierului JSON de cache
+    """
+
+    def __init__(self, path=FOLDER_CACHE_PATH):
+        """
+        Parametri:
+            path (str): Calea fișierului JSON de cache
+        """
+        self.path = path
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _key(search_root, name):
+        return f"{os.path.abspath(search_root)}|{name}"
+
+    def get(self, search_root, name):
+        """
+        Returnează calea din cache, dacă este încă validă.
+
+        Parametri:
+            search_root (str): Rădăcina căutării
+            name (str): Numele folderului
+
+        Returnează:
+            str: Calea validată
+            None: Dacă nu există intrare sau folderul nu mai este același
+        """
+        entry = self._entries.get(self._key(search_root, name))
+        if not entry:
+            return None
+        try:
+            st = os.stat(entry['path'])
+        except OSError:
+            return None
+        if (not stat.S_ISDIR(st.st_mode) or st.st_dev != entry['dev']
+                or st.st_ino != entry['ino'] or os.path.basename(entry['path']) != name):
+            return None
+        return entry['path']
+
+    def put(self, search_root, name, path):
+        """
+        Adaugă o cale găsită în cache.
+
+        Parametri:
+            search_root (str): Rădăcina căutării
+            name (str): Numele folderului
+            path (str): Calea găsită
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self._entries[self._key(search_root, name)] = {
+            'path': path,
+            'dev': st.st_dev,
+            'ino': st.st_ino,
+        }
+
+    def save(self):
+        """Scrie cache-ul pe disc (atomic, prin fișier temporar)."""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.warning("Could not save the folder cache: %s", e)
+
+
+def find_folders(names, search_root, cache=None):
+    """
+    Găsește folderele după nume, folosind mai întâi cache-ul persistent.
+
+    Parametri:
+        names (iterable): Numele folderelor căutate
+        search_root (str): Directorul rădăcină unde să caute
+        cache (FolderLocationCache, optional): Cache-ul (implicit cel din config)
+
+    Returnează:
+        dict: nume -> cale completă, doar pentru folderele găsite
+    """
+    if cache is None:
+        cache = FolderLocationCache()
+
+    found = {}
+    missing = []
+    for name in dict.fromkeys(names):
+        cached = cache.get(search_root, name)
+        if cached:
+            found[name] = cached
+        else:
+            missing.append(name)
+
+    if missing:
+        scanned = scan_for_folders(missing, search_root)
+        for name, path in scanned.items():
+            cache.put(search_root, name, path)
+        if scanned:
+            cache.save()
+        found.update(scanned)
+
+    return found
@@ -0,0 +1,148 @@
+"""
+Calitatea Cadrelor - Alegerea celei mai bune fotografii dintr-o rafală
+
+Descriere:
+    Imediat după pornirea camerei, primul cadru este adesea mișcat sau
+    subexpus, iar administratorul trebuie să decidă pe baza unei fotografii
+    inutile. În modul rafală monitorul capturează mai multe cadre, iar
+    acest modul le evaluează și îl păstrează doar pe cel mai bun.
+
+    Metrici (calculate vectorizat cu NumPy, pe o versiune micșorată
+    în tonuri de gri a cadrului):
+    - claritate: varianța Laplacianului (muchii puternice = imagine clară)
+    - expunere: luminozitatea medie, contrastul și procentul de pixeli
+      arși sau complet negri
+
+    Decodarea JPEG folosește modul "draft" din Pillow (decodare direct la
+    rezoluție redusă), astfel încât evaluarea unui cadru durează câteva
+    milisecunde.
+
+    NumPy și Pillow sunt opționale: fără ele, modul rafală nu este
+    disponibil și monitorul păstrează primul cadru.
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+from collections import namedtuple
+
+try:
+    import numpy as np
+    from PIL import Image
+    QUALITY_AVAILABLE = True
+except ImportError:
+    np = None
+    Image = None
+    QUALITY_AVAILABLE = False
+
+
+# Latura maximă (pixeli) a cadrului evaluat
+ANALYSIS_SIZE = 320
+
+# Pragurile (0-255) sub/peste care un pixel este considerat negru/ars
+DARK_LEVEL = 8
+BRIGHT_LEVEL = 247
+
+# Scorurile unui cadru
+FrameScore = namedtuple('FrameScore', [
+    'sharpness',    # Varianța Laplacianului (mai mare = mai clar)
+    'brightness',   # Luminozitatea medie (0-255)
+    'contrast',     # Deviația standard a luminozității (0-255)
+    'clipped',      # Fracțiunea pixelilor negri sau arși (0-1)
+    'exposure',     # Scorul de expunere (0-1, 1 = expunere ideală)
+])
+
+
+def load_gray(path, size=ANALYSIS_SIZE):
+    """
+    Încarcă un cadru ca matrice float32 în tonuri de gri, la rezoluție redusă.
+
+    Parametri:
+        path (str): Calea fișierului JPEG
+        size (int): Latura maximă a cadrului rezultat
+
+    Returnează:
+        numpy.ndarray: Matricea (înălțime, lățime) cu valori 0-255
+    """
+    with Image.open(path) as image:
+        # Decodare JPEG direct la o scară redusă (1/2, 1/4, 1/8), cât mai
+        # apropiată de dimensiunea finală
+        width, height = image.size
+        ratio = size / max(width, height)
+        image.draft('L', (max(int(width * ratio), 1), max(int(height * ratio), 1)))
+        image = image.convert('L')
+        if max(image.size) > size:
+            image.thumbnail((size, size))
+        return np.asarray(image, dtype=np.float32)
+
+
+def laplacian_variance(gray):
+    """
+    Calculează varianța Laplacianului (nucleul 4-vecini) - măsura clarității.
+
+    Parametri:
+        gray (numpy.ndarray): Cadrul în tonuri de gri
+
+    Returnează:
+        float: Varianța răspunsului Laplacian
+    """
+    center = gray[1:-1, 1:-1]
+    laplacian = (gray[:-2, 1:-1] + gray[2:, 1:-1] +
+                 gray[1:-1, :-2] + gray[1:-1, 2:] - 4.0 * center)
+    return float(laplacian.var())
+
+
+def score_frame(gray):
+    """
+    Evaluează un cadru.
+
+    Parametri:
+        gray (numpy.ndarray): Cadrul în tonuri de gri (vezi load_gray)
+
+    Returnează:
+        FrameScore: Scorurile cadrului
+    """
+    brightness = float(gray.mean())
+    contrast = float(gray.std())
+    clipped = float(np.count_nonzero((gray <= DARK_LEVEL) | (gray >= BRIGHT_LEVEL))) / gray.size
+
+    # 1 pentru luminozitate medie (128), scade liniar spre negru/alb;
+    # penalizat de pixelii pierduți și de lipsa contrastului
+    exposure = (1.0 - abs(brightness - 128.0) / 128.0) * (1.0 - clipped)
+    exposure *= min(contrast / 32.0, 1.0)
+
+    return FrameScore(laplacian_variance(gray), brightness, contrast, clipped, max(exposure, 0.0))
+
+
+def select_best(paths):
+    """
+    Alege cel mai bun cadru dintr-o rafală.
+
+    Claritatea este normalizată față de cel mai clar cadru din rafală,
+    apoi combinată cu scorul de expunere: un cadru clar dar negru pierde
+    în fața unuia ceva mai puțin clar, dar expus corect.
+
+    Parametri:
+        paths (list): Căile cadrelor (JPEG)
+
+    Returnează:
+        tuple: (indexul celui mai bun cadru, lista FrameScore - None
+                pentru cadrele care nu au putut fi citite)
+    """
+    scores = []
+    for path in paths:
+        try:
+            scores.append(score_frame(load_gray(path)))
+        except (OSError, ValueError):
+            scores.append(None)
+
+    valid = [s.sharpness for s in scores if s is not None]
+    if not valid:
+        return 0, scores
+
+    max_sharpness = max(valid) or 1.0
+    best_index = max(
+        (i for i, s in enumerate(scores) if s is not None),
+        key=lambda i: (scores[i].sharpness / max_sharpness) * scores[i].exposure
+    )
+    return best_index, scores
@@ -0,0 +1,751 @@
+"""
+Detectarea Accesului pe Linux - Deschideri și citiri raportate de kernel
+
+Descriere:
+    Pe macOS, deschiderea unui folder este dedusă indirect (ștergerea
+    .DS_Store și verificarea ferestrelor Finder), iar watchdog raportează
+    doar modificări - citirea unui fișier confidențial nu este observată.
+    Pe Linux, kernel-ul poate raporta direct fiecare deschidere și citire,
+    fără nicio verificare periodică:
+
+    - inotify (IN_OPEN / IN_ACCESS): câte o urmărire pentru fiecare director
+      din folderele protejate; subdirectoarele noi sunt urmărite pe măsură
+      ce apar. Nu necesită drepturi speciale.
+    - fanotify (FAN_OPEN / FAN_ACCESS / FAN_MODIFY): un singur marcaj pe
+      sistemul de fișiere montat care conține folderul protejat, deci nu
+      depinde de numărul de directoare. Fiecare eveniment conține PID-ul
+      procesului, astfel încât accesările făcute chiar de monitor sunt
+      ignorate. Necesită CAP_SYS_ADMIN (de regulă root); creările,
+      ștergerile și redenumirile sunt primite în continuare prin inotify.
+
+    WatchManager limitează numărul de urmăriri inotify (memorie în kernel,
+    limita fs.inotify.max_user_watches): cu fanotify, directoarele sunt
+    urmărite doar la cerere; fără fanotify, arborele este urmărit de sus în
+    jos până la epuizarea bugetului, iar restul la cerere.
+
+    KernelAccessMonitor citește evenimentele pe un fir propriu (blocat în
+    select până când kernel-ul are ceva de raportat) și le trimite aceluiași
+    FolderAccessHandler folosit cu watchdog (on_any_event), deci filtrarea,
+    coalescența și fluxul de aprobare rămân neschimbate.
+
+    Apelurile de sistem sunt făcute prin ctypes (fără dependențe externe).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import selectors
+import stat
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from config import ACCESS_BACKEND, WATCH_BUDGET, WATCH_MODE
+from metrics import REGISTRY
+from path_trie import PathTrie
+
+log = logging.getLogger(__name__)
+
+# Constante inotify (<sys/inotify.h>)
+IN_ACCESS = 0x00000001
+IN_MODIFY = 0x00000002
+IN_OPEN = 0x00000020
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+# Constante fanotify (<sys/fanotify.h>)
+FAN_ACCESS = 0x00000001
+FAN_MODIFY = 0x00000002
+FAN_OPEN = 0x00000020
+FAN_Q_OVERFLOW = 0x00004000
+FAN_ONDIR = 0x40000000
+FAN_CLOEXEC = 0x00000001
+FAN_NONBLOCK = 0x00000002
+FAN_CLASS_NOTIF = 0x00000000
+FAN_MARK_ADD = 0x00000001
+FAN_MARK_MOUNT = 0x00000010
+FANOTIFY_METADATA_VERSION = 3
+AT_FDCWD = -100
+
+# Evenimentele de structură (urmărite mereu prin inotify)
+STRUCTURE_MASK = (IN_CREATE | IN_DELETE | IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO
+                  | IN_DELETE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK)
+# Deschiderile și citirile (prin inotify doar dacă fanotify nu este disponibil)
+READ_MASK = IN_OPEN | IN_ACCESS
+# Evenimentele raportate de marcajul fanotify (inclusiv pentru directoare)
+FANOTIFY_MASK = FAN_OPEN | FAN_ACCESS | FAN_MODIFY | FAN_ONDIR
+
+# struct inotify_event: wd, mask, cookie, len (urmat de nume)
+_INOTIFY_EVENT = struct.Struct('iIII')
+# struct fanotify_event_metadata: event_len, vers, reserved, metadata_len, mask, fd, pid
+_FANOTIFY_EVENT = struct.Struct('IBBHQii')
+
+_READ_SIZE = 64 * 1024
+
+# Cât timp sunt ignorate evenimentele unui director parcurs chiar de monitor
+# (la armarea urmăririlor) - doar pentru inotify, care nu raportează PID-ul
+_OWN_SCAN_GRACE = 1.0
+
+# Tipurile de evenimente, în ordinea priorității (un eveniment inotify poate
+# avea mai mulți biți setați)
+_INOTIFY_TYPES = (
+    (IN_CREATE | IN_MOVED_TO, 'created'),
+    (IN_DELETE, 'deleted'),
+    (IN_MOVED_FROM, 'moved'),
+    (IN_MODIFY, 'modified'),
+    (IN_OPEN, 'opened'),
+    (IN_ACCESS, 'accessed'),
+)
+
+# Un eveniment primit de la kernel - aceleași câmpuri ca un eveniment watchdog
+# (src_path, event_type, is_directory), plus PID-ul procesului (None pentru inotify)
+KernelEvent = namedtuple('KernelEvent', ['src_path', 'event_type', 'is_directory', 'pid'])
+
+KERNEL_EVENTS = REGISTRY.counter(
+    'monitor_kernel_events_total', 'Evenimente primite de la kernel, după sursă și tip',
+    ['backend', 'event_type'])
+KERNEL_OVERFLOWS = REGISTRY.counter(
+    'monitor_kernel_overflows_total', 'Depășiri ale cozii de evenimente din kernel', ['backend'])
+
+_libc = None
+
+
+def _load_libc():
+    """Încarcă biblioteca C și declară semnăturile funcțiilor folosite."""
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        libc.fanotify_init.argtypes = [ctypes.c_uint, ctypes.c_uint]
+        libc.fanotify_mark.argtypes = [ctypes.c_int, ctypes.c_uint, ctypes.c_uint64,
+                                       ctypes.c_int, ctypes.c_char_p]
+        _libc = libc
+    return _libc
+
+
+def _check(result, what, path=None):
+    """Transformă un rezultat -1 al unui apel de sistem în OSError."""
+    if result < 0:
+        code = ctypes.get_errno()
+        raise OSError(code, f"{what}: {os.strerror(code)}", path)
+    return result
+
+
+class Inotify:
+    """
+    Descriptorul inotify și urmăririle lui.
+
+    Atribute:
+        fd (int): Descriptorul de fișier (neblocant)
+    """
+
+    def __init__(self):
+        """
+        Ridică:
+            OSError: Dacă inotify nu este disponibil
+        """
+        self._libc = _load_libc()
+        self.fd = _check(self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC), 'inotify_init1')
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path, mask):
+        """
+        Urmărește un director.
+
+        Parametri:
+            path (str): Directorul
+            mask (int): Evenimentele urmărite (IN_*)
+
+        Returnează:
+            int: Descriptorul urmăririi (același pentru un director deja urmărit)
+
+        Ridică:
+            OSError: Dacă directorul nu poate fi urmărit (ex: ENOSPC - limita
+                     fs.inotify.max_user_watches a fost atinsă)
+        """
+        return _check(self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask),
+                      'inotify_add_watch', path)
+
+    def rm_watch(self, wd):
+        """Oprește o urmărire (erorile sunt ignorate - directorul poate fi deja șters)."""
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self):
+        """
+        Citește toate evenimentele disponibile (fără a bloca).
+
+        Returnează:
+            list: Tupluri (wd, mask, cookie, nume) - numele este '' pentru
+                  evenimentele directorului urmărit însuși
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                events.append((wd, mask, cookie, name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Fanotify:
+    """
+    Descriptorul fanotify (clasa de notificare - nu blochează accesul).
+
+    Atribute:
+        fd (int): Descriptorul de fișier (neblocant)
+    """
+
+    def __init__(self):
+        """
+        Ridică:
+            OSError: Dacă fanotify nu este permis (EPERM fără CAP_SYS_ADMIN)
+        """
+        self._libc = _load_libc()
+        self.fd = _check(self._libc.fanotify_init(
+            FAN_CLASS_NOTIF | FAN_CLOEXEC | FAN_NONBLOCK,
+            os.O_RDONLY | getattr(os, 'O_LARGEFILE', 0) | os.O_CLOEXEC
+        ), 'fanotify_init')
+
+    def fileno(self):
+        return self.fd
+
+    def mark_mount(self, path, mask):
+        """
+        Marchează sistemul de fișiere montat care conține o cale.
+
+        Parametri:
+            path (str): O cale de pe sistemul de fișiere montat
+            mask (int): Evenimentele raportate (FAN_*)
+
+        Ridică:
+            OSError: Dacă marcajul nu poate fi adăugat
+        """
+        _check(self._libc.fanotify_mark(self.fd, FAN_MARK_ADD | FAN_MARK_MOUNT, mask,
+                                        AT_FDCWD, os.fsencode(path)), 'fanotify_mark', path)
+
+    def read(self):
+        """
+        Citește toate evenimentele disponibile (fără a bloca).
+
+        Descriptorul deschis de kernel pentru fiecare eveniment este folosit
+        doar pentru a afla calea și apoi închis.
+
+        Returnează:
+            list: Tupluri (mask, pid, cale, este_director) - calea este None
+                  la depășirea cozii
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset + _FANOTIFY_EVENT.size <= len(data):
+                (event_len, version, _, _, mask, fd,
+                 pid) = _FANOTIFY_EVENT.unpack_from(data, offset)
+                if event_len < _FANOTIFY_EVENT.size:
+                    # Lungime invalidă: restul buffer-ului nu mai poate fi parcurs
+                    # după event_len, dar descriptorii lui sunt deja deschiși
+                    # de kernel - fără FAN_REPORT_*, înregistrările au lungime fixă
+                    log.warning("Malformed fanotify event (length %s) - discarding the buffer",
+                                event_len)
+                    self._close_descriptors(data, offset)
+                    break
+                offset += event_len
+                if version != FANOTIFY_METADATA_VERSION:
+                    # Descriptorul evenimentului este deja deschis de kernel
+                    log.warning("Unexpected fanotify metadata version %s", version)
+                    if fd >= 0:
+                        os.close(fd)
+                    continue
+                path, is_directory = None, False
+                if fd >= 0:
+                    try:
+                        path = os.readlink(f'/proc/self/fd/{fd}')
+                        is_directory = stat.S_ISDIR(os.fstat(fd).st_mode)
+                    except OSError:
+                        pass
+                    finally:
+                        os.close(fd)
+                    if path and path.endswith(' (deleted)'):
+                        path = path[:-len(' (deleted)')]
+                events.append((mask, pid, path, is_directory))
+
+    @staticmethod
+    def _close_descriptors(data, offset):
+        """Închide descriptorii înregistrărilor rămase într-un buffer de la offset."""
+        while offset + _FANOTIFY_EVENT.size <= len(data):
+            fd = _FANOTIFY_EVENT.unpack_from(data, offset)[5]
+            if fd >= 0:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            offset += _FANOTIFY_EVENT.size
+
+    def close(self):
+        os.close(self.fd)
+
+
+def fanotify_permitted():
+    """True dacă procesul curent poate folosi fanotify (Linux, CAP_SYS_ADMIN)."""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        Fanotify().close()
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+def resolve_backend(kind=ACCESS_BACKEND):
+    """
+    Alege sursa evenimentelor de fișiere.
+
+    Parametri:
+        kind (str): 'auto', 'fanotify', 'inotify' sau 'watchdog'
+
+    Returnează:
+        str: 'fanotify', 'inotify' sau 'watchdog'
+
+    Ridică:
+        ValueError: Dacă sursa nu este cunoscută
+    """
+    if kind == 'auto':
+        if not sys.platform.startswith('linux'):
+            return 'watchdog'
+        return 'fanotify' if fanotify_permitted() else 'inotify'
+    if kind not in ('fanotify', 'inotify', 'watchdog'):
+        raise ValueError(f"Sursă de evenimente necunoscută: {kind}")
+    return kind
+
+
+def system_watch_limit(path='/proc/sys/fs/inotify/max_user_watches'):
+    """
+    Citește limita de urmăriri inotify a utilizatorului.
+
+    Returnează:
+        int: Limita (fs.inotify.max_user_watches)
+        None: Dacă limita nu poate fi citită (alt sistem de operare)
+    """
+    try:
+        with open(path) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+class WatchManager:
+    """
+    Urmăririle inotify ale directoarelor protejate, în limita unui buget.
+
+    Fiecare urmărire ocupă memorie în kernel, iar numărul lor este limitat
+    pentru tot utilizatorul (fs.inotify.max_user_watches); un arbore mare nu
+    poate fi urmărit integral fără a afecta celelalte aplicații.
+
+    - eager: la pornire, arborele este parcurs în lățime (nivelurile de sus
+      primele) și fiecare director este urmărit, până la epuizarea bugetului;
+      directoarele rămase sunt urmărite la cerere
+    - lazy: la pornire sunt urmărite doar folderele protejate; un director
+      este urmărit la cerere (ensure), când apare activitate în el - potrivit
+      când fanotify raportează deja deschiderile și citirile de pe tot
+      sistemul de fișiere montat
+    - directoarele create ulterior sunt urmărite imediat, cu tot conținutul
+    - o zecime din buget este rezervată urmăririlor la cerere; când și
+      rezerva este plină, urmărirea la cerere folosită cel mai demult este
+      eliminată (LRU)
+
+    Atribute:
+        mode (str): 'eager' sau 'lazy'
+        budget (int): Numărul maxim de urmăriri
+        exhausted (bool): True dacă bugetul (sau limita kernel-ului) a fost atins
+        on_demand (int): Directoare urmărite la cerere
+    """
+
+    def __init__(self, inotify, mask, mode='eager', budget=None):
+        """
+        Parametri:
+            inotify (Inotify): Descriptorul inotify
+            mask (int): Evenimentele urmărite în fiecare director
+            mode (str): 'eager' sau 'lazy'
+            budget (int, optional): Numărul maxim de urmăriri (implicit
+                jumătate din fs.inotify.max_user_watches)
+        """
+        if budget is None:
+            limit = system_watch_limit()
+            budget = limit // 2 if limit else 8192
+        self.inotify = inotify
+        self.mask = mask
+        self.mode = mode
+        self.budget = budget
+        self.exhausted = False
+        self.on_demand = 0
+        self.evicted = 0
+        self._reserve = max(1, budget // 10)
+        self._wd_paths = {}
+        self._path_wds = {}
+        self._demand_lru = OrderedDict()
+        self._own_scans = {}
+
+    def __len__(self):
+        return len(self._wd_paths)
+
+    def __contains__(self, path):
+        return path in self._path_wds
+
+    def path_of(self, wd):
+        """Returnează directorul unei urmăriri (None dacă nu mai este urmărit)."""
+        return self._wd_paths.get(wd)
+
+    def start(self, paths):
+        """
+        Urmărește folderele protejate (recursiv în modul eager).
+
+        Parametri:
+            paths (list): Folderele protejate
+        """
+        for path in paths:
+            if self.mode == 'eager':
+                self.arm_tree(path)
+            else:
+                self.arm(path)
+
+    def arm(self, path):
+        """
+        Urmărește un singur director, dacă bugetul (fără rezervă) permite.
+
+        Parametri:
+            path (str): Directorul
+
+        Returnează:
+            bool: True dacă directorul este urmărit
+        """
+        if path in self._path_wds:
+            return True
+        if len(self._wd_paths) >= self.budget - self._reserve:
+            self.exhausted = True
+            return False
+        return self._add(path)
+
+    def _add(self, path):
+        try:
+            wd = self.inotify.add_watch(path, self.mask)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                self.exhausted = True
+            elif e.errno not in (errno.ENOENT, errno.ENOTDIR):
+                log.warning("Cannot watch %s: %s", path, e)
+            return False
+        self._wd_paths[wd] = path
+        self._path_wds[path] = wd
+        return True
+
+    def arm_tree(self, top):
+        """
+        Urmărește un director și subdirectoarele lui, în lățime, până la
+        epuizarea bugetului.
+
+        Parametri:
+            top (str): Directorul
+
+        Returnează:
+            int: Numărul de directoare noi urmărite
+        """
+        armed = 0
+        level = [top]
+        while level:
+            next_level = []
+            for path in level:
+                known = path in self._path_wds
+                if not self.arm(path):
+                    if self.exhausted:
+                        return armed
+                    continue
+                armed += not known
+                # Parcurgerea deschide directorul - evenimentul nu este un acces
+                self._own_scans[path] = time.monotonic() + _OWN_SCAN_GRACE
+                try:
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                next_level.append(entry.path)
+                except OSError:
+                    continue
+            level = next_level
+        return armed
+
+    def ensure(self, path):
+        """
+        Urmărește la cerere directorul în care a apărut activitate.
+
+        Parametri:
+            path (str): Directorul
+
+        Returnează:
+            bool: True dacă directorul este (acum) urmărit
+        """
+        if path in self._path_wds:
+            if path in self._demand_lru:
+                self._demand_lru.move_to_end(path)
+            return True
+        if len(self._wd_paths) >= self.budget:
+            if not self._demand_lru:
+                return False
+            _, wd = self._demand_lru.popitem(last=False)
+            self.inotify.rm_watch(wd)
+            self._drop(wd)
+            self.evicted += 1
+        if not self._add(path):
+            return False
+        self._demand_lru[path] = self._path_wds[path]
+        self.on_demand += 1
+        return True
+
+    def _drop(self, wd):
+        path = self._wd_paths.pop(wd, None)
+        if path is not None and self._path_wds.get(path) == wd:
+            del self._path_wds[path]
+            self._demand_lru.pop(path, None)
+
+    def forget(self, wd):
+        """Elimină o urmărire încheiată de kernel (IN_IGNORED - director șters)."""
+        self._drop(wd)
+
+    def is_own_scan(self, path, now):
+        """True dacă directorul a fost parcurs de curând chiar de monitor."""
+        return self._own_scans.get(path, 0) > now
+
+    def purge_scans(self, now):
+        if self._own_scans:
+            self._own_scans = {path: until for path, until in self._own_scans.items()
+                               if until > now}
+
+    def stats(self):
+        """
+        Returnează starea urmăririlor.
+
+        Returnează:
+            dict: mode, watches, budget, exhausted, on_demand, evicted
+        """
+        return {
+            'mode': self.mode,
+            'watches': len(self._wd_paths),
+            'budget': self.budget,
+            'exhausted': self.exhausted,
+            'on_demand': self.on_demand,
+            'evicted': self.evicted,
+        }
+
+
+class KernelAccessMonitor:
+    """
+    Primește deschiderile, citirile și modificările din folderele protejate
+    direct de la kernel și le trimite handler-ului.
+
+    Are aceeași interfață ca observatorul watchdog (start, stop, join).
+
+    Atribute:
+        handler (FolderAccessHandler): Primește evenimentele (on_any_event)
+        paths (list): Folderele urmărite (recursiv)
+        backend (str): 'fanotify' sau 'inotify' (după pornire - fanotify
+            revine la inotify dacă marcajul nu poate fi adăugat)
+        watches (WatchManager): Urmăririle inotify (create la pornire)
+        running (bool): Indicator dacă monitorul este activ
+    """
+
+    def __init__(self, handler, paths, backend='inotify', watch_mode=WATCH_MODE,
+                 watch_budget=WATCH_BUDGET):
+        """
+        Parametri:
+            handler: Obiectul cu metoda on_any_event(event)
+            paths (list): Folderele de urmărit (recursiv)
+            backend (str): 'fanotify' sau 'inotify'
+            watch_mode (str): 'auto', 'eager' sau 'lazy' (vezi WatchManager)
+            watch_budget (int, optional): Numărul maxim de urmăriri inotify
+        """
+        self.handler = handler
+        self.paths = [os.path.normpath(path) for path in paths]
+        self.backend = backend
+        self.watch_mode = watch_mode
+        self.watch_budget = watch_budget
+        self.watches = None
+        self.running = False
+        self.thread = None
+
+        self._inotify = None
+        self._fanotify = None
+        self._own_pid = os.getpid()
+        self._protected = PathTrie()
+        for path in self.paths:
+            self._protected.insert(path, True)
+        self._wake_r, self._wake_w = os.pipe()
+
+    @property
+    def watch_count(self):
+        """Numărul de directoare urmărite prin inotify."""
+        return len(self.watches) if self.watches is not None else 0
+
+    def start(self):
+        """
+        Armează urmăririle și pornește firul de citire.
+
+        Ridică:
+            OSError: Dacă inotify nu este disponibil
+        """
+        if self.backend == 'fanotify':
+            try:
+                self._fanotify = Fanotify()
+                for path in self.paths:
+                    self._fanotify.mark_mount(path, FANOTIFY_MASK)
+            except (OSError, AttributeError) as e:
+                log.warning("fanotify unavailable (%s) - using inotify", e)
+                if self._fanotify is not None:
+                    self._fanotify.close()
+                    self._fanotify = None
+                self.backend = 'inotify'
+
+        mode = self.watch_mode
+        if mode == 'auto':
+            mode = 'lazy' if self._fanotify is not None else 'eager'
+        # Cu fanotify, deschiderile, citirile și modificările vin de pe tot
+        # sistemul de fișiere montat; inotify raportează doar structura
+        mask = (STRUCTURE_MASK & ~IN_MODIFY if self._fanotify is not None
+                else STRUCTURE_MASK | READ_MASK)
+        self._inotify = Inotify()
+        self.watches = WatchManager(self._inotify, mask, mode, self.watch_budget)
+        self.watches.start(self.paths)
+        if self.watches.exhausted:
+            log.warning("Watch budget reached (%s directories) - the remaining directories "
+                        "are watched on demand", self.watches.budget)
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='kernel-access', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Oprește firul de citire (descriptorii sunt închiși de fir)."""
+        self.running = False
+        os.write(self._wake_w, b'x')
+        if self.watches is not None:
+            stats = self.watches.stats()
+            log.info("Kernel access events (%s): %s watches (%s), %s armed on demand%s",
+                     self.backend, stats['watches'], stats['mode'], stats['on_demand'],
+                     ', budget reached' if stats['exhausted'] else '')
+
+    def join(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _emit(self, path, event_type, is_directory, pid=None):
+        KERNEL_EVENTS.labels(self.backend, event_type).inc()
+        self.handler.on_any_event(KernelEvent(path, event_type, is_directory, pid))
+
+    def _handle_inotify(self):
+        watches = self.watches
+        now = time.monotonic()
+        for wd, mask, _, name in self._inotify.read():
+            if mask & IN_Q_OVERFLOW:
+                KERNEL_OVERFLOWS.labels('inotify').inc()
+                log.warning("inotify queue overflow - some events were lost")
+                continue
+            if mask & IN_IGNORED:
+                watches.forget(wd)
+                continue
+            directory = watches.path_of(wd)
+            if directory is None:
+                continue
+            if mask & IN_DELETE_SELF:
+                if directory in self.paths:
+                    log.warning("Protected folder removed: %s", directory)
+                continue
+
+            path = os.path.join(directory, name) if name else directory
+            is_directory = bool(mask & IN_ISDIR)
+            event_type = next((kind for bits, kind in _INOTIFY_TYPES if mask & bits), None)
+            if event_type is None:
+                continue
+            if is_directory:
+                if event_type in ('opened', 'accessed'):
+                    if watches.is_own_scan(path, now):
+                        continue
+                    # Un subdirector listat este urmărit de acum (dacă nu era)
+                    watches.ensure(path)
+                elif event_type == 'created':
+                    watches.arm_tree(path)
+            self._emit(path, event_type, is_directory)
+        watches.purge_scans(now)
+
+    def _handle_fanotify(self):
+        for mask, pid, path, is_directory in self._fanotify.read():
+            if mask & FAN_Q_OVERFLOW:
+                KERNEL_OVERFLOWS.labels('fanotify').inc()
+                log.warning("fanotify queue overflow - some events were lost")
+                continue
+            # Marcajul acoperă tot sistemul de fișiere montat - doar folderele
+            # protejate contează; accesările monitorului însuși sunt ignorate
+            if pid == self._own_pid or not path or self._protected.longest_prefix(path) is None:
+                continue
+            # Creările și ștergerile din acest director vor fi raportate de inotify
+            self.watches.ensure(path if is_directory else os.path.dirname(path))
+            if mask & FAN_MODIFY:
+                event_type = 'modified'
+            elif mask & FAN_OPEN:
+                event_type = 'opened'
+            else:
+                event_type = 'accessed'
+            self._emit(path, event_type, is_directory, pid)
+
+    def _run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._inotify.fileno(), selectors.EVENT_READ, self._handle_inotify)
+        if self._fanotify is not None:
+            selector.register(self._fanotify.fileno(), selectors.EVENT_READ,
+                              self._handle_fanotify)
+        selector.register(self._wake_r, selectors.EVENT_READ, None)
+        try:
+            while self.running:
+                for key, _ in selector.select():
+                    if key.data is None:
+                        return
+                    try:
+                        key.data()
+                    except Exception as e:
+                        log.debug("Kernel event handling FAILED: %s", e)
+        finally:
+            selector.close()
+            self._inotify.close()
+            if self._fanotify is not None:
+                self._fanotify.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
@@ -0,0 +1,393 @@
+"""
+Metrici ale Monitorului - Contoare și histograme de latență în proces
+
+Descriere:
+    Monitorul nu raporta cât durează check_finder_windows, cât de des
+    rulează _poll_loop, cât durează captura sau cât trece de la detectare
+    la decizie - exista doar textul [DEBUG] afișat la fiecare verificare.
+
+    Registry:
+    - contoare (Counter) și histograme de latență (Histogram), opțional cu
+      etichete (ex: stage="capture"); actualizarea unei valori este o
+      adunare sub un lock, fără alocări - potrivită pentru buclele fierbinți
+    - histogramele au praguri fixe (log-spațiate, 0.1 ms - 60 s), deci
+      memoria nu crește cu numărul de observații
+    - timer(): context manager care măsoară un bloc de cod
+
+    MetricsServer:
+    - un server HTTP local (implicit 127.0.0.1:9108, vezi config.py):
+      /metrics      -> formatul text Prometheus
+      /metrics.json -> aceleași valori, ca JSON (cu percentile estimate)
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import METRICS_HOST, METRICS_PORT
+
+# Pragurile implicite ale histogramelor (secunde): 0.1 ms ... 60 s
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class Counter:
+    """
+    Contor monoton crescător.
+
+    Atribute:
+        value (float): Valoarea curentă
+    """
+
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Crește contorul cu amount."""
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return {'value': self.value}
+
+
+class Histogram:
+    """
+    Histogramă cu praguri fixe (distribuția latențelor).
+
+    Atribute:
+        buckets (tuple): Limitele superioare ale intervalelor (crescătoare)
+        counts (list): Observațiile din fiecare interval (+ unul pentru +Inf)
+        count (int): Numărul total de observații
+        sum (float): Suma observațiilor
+        max (float): Cea mai mare observație
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max', '_lock')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Înregistrează o observație (ex: o durată în secunde)."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q):
+        """
+        Estimează o percentilă prin interpolare în intervalul care o conține.
+
+        Parametri:
+            q (float): Percentila (0-1, ex: 0.99)
+
+        Returnează:
+            float: Valoarea estimată (0 dacă nu există observații)
+        """
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+            highest = self.max
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else highest
+                return min(lower + (upper - lower) * (rank - seen) / count, highest)
+            seen += count
+        return highest
+
+    def snapshot(self):
+        with self._lock:
+            count, total, highest = self.count, self.sum, self.max
+        return {
+            'count': count,
+            'sum': total,
+            'mean': total / count if count else 0.0,
+            'max': highest,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+        }
+
+
+class _Family:
+    """O metrică cu nume, descriere și câte o serie pentru fiecare combinație de etichete."""
+
+    def __init__(self, name, help_text, kind, labelnames, factory):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._series = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._series[()] = factory()
+
+    def labels(self, *values):
+        """
+        Returnează seria pentru valorile etichetelor (creată la prima utilizare).
+
+        Parametri:
+            *values: Valorile etichetelor, în ordinea labelnames
+
+        Ridică:
+            ValueError: Dacă numărul valorilor diferă de numărul etichetelor
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: se așteaptă etichetele {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._factory())
+        return series
+
+    def series(self):
+        with self._lock:
+            return sorted(self._series.items())
+
+    # Familiile fără etichete se folosesc direct, ca o singură serie
+    def inc(self, amount=1):
+        self._series[()].inc(amount)
+
+    def observe(self, value):
+        self._series[()].observe(value)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Registry:
+    """
+    Colecția de metrici a procesului.
+
+    Exemplu:
+        polls = REGISTRY.counter('monitor_polls_total', 'Verificări Finder')
+        polls.inc()
+        latency = REGISTRY.histogram('monitor_stage_seconds', 'Durata etapelor', ['stage'])
+        with REGISTRY.timer(latency.labels('capture')):
+            capture_photo()
+    """
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name, help_text, kind, labelnames, factory):
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = _Family(name, help_text, kind, labelnames, factory)
+                self._families[name] = family
+            elif family.kind != kind or family.labelnames != tuple(labelnames):
+                raise ValueError(f"Metrica {name} există deja cu alt tip sau alte etichete")
+            return family
+
+    def counter(self, name, help_text, labelnames=()):
+        """
+        Creează (sau returnează) un contor.
+
+        Parametri:
+            name (str): Numele metricii (convenția Prometheus, ex: ..._total)
+            help_text (str): Descrierea
+            labelnames (list, optional): Numele etichetelor
+
+        Returnează:
+            _Family: Metrica (inc() direct sau labels(...).inc())
+        """
+        return self._register(name, help_text, 'counter', labelnames, Counter)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Creează (sau returnează) o histogramă.
+
+        Parametri:
+            name (str): Numele metricii (ex: ..._seconds)
+            help_text (str): Descrierea
+            labelnames (list, optional): Numele etichetelor
+            buckets (tuple, optional): Limitele intervalelor
+
+        Returnează:
+            _Family: Metrica (observe() direct sau labels(...).observe())
+        """
+        return self._register(name, help_text, 'histogram', labelnames,
+                              lambda: Histogram(buckets))
+
+    @contextmanager
+    def timer(self, histogram):
+        """
+        Măsoară durata unui bloc de cod (și când blocul ridică o excepție).
+
+        Parametri:
+            histogram: Histograma (sau seria cu etichete) în care se înregistrează
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    def families(self):
+        with self._lock:
+            return sorted(self._families.values(), key=lambda family: family.name)
+
+    def render_prometheus(self):
+        """
+        Returnează toate metricile în formatul text Prometheus (versiunea 0.0.4).
+
+        Returnează:
+            str: Textul expus la /metrics
+        """
+        lines = []
+        for family in self.families():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, series in family.series():
+                labels = _format_labels(family.labelnames, values)
+                if family.kind == 'counter':
+                    lines.append(f"{family.name}{labels} {_format_value(series.value)}")
+                    continue
+                with series._lock:
+                    counts, count, total = list(series.counts), series.count, series.sum
+                cumulative = 0
+                bounds = [repr(bound) for bound in series.buckets] + ['+Inf']
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    le = _format_labels(family.labelnames, values, [('le', bound)])
+                    lines.append(f"{family.name}_bucket{le} {cumulative}")
+                lines.append(f"{family.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{family.name}_count{labels} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self):
+        """
+        Returnează toate metricile ca dicționar (pentru /metrics.json).
+
+        Returnează:
+            dict: {nume: {"type", "help", "series": [{"labels": {...}, ...valori}]}}
+        """
+        data = {}
+        for family in self.families():
+            data[family.name] = {
+                'type': family.kind,
+                'help': family.help,
+                'series': [dict(series.snapshot(), labels=dict(zip(family.labelnames, values)))
+                           for values, series in family.series()],
+            }
+        return data
+
+
+# Registry-ul procesului - folosit de monitor.py
+REGISTRY = Registry()
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Servește /metrics (Prometheus) și /metrics.json."""
+
+    registry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body = self.registry.render_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/metrics.json':
+            body = json.dumps(self.registry.to_json()).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Fiecare interogare Prometheus ar apărea altfel în consolă
+        pass
+
+
+class MetricsServer:
+    """
+    Serverul HTTP local care expune metricile.
+
+    Atribute:
+        host (str): Adresa pe care ascultă (implicit doar local)
+        port (int): Portul (0 = ales de sistem)
+        registry (Registry): Metricile expuse
+    """
+
+    def __init__(self, host=METRICS_HOST, port=METRICS_PORT, registry=REGISTRY):
+        """
+        Parametri:
+            host (str): Adresa pe care ascultă
+            port (int): Portul (0 = ales de sistem)
+            registry (Registry): Metricile expuse
+        """
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server = None
+
+    def start(self):
+        """
+        Pornește serverul pe un fir de fundal.
+
+        Returnează:
+            int: Portul pe care ascultă serverul
+
+        Ridică:
+            OSError: Dacă portul nu poate fi ocupat
+        """
+        handler = type('MetricsRequestHandler', (_MetricsRequestHandler,),
+                       {'registry': self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.thread = threading.Thread(target=self._server.serve_forever, name='metrics',
+                                       daemon=True)
+        self.thread.start()
+        return self.port
+
+    def stop(self):
+        """Oprește serverul."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -5,318 +5,737 @@ Descriere:
     Acest modul monitorizează un folder protejat și solicită aprobarea
     administratorului înainte de a permite accesul. Când cineva încearcă
     să deschidă folderul protejat, sistemul:
-    1. Detectează accesul prin monitorizarea ferestrelor Finder
+    1. Detectează accesul prin monitorizarea ferestrelor Finder (pe Linux,
+       deschiderile și citirile sunt raportate direct de kernel)
     2. Capturează o fotografie cu camera web
     3. Închide fereastra și afișează un mesaj de așteptare
     4. Trimite cererea către serverul de administrare
-    5. Așteaptă decizia administratorului (aprobare/respingere)
+    5. Așteaptă decizia administratorului (aprobare/respingere) - persoanele
+       înrolate în galeria de fețe sunt aprobate automat
     6. Dacă este aprobat, deschide folderul; dacă nu, blochează ecranul
 
 Autor: Bascacov Alexandra
 Versiune: 1.0
 """
 
+import heapq
+import logging
+import logging.handlers
 import os
+import queue
+import random
+import socket
+import sys
 import time
-import subprocess
+import uuid
 import requests
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from config import (
-    PROTECTED_FOLDER, SEARCH_ROOT, SERVER_URL, APPROVAL_TIMEOUT, ACCESS_COOLDOWN
+    PROTECTED_FOLDERS, SEARCH_ROOT, SERVER_URL, APPROVAL_TIMEOUT, ACCESS_COOLDOWN,
+    APPROVAL_CACHE_DURATION, APPROVAL_SCOPE, APPROVAL_WORKERS, DECISION_POLL_INTERVAL, WINDOW_SOURCE,
+    POLL_MIN_INTERVAL, POLL_MAX_INTERVAL, POLL_BACKOFF_FACTOR,
+    SERVER_POOL_SIZE, SERVER_CONNECT_TIMEOUT, SERVER_READ_TIMEOUT, SERVER_RETRIES,
+    SERVER_RETRY_BACKOFF, SERVER_BREAKER_THRESHOLD, SERVER_BREAKER_COOLDOWN,
+    BURST_FRAMES, BURST_INTERVAL, LOG_LEVEL, METRICS_HOST, METRICS_PORT, ACCESS_BACKEND,
+    OS_ACTIONS, TRACE_PATH
 )
+from approval_cache import ApprovalCache, RevocationListener
+from event_pipeline import CoalescingQueue, EventPipeline
+from face_gallery import create_face_matcher
+from camera import CameraError, ensure_capture_service
+from folder_discovery import find_folders
+from frame_quality import QUALITY_AVAILABLE, select_best
+from linux_access import KernelAccessMonitor, resolve_backend
+from event_trace import TraceRecorder
+from metrics import REGISTRY, MetricsServer
+from os_actions import create_os_actions, delete_ds_store
+from path_trie import PathTrie
+from spool import AttemptSpool, SpoolReplayer
+from window_sources import create_window_source, WindowSourceError
 
 # Directorul unde se salvează fotografiile capturate
 CAPTURES_DIR = os.path.join(os.path.dirname(__file__), 'captures')
 
+log = logging.getLogger('monitor')
+
+# Metricile monitorului - expuse de MetricsServer (vezi metrics.py)
+POLLS = REGISTRY.counter(
+    'monitor_polls_total', 'Iterații ale buclei _poll_loop, după rezultat', ['result'])
+POLL_STAGE_SECONDS = REGISTRY.histogram(
+    'monitor_poll_stage_seconds', 'Durata etapelor unei verificări a ferestrelor Finder',
+    ['stage'])
+EVENTS = REGISTRY.counter(
+    'monitor_events_total', 'Evenimente de fișiere primite de la watchdog', ['event_type'])
+ACCESSES = REGISTRY.counter(
+    'monitor_accesses_total', 'Accese procesate de handler, după rezultat', ['outcome'])
+HANDLER_SECONDS = REGISTRY.histogram(
+    'monitor_handler_seconds', 'Durata metodelor handler-ului de evenimente', ['stage'])
+APPROVAL_STAGE_SECONDS = REGISTRY.histogram(
+    'monitor_approval_stage_seconds',
+    'Durata etapelor fluxului de aprobare (admin_notified, decision și total: de la detectare)',
+    ['stage'])
+DECISIONS = REGISTRY.counter(
+    'monitor_decisions_total', 'Fluxuri de aprobare încheiate, după decizie', ['decision'])
+
+
+def setup_logging(level=LOG_LEVEL, prefix=''):
+    """
+    Configurează jurnalul monitorului.
 
-# Path to pre-compiled camera capture binary
-_CAMERA_BINARY = os.path.join(os.path.dirname(__file__), '.camera_capture')
-_CAMERA_SOURCE = os.path.join(os.path.dirname(__file__), '.camera_capture.swift')
+    Mesajele sub nivelul ales (config.LOG_LEVEL) sunt eliminate imediat, fără
+    a fi formatate. Celelalte sunt puse într-o coadă (QueueHandler) și scrise
+    în consolă de un fir separat (QueueListener), deci buclele de
+    monitorizare nu așteaptă niciodată după consolă.
 
-# Swift source code for camera capture
-_SWIFT_CAMERA_CODE = '''
-import AVFoundation
-import CoreImage
-import Foundation
+    Parametri:
+        level (str): Nivelul minim ("DEBUG", "INFO", "WARNING", "ERROR")
+        prefix (str, optional): Text pus înaintea fiecărui mesaj
+            (ex: "[worker 2] " pentru procesele supervizorului)
 
-class CameraCapture: NSObject, AVCapturePhotoCaptureDelegate {
-    var session: AVCaptureSession?
-    var photoOutput: AVCapturePhotoOutput?
-    var capturedData: Data?
-    var isDone = false
+    Returnează:
+        QueueListener: Firul de scriere - stop() golește coada la ieșire
+    """
+    records = queue.SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(f"[%(levelname)s] {prefix}%(message)s"))
+    listener = logging.handlers.QueueListener(records, console)
 
-    func capture(to path: String) -> Bool {
-        guard let device = AVCaptureDevice.default(for: .video) else {
-            fputs("No camera found\\n", stderr)
-            return false
-        }
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [logging.handlers.QueueHandler(records)]
+    root_logger.setLevel(level)
+    listener.start()
+    return listener
 
-        session = AVCaptureSession()
-        session?.sessionPreset = .photo
 
-        guard let input = try? AVCaptureDeviceInput(device: device) else {
-            fputs("Cannot create input\\n", stderr)
-            return false
-        }
+# Clientul serviciului de captură (vezi camera.py) - creat la prima captură
+# sau la pornirea monitorului
+_capture_client = None
+_capture_service = None
+_capture_lock = threading.Lock()
 
-        if session?.canAddInput(input) == true {
-            session?.addInput(input)
-        }
 
-        photoOutput = AVCapturePhotoOutput()
-        if session?.canAddOutput(photoOutput!) == true {
-            session?.addOutput(photoOutput!)
-        }
+def start_capture_service():
+    """
+    Pornește (sau se conectează la) serviciul de captură.
 
-        session?.startRunning()
+    Camera este încălzită o singură dată; capturile ulterioare nu mai
+    plătesc pornirea sesiunii de captură.
 
-        // Wait for camera to warm up
-        RunLoop.current.run(until: Date(timeIntervalSinceNow: 0.5))
+    Returnează:
+        CaptureClient: Clientul serviciului
+        None: Dacă nu rulează niciun serviciu și nu există o cameră reală
+              (CAMERA_BACKEND "auto" în afara macOS) - fără fotografie
+    """
+    global _capture_client, _capture_service
+    with _capture_lock:
+        if _capture_client is None:
+            _capture_client, _capture_service = ensure_capture_service()
+        return _capture_client
 
-        let settings = AVCapturePhotoSettings()
-        photoOutput?.capturePhoto(with: settings, delegate: self)
 
-        // Run the run loop until capture is done or timeout
-        let timeout = Date(timeIntervalSinceNow: 5)
-        while !isDone && Date() < timeout {
-            RunLoop.current.run(until: Date(timeIntervalSinceNow: 0.1))
-        }
+def stop_capture_service():
+    """Oprește serviciul de captură pornit de monitor (dacă există)."""
+    global _capture_client, _capture_service
+    with _capture_lock:
+        if _capture_client is not None:
+            _capture_client.close()
+        if _capture_service is not None:
+            _capture_service.stop()
+        _capture_client = _capture_service = None
 
-        session?.stopRunning()
 
-        if !isDone {
-            fputs("Capture timed out\\n", stderr)
-            return false
-        }
-
-        guard let data = capturedData else {
-            fputs("No data captured\\n", stderr)
-            return false
-        }
+def capture_filename():
+    """
+    Returnează un nume nou, unic, pentru o fotografie capturată.
 
-        do {
-            try data.write(to: URL(fileURLWithPath: path))
-            return true
-        } catch {
-            fputs("Failed to write: \\(error)\\n", stderr)
-            return false
-        }
-    }
+    Mai multe fluxuri de aprobare capturează în paralel, deci momentul
+    (la secundă) nu este suficient: un sufix aleator împiedică două capturi
+    din aceeași secundă să se suprascrie (și două încercări să refere
+    aceeași fotografie).
 
-    func photoOutput(_ output: AVCapturePhotoOutput, didFinishProcessingPhoto photo: AVCapturePhoto, error: Error?) {
-        if let error = error {
-            fputs("Photo error: \\(error)\\n", stderr)
-        } else {
-            capturedData = photo.fileDataRepresentation()
-        }
-        isDone = true
-    }
-}
+    Returnează:
+        str: Numele fișierului (ex: 'capture_20250117_143052_3f9a1c2e.jpg')
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f'capture_{timestamp}_{uuid.uuid4().hex[:8]}.jpg'
 
-guard CommandLine.arguments.count > 1 else {
-    fputs("Usage: camera_capture <output_path>\\n", stderr)
-    exit(1)
-}
 
-let capture = CameraCapture()
-let success = capture.capture(to: CommandLine.arguments[1])
-exit(success ? 0 : 1)
-'''
+def capture_photo():
+    """
+    Capturează o fotografie prin serviciul de captură.
 
+    Serviciul ține camera pornită (pe macOS, o sesiune AVFoundation
+    persistentă), deci o captură durează doar cât declanșarea și scrierea.
 
-def _ensure_camera_binary():
+    Returns:
+        str: Filename of saved photo (e.g., 'capture_20250117_143052_3f9a1c2e.jpg')
+        None: If capture failed or no camera available
     """
-    Ensure the camera capture binary exists and is compiled.
-    Compiles on first run or if source is newer than binary.
+    os.makedirs(CAPTURES_DIR, exist_ok=True)
+
+    filename = capture_filename()
+    filepath = os.path.join(CAPTURES_DIR, filename)
+
+    log.debug("Se capturează fotografia...")
+
+    client = start_capture_service()
+    if client is None:
+        log.debug("No camera available - attempt recorded without a photo")
+        return None
+    try:
+        elapsed_ms = client.capture(filepath)
+    except CameraError as e:
+        log.debug("Eșec la capturarea fotografiei: %s", e)
+        return None
+
+    log.debug("Fotografie salvată: %s (%.0f ms)", filename, elapsed_ms)
+    return filename
+
+
+def capture_best_photo(frames=BURST_FRAMES, interval=BURST_INTERVAL):
     """
-    # Check if binary exists and is up to date
-    if os.path.exists(_CAMERA_BINARY):
-        return True
+    Capturează o rafală de cadre și păstrează doar cel mai bun.
 
-    print("[DEBUG] Compiling camera capture binary...")
+    Cadrele sunt evaluate după claritate (varianța Laplacianului) și
+    expunere (vezi frame_quality.py); celelalte sunt șterse. Fără numpy
+    și Pillow sau cu frames=1 se face o singură captură.
 
+    Parametri:
+        frames (int): Numărul de cadre din rafală
+        interval (float): Pauza dintre cadre (secunde)
+
+    Returnează:
+        tuple: (numele fișierului sau None, FrameScore sau None)
+    """
+    if frames <= 1 or not QUALITY_AVAILABLE:
+        return capture_photo(), None
+
+    os.makedirs(CAPTURES_DIR, exist_ok=True)
+    burst_id = uuid.uuid4().hex[:8]
+    paths = []
     try:
-        # Write Swift source
-        with open(_CAMERA_SOURCE, 'w') as f:
-            f.write(_SWIFT_CAMERA_CODE)
-
-        # Compile to binary
-        result = subprocess.run(
-            ['swiftc', _CAMERA_SOURCE, '-o', _CAMERA_BINARY,
-             '-framework', 'AVFoundation', '-framework', 'CoreImage',
-             '-framework', 'Foundation'],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        client = start_capture_service()
+        if client is None:
+            log.debug("No camera available - attempt recorded without a photo")
+            return None, None
+        for i in range(frames):
+            if i:
+                time.sleep(interval)
+            path = os.path.join(CAPTURES_DIR, f'.burst_{burst_id}_{i}.jpg')
+            try:
+                client.capture(path)
+                paths.append(path)
+            except CameraError as e:
+                log.debug("Burst frame %s failed: %s", i, e)
+
+        if not paths:
+            log.debug("Eșec la capturarea fotografiei")
+            return None, None
+
+        started = time.monotonic()
+        best_index, scores = select_best(paths)
+        score = scores[best_index]
+        elapsed_ms = (time.monotonic() - started) * 1000
+
+        filename = capture_filename()
+        os.replace(paths[best_index], os.path.join(CAPTURES_DIR, filename))
+        if score is not None:
+            log.debug("Fotografie salvată: %s (frame %s/%s, sharpness=%.0f, exposure=%.2f, "
+                      "scored in %.1f ms)", filename, best_index + 1, len(paths),
+                      score.sharpness, score.exposure, elapsed_ms)
+        return filename, score
+    finally:
+        for path in paths:
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+class ServerUnavailable(Exception):
+    """Serverul de administrare nu a putut fi contactat (sau circuitul este deschis)."""
+
+
+class ServerRejected(ServerUnavailable):
+    """
+    Serverul a răspuns cu o eroare (4xx sau 5xx, în afară de cele tranzitorii
+    din ServerClient.RETRY_STATUSES) - retrimiterea identică a cererii va
+    eșua probabil la fel.
 
-        if result.returncode != 0:
-            print(f"[DEBUG] Swift compilation failed: {result.stderr}")
-            return False
+    Atribute:
+        status (int): Codul HTTP al răspunsului
+    """
 
-        # Clean up source file
-        os.unlink(_CAMERA_SOURCE)
-        print("[DEBUG] Camera binary compiled successfully")
-        return True
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
 
-    except Exception as e:
-        print(f"[DEBUG] Failed to compile camera binary: {e}")
-        return False
 
+class ServerClient:
+    """
+    Client HTTP comun pentru comunicarea monitorului cu serverul de administrare.
+
+    Toate cererile folosesc o singură requests.Session cu un fond de conexiuni
+    keep-alive (HTTPAdapter), deci o cerere pe o conexiune caldă costă un
+    singur round-trip, fără un nou handshake TCP/TLS.
+
+    Pe lângă fondul de conexiuni:
+        - fiecare cerere are un timeout de conectare și de citire, iar
+          reîncercările se opresc la un termen limită (deadline) per apel
+        - erorile tranzitorii sunt reîncercate cu backoff exponențial și
+          jitter; cererile POST sunt reîncercate doar dacă nu s-au putut
+          conecta (cererea sigur nu a ajuns la server) - o încercare trimisă
+          de două ori este oricum recunoscută de server după client_ref
+        - un răspuns de eroare (status >= 400) ridică ServerRejected, cu
+          mesajul 'error' din corpul JSON
+        - un circuit breaker: după SERVER_BREAKER_THRESHOLD eșecuri
+          consecutive, cererile eșuează imediat timp de
+          SERVER_BREAKER_COOLDOWN secunde; apoi o singură cerere de probă
+          decide dacă circuitul se închide
 
-def capture_photo():
+    Atribute:
+        base_url (str): Adresa serverului (ex: http://127.0.0.1:5000)
+        session (requests.Session): Sesiunea cu fondul de conexiuni
+        state (str): Starea circuitului: 'closed', 'open' sau 'half-open'
+        recorder (TraceRecorder): Înregistrarea răspunsurilor (None = dezactivată)
     """
-    Capture photo using native macOS AVFoundation framework.
-    Works on any Mac without additional software like imagesnap.
-    Uses a compiled Swift binary for reliable camera access.
 
-    Returns:
-        str: Filename of saved photo (e.g., 'capture_20250117_143052.jpg')
-        None: If capture failed or no camera available
+    # Coduri HTTP tratate ca erori tranzitorii (se reîncearcă)
+    RETRY_STATUSES = frozenset({502, 503, 504})
+
+    def __init__(self, base_url=SERVER_URL, pool_size=SERVER_POOL_SIZE,
+                 connect_timeout=SERVER_CONNECT_TIMEOUT, read_timeout=SERVER_READ_TIMEOUT,
+                 retries=SERVER_RETRIES, backoff=SERVER_RETRY_BACKOFF,
+                 breaker_threshold=SERVER_BREAKER_THRESHOLD,
+                 breaker_cooldown=SERVER_BREAKER_COOLDOWN):
+        """
+        Parametri:
+            base_url (str): Adresa serverului
+            pool_size (int): Numărul maxim de conexiuni păstrate deschise
+            connect_timeout (float): Timeout-ul de conectare (secunde)
+            read_timeout (float): Timeout-ul de citire a răspunsului (secunde)
+            retries (int): Numărul maxim de reîncercări
+            backoff (float): Pauza de bază între reîncercări (secunde)
+            breaker_threshold (int): Eșecuri consecutive care deschid circuitul
+            breaker_cooldown (float): Cât timp rămâne circuitul deschis (secunde)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.recorder = None
+
+    def get_json(self, path, deadline=None, read_timeout=None):
+        """
+        Trimite o cerere GET și returnează răspunsul JSON.
+
+        Parametri:
+            path (str): Calea relativă (ex: '/api/attempt/5')
+            deadline (float, optional): Durata maximă a apelului, cu reîncercări
+            read_timeout (float, optional): Timeout-ul de citire pentru această
+                cerere (ex: long-poll, unde serverul răspunde după câteva secunde)
+
+        Returnează:
+            dict: Răspunsul decodat
+
+        Ridică:
+            ServerUnavailable: Dacă serverul nu a răspuns până la termen
+        """
+        return self._call('GET', path, deadline=deadline, idempotent=True,
+                          read_timeout=read_timeout)
+
+    def post_json(self, path, payload, deadline=None):
+        """
+        Trimite o cerere POST cu corp JSON și returnează răspunsul JSON.
+
+        Parametri:
+            path (str): Calea relativă (ex: '/api/attempt')
+            payload (dict): Corpul cererii
+            deadline (float, optional): Durata maximă a apelului, cu reîncercări
+
+        Returnează:
+            dict: Răspunsul decodat
+
+        Ridică:
+            ServerUnavailable: Dacă serverul nu a răspuns până la termen
+        """
+        return self._call('POST', path, json=payload, deadline=deadline, idempotent=False)
+
+    def close(self):
+        """Închide conexiunile din fond."""
+        self.session.close()
+
+    def _call(self, method, path, **kwargs):
+        """Execută cererea și o înregistrează (dacă există un recorder)."""
+        try:
+            data = self._request(method, path, **kwargs)
+        except ServerUnavailable as e:
+            if self.recorder is not None:
+                self.recorder.server(method, path, error=e)
+            raise
+        if self.recorder is not None:
+            self.recorder.server(method, path, data)
+        return data
+
+    def _before_request(self):
+        """Verifică circuitul; ridică ServerUnavailable dacă este deschis."""
+        with self._lock:
+            if self.state == 'closed':
+                return
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.breaker_cooldown:
+                    raise ServerUnavailable('circuit open')
+                self.state = 'half-open'
+            # half-open: o singură cerere de probă la un moment dat
+            if self._probe_in_flight:
+                raise ServerUnavailable('circuit half-open')
+            self._probe_in_flight = True
+
+    def _record(self, success):
+        with self._lock:
+            self._probe_in_flight = False
+            if success:
+                if self.state != 'closed':
+                    log.debug("Server circuit CLOSED")
+                self.state = 'closed'
+                self._failures = 0
+                return
+            self._failures += 1
+            if self.state == 'half-open' or self._failures >= self.breaker_threshold:
+                if self.state != 'open':
+                    log.debug("Server circuit OPEN for %ss after %s failure(s)",
+                              self.breaker_cooldown, self._failures)
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+    def _request(self, method, path, deadline=None, idempotent=True, read_timeout=None, **kwargs):
+        url = f"{self.base_url}{path}"
+        read_timeout = read_timeout or self.read_timeout
+        budget = deadline if deadline is not None else self.connect_timeout + read_timeout
+        end = time.monotonic() + budget
+        attempt = 0
+        while True:
+            self._before_request()
+            remaining = end - time.monotonic()
+            timeout = (min(self.connect_timeout, max(remaining, 0.05)),
+                       min(read_timeout, max(remaining, 0.05)))
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                # O cerere care nu este idempotentă este reîncercată doar dacă
+                # nu s-a putut conecta; o conexiune închisă după trimitere
+                # (ex: RemoteDisconnected) poate să fi ajuns deja la server
+                error, retryable = e, idempotent or _connect_failed(e)
+            except requests.exceptions.Timeout as e:
+                error, retryable = e, idempotent
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    # Serverul a răspuns - inclusiv cu o eroare, care nu se reîncearcă
+                    self._record(True)
+                    return _decode(response)
+                error, retryable = ServerUnavailable(f"HTTP {response.status_code}"), idempotent
+
+            self._record(False)
+            attempt += 1
+            delay = self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+            if (not retryable or attempt > self.retries or self.state == 'open'
+                    or time.monotonic() + delay >= end):
+                raise ServerUnavailable(f"{method} {path}: {error}") from error
+            time.sleep(delay)
+
+
+def _connect_failed(error):
     """
-    os.makedirs(CAPTURES_DIR, exist_ok=True)
+    Verifică dacă o eroare de conexiune a apărut înainte de trimiterea cererii.
 
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f'capture_{timestamp}.jpg'
-    filepath = os.path.join(CAPTURES_DIR, filename)
+    Parametri:
+        error (requests.ConnectionError): Eroarea
+
+    Returnează:
+        bool: True pentru un timeout de conectare sau o conexiune nouă eșuată
+              (refuzată, adresă inexistentă) - cererea sigur nu a ajuns la server
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, 'reason', reason), NewConnectionError)
 
-    print(f"[DEBUG] Se capturează fotografia cu AVFoundation...")
 
-    # Ensure camera binary is compiled
-    if not _ensure_camera_binary():
-        print("[DEBUG] Camera binary not available")
-        return None
+def _decode(response):
+    """
+    Decodează răspunsul JSON al serverului.
+
+    Parametri:
+        response (requests.Response): Răspunsul (orice status în afară de
+            ServerClient.RETRY_STATUSES)
 
+    Returnează:
+        dict: Răspunsul decodat (status < 400)
+
+    Ridică:
+        ServerRejected: Pentru status >= 400 (mesajul 'error' din corp, dacă există)
+        ServerUnavailable: Dacă un răspuns de succes nu este JSON
+    """
+    status = response.status_code
     try:
-        # Run the camera capture binary
-        result = subprocess.run(
-            [_CAMERA_BINARY, filepath],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        data = response.json()
+    except ValueError as e:
+        if status >= 400:
+            raise ServerRejected(status, f"HTTP {status}: invalid response") from e
+        raise ServerUnavailable(f"invalid response: {e}") from e
+    if status >= 400:
+        message = data.get('error') if isinstance(data, dict) else None
+        raise ServerRejected(status, f"HTTP {status}: {message or 'error'}")
+    return data
+
+
+class AdaptivePollScheduler:
+    """
+    Planificator adaptiv pentru verificarea ferestrelor Finder.
+
+    În loc de o pauză fixă de 0.5 secunde, intervalul dintre verificări
+    se adaptează activității:
+        - după o activitate în folderul protejat (eveniment watchdog)
+          intervalul revine la minim - detectare rapidă
+        - la fiecare verificare fără rezultat intervalul crește exponențial,
+          până la maxim - mai puține treziri ale procesorului când nu se
+          întâmplă nimic
+        - cât timp se așteaptă o decizie sau aprobarea este în cache,
+          verificarea este suspendată complet
+
+    Planificatorul înregistrează și compromisul dintre latența de detectare
+    și numărul de treziri (vezi stats()).
+
+    Atribute:
+        min_interval (float): Intervalul minim între verificări (secunde)
+        max_interval (float): Intervalul maxim între verificări (secunde)
+        backoff_factor (float): Factorul de creștere a intervalului
+        interval (float): Intervalul curent
+        polls (int): Numărul de verificări efectuate
+        wakeups (int): Numărul de treziri ale firului de verificare
+        detections (int): Numărul de detectări
+        suspended_time (float): Timpul total petrecut în suspendare (secunde)
+    """
+
+    # Numărul de latențe de detectare păstrate pentru statistici
+    LATENCY_SAMPLES = 256
+
+    def __init__(self, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                 backoff_factor=POLL_BACKOFF_FACTOR):
+        """
+        Parametri:
+            min_interval (float): Intervalul minim între verificări (secunde)
+            max_interval (float): Intervalul maxim între verificări (secunde)
+            backoff_factor (float): Factorul de creștere a intervalului
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.interval = min_interval
+        self.polls = 0
+        self.wakeups = 0
+        self.detections = 0
+        self.suspended_time = 0.0
+        self._started = time.monotonic()
+        self._last_activity = None
+        self._latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self._intervals_at_detection = deque(maxlen=self.LATENCY_SAMPLES)
+        self._wake_event = threading.Event()
+
+    def notify_activity(self):
+        """
+        Semnalează activitate în folderul protejat.
 
-        if result.returncode == 0 and os.path.exists(filepath):
-            print(f"[DEBUG] Fotografie salvată: {filename}")
-            return filename
+        Intervalul revine la minim și firul de verificare este trezit imediat.
+        """
+        self._last_activity = time.monotonic()
+        self.interval = self.min_interval
+        self._wake_event.set()
+
+    def wake(self):
+        """Trezește firul de verificare (ex: s-a terminat așteptarea unei decizii)."""
+        self._wake_event.set()
+
+    def record_poll(self, detected):
+        """
+        Înregistrează rezultatul unei verificări și ajustează intervalul.
+
+        Parametri:
+            detected (bool): True dacă verificarea a detectat folderul protejat
+        """
+        self.polls += 1
+        if detected:
+            self.detections += 1
+            self._intervals_at_detection.append(self.interval)
+            if self._last_activity is not None:
+                self._latencies.append(time.monotonic() - self._last_activity)
+                self._last_activity = None
+            self.interval = self.min_interval
         else:
-            if result.stderr:
-                # Filter out the harmless KVO warning
-                errors = [l for l in result.stderr.strip().split('\n')
-                          if 'NSKVONotifying' not in l]
-                if errors:
-                    print(f"[DEBUG] Camera error: {'; '.join(errors)}")
-            print("[DEBUG] Eșec la capturarea fotografiei")
-            return None
+            self.interval = min(self.interval * self.backoff_factor, self.max_interval)
 
-    except subprocess.TimeoutExpired:
-        print("[DEBUG] Camera capture timed out")
-        return None
-    except Exception as e:
-        print(f"[DEBUG] Eroare la capturarea fotografiei: {e}")
-        return None
+    def wait(self):
+        """Așteaptă intervalul curent (sau până la o trezire)."""
+        self._sleep(self.interval)
+
+    def suspend(self, timeout=None):
+        """
+        Suspendă verificarea până la trezire sau până expiră timeout-ul.
+
+        După suspendare intervalul revine la minim - starea tocmai s-a
+        schimbat (decizie primită, aprobare expirată), deci utilizatorul
+        este probabil activ.
+
+        Parametri:
+            timeout (float, optional): Durata maximă a suspendării (secunde)
+        """
+        started = time.monotonic()
+        self._sleep(timeout)
+        self.suspended_time += time.monotonic() - started
+        self.interval = self.min_interval
+
+    def _sleep(self, timeout):
+        self._wake_event.wait(timeout)
+        self._wake_event.clear()
+        self.wakeups += 1
+
+    def stats(self):
+        """
+        Returnează statisticile planificatorului.
+
+        Returnează:
+            dict: polls, wakeups, wakeups_per_minute, suspended_time,
+                  detections, interval curent, latența de detectare
+                  (mediană și maximă, în secunde, măsurată de la ultima
+                  activitate) și intervalul mediu în momentul detectării
+        """
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        latencies = sorted(self._latencies)
+        intervals = list(self._intervals_at_detection)
+        return {
+            'polls': self.polls,
+            'wakeups': self.wakeups,
+            'wakeups_per_minute': self.wakeups * 60.0 / elapsed,
+            'suspended_time': self.suspended_time,
+            'detections': self.detections,
+            'interval': self.interval,
+            'detection_latency_median': latencies[len(latencies) // 2] if latencies else None,
+            'detection_latency_max': latencies[-1] if latencies else None,
+            'interval_at_detection_mean': sum(intervals) / len(intervals) if intervals else None,
+        }
 
 
 class FinderWindowMonitor:
     """
     Monitor pentru Ferestrele Finder - Detectează deschiderea folderului protejat.
 
-    Această clasă verifică periodic (la fiecare 0.5 secunde) toate ferestrele
-    Finder deschise pentru a detecta dacă utilizatorul încearcă să acceseze
-    folderul protejat sau oricare subfolder al acestuia.
+    Această clasă verifică periodic (la un interval adaptiv, vezi
+    AdaptivePollScheduler) toate ferestrele Finder deschise pentru a detecta
+    dacă utilizatorul încearcă să acceseze unul dintre folderele protejate
+    sau oricare subfolder al acestora.
 
     Funcționare:
-        - Folosește AppleScript pentru a interoga aplicația Finder
+        - Interoghează o sursă de ferestre (vezi window_sources.py) - implicit
+          un proces osascript persistent pe macOS
         - Obține lista tuturor căilor deschise în ferestre Finder
-        - Compară căile cu folderul protejat
+        - Găsește folderul protejat al fiecărei căi prin trie-ul handler-ului
+          (O(adâncime), indiferent de numărul de foldere protejate)
         - Declanșează fluxul de aprobare când detectează acces
 
     Atribute:
-        protected_path (str): Calea completă către folderul protejat
         handler (FolderAccessHandler): Obiectul care gestionează evenimentele
+        window_source (WindowSource): Sursa din care se citesc ferestrele
+        scheduler (AdaptivePollScheduler): Planificatorul verificărilor
         running (bool): Indicator dacă monitorul este activ
     """
 
-    def __init__(self, protected_path, handler):
+    def __init__(self, handler, window_source=None):
         """
         Inițializează monitorul pentru ferestre Finder.
 
         Parametri:
-            protected_path (str): Calea către folderul de monitorizat
             handler (FolderAccessHandler): Handler-ul pentru evenimente
+                (conține folderele protejate)
+            window_source (WindowSource, optional): Sursa de ferestre
+                (implicit cea din config.WINDOW_SOURCE)
         """
-        self.protected_path = protected_path
         self.handler = handler
+        self.window_source = window_source or create_window_source(WINDOW_SOURCE)
+        self.scheduler = AdaptivePollScheduler()
         self.running = False
 
+        # Handler-ul trezește planificatorul la activitate și la schimbări de stare
+        handler.poll_scheduler = self.scheduler
+
     def check_finder_windows(self):
         """
-        Verifică dacă Finder are folderul protejat deschis.
+        Verifică dacă Finder are deschis vreun folder protejat.
 
-        Folosește AppleScript pentru a obține lista tuturor ferestrelor Finder
-        și verifică dacă vreuna dintre ele afișează folderul protejat.
+        Obține lista tuturor ferestrelor Finder de la sursa de ferestre
+        și caută, pentru fiecare, folderul protejat care o conține.
+        Folderele care așteaptă deja o decizie, au o aprobare validă sau
+        sunt în perioada de cooldown sunt ignorate.
 
         Returnează:
-            bool: True dacă folderul protejat este deschis, False altfel
-        """
-        # Script AppleScript pentru a obține toate căile ferestrelor Finder
-        # Folosește 'folder of' pentru a gestiona ferestrele de folder obișnuite
-        script = '''
-        tell application "Finder"
-            set windowPaths to {}
-            set windowCount to count of windows
-            repeat with i from 1 to windowCount
-                try
-                    set w to window i
-                    set t to target of w
-                    set p to POSIX path of (t as alias)
-                    set end of windowPaths to p
-                on error errMsg
-                    -- Window might be a special view (Recents, Tags, etc.)
-                    log "Window " & i & " error: " & errMsg
-                end try
-            end repeat
-            return windowPaths
-        end tell
-        '''
-        result = subprocess.run(
-            ['osascript', '-e', script],
-            capture_output=True,
-            text=True
-        )
-        # Log raw output for debugging
-        raw_out = result.stdout.strip()
-        raw_err = result.stderr.strip()
-        if raw_out or raw_err:
-            print(f"[DEBUG] AppleScript output: '{raw_out}' | stderr: '{raw_err}'")
-        if result.returncode != 0:
-            print(f"[DEBUG] AppleScript FAILED: rc={result.returncode}, stderr='{result.stderr.strip()}'")
-        if result.returncode == 0:
-            # Parse the output - it's a comma-separated list
-            paths = result.stdout.strip()
-            if paths:
-                print(f"[DEBUG] Finder windows detected: {paths}")
-                print(f"[DEBUG] Looking for: {self.protected_path} (or subfolders)")
-                # Check if our protected folder OR any subfolder is open
-                # Normalize paths for comparison
-                protected_normalized = self.protected_path.rstrip('/') + '/'
-                for path in paths.split(', '):
-                    path_normalized = path.strip().rstrip('/') + '/'
-                    # Check if path is the protected folder OR inside it
-                    if path_normalized.startswith(protected_normalized) or path_normalized == protected_normalized:
-                        print(f"[DEBUG] MATCH FOUND: '{path_normalized}' is within protected area")
-                        return True
-        return False
+            list: Folderele protejate (ProtectedRoot) deschise care necesită
+                  aprobare - listă goală dacă nu există
+        """
+        started = time.perf_counter()
+        recorder = self.handler.recorder
+        try:
+            paths = self.window_source.list_window_paths()
+        except WindowSourceError as e:
+            POLLS.labels('source_error').inc()
+            log.debug("Window source '%s' FAILED: %s", self.window_source.name, e)
+            if recorder is not None:
+                recorder.windows(None)
+            return []
+        finally:
+            listed = time.perf_counter()
+            POLL_STAGE_SECONDS.labels('list_windows').observe(listed - started)
+        if recorder is not None:
+            recorder.windows(paths)
+
+        matched = []
+        for path in paths:
+            # Check if path is a protected folder OR inside one
+            root = self.handler.root_for(path)
+            if root is None or root in matched:
+                continue
+            if root.pending_approval or self.handler.is_approval_cached(path=path):
+                continue
+            if self.handler.in_cooldown(root):
+                continue
+            log.debug("MATCH FOUND: '%s' is within protected area %s", path, root.path)
+            matched.append(root)
+        POLL_STAGE_SECONDS.labels('match').observe(time.perf_counter() - listed)
+        return matched
 
     def start(self):
         """
         Pornește monitorizarea ferestrelor Finder.
 
         Creează un fir de execuție (thread) separat care verifică periodic
-        toate ferestrele Finder pentru a detecta accesul la folderul protejat.
+        toate ferestrele Finder pentru a detecta accesul la folderele protejate.
         """
         self.running = True
         self.thread = threading.Thread(target=self._poll_loop, daemon=True)
@@ -325,32 +744,549 @@ class FinderWindowMonitor:
     def stop(self):
         """Oprește monitorizarea ferestrelor Finder."""
         self.running = False
+        self.scheduler.wake()
+        self.window_source.close()
+
+        stats = self.scheduler.stats()
+        log.info("Finder polling: %s polls, %.1f wakeups/min, %.0fs suspended, %s detections",
+                 stats['polls'], stats['wakeups_per_minute'], stats['suspended_time'],
+                 stats['detections'])
 
     def _poll_loop(self):
         """
-        Buclă de verificare periodică - rulează în fundal.
+        Buclă de verificare adaptivă - rulează în fundal.
+
+        Verifică ferestrele Finder la intervalul dat de planificator. Dacă
+        detectează că un folder protejat este deschis, declanșează fluxul de
+        aprobare. Cât timp toate folderele protejate așteaptă o decizie sau
+        au o aprobare validă, bucla este suspendată (fără treziri inutile).
+        """
+        log.debug("_poll_loop STARTED")
+        suspended_reason = None
+        while self.running:
+            suspension = self.handler.poll_suspension()
+            if suspension is not None:
+                reason, timeout = suspension
+                if suspended_reason != reason:
+                    log.debug("Polling suspended (%s)", reason)
+                    suspended_reason = reason
+                POLLS.labels('suspended').inc()
+                # Handler-ul ne trezește când se termină fluxul de aprobare;
+                # timeout-ul este expirarea aprobării sau o plasă de siguranță
+                self.scheduler.suspend(timeout=timeout)
+                continue
+
+            if suspended_reason is not None:
+                log.debug("Polling resumed")
+                suspended_reason = None
+
+            with REGISTRY.timer(POLL_STAGE_SECONDS.labels('check')):
+                opened_roots = self.check_finder_windows()
+            self.scheduler.record_poll(bool(opened_roots))
+            POLLS.labels('detected' if opened_roots else 'checked').inc()
+            for root in opened_roots:
+                log.info("Finder window detected for protected folder: %s", root.path)
+                root.last_access_time = self.handler.clock.time()
+                self.handler.handle_access(root.path, 'folder_opened')
+            if not opened_roots:
+                self.scheduler.wait()
+
+
+class ProtectedRoot:
+    """
+    Un folder protejat, cu politica și starea de aprobare proprii.
+
+    Fiecare folder protejat are propriul cooldown între alerte, propria
+    durată de valabilitate a aprobării și propria stare (așteaptă decizie),
+    astfel încât accesul la un folder nu blochează accesul la altul.
+    Aprobările sunt păstrate în cache-ul handler-ului (vezi approval_cache.py),
+    per cale aprobată.
+
+    Atribute:
+        path (str): Calea completă către folderul protejat
+        cooldown (float): Timpul minim (secunde) între două alerte
+        approval_cache_duration (float): Cât timp (secunde) rămâne validă o aprobare
+        last_access_time (float): Timestamp-ul ultimului acces detectat
+        pending_approval (bool): True dacă așteptăm o decizie
+    """
+
+    def __init__(self, path, cooldown=ACCESS_COOLDOWN, approval_cache_duration=APPROVAL_CACHE_DURATION):
+        """
+        Parametri:
+            path (str): Calea completă către folderul protejat
+            cooldown (float): Timpul minim (secunde) între două alerte
+            approval_cache_duration (float): Durata de valabilitate a aprobării
+        """
+        self.path = os.path.normpath(path)
+        self.cooldown = cooldown
+        self.approval_cache_duration = approval_cache_duration
+        self.last_access_time = 0
+        self.pending_approval = False
+
+    def __repr__(self):
+        return f"ProtectedRoot({self.path!r})"
+
+
+class ApprovalRequest:
+    """
+    O cerere de aprobare - mașina de stări pentru un acces detectat.
+
+    Cererea este înregistrată pe server imediat; în paralel cu înregistrarea
+    rulează două etape secundare:
+        - captura fotografiei, atașată încercării când este gata
+        - acțiunile de interfață (închiderea ferestrei, popup de așteptare)
+
+    Dacă fotografia arată o persoană înrolată în galeria de fețe, cererea
+    este aprobată local (face_match), fără a aștepta administratorul.
+
+    Stări (etapa principală):
+        registering -> trimiterea cererii la server
+        waiting     -> o interogare a serverului; se re-planifică până la
+                       decizie, până la o potrivire facială sau până la
+                       expirarea APPROVAL_TIMEOUT
+        approved    -> aprobare în cache, deschiderea folderului
+        denied      -> avertisment; blocarea ecranului după LOCK_DELAY
+        locking     -> blocarea ecranului
+        done        -> curățenie (starea folderului, .DS_Store, reluarea verificării)
+
+    Atribute:
+        root (ProtectedRoot): Folderul protejat al cererii
+        path (str): Calea accesată
+        access_type (str): Tipul accesului
+        state (str): Starea curentă
+        client_ref (str): Identificatorul local al încercării (spool, server)
+        attempt_id (int): ID-ul încercării pe server (după înregistrare)
+        photo_filename (str): Fotografia capturată
+        photo_score (FrameScore): Scorurile fotografiei (modul rafală)
+        face_match (FaceMatch): Persoana înrolată recunoscută în fotografie
+        generation (int): Versiunea programării - pașii programați pentru o
+            versiune mai veche sunt ignorați (vezi ApprovalEngine.decide_locally)
+        popup_process: Popup-ul de așteptare al cererii (vezi os_actions.py)
+        deadline (float): Momentul refuzului automat (în starea waiting)
+        polls (int): Numărul de interogări ale serverului
+        decision (str): 'approved' sau 'denied' după decizie
+        timings (dict): Durata fiecărei etape (secunde), ex: {'register': 0.004}
+    """
+
+    REGISTERING = 'registering'
+    WAITING = 'waiting'
+    APPROVED = 'approved'
+    DENIED = 'denied'
+    LOCKING = 'locking'
+    DONE = 'done'
+
+    # Stările în care decizia este deja luată
+    FINAL_STATES = (APPROVED, DENIED, LOCKING, DONE)
+
+    def __init__(self, root, path, access_type, clock=time):
+        self.root = root
+        self.path = path
+        self.access_type = access_type
+        self.state = self.REGISTERING
+        self.client_ref = uuid.uuid4().hex
+        self.attempt_id = None
+        self.registered = False
+        self.photo_filename = None
+        self.photo_score = None
+        self.photo_attached = False
+        self.face_match = None
+        self.generation = 0
+        self.popup_process = None
+        self.deadline = None
+        self.polls = 0
+        self.decision = None
+        self.timings = {}
+        self.clock = clock
+        self.created_at = clock.time()
+        self._started = clock.monotonic()
+        self.lock = threading.Lock()
+
+    def record(self, stage, started):
+        """
+        Înregistrează durata unei etape.
+
+        Parametri:
+            stage (str): Numele etapei
+            started (float): Momentul începerii (clock.monotonic)
+        """
+        self.timings[stage] = self.clock.monotonic() - started
+
+    def elapsed(self):
+        """Secundele trecute de la detectarea accesului."""
+        return self.clock.monotonic() - self._started
+
+    def __repr__(self):
+        return f"ApprovalRequest({self.path!r}, state={self.state!r}, attempt_id={self.attempt_id})"
+
+
+class ApprovalEngine:
+    """
+    Execută cererile de aprobare ca mașini de stări independente.
+
+    Fiecare pas al unei cereri este o sarcină scurtă executată de un fond
+    de fire (ThreadPoolExecutor). Între interogările serverului cererea nu
+    ocupă niciun fir: pasul următor este programat pe un temporizator
+    (un singur fir cu un heap de termene). Astfel:
+        - firele de detectare (watchdog, pipeline, verificarea ferestrelor)
+          doar adaugă cereri și revin imediat
+        - cereri pentru foldere protejate diferite așteaptă decizia în paralel
+        - pentru un folder protejat există cel mult o cerere activă
+
+    Înregistrarea pe server, captura fotografiei și acțiunile de interfață
+    pornesc în același timp; administratorul vede cererea după un singur
+    round-trip, iar fotografia apare când este gata. Duratele etapelor sunt
+    păstrate pe cerere (ApprovalRequest.timings) și agregate în stage_stats().
+
+    Dacă există o galerie de fețe, fotografia este comparată cu ea imediat
+    după captură; o persoană înrolată este aprobată fără interogarea
+    serverului (decide_locally), iar decizia este trimisă pentru audit.
+
+    Atribute:
+        handler (FolderAccessHandler): Furnizează acțiunile (server, UI, ecran)
+        workers (int): Numărul de fire de execuție pentru pași
+        poll_interval (float): Intervalul dintre interogările serverului (secunde)
+        face_matcher (FaceMatcher): Recunoașterea persoanelor înrolate (None = dezactivată)
+        clock: Sursa de timp - modulul time sau un ceas virtual (reluări, vezi event_trace.py)
+        capture (callable): Captura fotografiei - returnează (fișier, FrameScore)
+    """
+
+    # Pauza (secunde) dintre avertismentul de refuz și blocarea ecranului
+    LOCK_DELAY = 5
+
+    def __init__(self, handler, workers=APPROVAL_WORKERS, poll_interval=DECISION_POLL_INTERVAL,
+                 face_matcher=None, clock=time, capture=None):
+        """
+        Parametri:
+            handler (FolderAccessHandler): Handler-ul care execută acțiunile
+            workers (int): Numărul de fire de execuție pentru pași
+            poll_interval (float): Intervalul dintre interogările serverului
+            face_matcher (FaceMatcher, optional): Recunoașterea persoanelor înrolate
+            clock: Sursa de timp (time() și monotonic())
+            capture (callable, optional): Captura (implicit capture_best_photo)
+        """
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.face_matcher = face_matcher
+        self.clock = clock
+        self.capture = capture if capture is not None else capture_best_photo
+        self.running = False
+        self._executor = None
+        self._active = {}
+        self._lock = threading.Lock()
+        self._timers = []
+        self._timer_seq = 0
+        self._timer_cond = threading.Condition()
+        self._stage_totals = {}
+        self._steps = {
+            ApprovalRequest.REGISTERING: self._step_registering,
+            ApprovalRequest.WAITING: self._step_waiting,
+            ApprovalRequest.APPROVED: self._step_approved,
+            ApprovalRequest.DENIED: self._step_denied,
+            ApprovalRequest.LOCKING: self._step_locking,
+            ApprovalRequest.DONE: self._step_done,
+        }
+
+    def start(self):
+        """Pornește fondul de fire și temporizatorul."""
+        self.running = True
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix='approval')
+        self._timer_thread = threading.Thread(target=self._timer_loop, name='approval-timer',
+                                              daemon=True)
+        self._timer_thread.start()
+
+    def stop(self):
+        """Oprește execuția (cererile active sunt abandonate)."""
+        self.running = False
+        with self._timer_cond:
+            self._timer_cond.notify_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, root, path, access_type):
+        """
+        Adaugă o cerere de aprobare (revine imediat).
+
+        Parametri:
+            root (ProtectedRoot): Folderul protejat accesat
+            path (str): Calea accesată
+            access_type (str): Tipul accesului
+
+        Returnează:
+            ApprovalRequest: Cererea creată
+            None: Dacă folderul are deja o cerere activă
+        """
+        with self._lock:
+            if root.path in self._active:
+                return None
+            request = ApprovalRequest(root, path, access_type, clock=self.clock)
+            self._active[root.path] = request
+            root.pending_approval = True
+        self._schedule(request)
+        if self.running:
+            self._executor.submit(self._run_side_stage, 'capture', self._stage_capture, request)
+            self._executor.submit(self._run_side_stage, 'ui', self._stage_ui, request)
+        return request
+
+    def active_requests(self):
+        """
+        Returnează cererile în curs.
 
-        Verifică ferestrele Finder la fiecare 0.5 secunde. Dacă detectează
-        că folderul protejat este deschis, declanșează fluxul de aprobare.
+        Returnează:
+            list: Lista ApprovalRequest active
         """
-        print("[DEBUG] _poll_loop STARTED")
-        poll_num = 0
+        with self._lock:
+            return list(self._active.values())
+
+    def stage_stats(self):
+        """
+        Returnează duratele agregate ale etapelor.
+
+        Returnează:
+            dict: etapă -> {'count', 'mean', 'max'} (secunde)
+        """
+        with self._lock:
+            return {
+                stage: {'count': len(values), 'mean': sum(values) / len(values), 'max': max(values)}
+                for stage, values in self._stage_totals.items()
+            }
+
+    def decide_locally(self, request, match):
+        """
+        Aprobă o cerere pe baza recunoașterii faciale (fără administrator).
+
+        Dacă cererea așteaptă deja decizia, interogarea programată este
+        anulată (versiunea programării crește) și pasul următor rulează
+        imediat; în timpul înregistrării, decizia este preluată de primul
+        pas de așteptare.
+
+        Parametri:
+            request (ApprovalRequest): Cererea
+            match (FaceMatch): Persoana recunoscută
+        """
+        with request.lock:
+            if request.state in ApprovalRequest.FINAL_STATES:
+                return
+            request.face_match = match
+            if request.state != ApprovalRequest.WAITING:
+                return
+            request.generation += 1
+            generation = request.generation
+        self._schedule(request, 0, generation)
+
+    def _schedule(self, request, delay=0, generation=None):
+        """Programează pasul curent al cererii (imediat sau după delay secunde)."""
+        if not self.running:
+            return
+        if generation is None:
+            generation = request.generation
+        if delay <= 0:
+            self._executor.submit(self._run_step, request, generation)
+            return
+        with self._timer_cond:
+            self._timer_seq += 1
+            heapq.heappush(self._timers, (self.clock.monotonic() + delay, self._timer_seq,
+                                          request, generation))
+            self._timer_cond.notify()
+
+    def _timer_loop(self):
+        """Mută cererile al căror termen a expirat în fondul de fire."""
         while self.running:
-            poll_num += 1
-            if self.handler.pending_approval:
-                if poll_num % 10 == 1:
-                    print(f"[DEBUG] Poll #{poll_num} - skipped (pending_approval=True)")
-            elif self.handler.is_approval_cached(path=self.protected_path, log=True):  # Always log
-                pass  # Skip - approval cached
+            with self._timer_cond:
+                if not self._timers:
+                    self._timer_cond.wait()
+                    continue
+                due, _, request, generation = self._timers[0]
+                delay = due - self.clock.monotonic()
+                if delay > 0:
+                    self._timer_cond.wait(delay)
+                    continue
+                heapq.heappop(self._timers)
+            if generation == request.generation:
+                self._schedule(request, 0, generation)
+
+    def _run_step(self, request, generation):
+        """Execută pasul curent și trece cererea în starea următoare."""
+        if generation != request.generation:
+            return
+        state = request.state
+        try:
+            next_state, delay = self._steps[state](request)
+        except Exception as e:
+            log.debug("Approval step '%s' FAILED for %s: %s", state, request.path, e)
+            # Eșec -> refuz (fail closed); un eșec în refuz sau curățenie încheie cererea
+            if state in (ApprovalRequest.DENIED, ApprovalRequest.LOCKING):
+                next_state, delay = ApprovalRequest.DONE, 0
+            elif state == ApprovalRequest.DONE:
+                return
             else:
-                if poll_num % 10 == 1:  # Print every 5 seconds (10 * 0.5s)
-                    print(f"[DEBUG] Poll #{poll_num} - checking Finder windows...")
-                is_open = self.check_finder_windows()
-                if is_open:
-                    print(f"[DEBUG] Protected folder detected in Finder!")
-                    print("\n[Finder window detected for protected folder]")
-                    self.handler.handle_access(self.protected_path, 'folder_opened')
-            time.sleep(0.5)
+                next_state, delay = ApprovalRequest.DENIED, 0
+
+        if next_state is None:
+            return
+        with request.lock:
+            # Cererea a fost re-programată între timp (decizie locală)
+            if generation != request.generation:
+                return
+            request.state = next_state
+        if next_state != state:
+            log.debug("%s: %s -> %s", request.root.path, state, next_state)
+        self._schedule(request, delay, generation)
+
+    def _run_side_stage(self, name, stage, request):
+        """Execută o etapă secundară (captură, interfață) și îi măsoară durata."""
+        started = self.clock.monotonic()
+        try:
+            stage(request)
+        except Exception as e:
+            log.debug("Approval stage '%s' FAILED for %s: %s", name, request.path, e)
+        finally:
+            request.record(name, started)
+
+    def _stage_capture(self, request):
+        """
+        Capturează fotografia, o compară cu galeria de fețe și o atașează
+        încercării (dacă este deja înregistrată).
+        """
+        photo_filename, request.photo_score = self.capture()
+        with request.lock:
+            request.photo_filename = photo_filename
+            ready = request.registered
+
+        if photo_filename and self.face_matcher is not None:
+            started = self.clock.monotonic()
+            match = self.face_matcher.match_photo(os.path.join(CAPTURES_DIR, photo_filename))
+            request.record('face_match', started)
+            if match is not None:
+                log.debug("Face match: %s (similarity %.3f)", match.name, match.similarity)
+                self.decide_locally(request, match)
+
+        if photo_filename and ready:
+            self._attach_photo(request)
+
+    def _stage_ui(self, request):
+        """Închide fereastra și afișează popup-ul de așteptare."""
+        log.info("Closing Finder window - awaiting approval...")
+        self.handler.os_actions.close_finder_window(request.root.path)
+        popup_process = self.handler.os_actions.show_waiting_popup()
+        with request.lock:
+            request.popup_process = popup_process
+            decided = request.state in ApprovalRequest.FINAL_STATES
+        # Decizia a sosit înaintea popup-ului - îl închidem imediat
+        if decided:
+            self.handler.os_actions.close_waiting_popup(popup_process)
+
+    def _attach_photo(self, request):
+        """Atașează fotografia încercării (o singură dată, pe server sau în spool)."""
+        with request.lock:
+            if request.photo_attached or not request.photo_filename:
+                return
+            request.photo_attached = True
+        started = self.clock.monotonic()
+        self.handler.attach_photo(request.client_ref, request.attempt_id, request.photo_filename,
+                                  request.photo_score)
+        request.record('attach', started)
+
+    def _step_registering(self, request):
+        started = self.clock.monotonic()
+        request.attempt_id = self.handler.send_to_server(
+            request.path, request.access_type, client_ref=request.client_ref
+        )
+        request.record('register', started)
+        with request.lock:
+            request.registered = True
+            photo_ready = request.photo_filename is not None
+        # Fotografia a fost gata înaintea înregistrării
+        if photo_ready:
+            self._attach_photo(request)
+
+        if not request.attempt_id:
+            # Persoana a fost deja recunoscută - aprobarea nu depinde de server
+            if request.face_match is not None:
+                return self._approve_face_match(request)
+            log.warning("Failed to contact server - denying access")
+            return ApprovalRequest.DENIED, 0
+
+        request.timings['admin_notified'] = request.elapsed()
+        request.deadline = self.clock.time() + APPROVAL_TIMEOUT
+        log.info("Waiting for admin approval (timeout: %ss)...", APPROVAL_TIMEOUT)
+        return ApprovalRequest.WAITING, 0
+
+    def _approve_face_match(self, request):
+        """Aprobă cererea pentru persoana recunoscută și trimite decizia pentru audit."""
+        request.timings['decision'] = request.elapsed()
+        self.handler.record_face_decision(request.client_ref, request.attempt_id,
+                                          request.face_match)
+        return ApprovalRequest.APPROVED, 0
+
+    def _step_waiting(self, request):
+        if request.face_match is not None:
+            return self._approve_face_match(request)
+        request.polls += 1
+        status = self.handler.poll_decision(request.attempt_id)
+        if status == 'approved':
+            request.timings['decision'] = request.elapsed()
+            return ApprovalRequest.APPROVED, 0
+        if status == 'denied':
+            request.timings['decision'] = request.elapsed()
+            return ApprovalRequest.DENIED, 0
+        if self.clock.time() >= request.deadline:
+            log.info("Timeout reached - auto-denying")
+            return ApprovalRequest.DENIED, 0
+        return ApprovalRequest.WAITING, self.poll_interval
+
+    def _close_popup(self, request):
+        with request.lock:
+            popup_process = request.popup_process
+        self.handler.os_actions.close_waiting_popup(popup_process)
+
+    def _step_approved(self, request):
+        self._close_popup(request)
+        # Aprobarea este păstrată în cache pentru calea aprobată (APPROVAL_SCOPE)
+        entry = self.handler.grant_approval(request)
+        log.debug("APPROVAL SET: %s valid for %.0fs", entry.path,
+                  entry.expires_at - self.clock.time())
+        request.decision = 'approved'
+        DECISIONS.labels('approved').inc()
+        log.info("ACCESS GRANTED - Opening folder...")
+        self.handler.os_actions.show_approved_notification()
+        self.handler.os_actions.open_folder(entry.path)
+        return ApprovalRequest.DONE, 0
+
+    def _step_denied(self, request):
+        request.decision = 'denied'
+        DECISIONS.labels('denied').inc()
+        self._close_popup(request)
+        self.handler.os_actions.show_denied_warning()
+        log.debug("Warning shown - locking in %s seconds...", self.LOCK_DELAY)
+        return ApprovalRequest.LOCKING, self.LOCK_DELAY
+
+    def _step_locking(self, request):
+        self.handler.os_actions.lock_screen()
+        return ApprovalRequest.DONE, 0
+
+    def _step_done(self, request):
+        root = request.root
+        request.timings['total'] = request.elapsed()
+        timings = ', '.join(f"{stage}={seconds * 1000:.0f}ms"
+                            for stage, seconds in request.timings.items())
+        log.debug("Approval flow DONE for %s - %s", root.path, timings)
+        with self._lock:
+            self._active.pop(root.path, None)
+            root.pending_approval = False
+            for stage, seconds in request.timings.items():
+                self._stage_totals.setdefault(stage, deque(maxlen=256)).append(seconds)
+        for stage, seconds in request.timings.items():
+            APPROVAL_STAGE_SECONDS.labels(stage).observe(seconds)
+        # Delete .DS_Store again so we can detect next open
+        self.handler.os_actions.rearm_folder(root.path)
+        if self.handler.recorder is not None:
+            self.handler.recorder.flow(request)
+        # Reluăm verificarea ferestrelor (era suspendată)
+        if self.handler.poll_scheduler is not None:
+            self.handler.poll_scheduler.wake()
+        return None, 0
 
 
 class FolderAccessHandler(FileSystemEventHandler):
@@ -366,114 +1302,301 @@ class FolderAccessHandler(FileSystemEventHandler):
 
     Funcționare:
         1. Primește eveniment de acces (folder deschis sau fișier accesat)
-        2. Verifică dacă trebuie să declanșeze fluxul de aprobare
-        3. Capturează fotografie, închide fereastra, arată mesaj de așteptare
-        4. Trimite cererea la server și așteaptă decizia
-        5. Acționează conform deciziei (deschide folder sau blochează ecran)
+        2. Găsește folderul protejat care conține calea (trie, O(adâncime))
+        3. Verifică dacă trebuie să declanșeze fluxul de aprobare
+        4. Capturează fotografie, închide fereastra, arată mesaj de așteptare
+        5. Trimite cererea la server și așteaptă decizia
+        6. Acționează conform deciziei (deschide folder sau blochează ecran)
 
     Atribute:
-        protected_path (str): Calea către folderul protejat
-        last_access_time (float): Timestamp-ul ultimului acces detectat
-        pending_approval (bool): True dacă așteptăm o decizie
-        approved_until (float): Timestamp până când aprobarea este validă
-        APPROVAL_CACHE_DURATION (int): Durata în secunde cât rămâne validă aprobarea
+        roots (PathTrie): Folderele protejate (ProtectedRoot), indexate după cale
+        supervised (bool): True într-un proces pornit de supervisor.py
+        clock: Sursa de timp (modulul time sau un ceas virtual - vezi event_trace.py)
+        os_actions (OSActions): Acțiunile asupra sistemului (vezi os_actions.py)
+        recorder (TraceRecorder): Înregistrarea intrărilor (None = dezactivată)
     """
 
-    # Cât timp (secunde) după aprobare înainte de a necesita re-aprobare
-    APPROVAL_CACHE_DURATION = 300  # 5 minute
-
-    def __init__(self, protected_path):
+    def __init__(self, protected_roots, approval_cache=None, supervised=False, clock=time,
+                 server=None, spool=None, os_actions=None):
         """
         Inițializează handler-ul pentru evenimente de acces.
 
         Parametri:
-            protected_path (str): Calea completă către folderul protejat
+            protected_roots: Folderele protejate - o listă de ProtectedRoot
+                sau o singură cale (str)
+            approval_cache (optional): Cache-ul aprobărilor (implicit un
+                ApprovalCache nou; supervizorul dă un SharedApprovalCache)
+            supervised (bool): Dacă handler-ul rulează într-un proces al
+                supervizorului - retrimiterea din spool și revocările sunt
+                atunci gestionate de supervizor, o singură dată
+            clock (optional): Sursa de timp - time() și monotonic()
+            server (optional): Clientul serverului (implicit un ServerClient nou)
+            spool (AttemptSpool, optional): Spool-ul (implicit cel din config.SPOOL_PATH)
+            os_actions (OSActions, optional): Acțiunile (implicit config.OS_ACTIONS)
         """
         super().__init__()
-        self.protected_path = protected_path
-        self.last_access_time = 0
-        self.pending_approval = False
-        self.approved_until = 0  # Timestamp când expiră aprobarea
-        self.approved_path = None  # Track which path was approved
+        if isinstance(protected_roots, str):
+            protected_roots = [ProtectedRoot(protected_roots)]
+        self.roots = PathTrie()
+        for root in protected_roots:
+            self.roots.insert(root.path, root)
+        self.poll_scheduler = None  # Setat de FinderWindowMonitor
+        self.recorder = None        # Setat de main() când config.TRACE_PATH este dat
+        self.supervised = supervised
+        self.clock = clock
+        self.os_actions = os_actions if os_actions is not None else create_os_actions(OS_ACTIONS)
+
+        # Evenimentele watchdog sunt doar puse în coadă; firul pipeline-ului
+        # le contopește și apelează process_event câte o dată per rafală
+        self.pipeline = EventPipeline(self.process_event,
+                                      queue=CoalescingQueue(clock=clock.monotonic))
+
+        # Clientul HTTP comun (conexiuni keep-alive reutilizate)
+        self.server = server if server is not None else ServerClient()
+
+        # Fiecare încercare este scrisă în spool înainte de trimitere;
+        # cele netrimise sunt retrimise în loturi când serverul revine
+        self.spool = spool if spool is not None else AttemptSpool()
+        self.replayer = SpoolReplayer(self.spool, self.server)
+
+        # Aprobările valide, per cale; administratorul le poate revoca din
+        # dashboard, iar revocarea ajunge prin long-poll
+        if approval_cache is None:
+            approval_cache = ApprovalCache(clock=clock.time)
+        self.approval_cache = approval_cache
+        self.revocations = RevocationListener(self.approval_cache, self.server,
+                                              on_revoke=self._on_revoke)
+
+        # Fluxurile de aprobare rulează ca mașini de stări pe un fond de fire
+        self.approvals = ApprovalEngine(self, face_matcher=create_face_matcher(), clock=clock)
+
+    def start(self):
+        """Pornește procesarea evenimentelor și execuția fluxurilor de aprobare."""
+        self.approvals.start()
+        self.pipeline.start()
+        if not self.supervised:
+            self.replayer.start()
+            self.revocations.start()
+
+    def stop(self):
+        """Oprește procesarea evenimentelor și afișează statisticile."""
+        self.pipeline.stop()
+        self.approvals.stop()
+        self.replayer.stop()
+        self.revocations.stop()
+        self.server.close()
+        stats = self.pipeline.stats()
+        log.info("Event pipeline: %s received, %s ignored, %s coalesced, %s dropped, "
+                 "%s emitted (queue high-water %s)", stats['received'], stats['ignored'],
+                 stats['coalesced'], stats['dropped'], stats['emitted'], stats['high_water'])
+        for stage, stats in self.approvals.stage_stats().items():
+            log.info("Approval stage %s: %s runs, mean %.0f ms, max %.0f ms",
+                     stage, stats['count'], stats['mean'] * 1000, stats['max'] * 1000)
+        counts = self.spool.counts()
+        log.info("Attempt spool: %s queued, %s replayed this session",
+                 counts.get('queued', 0), self.replayer.replayed)
+        stats = self.approval_cache.stats()
+        log.info("Approval cache: %s entries, %s hits, %s misses, %s evicted, %s revoked",
+                 stats['entries'], stats['hits'], stats['misses'], stats['evictions'],
+                 stats['revoked'])
+        self.spool.close()
+
+    def root_for(self, path):
+        """
+        Găsește folderul protejat care conține o cale.
+
+        Parametri:
+            path (str): Calea (fișier sau folder)
 
-    def is_approval_cached(self, path=None, log=False):
+        Returnează:
+            ProtectedRoot: Cel mai adânc folder protejat care conține calea
+            None: Dacă nicio cale protejată nu conține calea dată
+        """
+        if not path:
+            return None
+        match = self.roots.longest_prefix(path)
+        return match[1] if match else None
+
+    def protected_roots(self):
+        """
+        Returnează toate folderele protejate.
+
+        Returnează:
+            list: Lista ProtectedRoot, sortată după cale
+        """
+        return [root for _, root in sorted(self.roots.items(), key=lambda item: item[0])]
+
+    @property
+    def pending_approval(self):
+        """True dacă se așteaptă o decizie pentru cel puțin un folder protejat."""
+        return any(root.pending_approval for _, root in self.roots.items())
+
+    def poll_suspension(self):
+        """
+        Determină dacă verificarea ferestrelor poate fi suspendată.
+
+        Verificarea este inutilă doar dacă toate folderele protejate fie
+        așteaptă o decizie, fie au o aprobare validă.
+
+        Returnează:
+            tuple: (motiv, timeout_secunde) dacă verificarea se poate suspenda
+            None: Dacă trebuie să continuăm verificarea
+        """
+        remaining = []
+        for _, root in self.roots.items():
+            if root.pending_approval:
+                continue
+            seconds = self.approval_cache.remaining(root.path)
+            if seconds > 0:
+                remaining.append(seconds)
+                continue
+            return None
+
+        if not remaining:
+            # Handler-ul ne trezește la final; timeout-ul este o plasă de siguranță
+            return 'pending_approval=True', APPROVAL_TIMEOUT
+        return 'approval cached', min(remaining)
+
+    def approval_remaining(self, path):
+        """
+        Returnează câte secunde mai este validă aprobarea pentru o cale.
+
+        Parametri:
+            path (str): Calea de verificat (fișier sau folder)
+
+        Returnează:
+            float: Secundele rămase (0 dacă nu există o aprobare validă)
+        """
+        if self.root_for(path) is None:
+            return 0
+        return self.approval_cache.remaining(path)
+
+    def is_approval_cached(self, path=None, verbose=False):
         """
         Verifică dacă suntem în perioada de cache pentru aprobare.
 
-        După ce administratorul aprobă accesul, utilizatorul are 5 minute
-        în care poate accesa folderul fără a mai necesita aprobare.
+        După ce administratorul aprobă accesul, utilizatorul are la dispoziție
+        durata de aprobare a folderului (implicit 5 minute) în care calea
+        aprobată (și tot ce este sub ea) poate fi accesată fără a mai necesita
+        aprobare. Căutarea în cache costă O(adâncimea căii).
 
         Parametri:
-            path (str, optional): Calea de verificat (fișier sau folder)
-            log (bool): Dacă să afișeze mesaje de debug
+            path (str, optional): Calea de verificat (fișier sau folder);
+                fără cale se verifică dacă vreun folder are o aprobare validă
+            verbose (bool): Dacă să scrie mesaje de debug în jurnal
 
         Returnează:
             bool: True dacă aprobarea este încă validă, False altfel
         """
-        current = time.time()
-        if current < self.approved_until and self.approved_path:
-            # Check if the given path is the approved path OR inside it
-            if path:
-                path_normalized = os.path.normpath(path)
-                approved_normalized = os.path.normpath(self.approved_path)
-                # Path is approved if it IS the approved path or STARTS WITH it
-                if path_normalized == approved_normalized or path_normalized.startswith(approved_normalized + os.sep):
-                    if log:
-                        remaining = int(self.approved_until - current)
-                        print(f"[DEBUG] Approval VALID for {path} - {remaining}s remaining")
-                    return True
-            else:
-                # No path specified, just check time
-                if log:
-                    remaining = int(self.approved_until - current)
-                    print(f"[DEBUG] Approval VALID - {remaining}s remaining")
-                return True
-        if log:
-            print(f"[DEBUG] Approval EXPIRED or path not covered")
+        if not path:
+            return self.approval_cache.any_valid()
+
+        entry = self.approval_cache.lookup(path) if self.root_for(path) is not None else None
+        if entry is not None:
+            if verbose:
+                remaining = int(entry.expires_at - self.clock.time())
+                log.debug("Approval VALID for %s (via %s) - %ss remaining",
+                          path, entry.path, remaining)
+            return True
+        if verbose:
+            log.debug("Approval EXPIRED or path not covered")
         return False
 
+    def in_cooldown(self, root):
+        """
+        Verifică dacă folderul protejat este în perioada de cooldown.
+
+        Aceeași pauză între alerte se aplică evenimentelor din sistemul de
+        fișiere și ferestrelor găsite la verificarea periodică (ex: un shell
+        rămas într-un folder protejat nu este reînregistrat la fiecare
+        verificare).
+
+        Parametri:
+            root (ProtectedRoot): Folderul protejat
+
+        Returnează:
+            bool: True dacă ultimul acces este mai recent decât root.cooldown
+        """
+        return self.clock.time() - root.last_access_time < root.cooldown
+
+    def approval_scope(self, root, path):
+        """
+        Determină calea acoperită de o aprobare (config.APPROVAL_SCOPE).
+
+        Parametri:
+            root (ProtectedRoot): Folderul protejat accesat
+            path (str): Calea accesată
+
+        Returnează:
+            str: Folderul protejat ('root') sau folderul accesat ('folder' -
+                 pentru un fișier, folderul care îl conține)
+        """
+        if APPROVAL_SCOPE != 'folder':
+            return root.path
+        scope = os.path.normpath(path)
+        if not os.path.isdir(scope):
+            scope = os.path.dirname(scope)
+        # Niciodată mai sus decât folderul protejat
+        if self.root_for(scope) is not root:
+            return root.path
+        return scope
+
+    def grant_approval(self, request):
+        """
+        Adaugă în cache aprobarea unei cereri.
+
+        Parametri:
+            request (ApprovalRequest): Cererea aprobată
+
+        Returnează:
+            ApprovalEntry: Intrarea din cache (calea aprobată și expirarea)
+        """
+        root = request.root
+        return self.approval_cache.grant(self.approval_scope(root, request.path),
+                                         ttl=root.approval_cache_duration,
+                                         attempt_id=request.attempt_id)
+
+    def _on_revoke(self, revocation):
+        """Reia verificarea ferestrelor (era suspendată pe durata aprobării)."""
+        if self.poll_scheduler is not None:
+            self.poll_scheduler.wake()
+
     def should_trigger(self, event):
         """
         Verifică dacă acest eveniment trebuie să declanșeze fluxul de aprobare.
 
         Filtrează evenimentele pentru a evita declanșări multiple sau inutile.
         Nu declanșează dacă:
+        - Calea nu aparține niciunui folder protejat
         - Avem deja o aprobare validă (în cache)
         - Suntem în perioada de cooldown (pauză între alertă)
         - Deja așteptăm o aprobare
-        - Este un fișier ascuns sau de sistem
 
         Parametri:
-            event: Evenimentul de sistem de fișiere detectat
+            event: Evenimentul (AccessEvent din pipeline sau eveniment watchdog)
 
         Returnează:
             bool: True dacă trebuie să declanșăm fluxul, False altfel
         """
+        root = self.root_for(event.src_path)
+        if root is None:
+            return False
+
         # Verificăm dacă suntem în perioada de cache pentru aprobare
-        if self.is_approval_cached(path=event.src_path, log=True):
+        if self.is_approval_cached(path=event.src_path, verbose=True):
             return False
 
         # Verificăm perioada de cooldown (pauză între alerte)
-        current_time = time.time()
-        if current_time - self.last_access_time < ACCESS_COOLDOWN:
+        if self.in_cooldown(root):
             return False
 
         # Nu declanșăm dacă deja așteptăm o aprobare
-        if self.pending_approval:
-            return False
-
-        # Obținem numele fișierului
-        basename = os.path.basename(event.src_path) if event.src_path else ""
-
-        # Ignorăm fișierele ascunse (inclusiv .DS_Store - deschiderea folderului
-        # este gestionată de FinderWindowMonitor)
-        if basename.startswith('.'):
-            return False
-
-        # Ignorăm alte fișiere de sistem comune
-        if basename in ['Thumbs.db', 'desktop.ini']:
+        if root.pending_approval:
             return False
 
+        # Fișierele ascunse (inclusiv .DS_Store - deschiderea folderului este
+        # gestionată de FinderWindowMonitor) și cele de sistem sunt eliminate
+        # deja de pipeline (config.EVENT_IGNORE)
         return True
 
     def get_display_info(self, event):
@@ -493,7 +1616,11 @@ class FolderAccessHandler(FileSystemEventHandler):
 
         # .DS_Store indică faptul că Finder a deschis folderul
         if basename == '.DS_Store':
-            return self.protected_path, 'folder_opened'
+            return self.root_for(event.src_path).path, 'folder_opened'
+
+        # Deschiderea sau listarea unui director (raportată de kernel pe Linux)
+        if event.is_directory and event.event_type in ('opened', 'accessed'):
+            return event.src_path, 'folder_opened'
 
         return event.src_path, f'file_{event.event_type}'
 
@@ -501,331 +1628,240 @@ class FolderAccessHandler(FileSystemEventHandler):
         """
         Gestionează orice eveniment de sistem de fișiere.
 
-        Această metodă este apelată automat de biblioteca watchdog
-        când se detectează orice modificare în folderul monitorizat.
+        Această metodă este apelată automat de biblioteca watchdog, pe firul
+        observatorului, pentru fiecare modificare din folderele monitorizate.
+        Ea doar semnalează activitatea și pune evenimentul în pipeline -
+        nu blochează niciodată (procesarea are loc în process_event).
 
         Parametri:
             event: Evenimentul detectat (creare, modificare, ștergere, etc.)
         """
-        # Debug: afișăm TOATE evenimentele
-        print(f"[DEBUG] Eveniment: {event.event_type} - {event.src_path}")
+        started = time.perf_counter()
+        EVENTS.labels(event.event_type).inc()
+        if self.recorder is not None:
+            self.recorder.event(event)
+
+        # Activitate într-un folder protejat - verificăm ferestrele imediat
+        if self.poll_scheduler is not None:
+            self.poll_scheduler.notify_activity()
+
+        self.pipeline.submit(event)
+        HANDLER_SECONDS.labels('on_any_event').observe(time.perf_counter() - started)
+
+    def process_event(self, access):
+        """
+        Procesează un acces logic (o rafală de evenimente pentru aceeași cale).
 
-        if not self.should_trigger(event):
+        Apelată pe firul pipeline-ului. Fluxul de aprobare este doar pus
+        în execuție (handle_access revine imediat), astfel încât pipeline-ul
+        continuă să golească coada cât timp se așteaptă decizia administratorului.
+
+        Parametri:
+            access (AccessEvent): Accesul livrat de pipeline
+        """
+        log.debug("Eveniment: %s - %s (x%s)", access.event_type, access.src_path, access.count)
+
+        with REGISTRY.timer(HANDLER_SECONDS.labels('should_trigger')):
+            triggered = self.should_trigger(access)
+        if not triggered:
+            ACCESSES.labels('filtered').inc()
             return
 
         # Update last access time
-        self.last_access_time = time.time()
+        self.root_for(access.src_path).last_access_time = self.clock.time()
 
         # Get display info
-        display_path, access_type = self.get_display_info(event)
+        display_path, access_type = self.get_display_info(access)
 
-        print(f"\n{'='*50}")
-        print(f"ACCESS DETECTED: {access_type}")
-        print(f"Path: {display_path}")
-        print(f"{'='*50}")
+        log.info("ACCESS DETECTED: %s - %s", access_type, display_path)
 
         self.handle_access(display_path, access_type)
 
     def handle_access(self, path, access_type):
         """
-        Gestionează accesul la folder - trimite la server și așteaptă decizia.
+        Pornește fluxul de aprobare pentru un acces - revine imediat.
 
-        Aceasta este metoda principală care orchestrează întregul flux de aprobare:
-        1. Capturează fotografie cu camera web
-        2. Închide fereastra Finder
-        3. Afișează popup de așteptare
-        4. Trimite cererea la server (cu fotografia)
-        5. Așteaptă decizia administratorului
-        6. Execută acțiunea corespunzătoare (deschide folder sau blochează)
+        Fluxul (executat de ApprovalEngine):
+        1. În paralel: trimite cererea la server, capturează fotografia
+           (atașată când este gata), închide fereastra și afișează popup-ul
+        2. Interoghează serverul până la decizia administratorului
+        3. Execută acțiunea corespunzătoare (deschide folder sau blochează)
 
         Parametri:
             path (str): Calea folderului/fișierului accesat
             access_type (str): Tipul accesului ('folder_opened', 'file_created', etc.)
-        """
-        print(f"[DEBUG] handle_access START - cale={path}, tip={access_type}")
-        self.pending_approval = True
 
-        try:
-            # FIRST: Capture photo of who is accessing
-            print("[DEBUG] Step 0: Capturing photo...")
-            photo_filename = capture_photo()
-            print(f"[DEBUG] Step 0 DONE - photo={photo_filename}")
-
-            # Close the Finder window
-            print("[DEBUG] Step 1: Closing Finder window...")
-            print("Closing Finder window - awaiting approval...")
-            self.close_finder_window(self.protected_path)
-            print("[DEBUG] Step 1 DONE")
-
-            # Show waiting popup
-            print("[DEBUG] Step 2: Showing waiting popup...")
-            self.show_waiting_popup()
-            print("[DEBUG] Step 2 DONE")
-
-            # Send to server (with photo)
-            print("[DEBUG] Step 3: Sending to server...")
-            attempt_id = self.send_to_server(path, access_type, photo_filename)
-            print(f"[DEBUG] Step 3 DONE - attempt_id={attempt_id}")
-            if not attempt_id:
-                print("[DEBUG] No attempt_id - server failed")
-                print("Failed to contact server - denying access")
-                self.close_waiting_popup()
-                self.show_warning_and_lock()
-                return
+        Returnează:
+            ApprovalRequest: Cererea pornită
+            None: Dacă calea nu este protejată sau folderul are deja o cerere activă
+        """
+        started = time.perf_counter()
+        root = self.root_for(path)
+        if root is None:
+            ACCESSES.labels('unprotected').inc()
+            log.debug("handle_access IGNORED - %s is not protected", path)
+            return None
 
-            # Wait for decision
-            print("[DEBUG] Step 4: Waiting for decision...")
-            decision = self.wait_for_decision(attempt_id)
-            print(f"[DEBUG] Step 4 DONE - decision={decision}")
-
-            # Close waiting popup
-            self.close_waiting_popup()
-
-            # Act on decision
-            if decision == 'approved':
-                print("[DEBUG] Decision is APPROVED - opening folder")
-                # Cache the approval for 5 minutes
-                self.approved_until = time.time() + self.APPROVAL_CACHE_DURATION
-                self.approved_path = self.protected_path  # Always approve the root protected folder
-                print(f"[DEBUG] APPROVAL SET: approved_until = {self.approved_until} (current={time.time()})")
-                print("ACCESS GRANTED - Opening folder...")
-                self.show_approved_notification()
-                self.open_folder(self.protected_path)
-            else:
-                print("[DEBUG] Decision is DENIED - showing warning and locking")
-                self.show_warning_and_lock()
-        finally:
-            print("[DEBUG] handle_access FINALLY - resetting state")
-            self.pending_approval = False
-            # Delete .DS_Store again so we can detect next open
-            delete_ds_store(self.protected_path)
+        request = self.approvals.submit(root, path, access_type)
+        if request is None:
+            ACCESSES.labels('already_pending').inc()
+            log.debug("handle_access IGNORED - %s already awaiting a decision", root.path)
+        else:
+            ACCESSES.labels('queued').inc()
+            log.debug("handle_access QUEUED - cale=%s, tip=%s, folder=%s",
+                      path, access_type, root.path)
+        HANDLER_SECONDS.labels('handle_access').observe(time.perf_counter() - started)
+        return request
 
-    def send_to_server(self, path, access_type, photo_filename=None):
+    def send_to_server(self, path, access_type, photo_filename=None, client_ref=None):
         """
         Trimite încercarea de acces la serverul de administrare.
 
         Creează o cerere HTTP POST către server cu informațiile despre
-        încercarea de acces, inclusiv fotografia capturată.
+        încercarea de acces, inclusiv fotografia capturată. Încercarea este
+        scrisă mai întâi în spool-ul local; dacă serverul nu răspunde, ea
+        rămâne în spool (cu rezultatul 'denied') și este retrimisă mai târziu.
 
         Parametri:
             path (str): Calea folderului/fișierului accesat
             access_type (str): Tipul accesului
             photo_filename (str, optional): Numele fișierului foto capturat
+            client_ref (str, optional): Identificatorul local al încercării
 
         Returnează:
             int: ID-ul încercării înregistrate pe server
             None: Dacă comunicarea cu serverul a eșuat
         """
+        payload = {
+            'folder_path': path,
+            'access_type': access_type,
+            'host': socket.gethostname(),  # Pentru detectarea rafalelor per gazdă
+        }
+        if photo_filename:
+            payload['photo_path'] = photo_filename
+
+        payload = self.spool.append(payload, client_ref)
+
         try:
-            payload = {
-                'folder_path': path,
-                'access_type': access_type
-            }
-            if photo_filename:
-                payload['photo_path'] = photo_filename
-
-            response = requests.post(
-                f"{SERVER_URL}/api/attempt",
-                json=payload,
-                timeout=10
-            )
-            data = response.json()
-            print(f"Attempt registered with ID: {data['id']}")
+            data = self.server.post_json('/api/attempt', payload, deadline=10)
+            log.info("Attempt registered with ID: %s", data['id'])
+            self.spool.mark_sent(payload['client_ref'], data['id'])
             return data['id']
-        except requests.exceptions.ConnectionError:
-            print("ERROR: Could not connect to admin server")
-            print(f"Make sure admin_server.py is running at {SERVER_URL}")
-            return None
+        except ServerRejected as e:
+            log.error("Admin server rejected the attempt: %s", e)
+        except ServerUnavailable as e:
+            log.error("Could not reach admin server (%s) - "
+                      "make sure admin_server.py is running at %s", e, SERVER_URL)
         except Exception as e:
-            print(f"ERROR: {e}")
-            return None
+            log.error("%s", e)
+
+        # Accesul este refuzat; încercarea rămâne în spool pentru retrimitere
+        self.spool.mark_queued(payload['client_ref'], status='denied')
+        self.replayer.wake()
+        return None
 
-    def wait_for_decision(self, attempt_id):
+    def attach_photo(self, client_ref, attempt_id, photo_filename, score=None):
         """
-        Așteaptă decizia administratorului cu timeout.
+        Atașează fotografia unei încercări deja înregistrate.
 
-        Interoghează periodic serverul pentru a verifica dacă administratorul
-        a luat o decizie. Dacă timeout-ul expiră fără decizie, accesul este
-        refuzat automat.
+        Fotografia este capturată în paralel cu înregistrarea, deci ajunge
+        după aceasta. Este scrisă mai întâi în spool (pentru retrimitere)
+        și apoi trimisă serverului, dacă încercarea este deja acolo.
 
         Parametri:
-            attempt_id (int): ID-ul încercării de acces
+            client_ref (str): Identificatorul local al încercării
+            attempt_id (int): ID-ul încercării pe server (None dacă nu a fost înregistrată)
+            photo_filename (str): Numele fișierului foto capturat
+            score (FrameScore, optional): Scorurile de calitate ale fotografiei
 
         Returnează:
-            str: 'approved' sau 'denied'
+            bool: True dacă fotografia a ajuns pe server
         """
-        print(f"[DEBUG] wait_for_decision START - attempt_id={attempt_id}")
-        print(f"Waiting for admin approval (timeout: {APPROVAL_TIMEOUT}s)...")
+        fields = {'photo_path': photo_filename}
+        if score is not None:
+            fields['photo_scores'] = {
+                'sharpness': score.sharpness,
+                'exposure': score.exposure,
+                'brightness': score.brightness,
+            }
 
-        start_time = time.time()
-        poll_count = 0
-        while time.time() - start_time < APPROVAL_TIMEOUT:
-            try:
-                poll_count += 1
-                elapsed = time.time() - start_time
-                print(f"[DEBUG] Polling server (#{poll_count}, elapsed={elapsed:.1f}s)...")
-                response = requests.get(f"{SERVER_URL}/api/attempt/{attempt_id}")
-                data = response.json()
-                print(f"[DEBUG] Server response: status={data.get('status')}")
-
-                if data['status'] == 'approved':
-                    print("[DEBUG] wait_for_decision returning 'approved'")
-                    return 'approved'
-                elif data['status'] == 'denied':
-                    print("[DEBUG] wait_for_decision returning 'denied'")
-                    return 'denied'
-
-                # Still pending, wait and retry
-                time.sleep(1)
-
-            except Exception as e:
-                print(f"[DEBUG] Poll error: {e}")
-                print(f"Error checking status: {e}")
-                time.sleep(1)
-
-        # Timeout reached
-        print("[DEBUG] wait_for_decision TIMEOUT")
-        print("Timeout reached - auto-denying")
-        return 'denied'
-
-    def close_finder_window(self, folder_path):
-        """
-        Închide fereastra Finder și fereastra aplicației din prim-plan.
-
-        Folosește AppleScript pentru a închide toate ferestrele Finder și
-        fereastra aplicației active (cu excepția Terminal și editorilor de cod).
-        """
-        print("[DEBUG] close_finder_window apelat")
-        time.sleep(0.3)  # Let window render
-
-        # Get the frontmost app and close its windows (except Terminal/Code)
-        close_frontmost_script = '''
-        tell application "System Events"
-            set frontApp to name of first application process whose frontmost is true
-        end tell
-        return frontApp
-        '''
-        result_front = subprocess.run(
-            ['osascript', '-e', close_frontmost_script],
-            capture_output=True,
-            text=True
-        )
-        frontmost_app = result_front.stdout.strip()
-        print(f"[DEBUG] Frontmost app: '{frontmost_app}'")
-
-        # Close that app's windows if it's not our terminal/editor
-        excluded_apps = ['Terminal', 'Code', 'iTerm2', 'iTerm', 'python', 'Python']
-        if frontmost_app and frontmost_app not in excluded_apps:
-            close_app_script = f'tell application "{frontmost_app}" to close every window'
-            result_close = subprocess.run(
-                ['osascript', '-e', close_app_script],
-                capture_output=True,
-                text=True
-            )
-            print(f"[DEBUG] Close {frontmost_app} windows result: rc={result_close.returncode}, stderr={result_close.stderr}")
-
-        # Also close ALL Finder windows
-        result = subprocess.run(
-            ['osascript', '-e', 'tell application "Finder" to close every window'],
-            capture_output=True,
-            text=True
-        )
-        print(f"[DEBUG] close Finder windows result: rc={result.returncode}, stderr={result.stderr}")
+        spooled = self.spool.update(client_ref, **fields)
+        if attempt_id is None and spooled is not None and spooled[0] == AttemptSpool.SENT:
+            # Încercarea a fost între timp retrimisă din spool
+            attempt_id = spooled[1]
+        if attempt_id is None:
+            return False
 
-    def show_waiting_popup(self):
-        """
-        Afișează un popup de notificare că accesul așteaptă aprobare.
+        try:
+            self.server.post_json(f'/api/attempt/{attempt_id}/photo', fields, deadline=10)
+        except ServerUnavailable as e:
+            log.debug("Attach photo failed: %s", e)
+            return False
+        log.debug("Photo %s attached to attempt %s", photo_filename, attempt_id)
+        return True
 
-        Creează un dialog AppleScript care informează utilizatorul că
-        cererea de acces a fost trimisă și așteaptă decizia administratorului.
+    def record_face_decision(self, client_ref, attempt_id, match):
         """
-        print("[DEBUG] Se lansează popup-ul de așteptare...")
-        script = '''
-        display dialog "Protected folder access detected.
-
-Awaiting admin approval..." buttons {} giving up after 300 with title "Access Control" with icon caution
-        '''
-        # Run in background so it doesn't block
-        self.popup_process = subprocess.Popen(
-            ['osascript', '-e', script],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        print(f"[DEBUG] Popup process started: pid={self.popup_process.pid}")
+        Înregistrează o aprobare automată prin recunoaștere facială (audit).
 
-    def close_waiting_popup(self):
-        """
-        Închide popup-ul de așteptare.
+        Decizia este scrisă în spool și trimisă serverului prin /api/decide,
+        cu sursa 'face_match'. Dacă încercarea nu a ajuns încă pe server,
+        ea va fi retrimisă din spool împreună cu decizia.
 
-        Termină procesul AppleScript care afișează dialogul de așteptare.
-        """
-        if hasattr(self, 'popup_process') and self.popup_process:
-            self.popup_process.terminate()
-            self.popup_process = None
-        # Oprim orice dialog osascript
-        subprocess.run(['pkill', '-f', 'osascript.*display dialog'], capture_output=True)
+        Parametri:
+            client_ref (str): Identificatorul local al încercării
+            attempt_id (int): ID-ul încercării pe server (None dacă nu a fost înregistrată)
+            match (FaceMatch): Persoana recunoscută
 
-    def show_approved_notification(self):
+        Returnează:
+            bool: True dacă decizia a ajuns pe server
         """
-        Afișează notificarea de aprobare.
+        audit = {
+            'decision_source': 'face_match',
+            'matched_identity': match.name,
+            'match_similarity': round(match.similarity, 4),
+        }
+        spooled = self.spool.update(client_ref, status='approved', **audit)
+        if attempt_id is None and spooled is not None and spooled[0] == AttemptSpool.SENT:
+            attempt_id = spooled[1]
+        if attempt_id is None:
+            return False
 
-        Arată un mesaj macOS care informează utilizatorul că accesul a fost aprobat.
-        """
-        subprocess.run([
-            'osascript', '-e',
-            'display notification "Folder access approved by admin" with title "Access Granted" sound name "Glass"'
-        ])
+        try:
+            self.server.post_json(f'/api/decide/{attempt_id}', {'decision': 'approved', **audit},
+                                  deadline=10)
+        except ServerUnavailable as e:
+            log.debug("Face match audit failed: %s", e)
+            return False
+        log.debug("Attempt %s auto-approved for %s", attempt_id, match.name)
+        return True
 
-    def open_folder(self, folder_path):
+    def poll_decision(self, attempt_id):
         """
-        Deschide folderul în Finder.
+        Interoghează o singură dată serverul pentru decizia administratorului.
 
         Parametri:
-            folder_path (str): Calea completă către folder
-        """
-        subprocess.run(['open', folder_path])
-
-    def lock_screen(self):
-        """
-        Blochează ecranul Mac-ului pornind screen saver-ul.
-
-        Dacă opțiunea "Solicită parolă" este activată în Preferințe Sistem,
-        aceasta blochează efectiv ecranul și necesită autentificare.
-        """
-        print("SE BLOCHEAZĂ ECRANUL - Acces refuzat!")
-        # Pornește screen saver-ul - dacă "require password" este activat
-        # în System Preferences, aceasta blochează efectiv ecranul
-        subprocess.run([
-            'open', '-a', 'ScreenSaverEngine'
-        ])
-
-    def show_warning_and_lock(self):
-        """
-        Afișează un avertisment și blochează ecranul după 5 secunde.
+            attempt_id (int): ID-ul încercării de acces
 
-        Arată o notificare de avertizare pentru acces neautorizat și
-        apoi blochează ecranul pentru a proteja sistemul.
+        Returnează:
+            str: 'approved', 'denied' sau 'pending'
+            None: Dacă serverul nu a putut fi interogat
         """
-        # Show non-blocking notification
-        subprocess.Popen([
-            'osascript', '-e',
-            'display notification "Screen will lock in 5 seconds..." with title "ACCESS DENIED" subtitle "Unauthorized folder access detected!" sound name "Basso"'
-        ])
-
-        # Wait 5 seconds
-        print("[DEBUG] Warning shown - locking in 5 seconds...")
-        time.sleep(5)
-
-        # Lock the screen
-        self.lock_screen()
+        try:
+            data = self.server.get_json(f'/api/attempt/{attempt_id}')
+        except ServerUnavailable as e:
+            log.debug("Poll error: %s", e)
+            return None
+        log.debug("Server response: status=%s", data.get('status'))
+        return data.get('status')
 
 
 def find_folder(name, search_root):
     """
     Caută un folder după nume în directorul specificat.
 
-    Parcurge recursiv toate subdirectoarele pentru a găsi un folder
-    cu numele specificat.
+    Folosește căutarea paralelă cu cache persistent din folder_discovery.py
+    (adâncime maximă și excluderi din config).
 
     Parametri:
         name (str): Numele folderului de căutat
@@ -835,66 +1871,131 @@ def find_folder(name, search_root):
         str: Calea completă către folder dacă a fost găsit
         None: Dacă folderul nu a fost găsit
     """
-    print(f"Se caută folderul '{name}' în {search_root}...")
-
-    for root, dirs, files in os.walk(search_root):
-        # Omitem directoarele ascunse
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-
-        if name in dirs:
-            found_path = os.path.join(root, name)
-            print(f"Găsit: {found_path}")
-            return found_path
-
-    return None
+    return find_folders([name], search_root).get(name)
 
 
-def get_protected_folder_path():
+def resolve_folder(spec, found=None):
     """
-    Obține calea completă către folderul protejat.
+    Obține calea completă către un folder protejat.
 
-    Verifică dacă PROTECTED_FOLDER din config este o cale completă sau
-    doar un nume de folder. Dacă este doar un nume, caută folderul
-    în directorul SEARCH_ROOT.
+    Verifică dacă specificația este o cale completă sau doar un nume de
+    folder. Dacă este doar un nume, caută folderul în directorul SEARCH_ROOT.
+
+    Parametri:
+        spec (str): Numele folderului ("Confidential") sau calea
+            ("~/Desktop/SecretFolder")
+        found (dict, optional): Rezultatele unei căutări comune (nume -> cale)
 
     Returnează:
         str: Calea completă către folderul protejat
         None: Dacă folderul nu poate fi găsit sau validat
     """
-    # Verificăm dacă PROTECTED_FOLDER este deja o cale completă
-    if os.path.isabs(PROTECTED_FOLDER):
-        if os.path.isdir(PROTECTED_FOLDER):
-            return PROTECTED_FOLDER
+    # Verificăm dacă specificația este deja o cale completă
+    expanded = os.path.expanduser(spec)
+    if os.path.isabs(expanded):
+        if os.path.isdir(expanded):
+            return expanded
         else:
-            print(f"EROARE: Calea specificată nu există: {PROTECTED_FOLDER}")
+            print(f"EROARE: Calea specificată nu există: {expanded}")
             return None
 
-    # Căutăm folderul după nume
-    found_path = find_folder(PROTECTED_FOLDER, SEARCH_ROOT)
+    # Căutăm folderul după nume (dacă nu a fost deja găsit în căutarea comună)
+    found_path = found.get(spec) if found is not None else find_folder(spec, SEARCH_ROOT)
     if found_path:
         return found_path
 
-    print(f"EROARE: Nu s-a putut găsi folderul '{PROTECTED_FOLDER}' în {SEARCH_ROOT}")
+    print(f"EROARE: Nu s-a putut găsi folderul '{spec}' în {SEARCH_ROOT}")
     return None
 
 
-def delete_ds_store(folder_path):
+def get_protected_roots(entries=None):
     """
-    Șterge fișierul .DS_Store pentru ca Finder să îl recreeze la deschidere.
+    Construiește lista folderelor protejate din configurare.
 
-    Fișierul .DS_Store este creat de Finder când se deschide un folder.
-    Prin ștergerea lui, putem detecta următoarea deschidere a folderului.
+    Fiecare element din PROTECTED_FOLDERS poate fi un nume/o cale (str)
+    sau un dicționar cu politica proprie:
+        {"path": "~/Clienti/Acme", "cooldown": 10, "approval_cache": 600}
 
     Parametri:
-        folder_path (str): Calea către folder
+        entries (list, optional): Elementele de configurare
+            (implicit config.PROTECTED_FOLDERS)
+
+    Returnează:
+        list: Lista ProtectedRoot pentru folderele găsite (fără duplicate)
     """
-    ds_store = os.path.join(folder_path, '.DS_Store')
-    try:
-        if os.path.exists(ds_store):
-            os.remove(ds_store)
-            print(f"S-a șters .DS_Store pentru a permite detectarea deschiderii")
-    except Exception as e:
-        print(f"Avertisment: Nu s-a putut șterge .DS_Store: {e}")
+    if entries is None:
+        entries = PROTECTED_FOLDERS
+
+    specs = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            specs.append((entry['path'], entry.get('cooldown', ACCESS_COOLDOWN),
+                          entry.get('approval_cache', APPROVAL_CACHE_DURATION)))
+        else:
+            specs.append((entry, ACCESS_COOLDOWN, APPROVAL_CACHE_DURATION))
+
+    # Toate folderele specificate doar prin nume sunt căutate într-o singură parcurgere
+    names = [spec for spec, _, _ in specs if not os.path.isabs(os.path.expanduser(spec))]
+    found = {}
+    if names:
+        print(f"Se caută {len(names)} folder(e) în {SEARCH_ROOT}...")
+        found = find_folders(names, SEARCH_ROOT)
+        for name in names:
+            if name in found:
+                print(f"Găsit: {found[name]}")
+
+    roots = {}
+    for spec, cooldown, approval_cache in specs:
+        path = resolve_folder(spec, found)
+        if path:
+            root = ProtectedRoot(path, cooldown=cooldown, approval_cache_duration=approval_cache)
+            roots[root.path] = root
+    return list(roots.values())
+
+
+def watch_paths(roots):
+    """
+    Returnează folderele care trebuie urmărite de watchdog.
+
+    Un folder protejat aflat în interiorul altui folder protejat este deja
+    acoperit de urmărirea recursivă a părintelui, deci nu se programează
+    de două ori (ar dubla evenimentele).
+
+    Parametri:
+        roots (list): Lista ProtectedRoot
+
+    Returnează:
+        list: Căile de programat în observer (sortate)
+    """
+    trie = PathTrie()
+    paths = []
+    for path in sorted(root.path for root in roots):
+        if trie.longest_prefix(path) is None:
+            trie.insert(path, True)
+            paths.append(path)
+    return paths
+
+
+def create_observer(handler, roots, backend=ACCESS_BACKEND):
+    """
+    Creează sursa evenimentelor de fișiere pentru folderele protejate.
+
+    Parametri:
+        handler (FolderAccessHandler): Handler-ul care primește evenimentele
+        roots (list): Lista ProtectedRoot urmărite
+        backend (str): config.ACCESS_BACKEND ("auto", "fanotify", "inotify", "watchdog")
+
+    Returnează:
+        tuple: (observer - start()/stop()/join(), backend-ul folosit)
+    """
+    backend = resolve_backend(backend)
+    if backend == 'watchdog':
+        observer = Observer()
+        for path in watch_paths(roots):
+            observer.schedule(handler, path, recursive=True)
+    else:
+        observer = KernelAccessMonitor(handler, watch_paths(roots), backend)
+    return observer, backend
 
 
 def main():
@@ -902,32 +2003,39 @@ def main():
     Funcția principală - punctul de intrare al aplicației.
 
     Această funcție:
-    1. Validează și găsește folderul protejat
+    1. Validează și găsește folderele protejate
     2. Inițializează monitorul de sistem de fișiere (watchdog)
     3. Inițializează monitorul de ferestre Finder
     4. Rulează în buclă până la întrerupere (Ctrl+C)
 
     Monitorizarea funcționează pe două canale:
-    - Watchdog: Detectează modificări de fișiere în folder
+    - Watchdog (sau, pe Linux, inotify/fanotify - vezi linux_access.py):
+      Detectează modificările, iar pe Linux și deschiderile și citirile
     - FinderWindowMonitor: Detectează deschiderea folderului în Finder
     """
+    log_listener = setup_logging()
     print("=" * 50)
     print("  MONITOR ACCES FOLDER")
     print("=" * 50)
 
-    # Găsim sau validăm folderul protejat
-    protected_path = get_protected_folder_path()
-    if not protected_path:
-        print("\nFailed to locate protected folder.")
+    # Găsim sau validăm folderele protejate
+    roots = get_protected_roots()
+    if not roots:
+        print("\nFailed to locate any protected folder.")
         print("Please check your config.py settings:")
-        print(f"  PROTECTED_FOLDER = '{PROTECTED_FOLDER}'")
+        print(f"  PROTECTED_FOLDERS = {PROTECTED_FOLDERS!r}")
         print(f"  SEARCH_ROOT = '{SEARCH_ROOT}'")
+        log_listener.stop()
         return
 
-    # Delete .DS_Store so we can detect when Finder opens the folder
-    delete_ds_store(protected_path)
+    # Delete .DS_Store so we can detect when Finder opens the folders
+    for root in roots:
+        delete_ds_store(root.path)
 
-    print(f"\nMonitoring folder: {protected_path}")
+    print(f"\nMonitoring {len(roots)} folder(s):")
+    for root in roots:
+        print(f"  {root.path} (cooldown {root.cooldown}s, "
+              f"approval valid {root.approval_cache_duration}s)")
     print(f"Cooldown: {ACCESS_COOLDOWN} seconds")
     print(f"Approval timeout: {APPROVAL_TIMEOUT} seconds")
     print(f"\nServer: {SERVER_URL}")
@@ -935,16 +2043,46 @@ def main():
     print("(Opens in Finder + file operations will trigger alerts)")
     print("(Press Ctrl+C to stop)\n")
 
+    # Camera pornită o singură dată - capturile nu mai plătesc pornirea la rece
+    capture_client = start_capture_service()
+    print(f"Camera: {(capture_client and capture_client.ping()) or 'unavailable'}")
+
     # Set up watchdog observer for file events
-    event_handler = FolderAccessHandler(protected_path)
-    observer = Observer()
-    observer.schedule(event_handler, protected_path, recursive=True)
+    event_handler = FolderAccessHandler(roots)
+    recorder = None
+    if TRACE_PATH:
+        recorder = TraceRecorder(TRACE_PATH, roots)
+        event_handler.recorder = event_handler.server.recorder = recorder
+        print(f"Recording trace: {TRACE_PATH} (replay with trace_replay.py)")
+    event_handler.start()
+    face_matcher = event_handler.approvals.face_matcher
+    if face_matcher is not None:
+        print(f"Face auto-approval: {len(face_matcher.gallery.names())} enrolled identity(ies), "
+              f"embedder {face_matcher.embedder.name}")
+    else:
+        print("Face auto-approval: disabled (no gallery or face_recognition missing)")
+    observer, backend = create_observer(event_handler, roots)
     observer.start()
+    if backend != 'watchdog':
+        print(f"File access events: {observer.backend} (kernel, {observer.watch_count} "
+              f"directories watched - opens and reads are detected)")
 
     # Set up Finder window monitor for folder opens
-    finder_monitor = FinderWindowMonitor(protected_path, event_handler)
+    finder_monitor = FinderWindowMonitor(event_handler)
     finder_monitor.start()
-    print("Finder window polling active (checks every 0.5s)")
+    print(f"Finder window polling active (adaptive {POLL_MIN_INTERVAL}-{POLL_MAX_INTERVAL}s, "
+          f"source: {finder_monitor.window_source.name})")
+
+    # Metricile sunt expuse local (Prometheus și JSON)
+    metrics_server = None
+    if METRICS_PORT is not None:
+        metrics_server = MetricsServer(METRICS_HOST, METRICS_PORT)
+        try:
+            port = metrics_server.start()
+            print(f"Metrics: http://{METRICS_HOST}:{port}/metrics (JSON: /metrics.json)")
+        except OSError as e:
+            print(f"Avertisment: serverul de metrici nu a putut porni: {e}")
+            metrics_server = None
 
     try:
         while True:
@@ -953,8 +2091,15 @@ def main():
         print("\nStopping monitor...")
         finder_monitor.stop()
         observer.stop()
+        event_handler.stop()
+        stop_capture_service()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if recorder is not None:
+            recorder.close()
 
     observer.join()
+    log_listener.stop()
     print("Monitor stopped.")
 
 
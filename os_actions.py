@@ -0,0 +1,322 @@
+"""
+Acțiunile Monitorului asupra Sistemului de Operare - Ferestre, notificări, ecran
+
+Descriere:
+    Fluxul de aprobare acționează asupra sistemului: închide fereastra
+    Finder, afișează popup-ul de așteptare și notificările, redeschide
+    folderul aprobat, blochează ecranul după un refuz. Până acum aceste
+    acțiuni erau metode ale FolderAccessHandler, care apelau direct
+    osascript - fluxul nu putea rula (sau fi măsurat) fără un Mac.
+
+    Backend-uri (ca window_sources.py și camera.py):
+    - MacOSActions: AppleScript, open, ScreenSaverEngine (comportamentul de până acum)
+    - OSActions: nu face nimic (doar jurnal) - celelalte sisteme
+    - RecordingOSActions: nu face nimic, dar păstrează fiecare apel
+      (nume, argumente, moment) - pentru reluări și benchmark-uri
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class OSActions:
+    """
+    Acțiunile fluxului de aprobare - implementarea de bază nu face nimic.
+
+    Atribute:
+        name (str): Numele backend-ului
+    """
+
+    name = 'none'
+
+    def close_finder_window(self, folder_path):
+        """Închide fereastra în care a fost deschis folderul protejat."""
+        log.debug("close_finder_window(%s) - no-op", folder_path)
+
+    def show_waiting_popup(self):
+        """
+        Afișează mesajul de așteptare a aprobării.
+
+        Returnează:
+            object: Un obiect transmis apoi lui close_waiting_popup (sau None)
+        """
+        return None
+
+    def close_waiting_popup(self, popup_process):
+        """Închide mesajul de așteptare returnat de show_waiting_popup."""
+
+    def show_approved_notification(self):
+        """Anunță utilizatorul că accesul a fost aprobat."""
+
+    def open_folder(self, folder_path):
+        """Redeschide folderul aprobat."""
+        log.debug("open_folder(%s) - no-op", folder_path)
+
+    def lock_screen(self):
+        """Blochează ecranul după un acces refuzat."""
+        log.warning("Access denied - screen lock not available on this system")
+
+    def show_denied_warning(self):
+        """Avertizează utilizatorul că accesul a fost refuzat."""
+
+    def rearm_folder(self, folder_path):
+        """Pregătește folderul pentru detectarea următoarei deschideri."""
+
+
+class MacOSActions(OSActions):
+    """Acțiunile pe macOS (AppleScript, open, ScreenSaverEngine)."""
+
+    name = 'macos'
+
+    def close_finder_window(self, folder_path):
+        """
+        Închide fereastra Finder și fereastra aplicației din prim-plan.
+
+        Folosește AppleScript pentru a închide toate ferestrele Finder și
+        fereastra aplicației active (cu excepția Terminal și editorilor de cod).
+        """
+        log.debug("close_finder_window apelat")
+        time.sleep(0.3)  # Let window render
+
+        # Get the frontmost app and close its windows (except Terminal/Code)
+        close_frontmost_script = '''
+        tell application "System Events"
+            set frontApp to name of first application process whose frontmost is true
+        end tell
+        return frontApp
+        '''
+        result_front = subprocess.run(
+            ['osascript', '-e', close_frontmost_script],
+            capture_output=True,
+            text=True
+        )
+        frontmost_app = result_front.stdout.strip()
+        log.debug("Frontmost app: '%s'", frontmost_app)
+
+        # Close that app's windows if it's not our terminal/editor
+        excluded_apps = ['Terminal', 'Code', 'iTerm2', 'iTerm', 'python', 'Python']
+        if frontmost_app and frontmost_app not in excluded_apps:
+            close_app_script = f'tell application "{frontmost_app}" to close every window'
+            result_close = subprocess.run(
+                ['osascript', '-e', close_app_script],
+                capture_output=True,
+                text=True
+            )
+            log.debug("Close %s windows result: rc=%s, stderr=%s",
+                      frontmost_app, result_close.returncode, result_close.stderr)
+
+        # Also close ALL Finder windows
+        result = subprocess.run(
+            ['osascript', '-e', 'tell application "Finder" to close every window'],
+            capture_output=True,
+            text=True
+        )
+        log.debug("close Finder windows result: rc=%s, stderr=%s", result.returncode, result.stderr)
+
+    def show_waiting_popup(self):
+        """
+        Afișează un popup de notificare că accesul așteaptă aprobare.
+
+        Creează un dialog AppleScript care informează utilizatorul că
+        cererea de acces a fost trimisă și așteaptă decizia administratorului.
+
+        Returnează:
+            subprocess.Popen: Procesul popup-ului (închis cu close_waiting_popup)
+        """
+        log.debug("Se lansează popup-ul de așteptare...")
+        script = '''
+        display dialog "Protected folder access detected.
+
+Awaiting admin approval..." buttons {} giving up after 300 with title "Access Control" with icon caution
+        '''
+        # Run in background so it doesn't block
+        popup_process = subprocess.Popen(
+            ['osascript', '-e', script],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        log.debug("Popup process started: pid=%s", popup_process.pid)
+        return popup_process
+
+    def close_waiting_popup(self, popup_process):
+        """
+        Închide popup-ul de așteptare al unei cereri.
+
+        Termină procesul AppleScript care afișează dialogul de așteptare.
+        Celelalte cereri în curs își păstrează popup-urile.
+
+        Parametri:
+            popup_process (subprocess.Popen): Procesul returnat de show_waiting_popup
+        """
+        if popup_process is not None and popup_process.poll() is None:
+            popup_process.terminate()
+
+    def show_approved_notification(self):
+        """
+        Afișează notificarea de aprobare.
+
+        Arată un mesaj macOS care informează utilizatorul că accesul a fost aprobat.
+        """
+        subprocess.run([
+            'osascript', '-e',
+            'display notification "Folder access approved by admin" with title "Access Granted" sound name "Glass"'
+        ])
+
+    def open_folder(self, folder_path):
+        """
+        Deschide folderul în Finder.
+
+        Parametri:
+            folder_path (str): Calea completă către folder
+        """
+        subprocess.run(['open', folder_path])
+
+    def lock_screen(self):
+        """
+        Blochează ecranul Mac-ului pornind screen saver-ul.
+
+        Dacă opțiunea "Solicită parolă" este activată în Preferințe Sistem,
+        aceasta blochează efectiv ecranul și necesită autentificare.
+        """
+        log.warning("SE BLOCHEAZĂ ECRANUL - Acces refuzat!")
+        # Pornește screen saver-ul - dacă "require password" este activat
+        # în System Preferences, aceasta blochează efectiv ecranul
+        subprocess.run([
+            'open', '-a', 'ScreenSaverEngine'
+        ])
+
+    def show_denied_warning(self):
+        """
+        Afișează avertismentul de acces refuzat.
+
+        Arată o notificare de avertizare pentru acces neautorizat; ecranul
+        este blocat de ApprovalEngine după ApprovalEngine.LOCK_DELAY secunde.
+        """
+        # Show non-blocking notification
+        subprocess.Popen([
+            'osascript', '-e',
+            'display notification "Screen will lock in 5 seconds..." with title "ACCESS DENIED" subtitle "Unauthorized folder access detected!" sound name "Basso"'
+        ])
+
+    def rearm_folder(self, folder_path):
+        """Șterge .DS_Store - Finder îl recreează la următoarea deschidere."""
+        delete_ds_store(folder_path)
+
+
+class RecordingOSActions(OSActions):
+    """
+    Acțiuni care doar se înregistrează - pentru reluări și benchmark-uri.
+
+    Atribute:
+        calls (list): Tupluri (nume, argumente, moment) în ordinea apelurilor
+        listeners (list): Funcții apelate cu fiecare apel (nume, argumente, moment)
+    """
+
+    name = 'recording'
+
+    def __init__(self, clock=time):
+        """
+        Parametri:
+            clock: Sursa de timp (modulul time sau un ceas virtual - time())
+        """
+        self.clock = clock
+        self.calls = []
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def _record(self, name, *args):
+        call = (name, args, self.clock.time())
+        with self._lock:
+            self.calls.append(call)
+        for listener in self.listeners:
+            listener(*call)
+
+    def counts(self):
+        """
+        Returnează numărul de apeluri per acțiune.
+
+        Returnează:
+            dict: nume -> număr de apeluri
+        """
+        with self._lock:
+            counts = {}
+            for name, _, _ in self.calls:
+                counts[name] = counts.get(name, 0) + 1
+            return counts
+
+    def close_finder_window(self, folder_path):
+        self._record('close_finder_window', folder_path)
+
+    def show_waiting_popup(self):
+        self._record('show_waiting_popup')
+        return None
+
+    def close_waiting_popup(self, popup_process):
+        self._record('close_waiting_popup')
+
+    def show_approved_notification(self):
+        self._record('show_approved_notification')
+
+    def open_folder(self, folder_path):
+        self._record('open_folder', folder_path)
+
+    def lock_screen(self):
+        self._record('lock_screen')
+
+    def show_denied_warning(self):
+        self._record('show_denied_warning')
+
+    def rearm_folder(self, folder_path):
+        self._record('rearm_folder', folder_path)
+
+
+def create_os_actions(kind='auto'):
+    """
+    Creează backend-ul acțiunilor potrivit pentru platforma curentă.
+
+    Parametri:
+        kind (str): 'auto', 'macos', 'none' sau 'recording'
+
+    Returnează:
+        OSActions: Backend-ul ales ('auto' = 'macos' pe macOS, altfel 'none')
+
+    Ridică:
+        ValueError: Dacă tipul nu este cunoscut
+    """
+    if kind == 'auto':
+        kind = 'macos' if sys.platform == 'darwin' else 'none'
+    if kind == 'macos':
+        return MacOSActions()
+    if kind == 'none':
+        return OSActions()
+    if kind == 'recording':
+        return RecordingOSActions()
+    raise ValueError(f"Backend de acțiuni necunoscut: {kind!r}")
+
+
+def delete_ds_store(folder_path):
+    """
+    Șterge fișierul .DS_Store pentru ca Finder să îl recreeze la deschidere.
+
+    Fișierul .DS_Store este creat de Finder când se deschide un folder.
+    Prin ștergerea lui, putem detecta următoarea deschidere a folderului.
+
+    Parametri:
+        folder_path (str): Calea către folder
+    """
+    ds_store = os.path.join(folder_path, '.DS_Store')
+    try:
+        if os.path.exists(ds_store):
+            os.remove(ds_store)
+            log.debug("S-a șters .DS_Store pentru a permite detectarea deschiderii")
+    except Exception as e:
+        log.warning("Nu s-a putut șterge .DS_Store: %s", e)
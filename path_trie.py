@@ -0,0 +1,198 @@
+"""
+Trie peste Componentele Căilor - Potrivire rapidă după prefix de cale
+
+Descriere:
+    Un trie în care fiecare nivel corespunde unei componente a căii
+    (ex: "/Users/ana/Confidential" -> "Users" -> "ana" -> "Confidential").
+    Găsirea celui mai lung prefix înregistrat pentru o cale costă O(adâncime),
+    indiferent de câte căi sunt înregistrate - spre deosebire de o listă
+    de comparații startswith.
+
+    Este folosit pentru:
+    - rădăcinile protejate (care folder protejat conține o cale?)
+    - cache-ul aprobărilor (ce aprobări acoperă o cale? - approval_cache.py)
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import os
+
+
+def split_path(path):
+    """
+    Împarte o cale în componente, după normalizare.
+
+    Parametri:
+        path (str): Calea (ex: "/Users/ana/Confidential/")
+
+    Returnează:
+        list: Componentele căii (ex: ['Users', 'ana', 'Confidential'])
+    """
+    return [part for part in os.path.normpath(path).split(os.sep) if part]
+
+
+class _Node:
+    """Un nod al trie-ului: copiii după componentă și valoarea (opțională)."""
+
+    __slots__ = ('children', 'value', 'has_value')
+
+    def __init__(self):
+        self.children = {}
+        self.value = None
+        self.has_value = False
+
+
+class PathTrie:
+    """
+    Trie care asociază valori unor căi și găsește cel mai lung prefix.
+
+    Exemplu:
+        trie = PathTrie()
+        trie.insert('/Users/ana/Confidential', 'A')
+        trie.longest_prefix('/Users/ana/Confidential/x/y.pdf')
+        # -> ('/Users/ana/Confidential', 'A')
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _find_node(self, path):
+        node = self._root
+        for part in split_path(path):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def insert(self, path, value):
+        """
+        Asociază o valoare unei căi (înlocuiește valoarea existentă).
+
+        Parametri:
+            path (str): Calea
+            value: Valoarea asociată
+        """
+        node = self._root
+        for part in split_path(path):
+            node = node.children.setdefault(part, _Node())
+        if not node.has_value:
+            self._size += 1
+        node.value = value
+        node.has_value = True
+
+    def remove(self, path):
+        """
+        Elimină valoarea asociată unei căi.
+
+        Parametri:
+            path (str): Calea
+
+        Returnează:
+            bool: True dacă exista o valoare pentru această cale
+        """
+        parts = split_path(path)
+        trail = [self._root]
+        for part in parts:
+            node = trail[-1].children.get(part)
+            if node is None:
+                return False
+            trail.append(node)
+
+        node = trail[-1]
+        if not node.has_value:
+            return False
+        node.value = None
+        node.has_value = False
+        self._size -= 1
+
+        # Eliminăm nodurile rămase fără valoare și fără copii
+        for depth in range(len(parts), 0, -1):
+            node = trail[depth]
+            if node.has_value or node.children:
+                break
+            del trail[depth - 1].children[parts[depth - 1]]
+        return True
+
+    def get(self, path, default=None):
+        """
+        Returnează valoarea asociată exact acestei căi.
+
+        Parametri:
+            path (str): Calea
+            default: Valoarea returnată dacă nu există
+
+        Returnează:
+            Valoarea asociată sau default
+        """
+        node = self._find_node(path)
+        if node is None or not node.has_value:
+            return default
+        return node.value
+
+    def longest_prefix(self, path):
+        """
+        Găsește cea mai lungă cale înregistrată care este prefix (ca
+        succesiune de componente) pentru calea dată.
+
+        Parametri:
+            path (str): Calea căutată (fișier sau folder)
+
+        Returnează:
+            tuple: (cale_prefix, valoare) dacă există
+            None: Dacă nicio cale înregistrată nu conține calea dată
+        """
+        node = self._root
+        parts = split_path(path)
+        best_depth, best_value = (0, node.value) if node.has_value else (-1, None)
+        for depth, part in enumerate(parts, 1):
+            node = node.children.get(part)
+            if node is None:
+                break
+            if node.has_value:
+                best_depth, best_value = depth, node.value
+
+        if best_depth < 0:
+            return None
+        return os.sep + os.sep.join(parts[:best_depth]), best_value
+
+    def prefixes(self, path):
+        """
+        Găsește toate căile înregistrate care sunt prefix pentru calea dată.
+
+        Parametri:
+            path (str): Calea căutată (fișier sau folder)
+
+        Returnează:
+            list: Perechi (cale_prefix, valoare), de la cea mai adâncă la rădăcină
+        """
+        node = self._root
+        parts = split_path(path)
+        found = [(os.sep, node.value)] if node.has_value else []
+        for depth, part in enumerate(parts, 1):
+            node = node.children.get(part)
+            if node is None:
+                break
+            if node.has_value:
+                found.append((os.sep + os.sep.join(parts[:depth]), node.value))
+        found.reverse()
+        return found
+
+    def items(self):
+        """
+        Parcurge toate perechile (cale, valoare) din trie.
+
+        Returnează:
+            generator: Perechi (cale, valoare)
+        """
+        stack = [((), self._root)]
+        while stack:
+            parts, node = stack.pop()
+            if node.has_value:
+                yield os.sep + os.sep.join(parts), node.value
+            for part, child in node.children.items():
+                stack.append((parts + (part,), child))
@@ -0,0 +1,439 @@
+"""
+Stare Partajată între Procese - Aprobări și starea folderelor protejate
+
+Descriere:
+    Când folderele protejate sunt împărțite între mai multe procese (vezi
+    supervisor.py), o aprobare acordată într-un proces trebuie să fie
+    vizibilă imediat în toate celelalte, iar cooldown-ul și indicatorul
+    "așteaptă decizie" ale unui folder trebuie să fie aceleași pentru
+    supervizor (care verifică ferestrele Finder) și pentru procesul care
+    deține folderul.
+
+    Ambele structuri stau într-un segment de memorie partajată
+    (multiprocessing.shared_memory), deci o citire nu trece prin niciun
+    canal de comunicare între procese:
+
+    SharedRootTable:
+    - câte o poziție per folder protejat: momentul ultimului acces și
+      indicatorul "așteaptă decizie" (două valori float64)
+
+    SharedApprovalCache:
+    - același API ca ApprovalCache (approval_cache.py): grant, lookup,
+      remaining, any_valid, revoke, revoke_attempt, stats
+    - tabelă hash cu adresare deschisă (sondare liniară, ștergere prin
+      deplasare înapoi - fără pietre funerare), indexată după un hash de
+      64 de biți al căii aprobate; căutarea verifică prefixele căii, deci
+      rămâne O(adâncime)
+    - numărul de intrări este fix; la depășire este eliminată intrarea
+      care expiră cel mai curând (ordinea LRU nu poate fi ținută ieftin
+      între procese)
+    - modificările sunt serializate de un multiprocessing.Lock comun;
+      dacă lock-ul nu poate fi obținut (un proces a murit în timp ce îl
+      ținea), căutarea raportează "fără aprobare" - se cere din nou
+      aprobarea, niciodată invers
+
+    Obiectele pot fi trimise proceselor pornite cu multiprocessing
+    (argumentele Process): procesul copil se atașează la același segment.
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+from approval_cache import ApprovalEntry
+from config import APPROVAL_CACHE_DURATION, APPROVAL_CACHE_SIZE
+from path_trie import split_path
+
+log = logging.getLogger(__name__)
+
+# Antetul tabelei de aprobări: entries, hits, misses, evictions, revoked
+_HEADER = struct.Struct('<5q')
+_HEADER_SIZE = 64
+
+# O poziție: hash-ul căii (0 = liberă), expirarea, ID-ul încercării (-1 = necunoscut),
+# lungimea căii în octeți; urmează calea (UTF-8)
+_SLOT = struct.Struct('<QdqH')
+_SLOT_HEADER_SIZE = 32
+
+# Lungimea maximă (octeți) a unei căi aprobate păstrate în memoria partajată
+PATH_MAX_BYTES = 1024
+
+_SLOT_SIZE = _SLOT_HEADER_SIZE + PATH_MAX_BYTES
+
+
+def _open_segment(name=None, size=0):
+    """Creează un segment nou (name=None) sau se atașează la unul existent."""
+    if name is None:
+        return shared_memory.SharedMemory(create=True, size=size)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _path_key(encoded):
+    """Hash-ul de 64 de biți al unei căi (niciodată 0 - valoarea pozițiilor libere)."""
+    key = int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), 'little')
+    return key or 1
+
+
+def _encode(path):
+    return path.encode('utf-8', 'surrogateescape')
+
+
+class SharedRootTable:
+    """
+    Starea folderelor protejate (ultimul acces, așteaptă decizie), în memorie partajată.
+
+    Fiecare folder are o poziție fixă (slot), aleasă de cel care creează
+    tabela (supervisor.py folosește ordinea alfabetică a căilor).
+    Valorile sunt float64 aliniate, deci o citire sau o scriere este
+    atomică și nu are nevoie de lock.
+
+    Atribute:
+        size (int): Numărul de poziții
+        name (str): Numele segmentului de memorie partajată
+    """
+
+    def __init__(self, size=0, name=None):
+        """
+        Parametri:
+            size (int): Numărul de foldere protejate (la creare)
+            name (str, optional): Segmentul existent la care se atașează
+        """
+        self._segment = _open_segment(name, max(size, 1) * 16)
+        self._values = self._segment.buf.cast('d')
+        self.size = len(self._values) // 2
+        self.name = self._segment.name
+
+    def __reduce__(self):
+        return (SharedRootTable, (0, self.name))
+
+    def last_access(self, slot):
+        """Momentul (time.time) ultimului acces care a declanșat o alertă."""
+        return self._values[2 * slot]
+
+    def set_last_access(self, slot, value):
+        self._values[2 * slot] = value
+
+    def pending(self, slot):
+        """True dacă folderul așteaptă decizia administratorului."""
+        return self._values[2 * slot + 1] != 0.0
+
+    def set_pending(self, slot, flag):
+        self._values[2 * slot + 1] = 1.0 if flag else 0.0
+
+    def close(self):
+        """Se detașează de segment (segmentul rămâne pentru celelalte procese)."""
+        self._values.release()
+        self._segment.close()
+
+    def unlink(self):
+        """Distruge segmentul - doar procesul care l-a creat, la oprire."""
+        self._segment.unlink()
+
+
+class SharedApprovalCache:
+    """
+    Cache de aprobări comun mai multor procese (API-ul ApprovalCache).
+
+    Atribute:
+        max_entries (int): Numărul maxim de aprobări păstrate
+        capacity (int): Pozițiile tabelei hash (putere a lui 2, >= 2 * max_entries)
+        default_ttl (float): Durata implicită a unei aprobări (secunde)
+        lock_timeout (float): Cât se așteaptă lock-ul comun (secunde)
+        name (str): Numele segmentului de memorie partajată
+    """
+
+    def __init__(self, max_entries=APPROVAL_CACHE_SIZE, default_ttl=APPROVAL_CACHE_DURATION,
+                 lock=None, name=None, clock=time.time, lock_timeout=1.0):
+        """
+        Parametri:
+            max_entries (int): Numărul maxim de aprobări (la creare)
+            default_ttl (float): Durata implicită a unei aprobări (secunde)
+            lock (multiprocessing.Lock, optional): Lock-ul comun (implicit unul nou)
+            name (str, optional): Segmentul existent la care se atașează
+            clock (callable): Sursa de timp (secunde, aceeași în toate procesele)
+            lock_timeout (float): Cât se așteaptă lock-ul comun (secunde)
+        """
+        capacity = 1
+        while capacity < 2 * max_entries:
+            capacity *= 2
+        self._segment = _open_segment(name, _HEADER_SIZE + capacity * _SLOT_SIZE)
+        self._buf = self._segment.buf
+        self.max_entries = max_entries
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self.default_ttl = default_ttl
+        self.lock_timeout = lock_timeout
+        self._lock = lock if lock is not None else multiprocessing.Lock()
+        self._clock = clock
+        self.name = self._segment.name
+
+    def __reduce__(self):
+        # Trimis unui proces copil: se atașează la același segment, cu același lock
+        return (SharedApprovalCache, (self.max_entries, self.default_ttl, self._lock, self.name,
+                                      self._clock, self.lock_timeout))
+
+    def __len__(self):
+        return self._header()[0]
+
+    # ------------------------------------------------------------------
+    # Acces la memoria partajată (apelantul ține lock-ul)
+    # ------------------------------------------------------------------
+
+    def _header(self):
+        return list(_HEADER.unpack_from(self._buf, 0))
+
+    def _add_header(self, field, amount=1):
+        values = self._header()
+        values[field] += amount
+        _HEADER.pack_into(self._buf, 0, *values)
+
+    def _offset(self, index):
+        return _HEADER_SIZE + index * _SLOT_SIZE
+
+    def _read(self, index):
+        """Returnează (key, expires_at, attempt_id, cale în octeți) pentru o poziție."""
+        offset = self._offset(index)
+        key, expires_at, attempt_id, length = _SLOT.unpack_from(self._buf, offset)
+        if not key:
+            return 0, 0.0, -1, b''
+        start = offset + _SLOT_HEADER_SIZE
+        return key, expires_at, attempt_id, bytes(self._buf[start:start + length])
+
+    def _write(self, index, key, expires_at, attempt_id, encoded):
+        offset = self._offset(index)
+        _SLOT.pack_into(self._buf, offset, key, expires_at, attempt_id, len(encoded))
+        start = offset + _SLOT_HEADER_SIZE
+        self._buf[start:start + len(encoded)] = encoded
+
+    def _find(self, key, encoded):
+        """Poziția căii (sau prima poziție liberă de pe traseul ei) și dacă a fost găsită."""
+        index = key & self._mask
+        while True:
+            slot_key, _, _, slot_path = self._read(index)
+            if not slot_key:
+                return index, False
+            if slot_key == key and slot_path == encoded:
+                return index, True
+            index = (index + 1) & self._mask
+
+    def _delete(self, index):
+        """Eliberează o poziție și mută înapoi intrările care ar deveni inaccesibile."""
+        hole = index
+        index = (index + 1) & self._mask
+        while True:
+            key, expires_at, attempt_id, encoded = self._read(index)
+            if not key:
+                break
+            home = key & self._mask
+            # Intrarea rămâne dacă poziția ei ideală este (circular) între gol și ea
+            if (index - home) & self._mask >= (index - hole) & self._mask:
+                self._write(hole, key, expires_at, attempt_id, encoded)
+                hole = index
+            index = (index + 1) & self._mask
+        _SLOT.pack_into(self._buf, self._offset(hole), 0, 0.0, -1, 0)
+        self._add_header(0, -1)
+
+    def _entries(self):
+        """Toate intrările ocupate: (poziție, key, expires_at, attempt_id, cale)."""
+        for index in range(self.capacity):
+            key, expires_at, attempt_id, encoded = self._read(index)
+            if key:
+                yield index, key, expires_at, attempt_id, encoded
+
+    def _remove_paths(self, paths):
+        removed = 0
+        for encoded in paths:
+            index, found = self._find(_path_key(encoded), encoded)
+            if found:
+                self._delete(index)
+                removed += 1
+        return removed
+
+    def _acquire(self):
+        if self._lock.acquire(timeout=self.lock_timeout):
+            return True
+        log.warning("Shared approval lock not acquired in %.1fs - a process probably "
+                    "died holding it", self.lock_timeout)
+        return False
+
+    # ------------------------------------------------------------------
+    # API-ul ApprovalCache
+    # ------------------------------------------------------------------
+
+    def grant(self, path, ttl=None, attempt_id=None):
+        """
+        Adaugă (sau reînnoiește) aprobarea unei căi, vizibilă în toate procesele.
+
+        Parametri:
+            path (str): Calea aprobată
+            ttl (float, optional): Durata aprobării (implicit default_ttl)
+            attempt_id (int, optional): ID-ul încercării aprobate
+
+        Returnează:
+            ApprovalEntry: Intrarea creată (nepartajată dacă calea depășește
+                PATH_MAX_BYTES sau lock-ul nu a putut fi obținut)
+        """
+        path = os.path.normpath(path)
+        entry = ApprovalEntry(path, self._clock() + (self.default_ttl if ttl is None else ttl),
+                              attempt_id)
+        encoded = _encode(path)
+        if len(encoded) > PATH_MAX_BYTES:
+            log.warning("Approval for %s not shared - path longer than %s bytes",
+                        path, PATH_MAX_BYTES)
+            return entry
+        if not self._acquire():
+            return entry
+        try:
+            key = _path_key(encoded)
+            index, found = self._find(key, encoded)
+            if not found and len(self) >= self.max_entries:
+                self._evict()
+                index, _ = self._find(key, encoded)
+            self._write(index, key, entry.expires_at,
+                        -1 if attempt_id is None else attempt_id, encoded)
+            if not found:
+                self._add_header(0)
+        finally:
+            self._lock.release()
+        return entry
+
+    def _evict(self):
+        """Elimină intrările expirate sau, dacă nu există, pe cea care expiră cel mai curând."""
+        now = self._clock()
+        entries = list(self._entries())
+        expired = [encoded for _, _, expires_at, _, encoded in entries if expires_at <= now]
+        if not expired:
+            expired = [min(entries, key=lambda item: item[2])[4]]
+            self._add_header(3)
+        self._remove_paths(expired)
+
+    def lookup(self, path):
+        """
+        Găsește aprobarea validă care acoperă o cale.
+
+        Sunt verificate doar prefixele căii (O(adâncime)); intrările expirate
+        întâlnite sunt eliminate.
+
+        Parametri:
+            path (str): Calea accesată (fișier sau folder)
+
+        Returnează:
+            ApprovalEntry: Aprobarea cea mai specifică încă validă
+            None: Dacă nicio aprobare validă nu acoperă calea
+        """
+        parts = split_path(path)
+        now = self._clock()
+        if not self._acquire():
+            return None
+        try:
+            for depth in range(len(parts), -1, -1):
+                prefix = os.sep + os.sep.join(parts[:depth])
+                encoded = _encode(prefix)
+                index, found = self._find(_path_key(encoded), encoded)
+                if not found:
+                    continue
+                _, expires_at, attempt_id, _ = self._read(index)
+                if expires_at <= now:
+                    self._delete(index)
+                    continue
+                self._add_header(1)
+                return ApprovalEntry(prefix, expires_at, None if attempt_id < 0 else attempt_id)
+            self._add_header(2)
+            return None
+        finally:
+            self._lock.release()
+
+    def remaining(self, path):
+        """
+        Returnează câte secunde mai este validă aprobarea unei căi.
+
+        Parametri:
+            path (str): Calea
+
+        Returnează:
+            float: Secundele rămase (0 dacă nu există o aprobare validă)
+        """
+        entry = self.lookup(path)
+        return max(entry.expires_at - self._clock(), 0) if entry else 0
+
+    def any_valid(self):
+        """True dacă există cel puțin o aprobare nerevocată și neexpirată."""
+        now = self._clock()
+        if not self._acquire():
+            return False
+        try:
+            return any(expires_at > now for _, _, expires_at, _, _ in self._entries())
+        finally:
+            self._lock.release()
+
+    def revoke(self, path):
+        """
+        Revocă aprobările care acoperă o cale sau se află sub ea.
+
+        Parametri:
+            path (str): Calea revocată
+
+        Returnează:
+            int: Numărul de intrări eliminate
+        """
+        path = os.path.normpath(path)
+        parts = split_path(path)
+        covering = {_encode(os.sep + os.sep.join(parts[:depth]))
+                    for depth in range(len(parts) + 1)}
+        below = _encode(path.rstrip(os.sep) + os.sep)
+        # O revocare nu se abandonează la timeout: se așteaptă lock-ul
+        with self._lock:
+            targets = [encoded for _, _, _, _, encoded in self._entries()
+                       if encoded in covering or encoded.startswith(below)]
+            removed = self._remove_paths(targets)
+            self._add_header(4, removed)
+            return removed
+
+    def revoke_attempt(self, attempt_id):
+        """
+        Revocă aprobările acordate pentru o încercare.
+
+        Parametri:
+            attempt_id (int): ID-ul încercării aprobate
+
+        Returnează:
+            int: Numărul de intrări eliminate
+        """
+        with self._lock:
+            targets = [encoded for _, _, _, slot_attempt, encoded in self._entries()
+                       if slot_attempt == attempt_id]
+            removed = self._remove_paths(targets)
+            self._add_header(4, removed)
+            return removed
+
+    def stats(self):
+        """
+        Returnează statisticile cache-ului (însumate pentru toate procesele).
+
+        Returnează:
+            dict: entries, hits, misses, evictions, revoked
+        """
+        entries, hits, misses, evictions, revoked = self._header()
+        return {
+            'entries': entries,
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'revoked': revoked,
+        }
+
+    def close(self):
+        """Se detașează de segment (segmentul rămâne pentru celelalte procese)."""
+        self._buf = None
+        self._segment.close()
+
+    def unlink(self):
+        """Distruge segmentul - doar procesul care l-a creat, la oprire."""
+        self._segment.unlink()
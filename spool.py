@@ -0,0 +1,401 @@
+"""
+Spool Local pentru Încercările de Acces - Nicio încercare pierdută la întreruperi
+
+Descriere:
+    Fiecare încercare de acces este scrisă mai întâi într-o bază SQLite locală
+    (mod WAL), lângă monitor, și abia apoi trimisă la server. Dacă serverul
+    nu poate fi contactat, monitorul refuză accesul (ca înainte), dar
+    încercarea rămâne în spool. Un fir de fundal (SpoolReplayer) o retrimite
+    când conexiunea revine, în loturi, prin endpoint-ul /api/attempts/batch.
+
+    Fiecare încercare are un client_ref (UUID) generat local; serverul îl
+    folosește pentru a nu crea duplicate, deci o încercare poate fi retrimisă
+    oricât de des fără efecte secundare.
+
+    Stări în spool:
+        live   - trimisă chiar acum de fluxul de aprobare
+        queued - trimiterea a eșuat, așteaptă retrimiterea
+        sent   - înregistrată pe server (server_id cunoscut)
+        failed - respinsă de server (date invalide); nu mai este retrimisă
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from config import SPOOL_PATH, SPOOL_BATCH_SIZE, SPOOL_REPLAY_INTERVAL, SPOOL_RETENTION
+
+log = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_ref TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    server_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS spool_state ON spool(state, id);
+"""
+
+
+class AttemptSpool:
+    """
+    Jurnal local, durabil, al încercărilor de acces.
+
+    Atribute:
+        path (str): Calea bazei de date SQLite a spool-ului
+    """
+
+    LIVE = 'live'
+    QUEUED = 'queued'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    def __init__(self, path=SPOOL_PATH):
+        """
+        Deschide (sau creează) spool-ul.
+
+        Încercările rămase în starea 'live' (monitorul s-a oprit în timpul
+        fluxului de aprobare) sunt trecute în 'queued' pentru a fi retrimise,
+        cu statusul 'denied' dacă nu aveau deja un rezultat local: niciun
+        monitor nu mai așteaptă decizia lor (fail closed).
+
+        Parametri:
+            path (str): Calea bazei de date SQLite
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._requeue_interrupted()
+
+    def _requeue_interrupted(self):
+        """Pune în coadă, refuzate, încercările rămase 'live' după o oprire bruscă."""
+        rows = self._conn.execute(
+            "SELECT client_ref, payload FROM spool WHERE state = ?", (self.LIVE,)
+        ).fetchall()
+        updates = []
+        for client_ref, payload in rows:
+            entry = json.loads(payload)
+            if entry.get('status') in (None, 'pending'):
+                entry['status'] = 'denied'
+                entry['decision_source'] = 'monitor'
+            updates.append((self.QUEUED, json.dumps(entry), client_ref))
+        if updates:
+            log.warning("Spool: %d attempt(s) interrupted by a restart - replaying them as denied",
+                        len(updates))
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE spool SET state = ?, payload = ? WHERE client_ref = ?", updates)
+
+    def append(self, payload, client_ref=None):
+        """
+        Adaugă o încercare în spool (înainte de trimiterea la server).
+
+        Parametri:
+            payload (dict): Datele încercării (folder_path, access_type, photo_path)
+            client_ref (str, optional): Identificatorul local (implicit un UUID nou)
+
+        Returnează:
+            dict: Datele completate cu client_ref și timestamp (de trimis la server)
+        """
+        entry = dict(payload)
+        entry['client_ref'] = client_ref or uuid.uuid4().hex
+        entry.setdefault('timestamp', datetime.now(timezone.utc).isoformat())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO spool (client_ref, payload, state, created_at) VALUES (?, ?, ?, ?)",
+                (entry['client_ref'], json.dumps(entry), self.LIVE, time.time())
+            )
+        return entry
+
+    def mark_sent(self, client_ref, server_id):
+        """
+        Marchează o încercare ca înregistrată pe server.
+
+        Parametri:
+            client_ref (str): Identificatorul local
+            server_id (int): ID-ul încercării pe server
+        """
+        self.mark_sent_many([(client_ref, server_id)])
+
+    def mark_sent_many(self, pairs):
+        """
+        Marchează mai multe încercări ca înregistrate (o singură tranzacție).
+
+        Parametri:
+            pairs (list): Perechi (client_ref, server_id)
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE spool SET state = ?, sent_at = ?, server_id = ? WHERE client_ref = ?",
+                    [(self.SENT, now, server_id, client_ref) for client_ref, server_id in pairs]
+                )
+
+    def mark_queued(self, client_ref, status=None):
+        """
+        Marchează o încercare pentru retrimitere.
+
+        Parametri:
+            client_ref (str): Identificatorul local
+            status (str, optional): Rezultatul local (ex: 'denied' - refuz
+                automat pentru că serverul nu a fost disponibil)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM spool WHERE client_ref = ?", (client_ref,)
+            ).fetchone()
+            if row is None:
+                return
+            entry = json.loads(row[0])
+            if status:
+                entry['status'] = status
+            self._conn.execute(
+                "UPDATE spool SET state = ?, payload = ? WHERE client_ref = ? AND state != ?",
+                (self.QUEUED, json.dumps(entry), client_ref, self.SENT)
+            )
+
+    def mark_failed(self, client_ref, error):
+        """
+        Scoate din coadă o încercare respinsă de server (nu mai este retrimisă).
+
+        Parametri:
+            client_ref (str): Identificatorul local
+            error (str): Motivul respingerii (jurnal)
+        """
+        log.warning("Spool: attempt %s rejected by the server (%s) - not replaying it",
+                    client_ref, error)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE spool SET state = ? WHERE client_ref = ? AND state != ?",
+                (self.FAILED, client_ref, self.SENT)
+            )
+
+    def update(self, client_ref, **fields):
+        """
+        Actualizează datele unei încercări (ex: fotografia, atașată ulterior).
+
+        Parametri:
+            client_ref (str): Identificatorul local
+            **fields: Câmpurile de actualizat (ex: photo_path='capture_...jpg')
+
+        Returnează:
+            tuple: (stare, server_id) - dacă încercarea a fost deja trimisă,
+                   actualizarea trebuie trimisă și serverului
+            None: Dacă încercarea nu există în spool
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, state, server_id FROM spool WHERE client_ref = ?", (client_ref,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = json.loads(row[0])
+            entry.update(fields)
+            self._conn.execute(
+                "UPDATE spool SET payload = ? WHERE client_ref = ?", (json.dumps(entry), client_ref)
+            )
+        return row[1], row[2]
+
+    def queued(self, limit=SPOOL_BATCH_SIZE):
+        """
+        Returnează cele mai vechi încercări care așteaptă retrimiterea.
+
+        Parametri:
+            limit (int): Numărul maxim de încercări
+
+        Returnează:
+            list: Datele încercărilor (dict), în ordinea în care au fost adăugate
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM spool WHERE state = ? ORDER BY id LIMIT ?",
+                (self.QUEUED, limit)
+            ).fetchall()
+        return [json.loads(payload) for payload, in rows]
+
+    def counts(self):
+        """
+        Returnează numărul de încercări pe stări.
+
+        Returnează:
+            dict: stare -> număr (ex: {'queued': 3, 'sent': 120})
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM spool GROUP BY state").fetchall()
+        return dict(rows)
+
+    def purge_sent(self, older_than=SPOOL_RETENTION):
+        """
+        Șterge încercările trimise mai vechi de older_than secunde.
+
+        Parametri:
+            older_than (float): Vârsta minimă (secunde)
+
+        Returnează:
+            int: Numărul de încercări șterse
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM spool WHERE state = ? AND sent_at < ?",
+                (self.SENT, time.time() - older_than)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        """Închide baza de date."""
+        with self._lock:
+            self._conn.close()
+
+
+class SpoolReplayer:
+    """
+    Fir de fundal care retrimite încercările din spool la server, în loturi.
+
+    Cât timp serverul nu răspunde, firul încearcă la fiecare
+    SPOOL_REPLAY_INTERVAL secunde (cu jitter, pentru ca mai multe monitoare
+    să nu revină simultan). Când un lot reușește, următorul este trimis
+    imediat, până la golirea spool-ului.
+
+    Atribute:
+        spool (AttemptSpool): Spool-ul din care se citește
+        client: Clientul HTTP (ServerClient din monitor.py - post_json)
+        batch_size (int): Numărul de încercări per lot
+        interval (float): Intervalul de bază între încercări (secunde)
+        replayed (int): Numărul de încercări retrimise cu succes
+        batches (int): Numărul de loturi trimise cu succes
+        rejected (int): Numărul de încercări respinse de server (stare 'failed')
+    """
+
+    def __init__(self, spool, client, batch_size=SPOOL_BATCH_SIZE, interval=SPOOL_REPLAY_INTERVAL):
+        """
+        Parametri:
+            spool (AttemptSpool): Spool-ul din care se citește
+            client: Clientul HTTP (trebuie să aibă post_json(path, payload))
+            batch_size (int): Numărul de încercări per lot
+            interval (float): Intervalul de bază între încercări (secunde)
+        """
+        self.spool = spool
+        self.client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.replayed = 0
+        self.batches = 0
+        self.rejected = 0
+        self.running = False
+        self._wake_event = threading.Event()
+
+    def start(self):
+        """Pornește firul de retrimitere."""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='spool-replayer', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Oprește firul de retrimitere."""
+        self.running = False
+        self._wake_event.set()
+
+    def wake(self):
+        """Trezește firul (ex: o încercare tocmai a fost pusă în coadă)."""
+        self._wake_event.set()
+
+    def replay_batch(self):
+        """
+        Trimite un lot de încercări din spool.
+
+        Dacă serverul respinge lotul (o singură încercare invalidă anulează
+        tot lotul), încercările sunt trimise una câte una: cele respinse
+        trec în starea 'failed', iar restul nu mai rămân blocate în spatele lor.
+
+        Returnează:
+            int: Numărul de încercări trimise (0 dacă spool-ul este gol)
+
+        Ridică:
+            Exception: Dacă serverul nu a putut fi contactat
+        """
+        entries = self.spool.queued(self.batch_size)
+        if not entries:
+            return 0
+        try:
+            data = self.client.post_json('/api/attempts/batch', {'attempts': entries},
+                                         deadline=30)
+        except Exception as e:
+            if getattr(e, 'status', None) is None:
+                raise  # Serverul nu a putut fi contactat - lotul este retrimis mai târziu
+            data = {'error': str(e)}
+        if 'results' not in data:
+            log.warning("Spool: batch of %d rejected (%s) - replaying one by one",
+                        len(entries), data.get('error'))
+            return self.replay_each(entries)
+        self.spool.mark_sent_many([(r['client_ref'], r['id']) for r in data['results']])
+        self.replayed += len(entries)
+        self.batches += 1
+        return len(entries)
+
+    def replay_each(self, entries):
+        """
+        Trimite încercările una câte una (după un lot respins).
+
+        O încercare respinsă cu un răspuns 4xx trece în starea 'failed'; una
+        care produce o eroare a serverului (5xx) rămâne în coadă.
+
+        Parametri:
+            entries (list): Încercările lotului
+
+        Returnează:
+            int: Numărul de încercări scoase din coadă (trimise sau respinse)
+
+        Ridică:
+            Exception: Dacă serverul nu mai poate fi contactat
+        """
+        done = 0
+        for entry in entries:
+            try:
+                data = self.client.post_json('/api/attempt', entry, deadline=10)
+            except Exception as e:
+                status = getattr(e, 'status', None)
+                if status is None:
+                    raise
+                if status >= 500:
+                    log.warning("Spool: attempt %s failed on the server (%s) - will retry",
+                                entry['client_ref'], e)
+                    continue
+                self.spool.mark_failed(entry['client_ref'], str(e))
+                self.rejected += 1
+            else:
+                self.spool.mark_sent(entry['client_ref'], data['id'])
+                self.replayed += 1
+            done += 1
+        return done
+
+    def _run(self):
+        while self.running:
+            try:
+                sent = self.replay_batch()
+            except Exception as e:
+                log.debug("Spool replay failed: %s", e)
+                sent = 0
+            if sent:
+                log.debug("Spool replayed %s attempt(s)", sent)
+                if sent == self.batch_size:
+                    continue
+                self.spool.purge_sent()
+            self._wake_event.wait(self.interval * random.uniform(0.5, 1.5))
+            self._wake_event.clear()
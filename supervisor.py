@@ -0,0 +1,500 @@
+"""
+Supervizorul Monitorului - Folderele protejate împărțite între mai multe procese
+
+Descriere:
+    monitor.py rulează totul într-un singur proces: cu multe foldere
+    protejate (sau foldere foarte active), un singur interpretor Python
+    procesează toate evenimentele, iar o eroare fatală oprește protecția
+    tuturor folderelor.
+
+    supervisor.py:
+    - împarte folderele protejate în grupuri (shard-uri), câte unul per
+      proces de lucru (worker); un folder protejat aflat în interiorul
+      altuia rămâne în grupul părintelui (un singur observator recursiv)
+    - fiecare worker rulează propriul observator de fișiere
+      (inotify/fanotify/watchdog - vezi linux_access.py), pipeline și
+      fluxuri de aprobare (FolderAccessHandler din monitor.py)
+    - starea care trebuie să fie aceeași în toate procesele stă în memorie
+      partajată (vezi shared_state.py): aprobările - o cale aprobată nu mai
+      cere aprobare în niciun proces - și, per folder protejat, cooldown-ul
+      și indicatorul "așteaptă decizie"
+    - procesul supervizor păstrează ce trebuie să existe o singură dată:
+      serviciul camerei, verificarea ferestrelor Finder (deschiderile sunt
+      trimise worker-ului care deține folderul), ascultarea revocărilor și
+      retrimiterea încercărilor din spool
+    - un worker căzut este repornit, cu pauză exponențială (cel mult
+      config.SUPERVISOR_RESTART_BACKOFF secunde); cererile lui în așteptare
+      sunt abandonate, deci folderele lui nu rămân blocate în "așteaptă decizie"
+
+Utilizare:
+    python supervisor.py
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+from approval_cache import RevocationListener
+from config import (
+    ACCESS_COOLDOWN, APPROVAL_TIMEOUT, LOG_LEVEL, METRICS_HOST, METRICS_PORT,
+    POLL_MIN_INTERVAL, PROTECTED_FOLDERS, SEARCH_ROOT, SERVER_URL,
+    SUPERVISOR_RESTART_BACKOFF, SUPERVISOR_WORKERS
+)
+from metrics import REGISTRY, MetricsServer
+from monitor import (
+    FinderWindowMonitor, FolderAccessHandler, ProtectedRoot, ServerClient,
+    create_observer, delete_ds_store, get_protected_roots, setup_logging,
+    start_capture_service, stop_capture_service, watch_paths
+)
+from path_trie import PathTrie
+from shared_state import SharedApprovalCache, SharedRootTable
+from spool import AttemptSpool, SpoolReplayer
+
+log = logging.getLogger('supervisor')
+
+# Un worker care rulează atât (secunde) fără să cadă își pierde istoricul de eșecuri
+STABLE_AFTER = 60
+
+WORKER_RESTARTS = REGISTRY.counter(
+    'supervisor_worker_restarts_total', 'Worker-i reporniți după o cădere', ['worker'])
+ROUTED = REGISTRY.counter(
+    'supervisor_routed_total', 'Deschideri Finder trimise worker-ilor, după rezultat',
+    ['worker', 'result'])
+
+
+class SharedProtectedRoot(ProtectedRoot):
+    """
+    Un folder protejat a cărui stare (ultimul acces, așteaptă decizie) este
+    în memoria partajată - aceeași în supervizor și în toate procesele.
+
+    Atribute:
+        table (SharedRootTable): Tabela comună
+        slot (int): Poziția folderului în tabelă
+    """
+
+    def __init__(self, path, cooldown, approval_cache_duration, table, slot):
+        """
+        Parametri:
+            path (str): Calea completă către folderul protejat
+            cooldown (float): Timpul minim (secunde) între două alerte
+            approval_cache_duration (float): Durata de valabilitate a aprobării
+            table (SharedRootTable): Tabela comună
+            slot (int): Poziția folderului în tabelă
+
+        Starea nu este reinițializată: un worker repornit o preia din tabelă.
+        """
+        self.path = os.path.normpath(path)
+        self.cooldown = cooldown
+        self.approval_cache_duration = approval_cache_duration
+        self.table = table
+        self.slot = slot
+
+    def __reduce__(self):
+        return (SharedProtectedRoot, (self.path, self.cooldown, self.approval_cache_duration,
+                                      self.table, self.slot))
+
+    @property
+    def last_access_time(self):
+        return self.table.last_access(self.slot)
+
+    @last_access_time.setter
+    def last_access_time(self, value):
+        self.table.set_last_access(self.slot, value)
+
+    @property
+    def pending_approval(self):
+        return self.table.pending(self.slot)
+
+    @pending_approval.setter
+    def pending_approval(self, flag):
+        self.table.set_pending(self.slot, flag)
+
+
+def shard_roots(roots, workers):
+    """
+    Împarte folderele protejate între worker-i.
+
+    Folderele imbricate rămân împreună cu folderul protejat de deasupra lor;
+    grupurile sunt distribuite de la cel mai mare la cel mai mic, fiecare
+    la worker-ul cu cele mai puține foldere.
+
+    Parametri:
+        roots (list): Lista ProtectedRoot
+        workers (int): Numărul maxim de worker-i
+
+    Returnează:
+        list: Câte o listă de ProtectedRoot per worker (niciuna goală)
+    """
+    tops = PathTrie()
+    groups = {}
+    for path in watch_paths(roots):
+        tops.insert(path, path)
+        groups[path] = []
+    for root in roots:
+        groups[tops.longest_prefix(root.path)[1]].append(root)
+
+    shards = [[] for _ in range(max(1, min(workers, len(groups))))]
+    for top in sorted(groups, key=lambda path: (-len(groups[path]), path)):
+        min(shards, key=len).extend(groups[top])
+    return [shard for shard in shards if shard]
+
+
+def run_worker(index, roots, approval_cache, commands, stop_event, level=LOG_LEVEL):
+    """
+    Punctul de intrare al unui proces worker.
+
+    Urmărește folderele primite și execută fluxurile de aprobare pentru
+    ele; deschiderile detectate de supervizor în Finder sosesc prin
+    coada commands. Se oprește când stop_event este setat sau când
+    supervizorul dispare.
+
+    Parametri:
+        index (int): Numărul worker-ului
+        roots (list): Folderele protejate (SharedProtectedRoot)
+        approval_cache (SharedApprovalCache): Aprobările comune
+        commands (multiprocessing.Queue): Perechi (cale, tip_acces) de la supervizor
+        stop_event (multiprocessing.Event): Semnalul de oprire
+        level (str): Nivelul jurnalului
+    """
+    # Ctrl+C ajunge la tot grupul de procese; oprirea o decide supervizorul
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    log_listener = setup_logging(level, prefix=f"[worker {index}] ")
+    parent = os.getppid()
+
+    handler = FolderAccessHandler(roots, approval_cache=approval_cache, supervised=True)
+    handler.start()
+    observer, backend = create_observer(handler, roots)
+    observer.start()
+
+    metrics_server = None
+    if METRICS_PORT is not None:
+        metrics_server = MetricsServer(METRICS_HOST, METRICS_PORT + 1 + index)
+        try:
+            metrics_server.start()
+        except OSError as e:
+            log.warning("Metrics server not started: %s", e)
+            metrics_server = None
+
+    log.info("Started (pid %s): %s folder(s), file events: %s",
+             os.getpid(), len(roots), backend)
+    try:
+        while not stop_event.is_set() and os.getppid() == parent:
+            try:
+                path, access_type = commands.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            handler.handle_access(path, access_type)
+    finally:
+        observer.stop()
+        handler.stop()
+        observer.join()
+        if metrics_server is not None:
+            metrics_server.stop()
+        approval_cache.close()
+        roots[0].table.close()
+        log.info("Stopped")
+        log_listener.stop()
+
+
+class ShardRouter:
+    """
+    Handler-ul văzut de FinderWindowMonitor în procesul supervizor.
+
+    Folosește aceleași verificări ca FolderAccessHandler (trie-ul
+    folderelor, aprobările comune), dar nu pornește fluxuri de aprobare:
+    handle_access trimite deschiderea worker-ului care deține folderul.
+
+    Atribute:
+        roots (PathTrie): Toate folderele protejate (SharedProtectedRoot)
+        approval_cache (SharedApprovalCache): Aprobările comune
+        recheck_interval (float): Cât poate fi suspendată verificarea
+            ferestrelor (secunde) - worker-ii nu pot trezi planificatorul
+            din alt proces, deci starea comună este recitită periodic
+    """
+
+    root_for = FolderAccessHandler.root_for
+    is_approval_cached = FolderAccessHandler.is_approval_cached
+    in_cooldown = FolderAccessHandler.in_cooldown
+    clock = time
+
+    def __init__(self, supervisor, recheck_interval=1.0):
+        self.supervisor = supervisor
+        self.roots = PathTrie()
+        for root in supervisor.roots:
+            self.roots.insert(root.path, root)
+        self.approval_cache = supervisor.approval_cache
+        self.recheck_interval = recheck_interval
+        self.poll_scheduler = None  # Setat de FinderWindowMonitor
+        self.recorder = None
+
+    def poll_suspension(self):
+        """Ca FolderAccessHandler.poll_suspension, cu timeout-ul limitat la recheck_interval."""
+        suspension = FolderAccessHandler.poll_suspension(self)
+        if suspension is None:
+            return None
+        reason, timeout = suspension
+        return reason, min(timeout, self.recheck_interval)
+
+    def handle_access(self, path, access_type):
+        """Trimite accesul worker-ului care deține folderul protejat."""
+        root = self.root_for(path)
+        if root is not None:
+            self.supervisor.route(root, path, access_type)
+
+    def _on_revoke(self, revocation):
+        if self.poll_scheduler is not None:
+            self.poll_scheduler.wake()
+
+
+class _Worker:
+    """Evidența unui worker: procesul curent, coada de comenzi și repornirile."""
+
+    def __init__(self, index, roots):
+        self.index = index
+        self.roots = roots
+        self.process = None
+        self.commands = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restarts = 0
+        self.next_start = 0.0
+
+
+class Supervisor:
+    """
+    Pornește worker-ii, le trimite deschiderile din Finder și îi repornește.
+
+    Atribute:
+        roots (list): Toate folderele protejate (SharedProtectedRoot)
+        workers (list): Evidența worker-ilor (_Worker)
+        approval_cache (SharedApprovalCache): Aprobările comune
+        table (SharedRootTable): Starea comună a folderelor
+        max_backoff (float): Pauza maximă înainte de o repornire (secunde)
+    """
+
+    def __init__(self, roots, workers=SUPERVISOR_WORKERS, max_backoff=SUPERVISOR_RESTART_BACKOFF,
+                 level=LOG_LEVEL):
+        """
+        Parametri:
+            roots (list): Folderele protejate (ProtectedRoot, ex: din get_protected_roots)
+            workers (int, optional): Numărul de worker-i (implicit numărul de nuclee)
+            max_backoff (float): Pauza maximă înainte de o repornire (secunde)
+            level (str): Nivelul jurnalului în worker-i
+        """
+        # "spawn": worker-ii nu moștenesc firele supervizorului (fork + fire = blocaje)
+        self._context = multiprocessing.get_context('spawn')
+        self.max_backoff = max_backoff
+        self.level = level
+
+        self.table = SharedRootTable(len(roots))
+        self.approval_cache = SharedApprovalCache(lock=self._context.Lock())
+        self.roots = [SharedProtectedRoot(root.path, root.cooldown, root.approval_cache_duration,
+                                          self.table, slot)
+                      for slot, root in enumerate(sorted(roots, key=lambda root: root.path))]
+        for root in self.roots:
+            root.last_access_time = 0
+            root.pending_approval = False
+
+        shards = shard_roots(self.roots, workers or os.cpu_count() or 1)
+        self.workers = [_Worker(index, shard) for index, shard in enumerate(shards)]
+        self._owner = {root.path: worker for worker in self.workers for root in worker.roots}
+        self._stop_event = self._context.Event()
+
+        # Ce există o singură dată: revocările și retrimiterea din spool
+        self.router = ShardRouter(self)
+        self.server = ServerClient()
+        self.spool = AttemptSpool()
+        self.replayer = SpoolReplayer(self.spool, self.server)
+        self.revocations = RevocationListener(self.approval_cache, self.server,
+                                              on_revoke=self.router._on_revoke)
+        self.finder_monitor = None
+
+    def start(self):
+        """Pornește serviciul camerei, worker-ii și verificarea ferestrelor Finder."""
+        start_capture_service()
+        for worker in self.workers:
+            self._spawn(worker)
+        self.replayer.start()
+        self.revocations.start()
+        self.finder_monitor = FinderWindowMonitor(self.router)
+        self.finder_monitor.start()
+
+    def _spawn(self, worker):
+        worker.commands = self._context.Queue()
+        worker.process = self._context.Process(
+            target=run_worker, name=f'monitor-worker-{worker.index}', daemon=True,
+            args=(worker.index, worker.roots, self.approval_cache, worker.commands,
+                  self._stop_event, self.level)
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+
+    def route(self, root, path, access_type):
+        """
+        Trimite un acces worker-ului care deține folderul protejat.
+
+        Folderul este marcat ca așteptând o decizie în tabela comună înainte
+        ca accesul să fie pus în coadă: până când worker-ul preia comanda,
+        verificările următoare ale ferestrelor îl ignoră, deci aceeași
+        fereastră nu pune în coadă cereri duplicate. Marcajul este șters la
+        finalul fluxului de aprobare (sau de check(), dacă worker-ul cade).
+
+        Parametri:
+            root (SharedProtectedRoot): Folderul protejat
+            path (str): Calea accesată
+            access_type (str): Tipul accesului (ex: 'folder_opened')
+        """
+        worker = self._owner[root.path]
+        if worker.process is None or not worker.process.is_alive():
+            ROUTED.labels(worker.index, 'dropped').inc()
+            log.warning("Worker %s is down - access to %s not handled", worker.index, path)
+            return
+        root.pending_approval = True
+        worker.commands.put((path, access_type))
+        ROUTED.labels(worker.index, 'sent').inc()
+
+    def check(self):
+        """
+        Verifică worker-ii și îi repornește pe cei căzuți.
+
+        Un worker căzut este repornit după 1, 2, 4 ... secunde (cel mult
+        max_backoff); pauza revine la 1 secundă după ce worker-ul rulează
+        STABLE_AFTER secunde fără să cadă.
+        """
+        now = time.monotonic()
+        for worker in self.workers:
+            process = worker.process
+            if process is not None and process.is_alive():
+                if worker.failures and now - worker.started_at > STABLE_AFTER:
+                    worker.failures = 0
+                continue
+
+            if process is not None:
+                # Fluxurile de aprobare ale worker-ului s-au pierdut odată cu el
+                for root in worker.roots:
+                    root.pending_approval = False
+                worker.failures += 1
+                delay = min(2 ** (worker.failures - 1), self.max_backoff)
+                worker.next_start = now + delay
+                worker.process = None
+                worker.commands.close()
+                log.warning("Worker %s exited (code %s) - restarting in %.0fs",
+                            worker.index, process.exitcode, delay)
+
+            if now >= worker.next_start:
+                self._spawn(worker)
+                worker.restarts += 1
+                WORKER_RESTARTS.labels(worker.index).inc()
+
+    def run(self, interval=1.0):
+        """Verifică worker-ii la fiecare interval secunde, până la Ctrl+C."""
+        try:
+            while True:
+                self.check()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self, timeout=10):
+        """
+        Oprește worker-ii și eliberează memoria partajată.
+
+        Parametri:
+            timeout (float): Cât se așteaptă oprirea unui worker (secunde)
+                înainte de a fi terminat forțat
+        """
+        self._stop_event.set()
+        if self.finder_monitor is not None:
+            self.finder_monitor.stop()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            worker.process.join(max(deadline - time.monotonic(), 0))
+            if worker.process.is_alive():
+                log.warning("Worker %s did not stop - terminating", worker.index)
+                worker.process.terminate()
+                worker.process.join()
+
+        self.replayer.stop()
+        self.revocations.stop()
+        self.server.close()
+        self.spool.close()
+        stop_capture_service()
+
+        stats = self.approval_cache.stats()
+        log.info("Shared approvals: %s entries, %s hits, %s misses, %s evicted, %s revoked",
+                 stats['entries'], stats['hits'], stats['misses'], stats['evictions'],
+                 stats['revoked'])
+        log.info("Worker restarts: %s", ', '.join(
+            f"{worker.index}={worker.restarts}" for worker in self.workers))
+        for shared in (self.approval_cache, self.table):
+            shared.close()
+            shared.unlink()
+
+
+def main():
+    """
+    Punctul de intrare: găsește folderele protejate și pornește supervizorul.
+
+    Funcționează ca monitor.py, dar folderele sunt împărțite între
+    config.SUPERVISOR_WORKERS procese (implicit numărul de nuclee).
+    """
+    log_listener = setup_logging(prefix="[supervisor] ")
+    print("=" * 50)
+    print("  MONITOR ACCES FOLDER (SUPERVIZOR)")
+    print("=" * 50)
+
+    roots = get_protected_roots()
+    if not roots:
+        print("\nFailed to locate any protected folder.")
+        print("Please check your config.py settings:")
+        print(f"  PROTECTED_FOLDERS = {PROTECTED_FOLDERS!r}")
+        print(f"  SEARCH_ROOT = '{SEARCH_ROOT}'")
+        log_listener.stop()
+        return
+
+    for root in roots:
+        delete_ds_store(root.path)
+
+    supervisor = Supervisor(roots)
+    print(f"\nMonitoring {len(roots)} folder(s) in {len(supervisor.workers)} worker process(es):")
+    for worker in supervisor.workers:
+        print(f"  worker {worker.index}: {', '.join(root.path for root in worker.roots)}")
+    print(f"Cooldown: {ACCESS_COOLDOWN} seconds")
+    print(f"Approval timeout: {APPROVAL_TIMEOUT} seconds")
+    print(f"\nServer: {SERVER_URL}")
+    print("(Press Ctrl+C to stop)\n")
+
+    supervisor.start()
+    print(f"Finder window polling active (from {POLL_MIN_INTERVAL}s, "
+          f"source: {supervisor.finder_monitor.window_source.name})")
+
+    metrics_server = None
+    if METRICS_PORT is not None:
+        metrics_server = MetricsServer(METRICS_HOST, METRICS_PORT)
+        try:
+            port = metrics_server.start()
+            print(f"Metrics: http://{METRICS_HOST}:{port}/metrics "
+                  f"(worker N: port {port + 1}+N)")
+        except OSError as e:
+            print(f"Avertisment: serverul de metrici nu a putut porni: {e}")
+            metrics_server = None
+
+    supervisor.run()
+    print("\nStopping supervisor...")
+    supervisor.stop()
+    if metrics_server is not None:
+        metrics_server.stop()
+    log_listener.stop()
+    print("Supervisor stopped.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+"""
+Teste unitare pentru componentele monitorului (fără Django).
+
+Descriere:
+    Componentele testate aici sunt Python pur și primesc ceasul ca
+    parametru, deci testele rulează fără server, cameră sau Finder.
+    Testele aplicației Django sunt în access_control/tests.py.
+
+Rulare:
+    python -m unittest discover tests
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
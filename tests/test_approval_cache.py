@@ -0,0 +1,70 @@
+"""
+Teste pentru cache-ul aprobărilor (ApprovalCache).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import unittest
+
+from approval_cache import ApprovalCache
+from trace_replay import VirtualClock
+
+
+class ApprovalCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=1_000_000.0)
+        self.cache = ApprovalCache(max_entries=2, default_ttl=60, clock=self.clock.time)
+
+    def test_approval_covers_paths_below_until_it_expires(self):
+        self.cache.grant('/p/a', attempt_id=7)
+        self.assertEqual(self.cache.lookup('/p/a/b/file.txt').attempt_id, 7)
+        self.assertIsNone(self.cache.lookup('/p/other'))
+
+        self.clock.advance_to(59)
+        self.assertEqual(self.cache.remaining('/p/a'), 1)
+        self.clock.advance_to(60)
+        self.assertIsNone(self.cache.lookup('/p/a/b'))
+        # Intrarea expirată este eliminată la căutare
+        self.assertEqual(len(self.cache), 0)
+        self.assertFalse(self.cache.any_valid())
+
+    def test_most_specific_valid_approval_wins(self):
+        self.cache.grant('/p', ttl=100)
+        self.cache.grant('/p/a', ttl=10)
+        self.assertEqual(self.cache.lookup('/p/a/x').path, '/p/a')
+        self.clock.advance_to(10)
+        self.assertEqual(self.cache.lookup('/p/a/x').path, '/p')
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.grant('/p/a')
+        self.cache.grant('/p/b')
+        self.cache.lookup('/p/a')
+        self.cache.grant('/p/c')
+
+        self.assertIsNone(self.cache.lookup('/p/b'))
+        self.assertIsNotNone(self.cache.lookup('/p/a'))
+        self.assertIsNotNone(self.cache.lookup('/p/c'))
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_revoke_removes_covering_and_nested_approvals(self):
+        cache = ApprovalCache(max_entries=10, default_ttl=60, clock=self.clock.time)
+        cache.grant('/p')
+        cache.grant('/p/a/b')
+        cache.grant('/q')
+
+        self.assertEqual(cache.revoke('/p/a'), 2)
+        self.assertIsNone(cache.lookup('/p/a/b/c'))
+        self.assertIsNotNone(cache.lookup('/q'))
+        self.assertEqual(cache.revoked, 2)
+
+    def test_revoke_attempt_removes_only_its_approvals(self):
+        self.cache.grant('/p/a', attempt_id=1)
+        self.cache.grant('/p/b', attempt_id=2)
+        self.assertEqual(self.cache.revoke_attempt(1), 1)
+        self.assertIsNone(self.cache.lookup('/p/a'))
+        self.assertIsNotNone(self.cache.lookup('/p/b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Teste pentru coada cu coalescență a evenimentelor (CoalescingQueue).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import unittest
+
+from event_pipeline import AccessEvent, CoalescingQueue
+from trace_replay import VirtualClock
+
+
+class CoalescingQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.queue = CoalescingQueue(maxsize=2, debounce=0.5, max_delay=2.0,
+                                     clock=self.clock.monotonic)
+
+    def test_burst_is_delivered_once_after_debounce(self):
+        self.queue.put('/p/a', 'created')
+        self.clock.advance_to(0.3)
+        self.queue.put('/p/a', 'modified', is_directory=True)
+
+        self.clock.advance_to(0.7)
+        self.assertIsNone(self.queue.pop_due())
+        self.assertEqual(self.queue.next_deadline(), 0.8)
+
+        self.clock.advance_to(0.8)
+        self.assertEqual(self.queue.pop_due(), AccessEvent('/p/a', 'modified', True, 2, 0.0))
+        self.assertIsNone(self.queue.pop_due())
+        self.assertEqual(self.queue.coalesced, 1)
+
+    def test_max_delay_bounds_a_continuous_burst(self):
+        for step in range(8):
+            self.clock.advance_to(step * 0.25)
+            self.queue.put('/p/a', 'modified')
+        # Evenimente la fiecare 0,25s: fără max_delay, calea nu ar fi livrată niciodată
+        self.assertEqual(self.queue.next_deadline(), 2.0)
+
+        self.clock.advance_to(2.0)
+        event = self.queue.pop_due()
+        self.assertEqual((event.src_path, event.count, event.first_seen), ('/p/a', 8, 0.0))
+
+    def test_quietest_path_is_delivered_first(self):
+        self.queue.put('/p/a', 'created')
+        self.queue.put('/p/b', 'created')
+        self.clock.advance_to(0.2)
+        self.queue.put('/p/a', 'modified')
+
+        self.clock.advance_to(1.0)
+        self.assertEqual([self.queue.pop_due().src_path, self.queue.pop_due().src_path],
+                         ['/p/b', '/p/a'])
+
+    def test_new_paths_are_dropped_when_full(self):
+        self.assertTrue(self.queue.put('/p/a', 'created'))
+        self.assertTrue(self.queue.put('/p/b', 'created'))
+        self.assertFalse(self.queue.put('/p/c', 'created'))
+        # O cale deja în coadă este contopită chiar dacă coada este plină
+        self.assertTrue(self.queue.put('/p/a', 'modified'))
+        self.assertEqual((len(self.queue), self.queue.dropped, self.queue.high_water), (2, 1, 2))
+
+    def test_get_returns_none_after_close(self):
+        self.queue.put('/p/a', 'created')
+        self.queue.close()
+        self.assertIsNone(self.queue.get())
+
+
+if __name__ == '__main__':
+    unittest.main()
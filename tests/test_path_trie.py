@@ -0,0 +1,58 @@
+"""
+Teste pentru trie-ul de căi (PathTrie).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import unittest
+
+from path_trie import PathTrie
+
+
+class PathTrieTests(unittest.TestCase):
+    def setUp(self):
+        self.trie = PathTrie()
+        self.trie.insert('/Users/ana/Confidential', 'confidential')
+        self.trie.insert('/Users/ana/Confidential/Taxes/', 'taxes')
+        self.trie.insert('/Volumes/Backup', 'backup')
+
+    def test_longest_prefix_returns_the_deepest_root(self):
+        self.assertEqual(self.trie.longest_prefix('/Users/ana/Confidential/Taxes/2024.pdf'),
+                         ('/Users/ana/Confidential/Taxes', 'taxes'))
+        self.assertEqual(self.trie.longest_prefix('/Users/ana/Confidential/notes.txt'),
+                         ('/Users/ana/Confidential', 'confidential'))
+        self.assertEqual(self.trie.longest_prefix('/Users/ana/Confidential/'),
+                         ('/Users/ana/Confidential', 'confidential'))
+
+    def test_longest_prefix_matches_whole_components(self):
+        self.assertIsNone(self.trie.longest_prefix('/Users/ana/Confidential2/file'))
+        self.assertIsNone(self.trie.longest_prefix('/Users/ana'))
+        self.assertIsNone(self.trie.longest_prefix('/Volumes'))
+
+    def test_longest_prefix_normalizes_the_path(self):
+        self.assertEqual(self.trie.longest_prefix('/Users/ana/Documents/../Confidential/x')[1],
+                         'confidential')
+        self.assertEqual(self.trie.longest_prefix('//Volumes//Backup/./a')[1], 'backup')
+
+    def test_root_entry_covers_every_path(self):
+        self.assertIsNone(self.trie.longest_prefix('/tmp/x'))
+        self.trie.insert('/', 'root')
+        self.assertEqual(self.trie.longest_prefix('/tmp/x'), ('/', 'root'))
+        self.assertEqual(self.trie.longest_prefix('/Volumes/Backup/a')[1], 'backup')
+
+    def test_remove_falls_back_to_the_parent_root(self):
+        self.assertTrue(self.trie.remove('/Users/ana/Confidential/Taxes'))
+        self.assertFalse(self.trie.remove('/Users/ana/Confidential/Taxes'))
+        self.assertEqual(self.trie.longest_prefix('/Users/ana/Confidential/Taxes/2024.pdf'),
+                         ('/Users/ana/Confidential', 'confidential'))
+        self.assertEqual(len(self.trie), 2)
+
+    def test_prefixes_are_deepest_first(self):
+        self.assertEqual([value for _, value in
+                          self.trie.prefixes('/Users/ana/Confidential/Taxes/a')],
+                         ['taxes', 'confidential'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Teste pentru cache-ul aprobărilor din memoria partajată (SharedApprovalCache).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import multiprocessing
+import unittest
+from unittest import mock
+
+import shared_state
+from shared_state import SharedApprovalCache
+from trace_replay import VirtualClock
+
+# Poziția ideală a fiecărei căi într-o tabelă de 8 poziții (hash-uri alese)
+HOMES = {b'/a': 1, b'/b': 1, b'/c': 2, b'/x': 7, b'/y': 7}
+
+
+def _revoke_in_child(cache, path, done):
+    cache.revoke(path)
+    cache.close()
+    done.set()
+
+
+class SharedApprovalCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=1_000_000.0)
+
+    def create_cache(self, max_entries=4, lock=None):
+        cache = SharedApprovalCache(max_entries=max_entries, default_ttl=60, lock=lock,
+                                    clock=self.clock.time)
+        self.addCleanup(cache.unlink)
+        self.addCleanup(cache.close)
+        return cache
+
+    def positions(self, cache):
+        return {encoded.decode(): index for index, _, _, _, encoded in cache._entries()}
+
+    def test_delete_shifts_colliding_entries_back(self):
+        cache = self.create_cache()
+        with mock.patch.object(shared_state, '_path_key', lambda encoded: HOMES.get(encoded, 3)):
+            for path in ('/a', '/b', '/c'):
+                cache.grant(path)
+            self.assertEqual(self.positions(cache), {'/a': 1, '/b': 2, '/c': 3})
+
+            self.assertEqual(cache.revoke('/a'), 1)
+            # Fără goluri pe traseu: /b și /c rămân accesibile
+            self.assertEqual(self.positions(cache), {'/b': 1, '/c': 2})
+            self.assertIsNotNone(cache.lookup('/b/file'))
+            self.assertIsNotNone(cache.lookup('/c/file'))
+
+    def test_delete_shifts_back_across_the_end_of_the_table(self):
+        cache = self.create_cache()
+        with mock.patch.object(shared_state, '_path_key', lambda encoded: HOMES.get(encoded, 3)):
+            cache.grant('/x')
+            cache.grant('/y')
+            self.assertEqual(self.positions(cache), {'/x': 7, '/y': 0})
+
+            cache.revoke('/x')
+            self.assertEqual(self.positions(cache), {'/y': 7})
+            self.assertIsNotNone(cache.lookup('/y'))
+
+    def test_entry_expiring_soonest_is_evicted(self):
+        cache = self.create_cache(max_entries=2)
+        cache.grant('/p/a', ttl=100)
+        cache.grant('/p/b', ttl=10)
+        cache.grant('/p/c', ttl=50)
+
+        self.assertIsNone(cache.lookup('/p/b'))
+        self.assertIsNotNone(cache.lookup('/p/a'))
+        self.assertEqual((len(cache), cache.stats()['evictions']), (2, 1))
+
+        # Intrările expirate sunt eliminate înaintea celor valide
+        self.clock.advance_to(60)
+        cache.grant('/p/d', ttl=100)
+        self.assertIsNotNone(cache.lookup('/p/a'))
+        self.assertIsNone(cache.lookup('/p/c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_revocation_in_another_process_is_visible(self):
+        # Ca în supervisor.py: procesele sunt pornite cu 'spawn' și primesc
+        # cache-ul prin __reduce__ (se atașează la același segment)
+        context = multiprocessing.get_context('spawn')
+        cache = self.create_cache(lock=context.Lock())
+        cache.grant('/p/a/b', attempt_id=5)
+        cache.grant('/q')
+
+        done = context.Event()
+        child = context.Process(target=_revoke_in_child, args=(cache, '/p', done))
+        child.start()
+        child.join(30)
+        self.assertEqual(child.exitcode, 0)
+        self.assertTrue(done.is_set())
+
+        self.assertIsNone(cache.lookup('/p/a/b/file'))
+        self.assertIsNotNone(cache.lookup('/q'))
+        self.assertEqual(cache.stats()['revoked'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Teste pentru spool-ul încercărilor (AttemptSpool, SpoolReplayer).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from monitor import ServerRejected, ServerUnavailable
+from spool import AttemptSpool, SpoolReplayer
+
+
+class FakeServer:
+    """
+    Server scriptat: batch este răspunsul (sau excepția) pentru loturi,
+    rejected - client_ref -> excepția ridicată la trimiterea individuală.
+    """
+
+    def __init__(self, batch=None, rejected=None):
+        self.batch = batch
+        self.rejected = rejected or {}
+        self.calls = []
+
+    def post_json(self, path, payload, deadline=None):
+        self.calls.append(path)
+        if path == '/api/attempts/batch':
+            if isinstance(self.batch, Exception):
+                raise self.batch
+            if self.batch is not None:
+                return self.batch
+            return {'results': [{'client_ref': entry['client_ref'], 'id': index}
+                                for index, entry in enumerate(payload['attempts'], 1)]}
+        error = self.rejected.get(payload['client_ref'])
+        if error is not None:
+            raise error
+        return {'id': int(payload['client_ref'][1:]) + 100}
+
+
+class SpoolTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'spool.db')
+        self.spool = self.open_spool()
+
+    def open_spool(self):
+        spool = AttemptSpool(self.path)
+        self.addCleanup(spool.close)
+        return spool
+
+    def queue(self, *refs):
+        for ref in refs:
+            self.spool.append({'folder_path': f'/p/{ref}', 'access_type': 'folder_opened'}, ref)
+            self.spool.mark_queued(ref, status='denied')
+
+
+class AttemptSpoolTests(SpoolTestCase):
+    def test_interrupted_attempts_are_requeued_as_denied(self):
+        self.spool.append({'folder_path': '/p/a'}, 'r1')
+        self.spool.append({'folder_path': '/p/b', 'status': 'approved'}, 'r2')
+        self.spool.close()
+
+        with self.assertLogs('spool', 'WARNING'):
+            spool = self.open_spool()
+        entries = {entry['client_ref']: entry for entry in spool.queued()}
+        self.assertEqual((entries['r1']['status'], entries['r1']['decision_source']),
+                         ('denied', 'monitor'))
+        self.assertEqual(entries['r2']['status'], 'approved')
+        self.assertEqual(spool.counts(), {'queued': 2})
+
+    def test_sent_attempt_is_not_requeued(self):
+        self.spool.append({'folder_path': '/p/a'}, 'r1')
+        self.spool.mark_sent('r1', 7)
+        self.spool.mark_queued('r1', status='denied')
+        self.assertEqual(self.spool.counts(), {'sent': 1})
+        self.assertEqual(self.spool.update('r1', photo_path='capture.jpg'), ('sent', 7))
+
+
+class SpoolReplayerTests(SpoolTestCase):
+    def test_batch_marks_every_attempt_sent(self):
+        self.queue('r1', 'r2', 'r3')
+        replayer = SpoolReplayer(self.spool, FakeServer(), batch_size=2)
+
+        self.assertEqual(replayer.replay_batch(), 2)
+        self.assertEqual(replayer.replay_batch(), 1)
+        self.assertEqual(replayer.replay_batch(), 0)
+        self.assertEqual((self.spool.counts(), replayer.batches), ({'sent': 3}, 2))
+
+    def test_unreachable_server_keeps_the_batch_queued(self):
+        self.queue('r1', 'r2')
+        replayer = SpoolReplayer(self.spool, FakeServer(batch=ServerUnavailable('down')))
+
+        with self.assertRaises(ServerUnavailable):
+            replayer.replay_batch()
+        self.assertEqual(self.spool.counts(), {'queued': 2})
+
+    def test_rejected_batch_falls_back_to_single_attempts(self):
+        self.queue('r1', 'r2', 'r3')
+        server = FakeServer(batch=ServerRejected(400, 'HTTP 400: status invalid'),
+                            rejected={'r2': ServerRejected(400, 'HTTP 400: status invalid'),
+                                      'r3': ServerRejected(500, 'HTTP 500: error')})
+        replayer = SpoolReplayer(self.spool, server)
+
+        with self.assertLogs('spool', 'WARNING'):
+            self.assertEqual(replayer.replay_batch(), 2)
+        self.assertEqual(server.calls, ['/api/attempts/batch'] + ['/api/attempt'] * 3)
+        # r1 trimisă, r2 respinsă definitiv, r3 (eroare a serverului) rămâne în coadă
+        self.assertEqual(self.spool.counts(), {'sent': 1, 'failed': 1, 'queued': 1})
+        self.assertEqual([entry['client_ref'] for entry in self.spool.queued()], ['r3'])
+        self.assertEqual((replayer.replayed, replayer.rejected), (1, 1))
+
+    def test_connection_lost_during_fallback_propagates(self):
+        self.queue('r1', 'r2')
+        server = FakeServer(batch={'error': 'invalid'},
+                            rejected={'r2': ServerUnavailable('down')})
+        replayer = SpoolReplayer(self.spool, server)
+
+        with self.assertLogs('spool', 'WARNING'), self.assertRaises(ServerUnavailable):
+            replayer.replay_batch()
+        self.assertEqual(self.spool.counts(), {'sent': 1, 'queued': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Teste pentru verificarea ferestrelor (FinderWindowMonitor, AdaptivePollScheduler).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import threading
+import time
+import unittest
+
+from approval_cache import ApprovalCache
+from monitor import AdaptivePollScheduler, FinderWindowMonitor, FolderAccessHandler, ProtectedRoot
+from path_trie import PathTrie
+from trace_replay import VirtualClock
+from window_sources import FakeWindowSource
+
+PROTECTED = '/Users/test/Protected'
+
+
+class PollHandler:
+    """
+    Handler minimal pentru FinderWindowMonitor (ca ShardRouter din supervisor.py).
+
+    Folosește metodele FolderAccessHandler pentru potrivire, cooldown și
+    suspendare; handle_access doar înregistrează accesul și marchează
+    folderul ca așteptând o decizie.
+    """
+
+    root_for = FolderAccessHandler.root_for
+    is_approval_cached = FolderAccessHandler.is_approval_cached
+    in_cooldown = FolderAccessHandler.in_cooldown
+    poll_suspension = FolderAccessHandler.poll_suspension
+
+    def __init__(self, roots, clock):
+        self.roots = PathTrie()
+        for root in roots:
+            self.roots.insert(root.path, root)
+        self.clock = clock
+        self.approval_cache = ApprovalCache(clock=clock.time)
+        self.poll_scheduler = None
+        self.recorder = None
+        self.accesses = []
+        self.accessed = threading.Event()
+
+    def handle_access(self, path, access_type):
+        self.accesses.append((path, access_type))
+        self.root_for(path).pending_approval = True
+        self.accessed.set()
+
+
+class FinderWindowMonitorTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=1_000_000.0)
+        self.root = ProtectedRoot(PROTECTED, cooldown=5)
+        self.handler = PollHandler([self.root], self.clock)
+        self.source = FakeWindowSource()
+        self.monitor = FinderWindowMonitor(self.handler, window_source=self.source)
+
+    def test_open_window_triggers_once(self):
+        self.source.set_paths(['/Users/test/Documents', PROTECTED + '/sub', PROTECTED])
+        self.assertEqual(self.monitor.check_finder_windows(), [self.root])
+
+        # Fluxul de aprobare a pornit: fereastra rămasă deschisă nu mai declanșează
+        self.root.pending_approval = True
+        self.assertEqual(self.monitor.check_finder_windows(), [])
+
+    def test_cooldown_is_respected(self):
+        self.source.set_paths([PROTECTED])
+        self.root.last_access_time = self.clock.time()
+
+        self.clock.advance_to(4)
+        self.assertEqual(self.monitor.check_finder_windows(), [])
+        self.clock.advance_to(6)
+        self.assertEqual(self.monitor.check_finder_windows(), [self.root])
+
+    def test_cached_approval_is_skipped(self):
+        self.source.set_paths([PROTECTED + '/sub'])
+        self.handler.approval_cache.grant(PROTECTED, ttl=60)
+        self.assertEqual(self.monitor.check_finder_windows(), [])
+
+    def test_polling_suspended_while_decision_pending(self):
+        self.source.set_paths([PROTECTED])
+        self.monitor.scheduler = AdaptivePollScheduler(min_interval=0.01, max_interval=0.02)
+        self.handler.poll_scheduler = self.monitor.scheduler
+        self.monitor.start()
+        try:
+            self.assertTrue(self.handler.accessed.wait(2))
+            self.assertEqual(self.handler.accesses, [(PROTECTED, 'folder_opened')])
+            self.assertEqual(self.root.last_access_time, self.clock.time())
+            self.assertIsNotNone(self.handler.poll_suspension())
+
+            queries = self.source.queries
+            time.sleep(0.1)
+            self.assertEqual(self.source.queries, queries)
+        finally:
+            self.monitor.running = False
+            self.monitor.scheduler.wake()
+            self.monitor.thread.join(2)
+        self.assertEqual(len(self.handler.accesses), 1)
+
+
+class AdaptivePollSchedulerTests(unittest.TestCase):
+    def test_interval_backs_off_to_max(self):
+        scheduler = AdaptivePollScheduler(min_interval=0.25, max_interval=1.0, backoff_factor=2)
+        intervals = []
+        for _ in range(4):
+            scheduler.record_poll(False)
+            intervals.append(scheduler.interval)
+        self.assertEqual(intervals, [0.5, 1.0, 1.0, 1.0])
+
+    def test_detection_and_activity_reset_interval(self):
+        scheduler = AdaptivePollScheduler(min_interval=0.25, max_interval=1.0, backoff_factor=2)
+        scheduler.record_poll(False)
+        scheduler.record_poll(True)
+        self.assertEqual(scheduler.interval, 0.25)
+        self.assertEqual(scheduler.detections, 1)
+
+        scheduler.record_poll(False)
+        scheduler.notify_activity()
+        self.assertEqual(scheduler.interval, 0.25)
+
+    def test_suspend_ends_on_wake(self):
+        scheduler = AdaptivePollScheduler(min_interval=0.25, max_interval=1.0, backoff_factor=2)
+        scheduler.record_poll(False)
+        threading.Timer(0.05, scheduler.wake).start()
+        started = time.monotonic()
+        scheduler.suspend(timeout=5)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(scheduler.interval, 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
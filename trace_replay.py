@@ -0,0 +1,403 @@
+"""
+Reluarea unui Fișier de Urmă - Pipeline-ul de decizie rulat offline, accelerat
+
+Descriere:
+    Reia un fișier de urmă înregistrat de monitor (vezi event_trace.py)
+    prin aceleași componente care iau deciziile în monitor.py:
+    EventPipeline (filtrare, coalescență, debounce), should_trigger și
+    cooldown-urile, FinderWindowMonitor.check_finder_windows, cache-ul
+    aprobărilor și mașina de stări ApprovalEngine.
+
+    Nimic nu depinde de un Mac, o cameră sau un server:
+    - ceas virtual (VirtualClock): timpul avansează direct la următorul
+      eveniment, deci o oră de urmă se reia în câteva secunde, iar
+      rezultatul nu depinde de încărcarea mașinii
+    - ferestrele Finder: FakeWindowSource, cu rezultatele înregistrate
+    - serverul: TraceServer răspunde cu ID-urile și deciziile înregistrate,
+      după aceeași întârziere (relativ la înregistrarea încercării)
+    - camera: nicio captură; acțiunile asupra sistemului: RecordingOSActions
+
+    Raportul: debitul (evenimente pe secundă), accelerarea față de timpul
+    real, statisticile pipeline-ului, fluxurile de aprobare și deciziile,
+    comparate cu cele înregistrate - o schimbare în should_trigger sau în
+    cooldown apare ca o diferență de decizii.
+
+Utilizare:
+    python trace_replay.py urma.jsonl.gz [--speed 50] [--unrecorded pending] [-v]
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import argparse
+import heapq
+import logging
+import time
+from collections import deque
+
+import config
+from event_trace import TRACE_CONFIG, TraceEvent, load_trace, summarize
+from monitor import (
+    ApprovalEngine, FinderWindowMonitor, FolderAccessHandler, ProtectedRoot, ServerUnavailable
+)
+from os_actions import RecordingOSActions
+from spool import AttemptSpool
+from window_sources import FakeWindowSource
+
+log = logging.getLogger('trace_replay')
+
+
+class VirtualClock:
+    """
+    Ceas controlat de reluare (aceeași interfață ca modulul time: time(), monotonic()).
+
+    Atribute:
+        start (float): Momentul de început (time.time) al urmei
+        now (float): Secundele scurse de la începutul urmei
+    """
+
+    def __init__(self, start=0.0):
+        self.start = start
+        self.now = 0.0
+
+    def time(self):
+        return self.start + self.now
+
+    def monotonic(self):
+        return self.now
+
+    def advance_to(self, now):
+        """Mută ceasul înainte (niciodată înapoi)."""
+        if now > self.now:
+            self.now = now
+
+
+class TraceServer:
+    """
+    Serverul de administrare, reconstituit din răspunsurile înregistrate.
+
+    Încercările primesc, în ordine, ID-urile înregistrate (o înregistrare
+    eșuată ridică ServerUnavailable, ca în original). Decizia unei încercări
+    devine vizibilă după aceeași întârziere față de înregistrare ca în urmă.
+    Încercările care nu existau la înregistrare primesc decizia unrecorded.
+
+    Atribute:
+        unrecorded (int): Încercări în plus față de urmă
+        unused (int): Încercări înregistrate rămase nefolosite (în deque)
+    """
+
+    def __init__(self, records, clock, unrecorded='pending', unrecorded_delay=1.0):
+        """
+        Parametri:
+            records (list): Înregistrările urmei (load_trace)
+            clock (VirtualClock): Ceasul reluării
+            unrecorded (str): Decizia pentru încercările în plus:
+                'approved', 'denied' sau 'pending' (administratorul nu răspunde)
+            unrecorded_delay (float): După cât timp apare decizia lor (secunde)
+        """
+        self.clock = clock
+        self.unrecorded_decision = unrecorded
+        self.unrecorded_delay = unrecorded_delay
+        self.unrecorded = 0
+        self._registrations = deque()
+        self._decisions = {}
+        self._registered = {}
+        recorded_at = {}
+        for record in records:
+            if record['k'] != 's':
+                continue
+            if record['m'] == 'POST' and record['u'] == '/api/attempt':
+                self._registrations.append(record)
+                if 'x' not in record:
+                    recorded_at[record['b']['id']] = record['t']
+            elif record['m'] == 'GET' and record['u'].startswith('/api/attempt/'):
+                attempt_id = int(record['u'].rsplit('/', 1)[1])
+                status = record.get('b', {}).get('status')
+                if (status in ('approved', 'denied') and attempt_id not in self._decisions
+                        and attempt_id in recorded_at):
+                    self._decisions[attempt_id] = (status, record['t'] - recorded_at[attempt_id])
+        self._next_id = max(recorded_at, default=0) + 1
+
+    @property
+    def unused(self):
+        return len(self._registrations)
+
+    def post_json(self, path, payload, deadline=None):
+        if path != '/api/attempt':
+            # Fotografii, decizii locale, loturi din spool - acceptate
+            return {'success': True, 'results': []}
+        if not self._registrations:
+            self.unrecorded += 1
+            attempt_id = self._next_id
+            self._next_id += 1
+            if self.unrecorded_decision != 'pending':
+                self._decisions[attempt_id] = (self.unrecorded_decision, self.unrecorded_delay)
+        else:
+            record = self._registrations.popleft()
+            if 'x' in record:
+                raise ServerUnavailable(f"POST {path}: {record['x']} (recorded)")
+            attempt_id = record['b']['id']
+        self._registered[attempt_id] = self.clock.time()
+        return {'id': attempt_id}
+
+    def get_json(self, path, deadline=None, read_timeout=None):
+        if path.startswith('/api/attempt/'):
+            attempt_id = int(path.rsplit('/', 1)[1])
+            decision = self._decisions.get(attempt_id)
+            registered = self._registered.get(attempt_id)
+            if (decision is not None and registered is not None
+                    and self.clock.time() - registered >= decision[1]):
+                return {'status': decision[0]}
+            return {'status': 'pending'}
+        if path.startswith('/api/revocations'):
+            return {'cursor': 0, 'revocations': []}
+        raise ServerUnavailable(f"GET {path}: not in trace")
+
+    def close(self):
+        pass
+
+
+class ReplayApprovalEngine(ApprovalEngine):
+    """
+    ApprovalEngine fără fire: pașii sunt programați pe ceasul virtual și
+    executați de TraceReplayer, în ordinea termenelor.
+
+    Atribute:
+        timeline (list): Heap de (termen, secvență, cerere, versiune)
+        flows (list): Fluxurile încheiate (root, cale, tip, decizie, moment)
+    """
+
+    def __init__(self, handler, clock):
+        super().__init__(handler, clock=clock, capture=lambda: (None, None))
+        self.timeline = []
+        self.flows = []
+        self._sequence = 0
+
+    def submit(self, root, path, access_type):
+        request = super().submit(root, path, access_type)
+        if request is not None:
+            # Nu există cameră; acțiunile de interfață sunt doar înregistrate
+            self._run_side_stage('ui', self._stage_ui, request)
+        return request
+
+    def _schedule(self, request, delay=0, generation=None):
+        if generation is None:
+            generation = request.generation
+        self._sequence += 1
+        heapq.heappush(self.timeline, (self.clock.monotonic() + max(delay, 0), self._sequence,
+                                       request, generation))
+
+    def next_due(self):
+        return self.timeline[0][0] if self.timeline else None
+
+    def run_next(self):
+        _, _, request, generation = heapq.heappop(self.timeline)
+        self._run_step(request, generation)
+
+    def _step_done(self, request):
+        result = super()._step_done(request)
+        self.flows.append((request.root.path, request.path, request.access_type,
+                           request.decision, self.clock.monotonic()))
+        return result
+
+
+class TraceReplayer:
+    """
+    Reia un fișier de urmă prin pipeline-ul de decizie al monitorului.
+
+    Atribute:
+        header (dict): Antetul urmei
+        records (list): Înregistrările urmei
+        clock (VirtualClock): Ceasul reluării
+        handler (FolderAccessHandler): Handler-ul real, cu backend-uri false
+        speed (float): Factorul de accelerare (None = cât de repede se poate)
+    """
+
+    def __init__(self, path, speed=None, unrecorded='pending'):
+        """
+        Parametri:
+            path (str): Fișierul de urmă
+            speed (float, optional): Rulare în ritmul urmei, accelerat de atâtea
+                ori (None = fără pauze)
+            unrecorded (str): Decizia pentru încercările care nu existau în urmă
+        """
+        self.header, self.records = load_trace(path)
+        self.speed = speed
+        self.clock = VirtualClock(self.header['start'])
+        roots = [ProtectedRoot(root_path, cooldown=cooldown, approval_cache_duration=duration)
+                 for root_path, cooldown, duration in self.header['roots']]
+
+        self.server = TraceServer(self.records, self.clock, unrecorded=unrecorded)
+        self.os_actions = RecordingOSActions(self.clock)
+        self.handler = FolderAccessHandler(roots, clock=self.clock, server=self.server,
+                                           spool=AttemptSpool(':memory:'),
+                                           os_actions=self.os_actions)
+        self.engine = self.handler.approvals = ReplayApprovalEngine(self.handler, self.clock)
+        self.window_source = FakeWindowSource()
+        self.finder_monitor = FinderWindowMonitor(self.handler, window_source=self.window_source)
+        self.poll_errors = 0
+        self.finder_detections = 0
+
+    def _run_until(self, target):
+        """Execută, în ordinea termenelor, tot ce este programat până la target."""
+        queue = self.handler.pipeline.queue
+        while True:
+            engine_due = self.engine.next_due()
+            queue_due = queue.next_deadline()
+            dues = [due for due in (engine_due, queue_due) if due is not None]
+            if not dues or min(dues) > target:
+                break
+            self.clock.advance_to(min(dues))
+            if queue_due is not None and queue_due <= self.clock.now:
+                self.handler.pipeline.drain_due()
+            else:
+                self.engine.run_next()
+        self.clock.advance_to(target)
+
+    def _apply(self, record):
+        kind = record['k']
+        if kind == 'e':
+            self.handler.on_any_event(TraceEvent(record['path'], record['e'], bool(record.get('d'))))
+        elif kind == 'w':
+            if 'x' in record:
+                self.poll_errors += 1
+                return
+            self.window_source.set_paths(record['paths'])
+            for root in self.finder_monitor.check_finder_windows():
+                self.finder_detections += 1
+                self.handler.handle_access(root.path, 'folder_opened')
+
+    def run(self):
+        """
+        Reia urma și returnează raportul.
+
+        Returnează:
+            dict: Rezultatele reluării (vezi report())
+        """
+        started = time.perf_counter()
+        for record in self.records:
+            if self.speed:
+                # Ritmul urmei, accelerat: pauza reală = pauza înregistrată / speed
+                delay = (record['t'] - self.clock.now) / self.speed
+                if delay > 0:
+                    time.sleep(delay)
+            self._run_until(record['t'])
+            self._apply(record)
+
+        # Fluxurile începute spre finalul urmei se termină (refuz automat,
+        # blocare) - cel mult APPROVAL_TIMEOUT + LOCK_DELAY + debounce
+        last = self.records[-1]['t'] if self.records else 0.0
+        self._run_until(last + config.APPROVAL_TIMEOUT + ApprovalEngine.LOCK_DELAY
+                        + config.EVENT_MAX_DELAY + 1)
+        self.wall_time = time.perf_counter() - started
+        self.handler.spool.close()
+        return self.report()
+
+    def report(self):
+        """
+        Construiește raportul reluării.
+
+        Returnează:
+            dict: trace (rezumatul urmei), virtual_time, wall_time, speedup,
+                  events_per_second, pipeline, flows, decisions,
+                  recorded_decisions, matched, mismatches, os_actions, server
+        """
+        summary = summarize(self.records)
+        recorded = [(record['path'], record.get('d')) for record in self.records
+                    if record['k'] == 'f']
+        replayed = [(root, decision) for root, _, _, decision, _ in self.engine.flows]
+        matched = sum(1 for a, b in zip(recorded, replayed) if a == b)
+        mismatches = [(index, a, b) for index, (a, b) in enumerate(zip(recorded, replayed))
+                      if a != b]
+        decisions = {}
+        for _, decision in replayed:
+            decisions[decision or 'none'] = decisions.get(decision or 'none', 0) + 1
+        wall = max(self.wall_time, 1e-9)
+        return {
+            'trace': summary,
+            'virtual_time': self.clock.now,
+            'wall_time': self.wall_time,
+            'speedup': self.clock.now / wall,
+            'events_per_second': summary['events'] / wall,
+            'pipeline': self.handler.pipeline.stats(),
+            'finder_detections': self.finder_detections,
+            'poll_errors': self.poll_errors,
+            'flows': len(replayed),
+            'decisions': decisions,
+            'recorded_decisions': summary['decisions'],
+            'matched': matched,
+            'compared': max(len(recorded), len(replayed)),
+            'mismatches': mismatches,
+            'os_actions': self.os_actions.counts(),
+            'server': {'unrecorded': self.server.unrecorded, 'unused': self.server.unused},
+        }
+
+
+def config_changes(header):
+    """
+    Compară configurarea din urmă cu cea curentă.
+
+    Returnează:
+        list: Tupluri (nume, valoarea din urmă, valoarea curentă) care diferă
+    """
+    recorded = header.get('config', {})
+    changes = []
+    for name in TRACE_CONFIG:
+        current = getattr(config, name)
+        if name in recorded and recorded[name] != current:
+            changes.append((name, recorded[name], current))
+    return changes
+
+
+def print_report(path, replayer, report):
+    trace = report['trace']
+    print(f"Trace {path}: {trace['duration']:.1f}s recorded, {trace['events']} file events, "
+          f"{trace['polls']} window polls, {trace['server']} server responses")
+    for name, recorded, current in config_changes(replayer.header):
+        print(f"  config changed: {name} = {current!r} (recorded with {recorded!r})")
+    print(f"Replayed {report['virtual_time']:.1f}s in {report['wall_time'] * 1000:.0f} ms "
+          f"({report['speedup']:.0f}x real time, {report['events_per_second']:.0f} events/s)")
+    pipeline = report['pipeline']
+    print(f"Pipeline: {pipeline['received']} received, {pipeline['ignored']} ignored, "
+          f"{pipeline['coalesced']} coalesced, {pipeline['dropped']} dropped, "
+          f"{pipeline['emitted']} emitted; Finder detections: {report['finder_detections']}")
+    decisions = ', '.join(f"{count} {decision}"
+                          for decision, count in sorted(report['decisions'].items())) or 'none'
+    recorded = ', '.join(f"{count} {decision}"
+                         for decision, count in sorted(report['recorded_decisions'].items())) \
+        or 'none'
+    print(f"Approval flows: {report['flows']} ({decisions}); recorded: {trace['flows']} ({recorded})")
+    print(f"Decisions matching the recording: {report['matched']}/{report['compared']}")
+    for index, expected, actual in report['mismatches'][:5]:
+        print(f"  flow #{index + 1}: recorded {expected[1]} for {expected[0]}, "
+              f"replayed {actual[1]} for {actual[0]}")
+    actions = ', '.join(f"{name}={count}" for name, count in sorted(report['os_actions'].items()))
+    print(f"OS actions: {actions or 'none'}")
+    server = report['server']
+    if server['unrecorded'] or server['unused']:
+        print(f"Server: {server['unrecorded']} attempt(s) not in the trace, "
+              f"{server['unused']} recorded attempt(s) not replayed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reia un fișier de urmă al monitorului")
+    parser.add_argument('trace', help="fișierul de urmă (config.TRACE_PATH)")
+    parser.add_argument('--speed', type=float,
+                        help="rulează în ritmul urmei, accelerat de atâtea ori "
+                             "(implicit: fără pauze)")
+    parser.add_argument('--unrecorded', choices=('pending', 'approved', 'denied'),
+                        default='pending',
+                        help="decizia pentru încercările care nu există în urmă")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="afișează mesajele monitorului în timpul reluării")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="[%(levelname)s] %(message)s")
+    replayer = TraceReplayer(args.trace, speed=args.speed, unrecorded=args.unrecorded)
+    report = replayer.run()
+    print_report(args.trace, replayer, report)
+
+
+if __name__ == '__main__':
+    main()
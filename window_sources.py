@@ -0,0 +1,390 @@
+"""
+Surse de Ferestre - Backend-uri pentru listarea folderelor deschise
+
+Descriere:
+    FinderWindowMonitor are nevoie, la fiecare verificare, de lista căilor
+    afișate în ferestrele deschise. Acest modul definește interfața comună
+    WindowSource și mai multe implementări:
+
+    - PersistentFinderWindowSource: un singur proces osascript (JXA) care
+      rămâne pornit și răspunde la cereri repetate printr-un pipe.
+      Costul unei verificări devine un schimb de mesaje, nu o pornire de proces
+      și o recompilare a scriptului.
+    - OsascriptWindowSource: varianta clasică (un proces osascript nou
+      pentru fiecare verificare) - folosită ca rezervă.
+    - ProcCwdWindowSource: echivalent pentru Linux - directoarele de lucru
+      ale proceselor utilizatorului (manager de fișiere, terminale).
+    - FakeWindowSource: listă de căi controlată din cod (pentru teste).
+
+Autor: Bascacov Alexandra
+Versiune: 1.0
+"""
+
+import json
+import logging
+import os
+import selectors
+import subprocess
+import sys
+import threading
+
+log = logging.getLogger(__name__)
+
+
+# Script AppleScript pentru a obține toate căile ferestrelor Finder
+# Folosește 'folder of' pentru a gestiona ferestrele de folder obișnuite
+_APPLESCRIPT_LIST_WINDOWS = '''
+tell application "Finder"
+    set windowPaths to {}
+    set windowCount to count of windows
+    repeat with i from 1 to windowCount
+        try
+            set w to window i
+            set t to target of w
+            set p to POSIX path of (t as alias)
+            set end of windowPaths to p
+        on error errMsg
+            -- Window might be a special view (Recents, Tags, etc.)
+            log "Window " & i & " error: " & errMsg
+        end try
+    end repeat
+    return windowPaths
+end tell
+'''
+
+# Script JXA pentru procesul persistent: compilat o singură dată, apoi
+# citește câte o linie de la stdin pentru fiecare cerere și răspunde cu
+# o linie JSON (lista căilor ferestrelor Finder).
+_JXA_WINDOW_SERVER = '''
+ObjC.import('Foundation');
+
+function run() {
+    var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+    var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+    var finder = Application('Finder');
+    var buffer = '';
+
+    while (true) {
+        var data = stdin.availableData;
+        if (data.length === 0) {
+            break;  // EOF - procesul Python s-a oprit
+        }
+        buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+        var lines = buffer.split('\\n');
+        buffer = lines.pop();
+
+        for (var i = 0; i < lines.length; i++) {
+            var paths = [];
+            try {
+                var windows = finder.finderWindows();
+                for (var j = 0; j < windows.length; j++) {
+                    try {
+                        paths.push($.NSURL.URLWithString(windows[j].target.url()).path.js);
+                    } catch (e) {
+                        // Fereastră specială (Recents, Tags etc.)
+                    }
+                }
+            } catch (e) {
+                // Finder nu rulează
+            }
+            var out = JSON.stringify(paths) + '\\n';
+            stdout.writeData($(out).dataUsingEncoding($.NSUTF8StringEncoding));
+        }
+    }
+}
+'''
+
+
+class WindowSourceError(Exception):
+    """Sursa de ferestre nu a putut răspunde la cerere."""
+
+
+class WindowSource:
+    """
+    Interfața comună pentru sursele de ferestre.
+
+    O sursă de ferestre returnează căile (foldere) afișate în ferestrele
+    deschise. Implementările trebuie să fie sigure pentru apeluri repetate
+    din firul de verificare al FinderWindowMonitor.
+    """
+
+    # Numele backend-ului (afișat în mesajele de pornire)
+    name = 'base'
+
+    def list_window_paths(self):
+        """
+        Obține căile afișate în ferestrele deschise.
+
+        Returnează:
+            list: Lista căilor (str)
+
+        Ridică:
+            WindowSourceError: Dacă sursa nu poate răspunde
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Eliberează resursele sursei (procese, fișiere)."""
+
+
+class OsascriptWindowSource(WindowSource):
+    """
+    Sursă de ferestre care pornește un proces osascript nou la fiecare cerere.
+
+    Este comportamentul original al monitorului: simplu, dar fiecare
+    verificare costă un fork/exec și recompilarea AppleScript-ului.
+    """
+
+    name = 'osascript'
+
+    def list_window_paths(self):
+        try:
+            result = subprocess.run(
+                ['osascript', '-e', _APPLESCRIPT_LIST_WINDOWS],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise WindowSourceError(str(e)) from e
+
+        if result.returncode != 0:
+            raise WindowSourceError(f"rc={result.returncode}, stderr='{result.stderr.strip()}'")
+
+        # Ieșirea este o listă separată prin virgulă
+        paths = result.stdout.strip()
+        if not paths:
+            return []
+        return [p.strip() for p in paths.split(', ')]
+
+
+class PersistentFinderWindowSource(WindowSource):
+    """
+    Sursă de ferestre cu un proces osascript (JXA) persistent.
+
+    Procesul este pornit o singură dată; fiecare cerere trimite o linie
+    prin stdin și citește răspunsul JSON din stdout. Dacă procesul moare
+    sau nu răspunde, este repornit. După MAX_RESTARTS eșecuri consecutive
+    se trece definitiv pe sursa de rezervă (implicit OsascriptWindowSource).
+
+    Atribute:
+        timeout (float): Timpul maxim (secunde) de așteptare pentru un răspuns
+        fallback (WindowSource): Sursa folosită dacă procesul nu funcționează
+        restarts (int): Numărul de reporniri ale procesului
+    """
+
+    name = 'persistent-jxa'
+
+    # Numărul de eșecuri consecutive după care se renunță la procesul persistent
+    MAX_RESTARTS = 3
+
+    def __init__(self, timeout=2.0, fallback=None):
+        """
+        Inițializează sursa persistentă (procesul este pornit la prima cerere).
+
+        Parametri:
+            timeout (float): Timpul maxim de așteptare pentru un răspuns
+            fallback (WindowSource, optional): Sursa de rezervă
+        """
+        self.timeout = timeout
+        self.fallback = fallback if fallback is not None else OsascriptWindowSource()
+        self.restarts = 0
+        self._failures = 0
+        self._process = None
+        self._buffer = b''
+        self._lock = threading.Lock()
+
+    def _start(self):
+        """Pornește procesul osascript persistent."""
+        self._process = subprocess.Popen(
+            ['osascript', '-l', 'JavaScript', '-e', _JXA_WINDOW_SERVER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+        self._buffer = b''
+
+    def _stop(self):
+        """Oprește procesul persistent (dacă rulează)."""
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=1)
+        except Exception:
+            self._process.kill()
+        self._process = None
+
+    def _read_line(self):
+        """
+        Citește o linie de răspuns din stdout-ul procesului, cu timeout.
+
+        Returnează:
+            bytes: Linia citită (fără '\\n')
+
+        Ridică:
+            WindowSourceError: La timeout sau dacă procesul s-a închis
+        """
+        fd = self._process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b'\n' not in self._buffer:
+                if not selector.select(self.timeout):
+                    raise WindowSourceError('timeout waiting for window helper')
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    raise WindowSourceError('window helper exited')
+                self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return line
+
+    def _query(self):
+        """Trimite o cerere procesului persistent și returnează căile."""
+        try:
+            if self._process is None or self._process.poll() is not None:
+                if self._process is not None:
+                    self.restarts += 1
+                self._start()
+            self._process.stdin.write(b'list\n')
+            return json.loads(self._read_line())
+        except (OSError, ValueError) as e:
+            raise WindowSourceError(str(e)) from e
+
+    def list_window_paths(self):
+        with self._lock:
+            if self._failures >= self.MAX_RESTARTS:
+                return self.fallback.list_window_paths()
+            try:
+                paths = self._query()
+                self._failures = 0
+                return paths
+            except WindowSourceError:
+                self._failures += 1
+                self._stop()
+                if self._failures >= self.MAX_RESTARTS:
+                    log.warning("Persistent window process is not responding - using '%s'",
+                                self.fallback.name)
+                raise
+
+    def close(self):
+        with self._lock:
+            self._stop()
+        self.fallback.close()
+
+
+class ProcCwdWindowSource(WindowSource):
+    """
+    Sursă de ferestre pentru Linux - directoarele de lucru ale proceselor.
+
+    Pe Linux nu există Finder; cel mai apropiat echivalent al unei
+    "ferestre deschise într-un folder" este un proces (manager de fișiere,
+    terminal, editor) al cărui director de lucru este acel folder.
+    Se citesc legăturile /proc/<pid>/cwd ale proceselor aceluiași utilizator,
+    fără a porni niciun proces nou.
+
+    Un director de lucru este raportat o singură dată - când procesul apare
+    sau își schimbă directorul. Pe Linux nimic nu "închide" un terminal
+    rămas într-un folder protejat, deci raportarea lui la fiecare verificare
+    ar înregistra o încercare nouă la fiecare cooldown, cât timp procesul
+    rămâne acolo.
+    """
+
+    name = 'proc-cwd'
+
+    def __init__(self, proc_root='/proc'):
+        """
+        Parametri:
+            proc_root (str): Rădăcina sistemului de fișiere proc
+        """
+        self.proc_root = proc_root
+        self._uid = os.getuid()
+        self._own_pid = os.getpid()
+        self._cwds = {}  # pid -> directorul de lucru la verificarea anterioară
+
+    def list_window_paths(self):
+        cwds = {}
+        try:
+            entries = os.scandir(self.proc_root)
+        except OSError as e:
+            raise WindowSourceError(str(e)) from e
+
+        with entries:
+            for entry in entries:
+                if not entry.name.isdigit() or int(entry.name) == self._own_pid:
+                    continue
+                try:
+                    if entry.stat(follow_symlinks=False).st_uid != self._uid:
+                        continue
+                    cwds[entry.name] = os.readlink(os.path.join(entry.path, 'cwd'))
+                except OSError:
+                    # Procesul s-a terminat sau nu avem acces
+                    continue
+        # Doar procesele noi și directoarele schimbate de la verificarea anterioară
+        paths = {cwd for pid, cwd in cwds.items() if self._cwds.get(pid) != cwd}
+        self._cwds = cwds
+        return sorted(paths)
+
+
+class FakeWindowSource(WindowSource):
+    """
+    Sursă de ferestre controlată din cod - pentru teste și reluări.
+
+    Atribute:
+        queries (int): Numărul de cereri primite
+    """
+
+    name = 'fake'
+
+    def __init__(self, paths=None):
+        """
+        Parametri:
+            paths (list, optional): Căile "deschise" inițial
+        """
+        self._paths = list(paths or [])
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def set_paths(self, paths):
+        """
+        Setează căile "deschise" returnate de următoarele cereri.
+
+        Parametri:
+            paths (list): Lista căilor
+        """
+        with self._lock:
+            self._paths = list(paths)
+
+    def list_window_paths(self):
+        with self._lock:
+            self.queries += 1
+            return list(self._paths)
+
+
+def create_window_source(kind='auto'):
+    """
+    Creează sursa de ferestre potrivită pentru platforma curentă.
+
+    Parametri:
+        kind (str): 'auto', 'persistent', 'osascript', 'proc' sau 'fake'
+
+    Returnează:
+        WindowSource: Sursa de ferestre creată
+    """
+    if kind == 'auto':
+        if sys.platform == 'darwin':
+            kind = 'persistent'
+        elif sys.platform.startswith('linux'):
+            kind = 'proc'
+        else:
+            kind = 'osascript'
+
+    if kind == 'persistent':
+        return PersistentFinderWindowSource()
+    if kind == 'osascript':
+        return OsascriptWindowSource()
+    if kind == 'proc':
+        return ProcCwdWindowSource()
+    if kind == 'fake':
+        return FakeWindowSource()
+    raise ValueError(f"Sursă de ferestre necunoscută: {kind}")